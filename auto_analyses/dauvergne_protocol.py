@@ -36,6 +36,7 @@ from lib.float import floatAsByteArray
 from lib.text.sectioning import title, subtitle
 from lib.text.string import LIST, PARAGRAPH, SECTION, SUBSECTION, TITLE, to_docstring
 from lib.timing import print_elapsed_time
+from multi import Processor_box
 from pipe_control.interatomic import interatomic_loop
 from pipe_control.mol_res_spin import exists_mol_res_spin_data, return_spin, spin_loop
 from pipe_control.pipes import cdp_name, get_pipe, has_pipe, pipe_names, switch
@@ -125,7 +126,7 @@ class dAuvergne_protocol:
     opt_func_tol = 1e-25
     opt_max_iterations = int(1e7)
 
-    def __init__(self, pipe_name=None, pipe_bundle=None, results_dir=None, write_results_dir=None, diff_model=None, mf_models=['m0', 'm1', 'm2', 'm3', 'm4', 'm5', 'm6', 'm7', 'm8', 'm9'], local_tm_models=['tm0', 'tm1', 'tm2', 'tm3', 'tm4', 'tm5', 'tm6', 'tm7', 'tm8', 'tm9'], grid_inc=11, diff_tensor_grid_inc={'sphere': 11, 'prolate': 11, 'oblate': 11, 'ellipsoid': 6}, min_algor='newton', mc_sim_num=500, max_iter=None, user_fns=None, conv_loop=True):
+    def __init__(self, pipe_name=None, pipe_bundle=None, results_dir=None, write_results_dir=None, diff_model=None, mf_models=['m0', 'm1', 'm2', 'm3', 'm4', 'm5', 'm6', 'm7', 'm8', 'm9'], local_tm_models=['tm0', 'tm1', 'tm2', 'tm3', 'tm4', 'tm5', 'tm6', 'tm7', 'tm8', 'tm9'], grid_inc=11, diff_tensor_grid_inc={'sphere': 11, 'prolate': 11, 'oblate': 11, 'ellipsoid': 6}, min_algor='newton', mc_sim_num=500, max_iter=None, user_fns=None, conv_loop=True, concurrent=False):
         """Perform the full model-free analysis protocol of d'Auvergne and Gooley, 2008b.
 
         @keyword pipe_name:             The name of the data pipe containing the sequence info.  This data pipe should have all values set including the CSA value, the bond length, the heteronucleus name and proton name.  It should also have all relaxation data loaded.
@@ -156,6 +157,8 @@ class dAuvergne_protocol:
         @type user_fns:                 dict
         @keyword conv_loop:             Automatic looping over all rounds until convergence.
         @type conv_loop:                bool
+        @keyword concurrent:            A flag which if True will cause the grid searches and minimisations of all model-free models to be executed together as a single queue of slave commands, so that the independent models are optimised concurrently on the multi-processor fabric.  Otherwise the models are optimised one after the other.
+        @type concurrent:               bool
         """
 
         # Initial printout.
@@ -177,6 +180,7 @@ class dAuvergne_protocol:
             self.mc_sim_num = mc_sim_num
             self.max_iter = max_iter
             self.conv_loop = conv_loop
+            self.concurrent = concurrent
 
             # The model-free data pipe names.
             self.mf_model_pipes = []
@@ -352,6 +356,8 @@ class dAuvergne_protocol:
         # Looping.
         if not isinstance(self.conv_loop, bool):
             raise RelaxError("The conv_loop user variable '%s' is incorrectly set.  It should be one of the booleans True or False." % self.conv_loop)
+        if not isinstance(self.concurrent, bool):
+            raise RelaxError("The concurrent user variable '%s' is incorrectly set.  It should be one of the booleans True or False." % self.concurrent)
 
 
     def convergence(self):
@@ -860,7 +866,10 @@ class dAuvergne_protocol:
 
 
     def multi_model(self, local_tm=False):
-        """Function for optimisation of all model-free models."""
+        """Function for optimisation of all model-free models.
+
+        If the concurrent flag is set, the slave commands for the grid searches of all models are first queued and executed together, followed by the minimisations of all models.  The models are independent, hence the results are identical to the sequential optimisation.  As the slave commands store the results directly in the spin containers of the model data pipes, the results are in the correct data pipes before the model elimination and model selection steps.
+        """
 
         # Set the data pipe names (also the names of preset model-free models).
         if local_tm:
@@ -872,7 +881,7 @@ class dAuvergne_protocol:
         for i in range(len(models)):
             self.pipes.append(self.name_pipe(models[i]))
 
-        # Loop over the data pipes.
+        # Set up the data pipes.
         for i in range(len(models)):
             # Place the model name into the status container.
             status.auto_analysis[self.pipe_bundle].current_model = models[i]
@@ -891,6 +900,10 @@ class dAuvergne_protocol:
             # Select the model-free model.
             self.interpreter.model_free.select_model(model=models[i])
 
+            # Concurrent optimisation of all models below.
+            if self.concurrent:
+                continue
+
             # Minimise.
             self.interpreter.minimise.grid_search(inc=self.grid_inc)
             self.interpreter.minimise.execute(self.min_algor, func_tol=self.opt_func_tol, max_iter=self.opt_max_iterations)
@@ -902,6 +915,46 @@ class dAuvergne_protocol:
             dir = self.base_dir + models[i]
             self.interpreter.results.write(file='results', dir=dir, force=True)
 
+        # Concurrent optimisation.
+        if self.concurrent:
+            # Unset the status.
+            status.auto_analysis[self.pipe_bundle].current_model = None
+
+            # Get the Processor box singleton (it contains the Processor instance) and alias the Processor.
+            processor_box = Processor_box()
+            processor = processor_box.processor
+
+            # The grid search, and then the minimisation, of all models as single queues.
+            for stage in ['grid', 'min']:
+                processor.hold_queue()
+                try:
+                    for i in range(len(models)):
+                        self.interpreter.pipe.switch(self.pipes[i])
+                        if stage == 'grid':
+                            self.interpreter.minimise.grid_search(inc=self.grid_inc)
+                        else:
+                            self.interpreter.minimise.execute(self.min_algor, func_tol=self.opt_func_tol, max_iter=self.opt_max_iterations)
+
+                # Clean up the queue on failure, without executing the queued slave commands.
+                except:
+                    processor.discard_queue()
+                    raise
+
+                # Execute all queued slave commands.
+                processor.release_queue()
+
+            # Model elimination and writing of the results.
+            for i in range(len(models)):
+                # Switch to the model's data pipe.
+                self.interpreter.pipe.switch(self.pipes[i])
+
+                # Model elimination.
+                self.interpreter.eliminate()
+
+                # Write the results.
+                dir = self.base_dir + models[i]
+                self.interpreter.results.write(file='results', dir=dir, force=True)
+
         # Unset the status.
         status.auto_analysis[self.pipe_bundle].current_model = None
 
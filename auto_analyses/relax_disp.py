@@ -39,6 +39,7 @@ from lib.io import determine_compression, get_file_path
 from lib.text.sectioning import section, subsection, subtitle, title
 from lib.timing import print_elapsed_time
 from lib.warnings import RelaxWarning
+from multi import Processor_box
 from pipe_control.mol_res_spin import return_spin, spin_loop
 from pipe_control.pipes import has_pipe
 from prompt.interpreter import Interpreter
@@ -55,7 +56,7 @@ class Relax_disp:
     opt_func_tol = 1e-25
     opt_max_iterations = int(1e7)
 
-    def __init__(self, pipe_name=None, pipe_bundle=None, results_dir=None, models=[MODEL_R2EFF], grid_inc=11, mc_sim_num=500, exp_mc_sim_num=None, modsel='AIC', pre_run_dir=None, optimise_r2eff=False, insignificance=0.0, numeric_only=False, mc_sim_all_models=False, eliminate=True, set_grid_r20=False, r1_fit=False):
+    def __init__(self, pipe_name=None, pipe_bundle=None, results_dir=None, models=[MODEL_R2EFF], grid_inc=11, mc_sim_num=500, exp_mc_sim_num=None, modsel='AIC', pre_run_dir=None, optimise_r2eff=False, insignificance=0.0, numeric_only=False, mc_sim_all_models=False, eliminate=True, set_grid_r20=False, r1_fit=False, concurrent=False):
         """Perform a full relaxation dispersion analysis for the given list of models.
 
         @keyword pipe_name:                 The name of the data pipe containing all of the data for the analysis.
@@ -70,7 +71,7 @@ class Relax_disp:
         @type grid_inc:                     int or None
         @keyword mc_sim_num:                The number of Monte Carlo simulations to be used for error analysis at the end of the analysis.
         @type mc_sim_num:                   int
-        @keyword exp_mc_sim_num:            The number of Monte Carlo simulations for the error analysis in the 'R2eff' model when exponential curves are fitted.  This defaults to the value of the mc_sim_num argument when not given.  When set to '-1', the R2eff errors are estimated from the Covariance matrix.  For the 2-point fixed-time calculation for the 'R2eff' model, this argument is ignored.
+        @keyword exp_mc_sim_num:            The number of Monte Carlo simulations for the error analysis in the 'R2eff' model when exponential curves are fitted.  This defaults to the value of the mc_sim_num argument when not given.  When set to '-1', the exponential curves are fitted in the batched Levenberg-Marquardt mode and the R2eff errors are estimated from the Covariance matrix.  For the 2-point fixed-time calculation for the 'R2eff' model, this argument is ignored.
         @type exp_mc_sim_num:               int or None
         @keyword modsel:                    The model selection technique to use in the analysis to determine which model is the best for each spin cluster.  This can currently be one of 'AIC', 'AICc', and 'BIC'.
         @type modsel:                       str
@@ -89,6 +90,8 @@ class Relax_disp:
         @keyword set_grid_r20:              A flag which if True will set the grid R20 values from the minimum R2eff values through the r20_from_min_r2eff user function. This will speed up the grid search with a factor GRID_INC^(Nr_spec_freq). For a CPMG experiment with two fields and standard GRID_INC=21, the speed-up is a factor 441.
         @type set_grid_r20:                 bool
         @keyword r1_fit:                    A flag which if True will activate R1 parameter fitting via relax_disp.r1_fit for the models that support it.  If False, then the relax_disp.r1_fit user function will not be called.
+        @keyword concurrent:                A flag which if True will cause the models to be optimised in waves of independent models, built from the model dependency graph of the R2eff value copying and model nesting.  The grid searches and minimisations of all models of a wave are executed together as single queues of slave commands on the multi-processor fabric.  Otherwise the models are optimised one after the other.
+        @type concurrent:                   bool
         """
 
         # Initial printout.
@@ -120,6 +123,7 @@ class Relax_disp:
             self.mc_sim_all_models = mc_sim_all_models
             self.eliminate = eliminate
             self.r1_fit = r1_fit
+            self.concurrent = concurrent
 
             # No results directory, so default to the current directory.
             if not self.results_dir:
@@ -258,6 +262,62 @@ class Relax_disp:
         self.interpreter.spectrum.error_analysis_per_field()
 
 
+    def model_dependencies(self, model=None):
+        """Determine the models which must be optimised before the given model.
+
+        These are the 'R2eff' model, from which the R2eff values are copied, and the nested model from which the optimised parameters are copied (see the nesting() method).
+
+
+        @keyword model: The model to be optimised.
+        @type model:    str
+        @return:        The list of models which the model depends on.
+        @rtype:         list of str
+        """
+
+        # The R2eff values.
+        deps = []
+        if model != MODEL_R2EFF and MODEL_R2EFF in self.models:
+            deps.append(MODEL_R2EFF)
+
+        # The nested model.
+        model_info, comparable_model_info = nesting_model(self_models=self.models, model=model)
+        if comparable_model_info != None and comparable_model_info.model not in deps:
+            deps.append(comparable_model_info.model)
+
+        # Return the dependencies.
+        return deps
+
+
+    def model_waves(self):
+        """Sort the models into waves of mutually independent models using the model dependency graph.
+
+        Each model is placed into the wave after the last of the models it depends on, so that the number of waves is the length of the longest dependency chain.
+
+
+        @return:    The list of waves, each being the list of models in the order of the models argument.
+        @rtype:     list of list of str
+        """
+
+        # Loop over the models.
+        levels = {}
+        waves = []
+        for model in self.models:
+            # The wave index.
+            level = 0
+            for dep in self.model_dependencies(model):
+                if dep in levels:
+                    level = max(level, levels[dep] + 1)
+            levels[model] = level
+
+            # Store the model.
+            if level == len(waves):
+                waves.append([])
+            waves[level].append(model)
+
+        # Return the waves.
+        return waves
+
+
     def name_pipe(self, prefix):
         """Generate a unique name for the data pipe.
 
@@ -359,6 +419,90 @@ class Relax_disp:
     def optimise(self, model=None, model_path=None):
         """Optimise the model, taking model nesting into account.
 
+        @keyword model:         The model to be optimised.
+        @type model:            str
+        @keyword model_path:    The folder name for the model, where possible spaces has been replaced with underscore.
+        @type model_path:       str
+        """
+
+        # Execute all optimisation stages.
+        for stage in self.optimise_stages(model=model, model_path=model_path):
+            pass
+
+
+    def optimise_models(self, models=None):
+        """Optimise a set of independent models together.
+
+        The optimisation stages of all models are advanced in lockstep.  For each stage, the processor queue is held while the slave commands of all models are queued, and then all of these are executed as a single queue.
+
+
+        @keyword models:    The list of models to optimise.  The models must not depend on each other.
+        @type models:       list of str
+        """
+
+        # Get the Processor box singleton (it contains the Processor instance) and alias the Processor.
+        processor_box = Processor_box()
+        processor = processor_box.processor
+
+        # Set up the models.
+        stages = []
+        for model in models:
+            # Printout.
+            subtitle(file=sys.stdout, text="The '%s' model" % model, prespace=3)
+
+            # Set up the data pipe, skipping models with results.
+            if self.setup_model(model=model):
+                stages.append([model, None])
+
+        # Loop until all models are optimised.
+        while len(stages):
+            processor.hold_queue()
+            try:
+                for i in range(len(stages)):
+                    # Alias.
+                    model, stage = stages[i]
+                    model_path = model.replace(" ", "_")
+
+                    # Switch to the data pipe of the model.
+                    self.interpreter.pipe.switch(self.name_pipe(model))
+
+                    # The first stage.
+                    if stage == None:
+                        # Calculate the R2eff values for the fixed relaxation time period data types.
+                        if model == MODEL_R2EFF and not has_exponential_exp_type():
+                            self.interpreter.minimise.calculate()
+                            stage = iter([])
+
+                        # Optimise the model.
+                        else:
+                            stage = self.optimise_stages(model=model, model_path=model_path)
+                        stages[i][1] = stage
+
+                    # Queue the slave commands of the next stage, finishing the model if there are no more stages.
+                    try:
+                        next(stage)
+                    except StopIteration:
+                        self.write_results(path=self.results_dir+sep+model_path, model=model)
+                        stages[i] = None
+
+            # Clean up the queue on failure, without executing the queued slave commands.
+            except:
+                processor.discard_queue()
+                raise
+
+            # Execute all queued slave commands.
+            processor.release_queue()
+
+            # Remove the finished models.
+            stages = [element for element in stages if element != None]
+
+
+    def optimise_stages(self, model=None, model_path=None):
+        """Optimise the model, taking model nesting into account, as a generator of optimisation stages.
+
+        The generator yields after each grid search and minimisation user function call, so that the slave commands of other models can be queued before the processor queue is executed.
+
+
         @keyword model:         The model to be optimised.
         @type model:            str
         @keyword model_path:    The folder name for the model, where possible spaces has been replaced with underscore.
@@ -404,6 +548,7 @@ class Relax_disp:
                 # Grid search.
                 if self.grid_inc:
                     self.interpreter.minimise.grid_search(inc=self.grid_inc)
+                    yield
 
                 # Default values.
                 else:
@@ -425,6 +570,10 @@ class Relax_disp:
             # Both the Jacobian and Hessian matrix has been specified for exponential curve-fitting, allowing for the much faster algorithms to be used.
             min_algor = 'Newton'
 
+            # For errors from the covariance matrix, fit all curves in the batched Levenberg-Marquardt mode.
+            if self.exp_mc_sim_num == -1:
+                min_algor = 'LM'
+
             # Check if all spins contains 'r2eff and it associated error.
             has_r2eff = False
 
@@ -459,6 +608,7 @@ class Relax_disp:
         # Do the minimisation.
         if do_minimise:
             self.interpreter.minimise.execute(min_algor=min_algor, func_tol=self.opt_func_tol, max_iter=self.opt_max_iterations, constraints=constraints)
+            yield
 
         # Model elimination.
         if self.eliminate:
@@ -470,8 +620,8 @@ class Relax_disp:
             # The constraints flag.
             constraints = False
 
-            # Both the Jacobian and Hessian matrix has been specified for exponential curve-fitting, allowing for the much faster algorithms to be used.
-            min_algor = 'Newton'
+            # The simulations are optimised together in the batched Levenberg-Marquardt mode, warm started from the optimised R2eff values.
+            min_algor = 'LM'
 
             # Skip optimisation, if 'r2eff' + 'r2eff_err' is present and flag for forcing optimisation is not raised.
             if has_r2eff and not self.optimise_r2eff:
@@ -518,6 +668,7 @@ class Relax_disp:
                 self.interpreter.monte_carlo.create_data()
                 self.interpreter.monte_carlo.initial_values()
                 self.interpreter.minimise.execute(min_algor=min_algor, func_tol=self.opt_func_tol, max_iter=self.opt_max_iterations, constraints=constraints)
+                yield
                 if self.eliminate:
                     self.interpreter.eliminate()
                 self.interpreter.monte_carlo.error_analysis()
@@ -572,60 +723,41 @@ class Relax_disp:
             # No print out.
             self.interpreter.relax_disp.r1_fit(fit=self.r1_fit)
 
-        # Loop over the models.
+        # The data pipes for model selection.
         self.model_pipes = []
         for model in self.models:
-            # Printout.
-            subtitle(file=sys.stdout, text="The '%s' model" % model, prespace=3)
-
-            # The results directory path.
-            model_path = model.replace(" ", "_")
-            path = self.results_dir+sep+model_path
-
-            # The name of the data pipe for the model.
-            model_pipe = self.name_pipe(model)
             if self.is_model_for_selection(model):
-                self.model_pipes.append(model_pipe)
-
-            # Check that results do not already exist - i.e. a previous run was interrupted.
-            path1 = path + sep + 'results'
-            path2 = path1 + '.bz2'
-            path3 = path1 + '.gz'
-            if access(path1, F_OK) or access(path2, F_OK) or access(path2, F_OK):
-                # Printout.
-                print("Detected the presence of results files for the '%s' model - loading these instead of performing optimisation for a second time." % model)
-
-                # Create a data pipe and switch to it.
-                self.interpreter.pipe.create(pipe_name=model_pipe, pipe_type='relax_disp', bundle=self.pipe_bundle)
-                self.interpreter.pipe.switch(model_pipe)
-
-                # Load the results.
-                self.interpreter.results.read(file='results', dir=path)
+                self.model_pipes.append(self.name_pipe(model))
 
-                # Jump to the next model.
-                continue
+        # Optimise the independent models of each wave together.
+        if self.concurrent:
+            for models in self.model_waves():
+                self.optimise_models(models=models)
 
-            # Create the data pipe by copying the base pipe, then switching to it.
-            self.interpreter.pipe.copy(pipe_from=self.pipe_name, pipe_to=model_pipe, bundle_to=self.pipe_bundle)
-            self.interpreter.pipe.switch(model_pipe)
+        # Loop over the models.
+        else:
+            for model in self.models:
+                # Printout.
+                subtitle(file=sys.stdout, text="The '%s' model" % model, prespace=3)
 
-            # Select the model.
-            self.interpreter.relax_disp.select_model(model)
+                # The results directory path.
+                model_path = model.replace(" ", "_")
+                path = self.results_dir+sep+model_path
 
-            # Copy the R2eff values from the R2eff model data pipe.
-            if model != MODEL_R2EFF and MODEL_R2EFF in self.models:
-                self.interpreter.value.copy(pipe_from=self.name_pipe(MODEL_R2EFF), pipe_to=model_pipe, param='r2eff')
+                # Set up the data pipe, jumping to the next model if results already exist.
+                if not self.setup_model(model=model):
+                    continue
 
-            # Calculate the R2eff values for the fixed relaxation time period data types.
-            if model == MODEL_R2EFF and not has_exponential_exp_type():
-                self.interpreter.minimise.calculate()
+                # Calculate the R2eff values for the fixed relaxation time period data types.
+                if model == MODEL_R2EFF and not has_exponential_exp_type():
+                    self.interpreter.minimise.calculate()
 
-            # Optimise the model.
-            else:
-                self.optimise(model=model, model_path=model_path)
+                # Optimise the model.
+                else:
+                    self.optimise(model=model, model_path=model_path)
 
-            # Write out the results.
-            self.write_results(path=path, model=model)
+                # Write out the results.
+                self.write_results(path=path, model=model)
 
         # The final model selection data pipe.
         if len(self.models) >= 2:
@@ -656,6 +788,55 @@ class Relax_disp:
         self.interpreter.state.save(state='final_state', dir=self.results_dir, force=True)
 
 
+    def setup_model(self, model=None):
+        """Set up the data pipe for the model, or load the results of a previous interrupted run.
+
+        @keyword model: The model to be optimised.
+        @type model:    str
+        @return:        True if the model is to be optimised, False if the results have been loaded from the results files.
+        @rtype:         bool
+        """
+
+        # The results directory path.
+        model_path = model.replace(" ", "_")
+        path = self.results_dir+sep+model_path
+
+        # The name of the data pipe for the model.
+        model_pipe = self.name_pipe(model)
+
+        # Check that results do not already exist - i.e. a previous run was interrupted.
+        path1 = path + sep + 'results'
+        path2 = path1 + '.bz2'
+        path3 = path1 + '.gz'
+        if access(path1, F_OK) or access(path2, F_OK) or access(path2, F_OK):
+            # Printout.
+            print("Detected the presence of results files for the '%s' model - loading these instead of performing optimisation for a second time." % model)
+
+            # Create a data pipe and switch to it.
+            self.interpreter.pipe.create(pipe_name=model_pipe, pipe_type='relax_disp', bundle=self.pipe_bundle)
+            self.interpreter.pipe.switch(model_pipe)
+
+            # Load the results.
+            self.interpreter.results.read(file='results', dir=path)
+
+            # Skip the optimisation.
+            return False
+
+        # Create the data pipe by copying the base pipe, then switching to it.
+        self.interpreter.pipe.copy(pipe_from=self.pipe_name, pipe_to=model_pipe, bundle_to=self.pipe_bundle)
+        self.interpreter.pipe.switch(model_pipe)
+
+        # Select the model.
+        self.interpreter.relax_disp.select_model(model)
+
+        # Copy the R2eff values from the R2eff model data pipe.
+        if model != MODEL_R2EFF and MODEL_R2EFF in self.models:
+            self.interpreter.value.copy(pipe_from=self.name_pipe(MODEL_R2EFF), pipe_to=model_pipe, param='r2eff')
+
+        # Optimise the model.
+        return True
+
+
     def write_results(self, path=None, model=None):
         """Create a set of results, text and Grace files for the current data pipe.
 
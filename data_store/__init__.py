@@ -35,9 +35,9 @@ from data_store.gui import Gui
 from data_store.pipe_container import PipeContainer
 from data_store.seq_align import Sequence_alignments
 import pipe_control
-from lib.compat import builtins
+from lib.compat import StringIO, builtins
 from lib.errors import RelaxError, RelaxPipeError, RelaxNoPipeError
-from lib.xml import fill_object_contents, xml_to_object
+from lib.xml import Binary_arrays, binary_arrays, fill_object_contents, read_binary, write_binary, xml_to_object
 from status import Status; status = Status()
 import version
 
@@ -469,6 +469,33 @@ class Relax_data_store(dict):
         return True
 
 
+    def from_binary(self, file_path, dir=None, pipe_to=None, verbosity=1):
+        """Load the binary relax format into the relax data store.
+
+        The XML document of the binary file is parsed by the from_xml() method, with the native arrays being memory-mapped as they are encountered.
+
+
+        @param file_path:   The full path of the binary relax file.
+        @type file_path:    str
+        @keyword dir:       The name of the directory containing the results file (needed for loading external files).
+        @type dir:          str
+        @keyword pipe_to:   The data pipe to load the XML data pipe into (the file must only contain one data pipe).
+        @type pipe_to:      str
+        @keyword verbosity: A flag specifying the amount of information to print.  The higher the value, the greater the verbosity.
+        @type verbosity:    int
+        """
+
+        # Open the file.
+        xml_file, store = read_binary(file_path)
+
+        # Parse the XML document with the native arrays activated.
+        binary_arrays(store)
+        try:
+            self.from_xml(xml_file, dir=dir, pipe_to=pipe_to, verbosity=verbosity)
+        finally:
+            binary_arrays(None)
+
+
     def from_xml(self, file, dir=None, pipe_to=None, verbosity=1):
         """Parse a XML document representation of a data pipe, and load it into the relax data store.
 
@@ -678,3 +705,28 @@ class Relax_data_store(dict):
 
         # Write out the XML file.
         file.write(xmldoc.toprettyxml(indent='    '))
+
+
+    def to_binary(self, file, pipes=None):
+        """Create the binary relax format representation of the data pipes.
+
+        This is the XML document of the to_xml() method, with all large numeric arrays and float lists stored natively rather than as text.
+
+
+        @param file:        The open, writable binary file object.
+        @type file:         file
+        @param pipes:       The name of the pipe, or list of pipes to place in the file.
+        @type pipes:        str or list of str
+        """
+
+        # Create the XML document with the native arrays activated.
+        store = Binary_arrays()
+        xml_file = StringIO()
+        binary_arrays(store)
+        try:
+            self.to_xml(xml_file, pipes=pipes)
+        finally:
+            binary_arrays(None)
+
+        # Package everything.
+        write_binary(file, xml_file.getvalue(), store)
@@ -1237,6 +1237,50 @@ class AlignTensorData(Element):
         # The number of simulations.
         self.__dict__['_sim_num'] = None
 
+        # The out of date Monte Carlo simulation elements of the dependent objects.
+        self.__dict__['_stale_sims'] = {}
+
+
+    def __getattr__(self, name):
+        """Calculate the dependent objects when first read, caching the result.
+
+        The values, errors, and Monte Carlo simulation elements of the objects created by dependency_generator() are flagged as out of date when the parameters they depend upon are set, and are only recalculated here.
+
+
+        @param name:    The name of the object.
+        @type name:     str
+        @return:        The object.
+        @rtype:         anything
+        """
+
+        # Private and special objects are never calculated.
+        if name[0] == '_':
+            raise AttributeError(name)
+
+        # The target and category.
+        if search('_err$', name):
+            category = 'err'
+            target = name[:-4]
+        elif search('_sim$', name):
+            category = 'sim'
+            target = name[:-4]
+        else:
+            category = 'val'
+            target = name
+
+        # Calculate the dependent object.
+        for target_i, update_if_set, depends in dependency_generator():
+            if target_i == target:
+                self._calc_object(target, depends, category)
+                break
+
+        # The object is not available.
+        if name not in self.__dict__:
+            raise AttributeError("The alignment tensor object '%s' does not exist." % name)
+
+        # Return the object.
+        return self.__dict__[name]
+
 
     def __setattr__(self, name, value):
         """Make this object read-only."""
@@ -1244,32 +1288,20 @@ class AlignTensorData(Element):
         raise RelaxError("The alignment tensor is a read-only object.  The alignment tensor set() method must be used instead.")
 
 
-    def _update_object(self, param_name, target, update_if_set, depends, category, sim_index=None):
-        """Function for updating the target object, its error, and the MC simulations.
+    def _calc_object(self, target, depends, category):
+        """Function for calculating the target object, its error, or the out of date MC simulation elements.
 
-        If the base name of the object is not within the 'update_if_set' list, this function returns
-        without doing anything (to avoid wasting time).  Dependant upon the category the object
-        (target), its error (target+'_err'), or all Monte Carlo simulations (target+'_sim') are
-        updated.
+        Dependant upon the category the object (target), its error (target+'_err'), or the Monte Carlo simulations (target+'_sim') are calculated and stored.  Nothing is stored if the objects that the target depends upon do not exist.
 
-        @param param_name:      The parameter name which is being set in the __setattr__() function.
-        @type param_name:       str
-        @param target:          The name of the object to update.
+
+        @param target:          The name of the object to calculate.
         @type target:           str
-        @param update_if_set:   If the parameter being set by the __setattr__() function is not within this list of parameters, don't waste time updating the target.
         @param depends:         An array of names objects that the target is dependent upon.
         @type depends:          array of str
-        @param category:        The category of the object to update (one of 'val', 'err', or 'sim').
+        @param category:        The category of the object to calculate (one of 'val', 'err', or 'sim').
         @type category:         str
-        @keyword sim_index:     The index for a Monte Carlo simulation for simulated parameter.
-        @type sim_index:        int or None
-        @return:                None
         """
 
-        # Only update if the parameter name is within the 'update_if_set' list.
-        if not param_name in update_if_set:
-            return
-
         # Get the function for calculating the value.
         fn = globals()['calc_'+target]
 
@@ -1279,24 +1311,17 @@ class AlignTensorData(Element):
 
         if category == 'val':
             # Get all the dependencies if possible.
-            missing_dep = 0
             deps = ()
             for dep_name in depends:
                 # Test if the object exists.
                 if not hasattr(self, dep_name):
-                    missing_dep = 1
-                    break
+                    return
 
                 # Get the object and place it into the 'deps' tuple.
                 deps = deps+(getattr(self, dep_name),)
 
-            # Only update the object if its dependencies exist.
-            if not missing_dep:
-                # Calculate the value.
-                value = fn(*deps)
-
-                # Set the attribute.
-                self.__dict__[target] = value
+            # Calculate and set the value.
+            self.__dict__[target] = fn(*deps)
 
 
         # The error.
@@ -1304,86 +1329,107 @@ class AlignTensorData(Element):
 
         if category == 'err':
             # Get all the dependencies if possible.
-            missing_dep = 0
             deps = ()
             for dep_name in depends:
                 # Test if the error object exists.
                 if not hasattr(self, dep_name+'_err'):
-                    missing_dep = 1
-                    break
+                    return
 
                 # Get the object and place it into the 'deps' tuple.
                 deps = deps+(getattr(self, dep_name+'_err'),)
 
-            # Only update the error object if its dependencies exist.
-            if not missing_dep:
-                # Calculate the value.
-                value = fn(*deps)
-
-                # Set the attribute.
-                self.__dict__[target+'_err'] = value
+            # Calculate and set the value.
+            self.__dict__[target+'_err'] = fn(*deps)
 
 
         # The Monte Carlo simulations.
         ##############################
 
         if category == 'sim':
-            # The simulation indices.
-            if sim_index != None:
-                sim_indices = [sim_index]
-            else:
-                sim_indices = list(range(self._sim_num))
-
             # Get all the dependencies if possible.
-            missing_dep = 0
             deps = []
             for dep_name in depends:
-                # Modify the dependency name.
-                if dep_name != 'type':
-                    dep_name = dep_name+'_sim'
-
                 # Test if the MC sim object exists.
-                if not hasattr(self, dep_name):
-                    missing_dep = 1
-                    break
+                if not hasattr(self, dep_name+'_sim'):
+                    return
 
                 # Get the object and place it into the 'deps' tuple.
-                deps.append(getattr(self, dep_name))
+                deps.append(getattr(self, dep_name+'_sim'))
 
-            # Only create the MC simulation object if its dependencies exist.
-            if not missing_dep:
-                # Initialise an empty array to store the MC simulation object elements (if it doesn't already exist).
-                if not target+'_sim' in self.__dict__:
-                    self.__dict__[target+'_sim'] = AlignTensorSimList(elements=self._sim_num)
+            # The previously calculated elements and the out of date indices, or a new structure.
+            if target in self._stale_sims:
+                sim_obj, sim_indices = self._stale_sims.pop(target)
+            else:
+                sim_obj = AlignTensorSimList(elements=self._sim_num)
+                sim_indices = range(self._sim_num)
 
+            # Loop over the out of date sims.
+            for i in sim_indices:
                 # Repackage the deps structure.
-                args = []
+                args = ()
                 skip = False
-                for i in sim_indices:
-                    args.append(())
+                for j in range(len(deps)):
+                    args = args + (deps[j][i],)
 
-                    # Loop over the dependent structures.
-                    for j in range(len(deps)):
-                        # None, so skip.
-                        if deps[j] is None or deps[j][i] is None:
-                            skip = True
+                    # None, so skip.
+                    if deps[j][i] is None:
+                        skip = True
 
-                        # String data type.
-                        if isinstance(deps[j], str):
-                            args[-1] = args[-1] + (deps[j],)
+                # Calculate the value, skipping missing data.
+                value = None
+                if not skip:
+                    value = fn(*args)
 
-                        # List data type.
-                        else:
-                            args[-1] = args[-1] + (deps[j][i],)
+                # Set the element.
+                sim_obj._set(value=value, sim_index=i)
 
-                # Loop over the sims and set the values.
-                if not skip:
-                    for i in sim_indices:
-                        # Calculate the value.
-                        value = fn(*args[sim_indices.index(i)])
+            # Set the attribute.
+            self.__dict__[target+'_sim'] = sim_obj
+
+
+    def _update_object(self, param_name, target, update_if_set, depends, category, sim_index=None):
+        """Function for flagging the target object, its error, or the MC simulation element as out of date.
+
+        If the base name of the object is not within the 'update_if_set' list, this function returns without doing anything.  Dependent objects are only recalculated by __getattr__() when next read, and only for the out of date simulation elements.
+
+
+        @param param_name:      The parameter name which is being set in the set() method.
+        @type param_name:       str
+        @param target:          The name of the object to update.
+        @type target:           str
+        @param update_if_set:   If the parameter being set by the set() method is not within this list of parameters, the target is not modified.
+        @type update_if_set:    list of str
+        @param depends:         An array of names objects that the target is dependent upon.
+        @type depends:          array of str
+        @param category:        The category of the object to update (one of 'val', 'err', or 'sim').
+        @type category:         str
+        @keyword sim_index:     The index for a Monte Carlo simulation for simulated parameter.  If None, all simulations are flagged.
+        @type sim_index:        int or None
+        """
+
+        # Only update if the parameter name is within the 'update_if_set' list.
+        if not param_name in update_if_set:
+            return
 
-                        # Set the attribute.
-                        self.__dict__[target+'_sim']._set(value=value, sim_index=i)
+        # The value or error.
+        if category in ['val', 'err']:
+            name = target
+            if category == 'err':
+                name = target+'_err'
+            if name in self.__dict__:
+                del self.__dict__[name]
+            return
+
+        # Move the calculated simulation elements out of the way.
+        if target+'_sim' in self.__dict__:
+            self._stale_sims[target] = [self.__dict__.pop(target+'_sim'), set()]
+
+        # Flag the simulation elements.
+        if target in self._stale_sims:
+            if sim_index == None:
+                self._stale_sims[target][1].update(range(self._sim_num))
+            else:
+                self._stale_sims[target][1].add(sim_index)
 
 
     def set(self, param=None, value=None, category='val', sim_index=None, update=True):
@@ -1397,7 +1443,7 @@ class AlignTensorData(Element):
         @type category:     str
         @keyword sim_index: The index for a Monte Carlo simulation for simulated parameter.
         @type sim_index:    int or None
-        @keyword update:    A flag which if True will cause all the alignment tensor objects to be updated correctly.  This can be turned off for speed, as long as the _update_object() method is called prior to using the tensor.
+        @keyword update:    A flag which if True will cause all the dependent alignment tensor objects to be flagged as out of date, so that they are recalculated when next read.  This can be turned off for speed, as long as the _update_object() method is called prior to using the tensor.
         @type update:       bool
         """
 
@@ -1440,7 +1486,7 @@ class AlignTensorData(Element):
         if param in ['type']:
             return
 
-        # Update the data structures.
+        # Flag the dependent data structures as out of date.
         if update:
             for target, update_if_set, depends in dependency_generator():
                 self._update_object(param, target, update_if_set, depends, category, sim_index=sim_index)
@@ -1466,6 +1512,12 @@ class AlignTensorData(Element):
         # Store the value.
         self.__dict__['_sim_num'] = sim_number
 
+        # Remove the dependent simulation objects, as their size has changed.
+        for target, update_if_set, depends in dependency_generator():
+            if target+'_sim' in self.__dict__:
+                del self.__dict__[target+'_sim']
+        self._stale_sims.clear()
+
 
 
 class AlignTensorSimList(list):
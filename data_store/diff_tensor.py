@@ -636,6 +636,50 @@ class DiffTensorData(Element):
         # The number of simulations.
         self.__dict__['_sim_num'] = None
 
+        # The out of date Monte Carlo simulation elements of the dependent objects.
+        self.__dict__['_stale_sims'] = {}
+
+
+    def __getattr__(self, name):
+        """Calculate the dependent objects when first read, caching the result.
+
+        The values, errors, and Monte Carlo simulation elements of the objects created by dependency_generator() are flagged as out of date when the parameters they depend upon are set, and are only recalculated here.
+
+
+        @param name:    The name of the object.
+        @type name:     str
+        @return:        The object.
+        @rtype:         anything
+        """
+
+        # Private and special objects are never calculated.
+        if name[0] == '_':
+            raise AttributeError(name)
+
+        # The target and category.
+        if search('_err$', name):
+            category = 'err'
+            target = name[:-4]
+        elif search('_sim$', name):
+            category = 'sim'
+            target = name[:-4]
+        else:
+            category = 'val'
+            target = name
+
+        # Calculate the dependent object.
+        for target_i, update_if_set, depends in dependency_generator(self.__dict__.get('type')):
+            if target_i == target and target not in self._mod_attr:
+                self._calc_object(target, depends, category)
+                break
+
+        # The object is not available.
+        if name not in self.__dict__:
+            raise AttributeError("The diffusion tensor object '%s' does not exist." % name)
+
+        # Return the object.
+        return self.__dict__[name]
+
 
     def __setattr__(self, name, value):
         """Make this object read-only."""
@@ -643,33 +687,20 @@ class DiffTensorData(Element):
         raise RelaxError("The diffusion tensor is a read-only object.  The diffusion tensor set() method must be used instead.")
 
 
-    def _update_object(self, param_name, target, update_if_set, depends, category):
-        """Function for updating the target object, its error, and the MC simulations.
+    def _calc_object(self, target, depends, category):
+        """Function for calculating the target object, its error, or the out of date MC simulation elements.
 
-        If the base name of the object is not within the 'update_if_set' list, this function returns
-        without doing anything (to avoid wasting time).  Dependant upon the category the object
-        (target), its error (target+'_err'), or all Monte Carlo simulations (target+'_sim') are
-        updated.
+        Dependant upon the category the object (target), its error (target+'_err'), or the Monte Carlo simulations (target+'_sim') are calculated and stored.  Nothing is stored if the objects that the target depends upon do not exist.
 
-        @param param_name:      The parameter name which is being set in the __setattr__() function.
-        @type param_name:       str
-        @param target:          The name of the object to update.
+
+        @param target:          The name of the object to calculate.
         @type target:           str
-        @param update_if_set:   If the parameter being set by the __setattr__() function is not
-            within this list of parameters, don't waste time updating the
-            target.
         @param depends:         An array of names objects that the target is dependent upon.
         @type depends:          array of str
-        @param category:        The category of the object to update (one of 'val', 'err', or
-            'sim').
+        @param category:        The category of the object to calculate (one of 'val', 'err', or 'sim').
         @type category:         str
-        @return:                None
         """
 
-        # Only update if the parameter name is within the 'update_if_set' list.
-        if not param_name in update_if_set:
-            return
-
         # Get the function for calculating the value.
         fn = globals()['calc_'+target]
 
@@ -679,24 +710,17 @@ class DiffTensorData(Element):
 
         if category == 'val':
             # Get all the dependencies if possible.
-            missing_dep = 0
             deps = ()
             for dep_name in depends:
                 # Test if the object exists.
                 if not hasattr(self, dep_name):
-                    missing_dep = 1
-                    break
+                    return
 
                 # Get the object and place it into the 'deps' tuple.
                 deps = deps+(getattr(self, dep_name),)
 
-            # Only update the object if its dependencies exist.
-            if not missing_dep:
-                # Calculate the value.
-                value = fn(*deps)
-
-                # Set the attribute.
-                self.__dict__[target] = value
+            # Calculate and set the value.
+            self.__dict__[target] = fn(*deps)
 
 
         # The error.
@@ -704,24 +728,17 @@ class DiffTensorData(Element):
 
         if category == 'err':
             # Get all the dependencies if possible.
-            missing_dep = 0
             deps = ()
             for dep_name in depends:
                 # Test if the error object exists.
                 if not hasattr(self, dep_name+'_err'):
-                    missing_dep = 1
-                    break
+                    return
 
                 # Get the object and place it into the 'deps' tuple.
                 deps = deps+(getattr(self, dep_name+'_err'),)
 
-            # Only update the error object if its dependencies exist.
-            if not missing_dep:
-                # Calculate the value.
-                value = fn(*deps)
-
-                # Set the attribute.
-                self.__dict__[target+'_err'] = value
+            # Calculate and set the value.
+            self.__dict__[target+'_err'] = fn(*deps)
 
 
         # The Monte Carlo simulations.
@@ -729,7 +746,6 @@ class DiffTensorData(Element):
 
         if category == 'sim':
             # Get all the dependencies if possible.
-            missing_dep = 0
             deps = []
             for dep_name in depends:
                 # Modify the dependency name.
@@ -738,46 +754,118 @@ class DiffTensorData(Element):
 
                 # Test if the MC sim object exists.
                 if not hasattr(self, dep_name) or getattr(self, dep_name) == None or not len(getattr(self, dep_name)):
-                    missing_dep = 1
-                    break
+                    return
 
                 # Get the object and place it into the 'deps' tuple.
                 deps.append(getattr(self, dep_name))
 
-            # Only create the MC simulation object if its dependencies exist.
-            if not missing_dep:
-                # Initialise an empty array to store the MC simulation object elements (if it doesn't already exist).
-                if not target+'_sim' in self.__dict__:
-                    self.__dict__[target+'_sim'] = DiffTensorSimList(elements=self._sim_num)
+            # The previously calculated elements and the out of date indices, or a new structure.
+            if target in self._stale_sims:
+                sim_obj, sim_indices = self._stale_sims.pop(target)
+            else:
+                sim_obj = DiffTensorSimList(elements=self._sim_num)
+                sim_indices = range(self._sim_num)
 
+            # Loop over the out of date sims.
+            for i in sim_indices:
                 # Repackage the deps structure.
-                args = []
+                args = ()
                 skip = False
-                for i in range(self._sim_num):
-                    args.append(())
+                for j in range(len(deps)):
+                    # String data type.
+                    if isinstance(deps[j], str):
+                        args = args + (deps[j],)
+
+                    # List data type.
+                    else:
+                        args = args + (deps[j][i],)
 
-                    # Loop over the dependent structures.
-                    for j in range(len(deps)):
                         # None, so skip.
-                        if deps[j] is None or deps[j][i] is None:
+                        if deps[j][i] is None:
                             skip = True
 
-                        # String data type.
-                        if isinstance(deps[j], str):
-                            args[-1] = args[-1] + (deps[j],)
+                # Calculate the value, skipping missing data.
+                value = None
+                if not skip:
+                    value = fn(*args)
+
+                # Set the element.
+                sim_obj._set(value=value, sim_index=i)
 
-                        # List data type.
-                        else:
-                            args[-1] = args[-1] + (deps[j][i],)
+            # Set the attribute.
+            self.__dict__[target+'_sim'] = sim_obj
 
-                # Loop over the sims and set the values.
-                if not skip:
-                    for i in range(self._sim_num):
-                        # Calculate the value.
-                        value = fn(*args[i])
 
-                        # Set the attribute.
-                        self.__dict__[target+'_sim']._set(value=value, sim_index=i)
+    def _reset_objects(self):
+        """Flag all the dependent objects as out of date."""
+
+        # Loop over the dependent objects of all diffusion types.
+        for diff_type in ['sphere', 'spheroid', 'ellipsoid']:
+            for target, update_if_set, depends in dependency_generator(diff_type):
+                # Skip the modifiable objects.
+                if target in self._mod_attr:
+                    continue
+
+                # Remove the value, error, and simulation objects.
+                for name in [target, target+'_err', target+'_sim']:
+                    if name in self.__dict__:
+                        del self.__dict__[name]
+
+        # Remove the simulation elements.
+        self._stale_sims.clear()
+
+
+    def _update_object(self, param_name, target, update_if_set, depends, category, sim_index=None):
+        """Function for flagging the target object, its error, or the MC simulation element as out of date.
+
+        If the base name of the object is not within the 'update_if_set' list, this function returns without doing anything.  Dependent objects are only recalculated by __getattr__() when next read, and only for the out of date simulation elements.  The exception is the modifiable spheroid_type object, which is updated immediately.
+
+
+        @param param_name:      The parameter name which is being set in the set() method.
+        @type param_name:       str
+        @param target:          The name of the object to update.
+        @type target:           str
+        @param update_if_set:   If the parameter being set by the set() method is not within this list of parameters, the target is not modified.
+        @type update_if_set:    list of str
+        @param depends:         An array of names objects that the target is dependent upon.
+        @type depends:          array of str
+        @param category:        The category of the object to update (one of 'val', 'err', or 'sim').
+        @type category:         str
+        @keyword sim_index:     The index for a Monte Carlo simulation for simulated parameter.  If None, all simulations are flagged.
+        @type sim_index:        int or None
+        """
+
+        # Only update if the parameter name is within the 'update_if_set' list.
+        if not param_name in update_if_set:
+            return
+
+        # Update the modifiable objects immediately, flagging all objects if the value has changed.
+        if target in self._mod_attr:
+            value = self.__dict__.get(target)
+            self._calc_object(target, depends, category)
+            if self.__dict__.get(target) != value:
+                self._reset_objects()
+            return
+
+        # The value or error.
+        if category in ['val', 'err']:
+            name = target
+            if category == 'err':
+                name = target+'_err'
+            if name in self.__dict__:
+                del self.__dict__[name]
+            return
+
+        # Move the calculated simulation elements out of the way.
+        if target+'_sim' in self.__dict__:
+            self._stale_sims[target] = [self.__dict__.pop(target+'_sim'), set()]
+
+        # Flag the simulation elements.
+        if target in self._stale_sims:
+            if sim_index == None:
+                self._stale_sims[target][1].update(range(self._sim_num))
+            else:
+                self._stale_sims[target][1].add(sim_index)
 
 
     def from_xml(self, diff_tensor_node, file_version=1):
@@ -888,13 +976,15 @@ class DiffTensorData(Element):
         if param == 'spheroid_type' and value:
             self.__dict__['_spheroid_type'] = True
 
-        # Skip the updating process for certain objects.
+        # Skip the updating process for certain objects, flagging all objects as out of date if the tensor type changes.
         if param in ['type', 'fixed', 'spheroid_type']:
+            if param != 'fixed':
+                self._reset_objects()
             return
 
-        # Update the data structures.
+        # Flag the dependent data structures as out of date.
         for target, update_if_set, depends in dependency_generator(self.type):
-            self._update_object(param, target, update_if_set, depends, category)
+            self._update_object(param, target, update_if_set, depends, category, sim_index=sim_index)
 
 
     def set_fixed(self, flag):
@@ -937,6 +1027,9 @@ class DiffTensorData(Element):
         # Set the type.
         self.__dict__['type'] = value
 
+        # Flag all dependent objects as out of date.
+        self._reset_objects()
+
 
     def to_xml(self, doc, element):
         """Create an XML element for the diffusion tensor.
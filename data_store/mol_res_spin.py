@@ -500,6 +500,10 @@ class ResidueList(list):
         # Add the initial residue container at index 0.
         self.append(ResidueContainer())
 
+        # Create special private lookup tables of residue numbers to indices for fast residue accesses, and of the indices of the residues in the table.
+        self._res_num_lookup = {}
+        self._res_num_indexed = set()
+
 
     def __repr__(self):
         """The string representation of the object.
@@ -530,21 +534,46 @@ class ResidueList(list):
 
         # Otherwise append a new ResidueContainer.
         else:
-            # Test if the residue number (or name if unnumbered) already exists.
-            for i in range(len(self)):
-                # Residue number has been supplied.
-                if res_num != None:
-                    if self[i].num == res_num:
-                        raise RelaxError("The residue number '" + repr(res_num) + "' already exists in the sequence.")
-
-                # No residue numbers.
-                else:
+            # Test if the residue number already exists.
+            if res_num != None:
+                if self.index_num(res_num) != None:
+                    raise RelaxError("The residue number '" + repr(res_num) + "' already exists in the sequence.")
+
+            # Test if the residue name already exists, if unnumbered.
+            else:
+                for i in range(len(self)):
                     if self[i].name == res_name:
                         raise RelaxError("The unnumbered residue name '" + repr(res_name) + "' already exists.")
 
             # Append a new ResidueContainer.
             self.append(ResidueContainer(res_name, res_num))
 
+        # Update the look up table.
+        self.register_num(len(self)-1)
+
+
+    def index_num(self, res_num):
+        """Return the index of the first residue with the given number, using the look up table.
+
+        @param res_num: The residue number.
+        @type res_num:  int
+        @return:        The residue index, or None if no such residue exists.
+        @rtype:         int or None
+        """
+
+        # Rebuild the look up table if residues have been added or removed behind its back.
+        if len(self._res_num_indexed) != len(self):
+            self.update_num_lookup()
+
+        # Check the look up table entry.
+        index = self._res_num_lookup.get(res_num)
+        if index == None or (index < len(self) and self[index].num == res_num):
+            return index
+
+        # The entry is out of date, so rebuild the look up table.
+        self.update_num_lookup()
+        return self._res_num_lookup.get(res_num)
+
 
     def is_empty(self):
         """Method for testing if this ResidueList object is empty.
@@ -591,6 +620,26 @@ class ResidueList(list):
             self[-1].spin.from_xml(spin_nodes, file_version=file_version)
 
 
+    def register_num(self, index):
+        """Add the residue number of the given residue to the look up table.
+
+        @param index:   The residue index.
+        @type index:    int
+        """
+
+        # Alias.
+        res_num = self[index].num
+
+        # Only the first residue with the number is stored.
+        if res_num != None:
+            current = self._res_num_lookup.get(res_num)
+            if current == None or current > index or current >= len(self) or self[current].num != res_num:
+                self._res_num_lookup[res_num] = index
+
+        # The residue is now indexed.
+        self._res_num_indexed.add(index)
+
+
     def to_xml(self, doc, element, pipe_type=None):
         """Create XML elements for each residue.
 
@@ -620,6 +669,20 @@ class ResidueList(list):
             self[i].spin.to_xml(doc, res_element, pipe_type=pipe_type)
 
 
+    def update_num_lookup(self):
+        """Rebuild the residue number look up table from all residues."""
+
+        # Reset.
+        self._res_num_lookup = {}
+        self._res_num_indexed = set()
+
+        # Loop over the residues, storing the first residue with each number.
+        for i in range(len(self)):
+            if self[i].num != None and self[i].num not in self._res_num_lookup:
+                self._res_num_lookup[self[i].num] = i
+            self._res_num_indexed.add(i)
+
+
 
 # The molecule data.
 ###################
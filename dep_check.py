@@ -225,6 +225,22 @@ except ImportError:
 3. Choose another multi processor method to give to the --multi command line flag.\n
     """
 
+# multiprocessing.
+try:
+    import multiprocessing
+    multiprocessing_module = True
+except ImportError:
+    message = sys.exc_info()[1]
+    multiprocessing_module = False
+
+    # The error message.
+    multiprocessing_message = """The Python multiprocessing module is not available. You should either:
+
+1. Run without multiprocessor support i.e. remove the --multi multiprocessing flag from the command line.
+
+2. Choose another multi processor method to give to the --multi command line flag.\n
+    """
+
 # PyMOL.
 try:
     import pymol
@@ -320,8 +336,8 @@ except ImportError:
 # Relaxation curve fitting.
 try:
     from target_functions import relax_fit
-    from target_functions.relax_fit import setup
-    del setup
+    from target_functions.relax_fit import fit_batch, setup
+    del fit_batch, setup
     C_module_exp_fn = True
 except ImportError:
     # The OS.
@@ -31,7 +31,7 @@ import sys
 
 # An exception list.
 EXCEPTIONS = {
-    'dep_check.py': ['bmrblib', 'bz2', 'cProfile', 'ctypes', 'epydoc', 'gzip', 'io', 'matplotlib', 'mpi4py', 'optparse', 'profile', 'pymol', 'readline', 'relax_fit', 'runpy', 'scipy', 'Structure', 'wx'],
+    'dep_check.py': ['bmrblib', 'bz2', 'cProfile', 'ctypes', 'epydoc', 'gzip', 'io', 'matplotlib', 'mpi4py', 'multiprocessing', 'optparse', 'profile', 'pymol', 'readline', 'relax_fit', 'runpy', 'scipy', 'Structure', 'wx'],
     'lib/compat.py': ['IOBase', 'pickle', 'queue', 'StringIO', 'TextTestResult'],
     'lib/xml.py': ['array', 'float32', 'float64', 'inf', 'int16', 'int32'],
     'test_suite/shared_data/dispersion/profiling/profiling_b14.py': ['cluster', 'single'],
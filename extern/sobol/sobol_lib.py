@@ -23,7 +23,7 @@
 
 
 import math
-from numpy import bitwise_xor, mod, round, transpose, zeros
+from numpy import arange, bitwise_and, bitwise_xor, int64, maximum, mod, right_shift, round, transpose, zeros
 
 def i4_bit_hi1 ( n ):
 
@@ -199,6 +199,51 @@ def i4_sobol_generate ( m, n, skip ):
 		[ r[0:m, j-1], seed ] = i4_sobol ( m, seed )
 	return r
 
+def i4_sobol_generate_vect ( m, n, skip ):
+
+#*****************************************************************************80
+#
+## I4_SOBOL_GENERATE_VECT generates a Sobol dataset using numpy array operations.
+#
+#  Discussion:
+#
+#    This gives identical results to I4_SOBOL_GENERATE.  Rather than stepping
+#    through the sequence one point at a time, the Gray code of each seed is
+#    used to directly XOR together the direction numbers of the set bits, one
+#    bit at a time for all points at once.
+#
+#  Parameters:
+#
+#    Input, integer M, the spatial dimension.
+#
+#    Input, integer N, the number of points to generate.
+#
+#    Input, integer SKIP, the number of initial points to skip.
+#
+#    Output, real R(M,N), the points.
+#
+	global maxcol
+	global recipd
+	global v
+
+	# Initialise the direction numbers for the dimension.
+	i4_sobol ( m, 0 )
+
+	# The seeds, as used in I4_SOBOL_GENERATE, and their Gray codes.
+	seed = maximum ( arange ( skip - 1, skip + n - 1, dtype=int64 ), 0 )
+	gray = bitwise_xor ( seed, right_shift ( seed, 1 ) )
+
+	# XOR together the direction numbers for each bit of the Gray codes.
+	lastq = zeros((m, n), dtype=int64)
+	direction = v[0:m, 0:maxcol].astype(int64)
+	for l in range(maxcol):
+		bit = bitwise_and ( right_shift ( gray, l ), 1 ).astype(bool)
+		if not bit.any():
+			continue
+		lastq[:, bit] = bitwise_xor ( lastq[:, bit], direction[:, l:l+1] )
+
+	return lastq * recipd
+
 def i4_sobol ( dim_num, seed ):
 
 #*****************************************************************************80
@@ -24,7 +24,7 @@
 
 # Python imports.
 from math import pi
-from numpy import dot, sum
+from numpy import dot, einsum, sum
 
 # relax module imports.
 from lib.physical_constants import kB, mu0
@@ -347,3 +347,42 @@ def pcs_tensor(dj, mu, A):
 
     # Return the PCS.
     return dj * dot(mu, dot(A, mu))
+
+
+def pcs_tensor_batch(c, vect, A):
+    """Calculate the PCS for a stack of electron-nuclear vectors and a stack of 3D alignment tensors.
+
+    The PCS value is::
+
+                        c_i      T
+        delta_ij  =  -------- . r_j . Ai . r_j ,
+                     |r_j|**5
+
+    where:
+        - i is the alignment tensor index,
+        - j is the index over the vectors,
+        - c_i is the PCS constant of alignment i without the distance dependence, i.e. the pcs_constant() value for r = 1,
+        - r_j is the vector connecting the electron and nuclear spins,
+        - Ai is the alignment tensor.
+
+    This is equivalent to pcs_tensor() with dj = c_i / |r_j|**3 and mu_j = r_j / |r_j|, but for all vectors and alignments at once.
+
+
+    @param c:       The PCS constants without the distance dependence.  The dimensions are {Ai}.
+    @type c:        numpy rank-1 array
+    @param vect:    The vectors connecting the electron and nuclear spins, in meters.  The last dimension is the 3D vector, and the other dimensions are arbitrary, for example {Sj, Ni, 3} for spin j and simulation i.
+    @type vect:     numpy array
+    @param A:       The alignment tensors.  The dimensions are {Ai, 3, 3}.
+    @type A:        numpy rank-3 array
+    @return:        The PCS values.  The dimensions are those of the vectors without the last dimension, preceded by the alignment dimension, for example {Ai, Sj, Ni}.
+    @rtype:         numpy array
+    """
+
+    # The squared vector lengths.
+    r_sqrd = sum(vect**2, axis=-1)
+
+    # The quadratic forms of the alignment tensors.
+    quad = einsum('...m,imn,...n->i...', vect, A, vect)
+
+    # Return the PCS values.
+    return c.reshape(c.shape + (1,)*r_sqrd.ndim) * quad / r_sqrd**2.5
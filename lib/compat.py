@@ -78,6 +78,12 @@ if PY_VERSION == 2:
 else:
     import builtins
 
+# The string interning function.
+if PY_VERSION == 2:
+    intern = builtins.intern
+else:
+    from sys import intern
+
 # The queue module.
 if PY_VERSION == 2:
     import Queue as queue
@@ -22,7 +22,25 @@
 
 # Python module imports.
 from math import sqrt
-from numpy import outer
+from numpy import newaxis
+
+
+def stacked_outer(a, b):
+    """The outer product of the first dimension of two arrays.
+
+    For rank-1 arrays this is identical to numpy.outer().  Any additional dimensions are broadcast, allowing the weights to be calculated for a stack of spins in which the spin index is the last dimension of all arrays.
+
+
+    @param a:   The first array.
+    @type a:    numpy array
+    @param b:   The second array.
+    @type b:    numpy array
+    @return:    The outer product.
+    @rtype:     numpy array
+    """
+
+    return a[:, newaxis] * b[newaxis]
+
 
 
 ##########
@@ -137,7 +155,7 @@ def calc_spheroid_d2ci(data, diff_data):
     """
 
     # Outer product.
-    op = outer(data.ddz_dO, data.ddz_dO)
+    op = stacked_outer(data.ddz_dO, data.ddz_dO)
 
     # Hessian.
     data.d2ci[2:, 2:, 0] = 3.0 * ((9.0 * data.dz**2 - 1.0) * op  +  data.dz * data.three_dz2_one * data.d2dz_dO2)
@@ -788,18 +806,18 @@ def calc_ellipsoid_d2ci(data, diff_data):
     ###############################
 
     # Outer products.
-    op_xx = outer(data.ddx_dO, data.ddx_dO)
-    op_yy = outer(data.ddy_dO, data.ddy_dO)
-    op_zz = outer(data.ddz_dO, data.ddz_dO)
+    op_xx = stacked_outer(data.ddx_dO, data.ddx_dO)
+    op_yy = stacked_outer(data.ddy_dO, data.ddy_dO)
+    op_zz = stacked_outer(data.ddz_dO, data.ddz_dO)
 
-    op_xy = outer(data.ddx_dO, data.ddy_dO)
-    op_yx = outer(data.ddy_dO, data.ddx_dO)
+    op_xy = stacked_outer(data.ddx_dO, data.ddy_dO)
+    op_yx = stacked_outer(data.ddy_dO, data.ddx_dO)
 
-    op_xz = outer(data.ddx_dO, data.ddz_dO)
-    op_zx = outer(data.ddz_dO, data.ddx_dO)
+    op_xz = stacked_outer(data.ddx_dO, data.ddz_dO)
+    op_zx = stacked_outer(data.ddz_dO, data.ddx_dO)
 
-    op_yz = outer(data.ddy_dO, data.ddz_dO)
-    op_zy = outer(data.ddz_dO, data.ddy_dO)
+    op_yz = stacked_outer(data.ddy_dO, data.ddz_dO)
+    op_zy = stacked_outer(data.ddz_dO, data.ddy_dO)
 
     # Components.
     x_comp = data.dx * data.d2dx_dO2 + op_xx
@@ -110,7 +110,7 @@ Comparison to CR72 full model can be found in the:
 """
 
 # Python module imports.
-from numpy import any, arccosh, arctan2, cos, cosh, fabs, isfinite, log, max, min, power, sin, sinh, sqrt, sum
+from numpy import any, arccosh, arctan2, cos, cosh, eye, fabs, isfinite, log, max, min, ndarray, power, sin, sinh, sqrt, sum
 from numpy.ma import fix_invalid, masked_greater_equal, masked_where
 
 # Repetitive calculations (to speed up calculations).
@@ -122,19 +122,21 @@ def r2eff_B14(r20a=None, r20b=None, pA=None, dw=None, dw_orig=None, kex=None, nc
 
     See the module docstring for details.
 
+    For evaluating multiple parameter points in one call, pA and kex can be supplied as numpy arrays of rank [NP][1][1][1][1][1] together with the other arrays having the additional first dimension [NP].
+
 
     @keyword r20a:          The R20 parameter value of state A (R2 with no exchange).
     @type r20a:             numpy float array of rank [NE][NS][NM][NO][ND]
     @keyword r20b:          The R20 parameter value of state B (R2 with no exchange).
     @type r20b:             numpy float array of rank [NE][NS][NM][NO][ND]
     @keyword pA:            The population of state A.
-    @type pA:               float
+    @type pA:               float or numpy float array of rank [NP][1][1][1][1][1]
     @keyword dw:            The chemical exchange difference between states A and B in rad/s.
     @type dw:               numpy float array of rank [NE][NS][NM][NO][ND]
     @keyword dw_orig:       The chemical exchange difference between states A and B in ppm. This is only for faster checking of zero value, which result in no exchange.
     @type dw_orig:          numpy float array of rank-1
     @keyword kex:           The kex parameter value (the exchange rate in rad/s).
-    @type kex:              float
+    @type kex:              float or numpy float array of rank [NP][1][1][1][1][1]
     @keyword ncyc:          The matrix exponential power array. The number of CPMG blocks.
     @type ncyc:             numpy int16 array of rank [NE][NS][NM][NO][ND]
     @keyword inv_tcpmg:     The inverse of the total duration of the CPMG element (in inverse seconds).
@@ -152,9 +154,14 @@ def r2eff_B14(r20a=None, r20b=None, pA=None, dw=None, dw_orig=None, kex=None, nc
     t_log_tog_neg = False
     t_v1c_less_one = False
 
+    # Multiple parameter points.
+    batch = isinstance(kex, ndarray)
+
     # Catch parameter values that will result in no exchange, returning flat R2eff = R20 lines (when kex = 0.0, k_AB = 0.0).
     # Test if pA or kex is zero.
-    if kex == 0.0 or pA == 1.0:
+    if batch:
+        mask_no_rex = ((kex == 0.0) | (pA == 1.0)).reshape(-1)
+    elif kex == 0.0 or pA == 1.0:
         back_calc[:] = r20a
         return
 
@@ -311,3 +318,158 @@ def r2eff_B14(r20a=None, r20b=None, pA=None, dw=None, dw_orig=None, kex=None, nc
     if not isfinite(sum(back_calc)):
         # Replaces nan, inf, etc. with fill value.
         fix_invalid(back_calc, copy=False, fill_value=1e100)
+
+    # The point specific replacements for multiple parameter points.
+    if batch:
+        back_calc[mask_no_rex] = r20a[mask_no_rex]
+
+
+def dr2eff_B14(r20a=None, r20b=None, pA=None, dw=None, kex=None, ncyc=None, inv_tcpmg=None, tcp=None, dback_calc=None):
+    """Calculate the partial derivatives of the R2eff values for the B14 model.
+
+    The derivatives of the exchange contribution are propagated in forward mode through each of the real and complex intermediate quantities of r2eff_B14(), simultaneously for the R20A - R20B difference, dw, pA and kex.  For this, the complex number N = g3 + g4.i is the principal square root of Psi - zeta.i, so that dN = (dPsi - dzeta.i) / 2N.  All exceptional cases of r2eff_B14() are mirrored, so that the derivatives match the back-calculated values.
+
+
+    @keyword r20a:          The R20 parameter value of state A (R2 with no exchange).
+    @type r20a:             numpy float array of rank [NE][NS][NM][NO][ND]
+    @keyword r20b:          The R20 parameter value of state B (R2 with no exchange).
+    @type r20b:             numpy float array of rank [NE][NS][NM][NO][ND]
+    @keyword pA:            The population of state A.
+    @type pA:               float
+    @keyword dw:            The chemical exchange difference between states A and B in rad/s.
+    @type dw:               numpy float array of rank [NE][NS][NM][NO][ND]
+    @keyword kex:           The kex parameter value (the exchange rate in rad/s).
+    @type kex:              float
+    @keyword ncyc:          The matrix exponential power array. The number of CPMG blocks.
+    @type ncyc:             numpy int16 array of rank [NE][NS][NM][NO][ND]
+    @keyword inv_tcpmg:     The inverse of the total duration of the CPMG element (in inverse seconds).
+    @type inv_tcpmg:        numpy float array of rank [NE][NS][NM][NO][ND]
+    @keyword tcp:           The tau_CPMG times (1 / 4.nu1).
+    @type tcp:              numpy float array of rank [NE][NS][NM][NO][ND]
+    @keyword dback_calc:    The array for holding the partial derivatives of the R2eff values with respect to R20A, R20B, dw (in rad/s), pA and kex, in that order.
+    @type dback_calc:       numpy float array of rank [5][NE][NS][NM][NO][ND]
+    """
+
+    # No exchange, R2eff = R20A.
+    if kex == 0.0 or pA == 1.0:
+        dback_calc[:] = 0.0
+        dback_calc[0] = 1.0
+        return
+
+    # The unit derivatives of the R20A - R20B difference, dw, pA and kex, in the first dimension.
+    d_dR, d_dw, d_pA, d_kex = eye(4).reshape(4, 4, 1, 1, 1, 1, 1)
+
+    # Parameter conversions.
+    pB = 1.0 - pA
+    k_BA = pA * kex
+    k_AB = pB * kex
+    dk_AB = -kex * d_pA + pB * d_kex
+    deltaR2 = r20a - r20b
+    dw2 = dw**2
+    two_tcp = 2.0 * tcp
+
+    # The alpha-, zeta and Psi values and their derivatives.
+    alpha_m = deltaR2 + k_AB - k_BA
+    dalpha_m = d_dR + (1.0 - 2.0*pA) * d_kex - 2.0 * kex * d_pA
+    zeta = 2.0 * dw * alpha_m
+    dzeta = 2.0 * d_dw * alpha_m + 2.0 * dw * dalpha_m
+    Psi = alpha_m**2 + 4.0 * k_BA * k_AB - dw2
+    dPsi = 2.0 * alpha_m * dalpha_m + 4.0 * kex**2 * (1.0 - 2.0*pA) * d_pA + 8.0 * pA * pB * kex * d_kex - 2.0 * dw * d_dw
+
+    # The complex number N = g3 + g4.i and its derivatives.
+    quad_zeta2_Psi2 = (zeta**2 + Psi**2)**0.25
+    fact = 0.5 * arctan2(-zeta, Psi)
+    g3 = cos(fact) * quad_zeta2_Psi2
+    g4 = sin(fact) * quad_zeta2_Psi2
+    N = g3 + g4*1j
+    dN = (dPsi - dzeta*1j) / (2.0 * N)
+    dg3 = dN.real
+    dg4 = dN.imag
+
+    # The F factors and their derivatives.
+    g32 = g3**2
+    g42 = g4**2
+    NNc = g32 + g42
+    dNNc = 2.0 * (g3 * dg3 + g4 * dg4)
+    F0 = (dw2 + g32) / NNc
+    dF0 = (2.0 * dw * d_dw + 2.0 * g3 * dg3 - F0 * dNNc) / NNc
+    F2 = (dw2 - g42) / NNc
+    dF2 = (2.0 * dw * d_dw - 2.0 * g4 * dg4 - F2 * dNNc) / NNc
+    F1b = (dw + g4) * (dw - g3*1j) / NNc
+    dF1b = ((d_dw + dg4) * (dw - g3*1j) + (dw + g4) * (d_dw - dg3*1j) - F1b * dNNc) / NNc
+    F1a_plus_b = (2. * dw2 + zeta*1j) / NNc
+    dF1a_plus_b = (4.0 * dw * d_dw + dzeta*1j - F1a_plus_b * dNNc) / NNc
+
+    # The exponents and their derivatives, catching values which are too large for sinh and cosh.
+    E0 = two_tcp * g3
+    mask_max_e = E0 >= 700.0
+    E0[mask_max_e] = 1.0
+    dE0 = two_tcp * dg3
+    E2 = two_tcp * g4
+    dE2 = two_tcp * dg4
+    E1 = (g3 - g4*1j) * tcp
+    dE1 = (dg3 - dg4*1j) * tcp
+
+    # The v1s, v4 and v5 values and their derivatives.
+    v1s = F0 * sinh(E0) - F2 * sin(E2)*1j
+    dv1s = dF0 * sinh(E0) + F0 * cosh(E0) * dE0 - (dF2 * sin(E2) + F2 * cos(E2) * dE2)*1j
+    v4 = F1b * (-alpha_m - g3 ) + F1b * (dw - g4)*1j
+    dv4 = dF1b * (-alpha_m - g3 + (dw - g4)*1j) + F1b * (-dalpha_m - dg3 + (d_dw - dg4)*1j)
+    ex1c = sinh(E1)
+    dex1c = cosh(E1) * dE1
+    pref = -deltaR2 + kex + dw*1j
+    dpref = -d_dR + d_kex + d_dw*1j
+    v2 = v4 + k_AB * F1a_plus_b
+    dv2 = dv4 + dk_AB * F1a_plus_b + k_AB * dF1a_plus_b
+    v5 = pref * v1s - 2. * v2 * ex1c
+    dv5 = dpref * v1s + pref * dv1s - 2. * (dv2 * ex1c + v2 * dex1c)
+
+    # The v1c value and its derivatives, catching values less than one.
+    v1c = F0 * cosh(E0) - F2 * cos(E2)
+    dv1c = dF0 * cosh(E0) + F0 * sinh(E0) * dE0 - dF2 * cos(E2) + F2 * sin(E2) * dE2
+    mask_v1c_less_one = v1c < 1.0
+    v1c[mask_v1c_less_one] = 1.0
+
+    # The v3 and y values and their derivatives, catching zero divisors.
+    v3 = sqrt(v1c**2 - 1.)
+    mask_v3_N_zero = v3 * N == 0.0
+    v3[v3 == 0.0] = 1.0
+    dv3 = v1c * dv1c / v3
+    y = power( (v1c - v3) / (v1c + v3), ncyc)
+    dy = -2.0 * ncyc * y * dv1c / v3
+
+    # The Tog value and its derivatives.
+    Tog_div = 2. * v3 * N
+    Tog_div[mask_v3_N_zero] = 1.0
+    dTog_div = 2. * (dv3 * N + v3 * dN)
+    Tog = 0.5 * (1. + y) + (1. - y) * v5 / Tog_div
+    dTog = 0.5 * dy - dy * v5 / Tog_div + (1. - y) * (dv5 - v5 * dTog_div / Tog_div) / Tog_div
+    mask_log_tog_neg = Tog.real < 0.0
+
+    # The derivatives of the exchange contribution.
+    dex = -inv_tcpmg * (ncyc * dv1c / v3 + dTog.real / Tog.real)
+
+    # The partial derivatives.
+    dback_calc[0] = 0.5 + dex[0]
+    dback_calc[1] = 0.5 - dex[0]
+    dback_calc[2] = dex[1]
+    dback_calc[3] = dex[2]
+    dback_calc[4] = 0.5 + dex[3]
+
+    # Replace data in array.
+    # If dw is zero or E0 is too large, R2eff = R20A.
+    mask_r20a = mask_max_e | (dw == 0.0)
+    if any(mask_r20a):
+        dback_calc[:, mask_r20a] = 0.0
+        dback_calc[0][mask_r20a] = 1.0
+
+    # The R2eff values fixed at 1e100.
+    mask_fixed = mask_v1c_less_one | mask_v3_N_zero | mask_log_tog_neg
+    if any(mask_fixed):
+        dback_calc[:, mask_fixed] = 0.0
+
+    # Catch errors, taking a sum over array is the fastest way to check for
+    # +/- inf (infinity) and nan (not a number).
+    if not isfinite(sum(dback_calc)):
+        # Replaces nan, inf, etc. with fill value.
+        fix_invalid(dback_calc, copy=False, fill_value=0.0)
@@ -93,7 +93,7 @@ More information on the CR72 full model can be found in the:
 """
 
 # Python module imports.
-from numpy import arccosh, cos, cosh, isfinite, fabs, min, max, multiply, sqrt, subtract, sum
+from numpy import any, arccosh, cos, cosh, eye, isfinite, fabs, min, max, multiply, ndarray, sin, sinh, sqrt, subtract, sum
 from numpy.ma import fix_invalid, masked_greater_equal, masked_where
 
 # Repetitive calculations (to speed up calculations).
@@ -105,6 +105,8 @@ def r2eff_CR72(r20a=None, r20a_orig=None, r20b=None, r20b_orig=None, pA=None, dw
 
     See the module docstring for details.
 
+    Multiple parameter points can be evaluated in one call by supplying pA and kex as numpy arrays of rank [NP][1][1][1][1][1], whereby NP is the number of points, and all other arrays with the additional first dimension [NP].  All exceptional cases are then handled point by point.
+
 
     @keyword r20a:          The R20 parameter value of state A (R2 with no exchange).
     @type r20a:             numpy float array of rank [NE][NS][NM][NO][ND]
@@ -115,13 +117,13 @@ def r2eff_CR72(r20a=None, r20a_orig=None, r20b=None, r20b_orig=None, pA=None, dw
     @keyword r20b_orig:     The R20 parameter value of state B (R2 with no exchange). This is only for faster checking of zero value, which result in no exchange.
     @type r20b_orig:        numpy float array of rank-1
     @keyword pA:            The population of state A.
-    @type pA:               float
+    @type pA:               float or numpy float array of rank [NP][1][1][1][1][1]
     @keyword dw:            The chemical exchange difference between states A and B in rad/s.
     @type dw:               numpy array of rank [NE][NS][NM][NO][ND]
     @keyword dw_orig:       The chemical exchange difference between states A and B in ppm. This is only for faster checking of zero value, which result in no exchange.
     @type dw_orig:          numpy float array of rank-1
     @keyword kex:           The kex parameter value (the exchange rate in rad/s).
-    @type kex:              float
+    @type kex:              float or numpy float array of rank [NP][1][1][1][1][1]
     @keyword cpmg_frqs:     The CPMG nu1 frequencies.
     @type cpmg_frqs:        numpy float array of rank [NE][NS][NM][NO][ND]
     @keyword back_calc:     The array for holding the back calculated R2eff values.  Each element corresponds to one of the CPMG nu1 frequencies.
@@ -132,9 +134,14 @@ def r2eff_CR72(r20a=None, r20a_orig=None, r20b=None, r20b_orig=None, pA=None, dw
     t_dw_zero = False
     t_max_etapos = False
 
+    # Multiple parameter points.
+    batch = isinstance(kex, ndarray)
+
     # Catch parameter values that will result in no exchange, returning flat R2eff = R20 lines (when kex = 0.0, k_AB = 0.0).
     # Test if pA or kex is zero.
-    if kex == 0.0 or pA == 1.0:
+    if batch:
+        mask_no_rex = ((kex == 0.0) | (pA == 1.0)).reshape(-1)
+    elif kex == 0.0 or pA == 1.0:
         back_calc[:] = r20a
         return
 
@@ -184,7 +191,10 @@ def r2eff_CR72(r20a=None, r20a_orig=None, r20b=None, r20b_orig=None, pA=None, dw
 
     # The arccosh argument - catch invalid values.
     fact = Dpos * cosh(etapos) - Dneg * cos(etaneg)
-    if min(fact) < 1.0:
+    if batch:
+        mask_invalid = (fact < 1.0).reshape(len(fact), -1).any(axis=1)
+        fact[mask_invalid] = 1.0
+    elif min(fact) < 1.0:
         back_calc[:] = r20_kex
         return
 
@@ -206,3 +216,112 @@ def r2eff_CR72(r20a=None, r20a_orig=None, r20b=None, r20b_orig=None, pA=None, dw
     if not isfinite(sum(back_calc)):
         # Replaces nan, inf, etc. with fill value.
         fix_invalid(back_calc, copy=False, fill_value=1e100)
+
+    # The point specific replacements for multiple parameter points.
+    if batch:
+        back_calc[mask_invalid] = r20_kex[mask_invalid]
+        back_calc[mask_no_rex] = r20a[mask_no_rex]
+
+
+def dr2eff_CR72(r20a=None, r20b=None, pA=None, dw=None, kex=None, cpmg_frqs=None, dback_calc=None):
+    """Calculate the partial derivatives of the R2eff values for the CR72 model.
+
+    The derivatives of the exchange contribution are propagated in forward mode through each of the intermediate quantities of r2eff_CR72() (Psi, zeta, D+/-, eta+/- and the arccosh argument), simultaneously for the R20A - R20B difference, dw, pA and kex.  All exceptional cases of r2eff_CR72() are mirrored, so that the derivatives match the back-calculated values.
+
+
+    @keyword r20a:          The R20 parameter value of state A (R2 with no exchange).
+    @type r20a:             numpy float array of rank [NE][NS][NM][NO][ND]
+    @keyword r20b:          The R20 parameter value of state B (R2 with no exchange).
+    @type r20b:             numpy float array of rank [NE][NS][NM][NO][ND]
+    @keyword pA:            The population of state A.
+    @type pA:               float
+    @keyword dw:            The chemical exchange difference between states A and B in rad/s.
+    @type dw:               numpy array of rank [NE][NS][NM][NO][ND]
+    @keyword kex:           The kex parameter value (the exchange rate in rad/s).
+    @type kex:              float
+    @keyword cpmg_frqs:     The CPMG nu1 frequencies.
+    @type cpmg_frqs:        numpy float array of rank [NE][NS][NM][NO][ND]
+    @keyword dback_calc:    The array for holding the partial derivatives of the R2eff values with respect to R20A, R20B, dw (in rad/s), pA and kex, in that order.
+    @type dback_calc:       numpy float array of rank [5][NE][NS][NM][NO][ND]
+    """
+
+    # No exchange, R2eff = R20A.
+    if kex == 0.0 or pA == 1.0:
+        dback_calc[:] = 0.0
+        dback_calc[0] = 1.0
+        return
+
+    # The unit derivatives of the R20A - R20B difference, dw, pA and kex, in the first dimension.
+    d_dR, d_dw, d_pA, d_kex = eye(4).reshape(4, 4, 1, 1, 1, 1, 1)
+
+    # Parameter conversions.
+    pB = 1.0 - pA
+    k_BA = pA * kex
+    k_AB = pB * kex
+    dw2 = dw**2
+
+    # The Psi and zeta values and their derivatives.
+    fact = r20a - r20b - k_BA + k_AB
+    dfact = d_dR + (1.0 - 2.0*pA) * d_kex - 2.0 * kex * d_pA
+    Psi = fact**2 - dw2 + 4.0*k_BA*k_AB
+    dPsi = 2.0 * fact * dfact - 2.0 * dw * d_dw + 4.0 * kex**2 * (1.0 - 2.0*pA) * d_pA + 8.0 * pA * pB * kex * d_kex
+    zeta = 2.0*dw * fact
+    dzeta = 2.0 * d_dw * fact + 2.0 * dw * dfact
+
+    # The D+/- values and their derivatives.
+    sqrt_psi2_zeta2 = sqrt(Psi**2 + zeta**2)
+    dsqrt_psi2_zeta2 = (Psi * dPsi + zeta * dzeta) / sqrt_psi2_zeta2
+    D_part = (0.5*Psi + dw2) / sqrt_psi2_zeta2
+    dD_part = (0.5 * dPsi + 2.0 * dw * d_dw - D_part * dsqrt_psi2_zeta2) / sqrt_psi2_zeta2
+    Dpos = 0.5 + D_part
+    Dneg = -0.5 + D_part
+
+    # The eta+/- values, catching eta+ values which are too large for cosh and eta- values of zero.
+    eta_fact = eta_scale / cpmg_frqs
+    etapos = eta_fact * sqrt(Psi + sqrt_psi2_zeta2)
+    etaneg = eta_fact * sqrt(-Psi + sqrt_psi2_zeta2)
+    mask_max_etapos = etapos >= 700.0
+    etapos[mask_max_etapos] = 1.0
+    sinc_etaneg = etaneg * 1.0
+    mask_etaneg_zero = etaneg == 0.0
+    sinc_etaneg[mask_etaneg_zero] = 1.0
+    sinc_etaneg = sin(sinc_etaneg) / sinc_etaneg
+
+    # The derivatives of eta+ and of cos(eta-).
+    detapos = eta_fact**2 * (dPsi + dsqrt_psi2_zeta2) / (2.0 * etapos)
+    dcos_etaneg = -0.5 * eta_fact**2 * (-dPsi + dsqrt_psi2_zeta2) * sinc_etaneg
+
+    # The arccosh argument and its derivatives.
+    fact = Dpos * cosh(etapos) - Dneg * cos(etaneg)
+    dfact = dD_part * (cosh(etapos) - cos(etaneg)) + Dpos * sinh(etapos) * detapos - Dneg * dcos_etaneg
+
+    # Catch invalid arccosh arguments, R2eff = (R20A + R20B + kex) / 2.
+    if min(fact) < 1.0:
+        dback_calc[:] = 0.0
+        dback_calc[0] = 0.5
+        dback_calc[1] = 0.5
+        dback_calc[4] = 0.5
+        return
+
+    # The derivatives of the exchange contribution.
+    dex = -cpmg_frqs * dfact / sqrt(fact**2 - 1.0)
+
+    # The partial derivatives.
+    dback_calc[0] = 0.5 + dex[0]
+    dback_calc[1] = 0.5 - dex[0]
+    dback_calc[2] = dex[1]
+    dback_calc[3] = dex[2]
+    dback_calc[4] = 0.5 + dex[3]
+
+    # Replace data in array.
+    # If dw is zero or eta+ is too large, R2eff = R20A.
+    mask_r20a = mask_max_etapos | (dw == 0.0)
+    if any(mask_r20a):
+        dback_calc[:, mask_r20a] = 0.0
+        dback_calc[0][mask_r20a] = 1.0
+
+    # Catch errors, taking a sum over array is the fastest way to check for
+    # +/- inf (infinity) and nan (not a number).
+    if not isfinite(sum(dback_calc)):
+        # Replaces nan, inf, etc. with fill value.
+        fix_invalid(dback_calc, copy=False, fill_value=0.0)
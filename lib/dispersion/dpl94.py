@@ -134,3 +134,58 @@ def r1rho_DPL94(r1rho_prime=None, phi_ex=None, kex=None, theta=None, R1=0.0, spi
     if not isfinite(sum(back_calc)):
         # Replaces nan, inf, etc. with fill value.
         fix_invalid(back_calc, copy=False, fill_value=1e100)
+
+
+def dr1rho_DPL94(r1rho_prime=None, phi_ex=None, kex=None, theta=None, R1=0.0, spin_lock_fields2=None, dback_calc=None):
+    """Calculate the partial derivatives of the R1rho values for the DPL94 model.
+
+    The R1rho equation is linear in R1, R1rho' and phi_ex, whereas the kex partial derivative is::
+
+        dR1rho                            omega_1^2 - kex^2
+        ------  =  sin^2(theta) * phi_ex * --------------------- .
+         dkex                             (kex^2 + omega_1^2)^2
+
+
+    @keyword r1rho_prime:       The R1rho_prime parameter value (R1rho with no exchange).
+    @type r1rho_prime:          numpy float array of rank [NE][NS][NM][NO][ND]
+    @keyword phi_ex:            The phi_ex parameter value (pA * pB * delta_omega^2).
+    @type phi_ex:               numpy float array of rank [NE][NS][NM][NO][ND]
+    @keyword kex:               The kex parameter value (the exchange rate in rad/s).
+    @type kex:                  float
+    @keyword theta:             The rotating frame tilt angles for each dispersion point.
+    @type theta:                numpy float array of rank [NE][NS][NM][NO][ND]
+    @keyword R1:                The R1 relaxation rate.
+    @type R1:                   numpy float array of rank [NE][NS][NM][NO][ND]
+    @keyword spin_lock_fields2: The R1rho spin-lock field strengths squared (in rad^2.s^-2).
+    @type spin_lock_fields2:    numpy float array of rank [NE][NS][NM][NO][ND]
+    @keyword dback_calc:        The array for holding the partial derivatives of the R1rho values with respect to R1, R1rho', phi_ex and kex, in that order.
+    @type dback_calc:           numpy float array of rank [4][NE][NS][NM][NO][ND]
+    """
+
+    # Repetitive calculations (to speed up calculations).
+    sin_theta2 = sin(theta)**2
+    kex2 = kex**2
+
+    # Catch zeros (to avoid pointless mathematical operations).
+    denom = kex2 + spin_lock_fields2
+    mask_denom_zero = denom == 0.0
+    if any(mask_denom_zero):
+        denom[mask_denom_zero] = 1.0
+
+    # The R1 and R1rho' partial derivatives.
+    dback_calc[0] = 1.0 - sin_theta2
+    dback_calc[1] = sin_theta2
+
+    # The phi_ex and kex partial derivatives.
+    dback_calc[2] = sin_theta2 * kex / denom
+    dback_calc[3] = sin_theta2 * phi_ex * (spin_lock_fields2 - kex2) / denom**2
+
+    # The R1rho value is fixed at 1e100 for a zero denominator.
+    if any(mask_denom_zero):
+        dback_calc[:, mask_denom_zero] = 0.0
+
+    # Catch errors, taking a sum over array is the fastest way to check for
+    # +/- inf (infinity) and nan (not a number).
+    if not isfinite(sum(dback_calc)):
+        # Replaces nan, inf, etc. with fill value.
+        fix_invalid(dback_calc, copy=False, fill_value=0.0)
@@ -74,7 +74,7 @@ More information on the IT99 model can be found in the:
 """
 
 # Python module imports.
-from numpy import isfinite, fabs, sqrt, sum
+from numpy import isfinite, fabs, min, ndarray, sqrt, sum
 from numpy.ma import fix_invalid, masked_where
 
 
@@ -83,17 +83,19 @@ def r2eff_IT99(r20=None, pA=None, dw=None, dw_orig=None, tex=None, cpmg_frqs=Non
 
     See the module docstring for details.
 
+    For evaluating multiple parameter points in one call, pA and tex can be supplied as numpy arrays of rank [NP][1][1][1][1][1] together with the other arrays having the additional first dimension [NP].
+
 
     @keyword r20:           The R20 parameter value (R2 with no exchange).
     @type r20:              numpy float array of rank [NE][NS][NM][NO][ND]
     @keyword pA:            The population of state A.
-    @type pA:               float
+    @type pA:               float or numpy float array of rank [NP][1][1][1][1][1]
     @keyword dw:            The chemical exchange difference between states A and B in rad/s.
     @type dw:               numpy float array of rank [NE][NS][NM][NO][ND]
     @keyword dw_orig:       The chemical exchange difference between states A and B in ppm. This is only for faster checking of zero value, which result in no exchange.
     @type dw_orig:          numpy float array of rank-1
     @keyword tex:           The tex parameter value (the time of exchange in s/rad).
-    @type tex:              float
+    @type tex:              float or numpy float array of rank [NP][1][1][1][1][1]
     @keyword cpmg_frqs:     The CPMG nu1 frequencies.
     @type cpmg_frqs:        numpy float array of rank [NE][NS][NM][NO][ND]
     @keyword back_calc:     The array for holding the back calculated R2eff values.  Each element corresponds to one of the CPMG nu1 frequencies.
@@ -103,8 +105,13 @@ def r2eff_IT99(r20=None, pA=None, dw=None, dw_orig=None, tex=None, cpmg_frqs=Non
     # Flag to tell if values should be replaced if numer is zero.
     t_dw_zero = False
 
+    # Multiple parameter points.
+    batch = isinstance(tex, ndarray)
+
     # Catch divide with zeros (to avoid pointless mathematical operations).
-    if tex == 0.0 or pA == 1.0:
+    if batch:
+        mask_no_rex = ((tex == 0.0) | (pA == 1.0)).reshape(-1)
+    elif tex == 0.0 or pA == 1.0:
         back_calc[:] = r20
         return
 
@@ -143,3 +150,60 @@ def r2eff_IT99(r20=None, pA=None, dw=None, dw_orig=None, tex=None, cpmg_frqs=Non
     if not isfinite(sum(back_calc)):
         # Replaces nan, inf, etc. with fill value.
         fix_invalid(back_calc, copy=False, fill_value=1e100)
+
+    # The point specific replacements for multiple parameter points.
+    if batch:
+        back_calc[mask_no_rex] = r20[mask_no_rex]
+
+
+def dr2eff_IT99(r20=None, pA=None, dw=None, tex=None, cpmg_frqs=None, dback_calc=None):
+    """Calculate the partial derivatives of the R2eff values for the IT99 model.
+
+    The R2eff equation is written as R20 + numer / denom, whereby numer = pA * pB * dw^2 * tex and denom = 1 + omega_a^2 * tex^2, and the partial derivatives follow from the quotient rule.  As the exchange contribution is zero and smooth at dw = 0, pA = 1 and tex = 0, the no exchange cases do not require special treatment.
+
+
+    @keyword r20:           The R20 parameter value (R2 with no exchange).
+    @type r20:              numpy float array of rank [NE][NS][NM][NO][ND]
+    @keyword pA:            The population of state A.
+    @type pA:               float
+    @keyword dw:            The chemical exchange difference between states A and B in rad/s.
+    @type dw:               numpy float array of rank [NE][NS][NM][NO][ND]
+    @keyword tex:           The tex parameter value (the time of exchange in s/rad).
+    @type tex:              float
+    @keyword cpmg_frqs:     The CPMG nu1 frequencies.
+    @type cpmg_frqs:        numpy float array of rank [NE][NS][NM][NO][ND]
+    @keyword dback_calc:    The array for holding the partial derivatives of the R2eff values with respect to R20, dw (in rad/s), pA and tex, in that order.
+    @type dback_calc:       numpy float array of rank [4][NE][NS][NM][NO][ND]
+    """
+
+    # Parameter conversions.
+    pB = 1.0 - pA
+
+    # Repetitive calculations (to speed up calculations).
+    dw2 = dw**2
+    padw2 = pA * dw2
+    tex2 = tex**2
+
+    # The numerator.
+    numer = padw2 * pB * tex
+
+    # The denominator.
+    omega_a2 = sqrt(2304.0 * cpmg_frqs**4 + padw2**2)
+    denom = 1.0 + omega_a2 * tex2
+
+    # The partial derivatives of omega_a^2 with respect to pA.dw^2.
+    domega_a2 = padw2 / omega_a2
+
+    # The R20 partial derivative.
+    dback_calc[0] = 1.0
+
+    # The dw, pA and tex partial derivatives, via the quotient rule.
+    dback_calc[1] = (2.0 * pA * pB * dw * tex * denom - numer * tex2 * domega_a2 * 2.0 * pA * dw) / denom**2
+    dback_calc[2] = ((1.0 - 2.0 * pA) * dw2 * tex * denom - numer * tex2 * domega_a2 * dw2) / denom**2
+    dback_calc[3] = (padw2 * pB * denom - numer * 2.0 * omega_a2 * tex) / denom**2
+
+    # Catch errors, taking a sum over array is the fastest way to check for
+    # +/- inf (infinity) and nan (not a number).
+    if not isfinite(sum(dback_calc)):
+        # Replaces nan, inf, etc. with fill value.
+        fix_invalid(dback_calc, copy=False, fill_value=0.0)
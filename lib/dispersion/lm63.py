@@ -65,7 +65,7 @@ More information on the LM63 model can be found in the:
 """
 
 # Python module imports.
-from numpy import isfinite, min, sum, tanh
+from numpy import isfinite, min, ndarray, sum, tanh
 from numpy.ma import fix_invalid, masked_where
 
 
@@ -74,13 +74,15 @@ def r2eff_LM63(r20=None, phi_ex=None, kex=None, cpmg_frqs=None, back_calc=None):
 
     See the module docstring for details.
 
+    For evaluating multiple parameter points in one call, kex can be supplied as numpy arrays of rank [NP][1][1][1][1][1] together with the other arrays having the additional first dimension [NP].
+
 
     @keyword r20:           The R20 parameter value (R2 with no exchange).
     @type r20:              numpy float array of rank [NE][NS][NM][NO][ND]
     @keyword phi_ex:        The phi_ex parameter value (pA * pB * delta_omega^2).
     @type phi_ex:           numpy float array of rank [NE][NS][NM][NO][ND]
     @keyword kex:           The kex parameter value (the exchange rate in rad/s).
-    @type kex:              float
+    @type kex:              float or numpy float array of rank [NP][1][1][1][1][1]
     @keyword cpmg_frqs:     The CPMG nu1 frequencies.
     @type cpmg_frqs:        numpy float array of rank [NE][NS][NM][NO][ND]
     @keyword back_calc:     The array for holding the back calculated R2eff values.  Each element corresponds to one of the CPMG nu1 frequencies.
@@ -90,8 +92,13 @@ def r2eff_LM63(r20=None, phi_ex=None, kex=None, cpmg_frqs=None, back_calc=None):
     # Flag to tell if values should be replaced if phi_ex is zero.
     t_phi_ex_zero = False
 
+    # Multiple parameter points.
+    batch = isinstance(kex, ndarray)
+
     # Catch divide with zeros (to avoid pointless mathematical operations).
-    if kex == 0.0:
+    if batch:
+        mask_no_rex = (kex == 0.0).reshape(-1)
+    elif kex == 0.0:
         back_calc[:] = r20
         return
 
@@ -118,3 +125,54 @@ def r2eff_LM63(r20=None, phi_ex=None, kex=None, cpmg_frqs=None, back_calc=None):
     if not isfinite(sum(back_calc)):
         # Replaces nan, inf, etc. with fill value.
         fix_invalid(back_calc, copy=False, fill_value=1e100)
+
+    # The point specific replacements for multiple parameter points.
+    if batch:
+        back_calc[mask_no_rex] = r20[mask_no_rex]
+
+
+def dr2eff_LM63(r20=None, phi_ex=None, kex=None, cpmg_frqs=None, dback_calc=None):
+    """Calculate the partial derivatives of the R2eff values for the LM63 model.
+
+    The R2eff equation is linear in R20 and phi_ex, whereas the kex partial derivative is::
+
+        dR2eff     phi_ex   /     8 * nu_cpmg                      \ 
+        ------ = - ------ * | 1 - ----------- * tanh(x) + sech(x)^2 | ,
+         dkex      kex^2    \         kex                           /
+
+    where x = kex / (4 * nu_cpmg).
+
+
+    @keyword r20:           The R20 parameter value (R2 with no exchange).
+    @type r20:              numpy float array of rank [NE][NS][NM][NO][ND]
+    @keyword phi_ex:        The phi_ex parameter value (pA * pB * delta_omega^2).
+    @type phi_ex:           numpy float array of rank [NE][NS][NM][NO][ND]
+    @keyword kex:           The kex parameter value (the exchange rate in rad/s).
+    @type kex:              float
+    @keyword cpmg_frqs:     The CPMG nu1 frequencies.
+    @type cpmg_frqs:        numpy float array of rank [NE][NS][NM][NO][ND]
+    @keyword dback_calc:    The array for holding the partial derivatives of the R2eff values with respect to R20, phi_ex and kex, in that order.
+    @type dback_calc:       numpy float array of rank [3][NE][NS][NM][NO][ND]
+    """
+
+    # The R20 partial derivative.
+    dback_calc[0] = 1.0
+
+    # No exchange.
+    if kex == 0.0:
+        dback_calc[1:] = 0.0
+        return
+
+    # Repetitive calculations (to speed up calculations).
+    kex_4 = 4.0 / kex
+    tanh_x = tanh(kex / (4.0 * cpmg_frqs))
+
+    # The phi_ex and kex partial derivatives.
+    dback_calc[1] = (1.0 - kex_4 * cpmg_frqs * tanh_x) / kex
+    dback_calc[2] = -phi_ex / kex**2 * (1.0 - 2.0 * kex_4 * cpmg_frqs * tanh_x + 1.0 - tanh_x**2)
+
+    # Catch errors, taking a sum over array is the fastest way to check for
+    # +/- inf (infinity) and nan (not a number).
+    if not isfinite(sum(dback_calc)):
+        # Replaces nan, inf, etc. with fill value.
+        fix_invalid(dback_calc, copy=False, fill_value=0.0)
@@ -24,9 +24,13 @@
 """Module for the calculation of the matrix exponential, for higher dimensional data."""
 
 # Python module imports.
-from numpy import array, any, complex128, dot, einsum, eye, exp, iscomplex, int16, newaxis, multiply, tile, sqrt, version, zeros
+from numpy import any, ceil, complex128, cos, dot, empty, exp, eye, iscomplex, iscomplexobj, int16, log2, maximum, newaxis, sin, sqrt, zeros
 from numpy.lib.stride_tricks import as_strided
-from numpy.linalg import eig, inv
+from numpy.linalg import eig, inv, solve
+try:
+    from numpy import matmul
+except ImportError:
+    matmul = None
 
 
 def create_index(NE=None, NS=None, NM=None, NO=None, ND=None):
@@ -164,11 +168,32 @@ def data_view_via_striding_array_row_col(data_array=None):
 
     return data_view
 
+# The Pade approximant coefficients b_k of the scaling and squaring algorithm of Higham (2005), for the degrees 3, 5, 7, 9 and 13.
+PADE_COEFF = {
+    3: [120., 60., 12., 1.],
+    5: [30240., 15120., 3360., 420., 30., 1.],
+    7: [17297280., 8648640., 1995840., 277200., 25200., 1512., 56., 1.],
+    9: [17643225600., 8821612800., 2075673600., 302702400., 30270240., 2162160., 110880., 3960., 90., 1.],
+    13: [64764752532480000., 32382376266240000., 7771770303897600., 1187353796428800., 129060195264000., 10559470521600., 670442572800., 33522128640., 1323241920., 40840800., 960960., 16380., 182., 1.]
+}
+"""The Pade approximant coefficients, indexed by the degree of the approximant."""
+
+# The maximal 1-norms of the matrices for which the Pade approximants of degree 3, 5, 7, 9 and 13 reach double precision, from Higham (2005).
+PADE_THETA = [
+    [3, 1.495585217958292e-2],
+    [5, 2.539398330063230e-1],
+    [7, 9.504178996162932e-1],
+    [9, 2.097847961257068],
+    [13, 5.371920351148152]
+]
+"""The Pade approximant degrees and their maximal matrix 1-norms, in increasing order."""
+
 
 def matrix_exponential(A, dtype=None):
-    """Calculate the exact matrix exponential using the eigenvalue decomposition approach, for higher dimensional data.  This of dimension [NE][NS][NM][NO][ND][X][X] or [NS][NM][NO][ND][X][X].
+    """Calculate the matrix exponential for higher dimensional data.  This of dimension [NE][NS][NM][NO][ND][X][X] or [NS][NM][NO][ND][X][X].
+
+    Here X is the Row and Column length, of the outer square matrix.  The 2x2 matrices are exponentiated using the closed form of matrix_exponential_rank_NS_NM_NO_ND_2_2(), and all larger matrices using the batched scaling and squaring Pade approximation of matrix_exponential_pade().  Real matrices are kept in real arithmetic throughout.
 
-    Here X is the Row and Column length, of the outer square matrix.
 
     @param A:               The square matrix to calculate the matrix exponential of.
     @type A:                numpy float array of rank [NE][NS][NM][NO][ND][X][X]
@@ -178,18 +203,6 @@ def matrix_exponential(A, dtype=None):
     @rtype:                 numpy float array of rank [NE][NS][NM][NO][ND][X][X]
     """
 
-    # Get the expected shape of the higher dimensional column numpy array.
-    if len(A.shape) == 7:
-        # Extract shapes from data.
-        NE, NS, NM, NO, ND, Row, Col = A.shape
-
-    else:
-        # Extract shapes from data.
-        NS, NM, NO, ND, Row, Col = A.shape
-
-        # Set NE to None.
-        NE = None
-
     # Convert dtype, if specified.
     if dtype != None:
         dtype_mat = A.dtype
@@ -199,208 +212,201 @@ def matrix_exponential(A, dtype=None):
             # This needs to be made as a copy.
             A = A.astype(dtype)
 
-    # Is the original matrix real?
+    # Is the original matrix real?  If so, switch to real arithmetic.
     complex_flag = any(iscomplex(A))
+    if not complex_flag and iscomplexobj(A):
+        A = A.real
+
+    # If numpy is under 1.10, the matrix products and linear algebra functions cannot operate on stacks of matrices.
+    if matmul is None:
+        eA = matrix_exponential_eig(A)
 
-    # If numpy is under 1.8, there would be a need to do eig(A) per matrix.
-    if float(version.version[:3]) < 1.8:
-        # Make array to store results
-        if NE != None:
-            if dtype != None:
-                eA = zeros([NE, NS, NM, NO, ND, Row, Col], dtype=dtype)
-            else:
-                eA = zeros([NE, NS, NM, NO, ND, Row, Col], dtype=complex128)
-        else:
-            if dtype != None:
-                eA = zeros([NS, NM, NO, ND, Row, Col], dtype=dtype)
-            else:
-                eA = zeros([NS, NM, NO, ND, Row, Col], dtype=complex128)
-
-        # Get the data view, from the helper function.
-        A_view = data_view_via_striding_array_row_col(data_array=A)
-
-        # Create index view.
-        index = create_index(NE=NE, NS=NS, NM=NM, NO=NO, ND=ND)
-        index_view = data_view_via_striding_array_col(data_array=index)
-
-        # Zip them together and iterate over them.
-        for A_i, index_i in zip(A_view, index_view):
-            # The eigenvalue decomposition.
-            W_i, V_i = eig(A_i)
-
-            # Calculate the exponential.
-            W_exp_i = exp(W_i)
-
-            # Make a eye matrix.
-            eye_mat_i = eye(Row)
-
-            # Transform it to a diagonal matrix, with elements from vector down the diagonal.
-            # Use the dtype, if specified.
-            if dtype != None:
-                W_exp_diag_i = multiply(W_exp_i, eye_mat_i, dtype=dtype )
-            else:
-                W_exp_diag_i = multiply(W_exp_i, eye_mat_i)
-
-            # Make dot product.
-            dot_V_W_i = dot( V_i, W_exp_diag_i)
-
-            # Compute the (multiplicative) inverse of a matrix.
-            inv_V_i = inv(V_i)
-
-            # Calculate the exact exponential.
-            eA_i = dot(dot_V_W_i, inv_V_i)
-
-            # Save results.
-            # Extract index from index_view.
-            if NE != None:
-                ei, si, mi, oi, di = index_i
-                eA[ei, si, mi, oi, di, :] = eA_i
-            else:
-                si, mi, oi, di = index_i
-                eA[si, mi, oi, di, :] = eA_i
+    # The closed form for the 2x2 matrices.
+    elif A.shape[-1] == 2:
+        eA = matrix_exponential_rank_NS_NM_NO_ND_2_2(A)
 
+    # The scaling and squaring Pade approximation for the larger matrices.
     else:
-        # The eigenvalue decomposition.
-        W, V = eig(A)
-
-        # W: The eigenvalues, each repeated according to its multiplicity.
-        # The eigenvalues are not necessarily ordered.
-        # The resulting array will be always be of complex type. Shape [NE][NS][NM][NO][ND][X]
-        # V: The normalized (unit 'length') eigenvectors, such that the column v[:,i]
-        # is the eigenvector corresponding to the eigenvalue w[i]. Shape [NE][NS][NM][NO][ND][X][X]
-
-        # Calculate the exponential of all elements in the input array. Shape [NE][NS][NM][NO][ND][X]
-        # Add one axis, to allow for broadcasting multiplication.
-        if NE != None:
-            W_exp = exp(W).reshape(NE, NS, NM, NO, ND, Row, 1)
-        else:
-            W_exp = exp(W).reshape(NS, NM, NO, ND, Row, 1)
-
-        # Make a eye matrix, with Shape [NE][NS][NM][NO][ND][X][X]
-        if NE != None:
-            eye_mat = tile(eye(Row)[newaxis, newaxis, newaxis, newaxis, newaxis, ...], (NE, NS, NM, NO, ND, 1, 1) )
-        else:
-            eye_mat = tile(eye(Row)[newaxis, newaxis, newaxis, newaxis, ...], (NS, NM, NO, ND, 1, 1) )
-
-        # Transform it to a diagonal matrix, with elements from vector down the diagonal.
-        # Use the dtype, if specified.
-        if dtype != None:
-            W_exp_diag = multiply(W_exp, eye_mat, dtype=dtype )
-        else:
-            W_exp_diag = multiply(W_exp, eye_mat)
-
-        # Make dot products for higher dimension.
-        # "...", the Ellipsis notation, is designed to mean to insert as many full slices (:)
-        # to extend the multi-dimensional slice to all dimensions.
-        dot_V_W = einsum('...ij, ...jk', V, W_exp_diag)
-
-        # Compute the (multiplicative) inverse of a matrix.
-        inv_V = inv(V)
+        eA = matrix_exponential_pade(A)
 
-        # Calculate the exact exponential.
-        eA = einsum('...ij, ...jk', dot_V_W, inv_V)
+    # Return the matrix.
+    return eA
 
-    # Return the complex matrix.
-    if complex_flag:
-        return array(eA)
 
-    # Return only the real part.
-    else:
-        return array(eA.real)
+def matrix_exponential_eig(A):
+    """Calculate the exact matrix exponential using the eigenvalue decomposition approach, matrix by matrix.
 
+    This is the fall back for the numpy versions below 1.10, where the matrix products and linear algebra functions cannot operate on stacks of matrices.
 
-def matrix_exponential_rank_NS_NM_NO_ND_2_2(A, dtype=None):
-    """Calculate the exact matrix exponential using the closed form in terms of the matrix elements., for higher dimensional data.  This is of dimension [NS][NM][NO][ND][2][2].
 
-    Here X is the Row and Column length, of the outer square matrix.
-
-    @param A:       The square matrix to calculate the matrix exponential of.
-    @type A:        numpy float array of rank [NS][NM][NO][ND][2][2]
-    @param dtype:   If provided, forces the calculation to use the data type specified.
-    @type dtype:    data-type, optional
-    @return:        The matrix exponential.  This will have the same dimensionality as the A matrix.
-    @rtype:         numpy float array of rank [NS][NM][NO][ND][2][2]
+    @param A:   The square matrices to calculate the matrix exponential of.
+    @type A:    numpy float array of rank [...][X][X]
+    @return:    The matrix exponentials.  This will have the same dimensionality as the A matrix.
+    @rtype:     numpy float array of rank [...][X][X]
     """
 
-    # Extract shapes from data.
-    NS, NM, NO, ND, Row, Col = A.shape
+    # Is the original matrix real?
+    complex_flag = any(iscomplex(A))
 
-    # Convert dtype, if specified.
-    if dtype != None:
-        dtype_mat = A.dtype
+    # The flattened view of the matrices, and the storage for the results.
+    A_flat = A.reshape((-1,) + A.shape[-2:])
+    eA = zeros(A_flat.shape, complex128)
 
-        # If the dtype is different from the input.
-        if dtype_mat != dtype:
-            # This needs to be made as a copy.
-            A = A.astype(dtype)
+    # Loop over the matrices.
+    for i in range(len(A_flat)):
+        # The eigenvalue decomposition.
+        W_i, V_i = eig(A_flat[i])
 
-    # Is the original matrix real?
-    complex_flag = any(iscomplex(A))
+        # Calculate the exact exponential.
+        eA[i] = dot(V_i * exp(W_i), inv(V_i))
 
-    # Make array to store results
-    if dtype != None:
-        eA_mat = zeros([NS, NM, NO, ND, Row, Col], dtype)
+    # Reshape.
+    eA = eA.reshape(A.shape)
+
+    # Return the complex matrix.
+    if complex_flag:
+        return eA
+
+    # Return only the real part.
     else:
-        eA_mat = zeros([NS, NM, NO, ND, Row, Col], dtype)
+        return eA.real
 
-    # Get the data view, from the helper function.
-    A_view = data_view_via_striding_array_row_col(data_array=A)
 
-    # The index view could be pre formed in init.
-    index = create_index(NS=NS, NM=NM, NO=NO, ND=ND)
-    index_view = data_view_via_striding_array_col(data_array=index)
+def matrix_exponential_pade(A):
+    """Calculate the matrix exponential using the scaling and squaring Pade approximation of Higham (2005), for a stack of matrices.
 
-    # Zip them together and iterate over them.
-    for A_i, index_i in zip(A_view, index_view):
-        a11 = A_i[0, 0]
-        a12 = A_i[0, 1]
-        a21 = A_i[1, 0]
-        a22 = A_i[1, 1]
+    The lowest Pade degree reaching double precision for all matrices is used.  If the degree 13 approximant is needed, each matrix A is scaled by its own 2**-s to bring its 1-norm within range, and the approximant is then squared s times for that matrix only.  The whole stack is evaluated at once using matmul() matrix products and a single batched linear solve.
 
-        # Discriminant
-        a = 1
-        b = -a11 - a22
-        c = a11 * a22 - a12 * a21
-        dis = b**2 - 4*a*c
+    Higham, N. J. (2005).  The scaling and squaring method for the matrix exponential revisited.  SIAM J. Matrix Anal. Appl., 26, 1179-1193.
 
-        # If dis is positive: two distinct real roots
-        # If dis is zero: one distinct real roots
-        # If dis is negative: two complex roots
 
-        # Eigenvalues lambda_1, lambda_2.
-        l1 = (-b + dis) / (2*a)
-        l2 = (-b - dis) / (2*a)
+    @param A:   The square matrices to calculate the matrix exponential of.
+    @type A:    numpy float or complex array of rank [...][X][X]
+    @return:    The matrix exponentials, in the data type of A.
+    @rtype:     numpy float or complex array of rank [...][X][X]
+    """
 
-        # Define M: M = V^-1 * [ [l1 0], [0 l2] ] * V
-        W_m = array([ [l1, 0], [0, l2] ])
+    # The matrix 1-norms.
+    norm = abs(A).sum(axis=-2).max(axis=-1)
+    max_norm = 0.0
+    if norm.size:
+        max_norm = norm.max()
+
+    # Select the lowest Pade degree, with no scaling.
+    for degree, theta in PADE_THETA:
+        if max_norm <= theta:
+            break
+
+    # The per-matrix scaling for degree 13.
+    squarings = None
+    if max_norm > theta:
+        squarings = maximum(0, ceil(log2(norm / theta))).astype(int)
+        A = A / (2.0**squarings)[..., newaxis, newaxis]
+
+    # The identity matrix and matrix powers.
+    b = PADE_COEFF[degree]
+    ident = eye(A.shape[-1])
+    A2 = matmul(A, A)
+
+    # The odd (U) and even (V) parts of the Pade approximant, for the degrees up to 9.
+    if degree < 13:
+        U = b[1] * ident
+        V = b[0] * ident
+        power = ident
+        for k in range(2, degree+1, 2):
+            power = A2 if k == 2 else matmul(power, A2)
+            U = U + b[k+1] * power
+            V = V + b[k] * power
+        U = matmul(A, U)
+
+    # The degree 13 odd and even parts, evaluated with the minimal number of matrix products.
+    else:
+        A4 = matmul(A2, A2)
+        A6 = matmul(A4, A2)
+        U = matmul(A6, b[13]*A6 + b[11]*A4 + b[9]*A2) + b[7]*A6 + b[5]*A4 + b[3]*A2 + b[1]*ident
+        U = matmul(A, U)
+        V = matmul(A6, b[12]*A6 + b[10]*A4 + b[8]*A2) + b[6]*A6 + b[4]*A4 + b[2]*A2 + b[0]*ident
 
-        v1_1 = 1
-        v1_2 = (l1 - a11) / a12
+    # The Pade approximant r(A) = (V - U)^-1 (V + U).
+    eA = solve(V - U, V + U)
 
-        v2_1 = 1
-        v2_2 = (l2 - a11) / a12
+    # Undo the scaling by repeated squaring, only for the matrices which were scaled.
+    if squarings is not None:
+        for i in range(squarings.max()):
+            mask = squarings > i
+            eA[mask] = matmul(eA[mask], eA[mask])
 
-        # normalized eigenvector
-        v1_1_norm = v1_1 / (sqrt(v1_1**2 + v1_2**2) )
-        v1_2_norm = v1_2 / (sqrt(v1_1**2 + v1_2**2) )
-        v2_1_norm = v2_1 / (sqrt(v2_1**2 + v2_2**2) )
-        v2_2_norm = v2_2 / (sqrt(v2_1**2 + v2_2**2) )
+    # Return the matrix exponentials.
+    return eA
 
-        #V_m = array([ [v1_norm], [v2_norm] ])
-        V_m = array([ [v1_1_norm, v2_1_norm], [v1_2_norm, v2_2_norm] ])
 
-        V_inv_m = inv(V_m)
+def matrix_exponential_rank_NS_NM_NO_ND_2_2(A, dtype=None):
+    """Calculate the exact matrix exponential using the closed form in terms of the matrix elements, for higher dimensional data.  This is of dimension [NE][NS][NM][NO][ND][2][2] or [NS][NM][NO][ND][2][2].
 
-        # Calculate the exact exponential.
-        dot_V_W = dot(V_m, W_m)
-        eA_m = dot(dot_V_W, V_inv_m)
+    With the mean of the eigenvalues m = (a11 + a22)/2 and the half-difference s = sqrt(((a11 - a22)/2)**2 + a12*a21), the exponential is::
 
-        # Save results.
+        exp(A) = exp(m) * [ cosh(s) I + sinh(s)/s (A - m I) ] .
 
-        # Extract index from index_view.
-        si, mi, oi, di = index_i
+    The hyperbolic functions are expanded as exponentials of m+s and m-s to avoid overflows, and a series expansion is used for small s.  For real matrices with a negative s**2, the circular functions are used so that the calculation stays in real arithmetic.
 
-        # Store the result.
-        eA_mat[si, mi, oi, di, :] = eA_m
 
-    return eA_mat
+    @param A:       The square matrix to calculate the matrix exponential of.
+    @type A:        numpy float array of rank [NE][NS][NM][NO][ND][2][2] or [NS][NM][NO][ND][2][2]
+    @param dtype:   If provided, forces the calculation to use the data type specified.
+    @type dtype:    data-type, optional
+    @return:        The matrix exponential.  This will have the same dimensionality as the A matrix.
+    @rtype:         numpy float array of rank [NE][NS][NM][NO][ND][2][2] or [NS][NM][NO][ND][2][2]
+    """
+
+    # Convert dtype, if specified.
+    if dtype != None and A.dtype != dtype:
+        A = A.astype(dtype)
+
+    # The matrix elements.
+    a11 = A[..., 0, 0]
+    a12 = A[..., 0, 1]
+    a21 = A[..., 1, 0]
+    a22 = A[..., 1, 1]
+
+    # The eigenvalue mean and the squared half-difference.
+    m = 0.5 * (a11 + a22)
+    d = 0.5 * (a11 - a22)
+    s2 = d**2 + a12 * a21
+
+    # The half-difference, with the circular functions for negative real values.
+    circ = None
+    if iscomplexobj(A):
+        s = sqrt(s2)
+    else:
+        circ = s2 < 0.0
+        s = sqrt(abs(s2))
+
+    # Catch small values, for the series expansion of sinh(s)/s.
+    small = abs(s) < 1e-2
+    s_safe = s.copy()
+    s_safe[small] = 1.0
+
+    # The terms exp(m) cosh(s) and exp(m) sinh(s)/s.
+    exp_pos = exp(m + s)
+    exp_neg = exp(m - s)
+    cosh_term = 0.5 * (exp_pos + exp_neg)
+    sinh_term = 0.5 * (exp_pos - exp_neg) / s_safe
+
+    # The circular functions.
+    if circ is not None and any(circ):
+        exp_m = exp(m[circ])
+        cosh_term[circ] = exp_m * cos(s[circ])
+        sinh_term[circ] = exp_m * sin(s_safe[circ]) / s_safe[circ]
+
+    # The series expansion of sinh(s)/s (or sin(s)/s for negative s**2) for small s.
+    sinh_term[small] = (exp(m) * (1.0 + s2/6.0 + s2**2/120.0 + s2**3/5040.0))[small]
+
+    # The matrix exponential.
+    eA = empty(A.shape, A.dtype)
+    eA[..., 0, 0] = cosh_term + sinh_term * d
+    eA[..., 0, 1] = sinh_term * a12
+    eA[..., 1, 0] = sinh_term * a21
+    eA[..., 1, 1] = cosh_term - sinh_term * d
+
+    # Return the matrix.
+    return eA
@@ -167,3 +167,116 @@ def r1rho_MP05(r1rho_prime=None, omega=None, offset=None, pA=None, dw=None, kex=
     if not isfinite(sum(back_calc)):
         # Replaces nan, inf, etc. with fill value.
         fix_invalid(back_calc, copy=False, fill_value=1e100)
+
+
+def dr1rho_MP05(r1rho_prime=None, omega=None, offset=None, pA=None, dw=None, kex=None, R1=0.0, spin_lock_fields=None, spin_lock_fields2=None, dback_calc=None):
+    """Calculate the partial derivatives of the R1rho' values for the MP05 model.
+
+    The R1rho' equation is written as::
+
+        R1rho' = R1.cos^2(theta) + R1rho'.sin^2(theta) + sin^2(theta) * numer / denom ,
+
+    with sin^2(theta) = omega_1^2 / omega_eff^2, numer = phi_ex.kex and::
+
+        denom = omega_aeff^2.omega_beff^2 / omega_eff^2 + kex^2 - sin^2(theta).phi_ex.F ,
+
+                     2.kex^2.(pA.omega_aeff^2 + pB.omega_beff^2)
+        F  =  1 + ----------------------------------------------- .
+                  omega_aeff^2.omega_beff^2 + omega_eff^2.kex^2
+
+    The dw, pA and kex partial derivatives are propagated through each of these terms via the chain rule.
+
+
+    @keyword r1rho_prime:       The R1rho_prime parameter value (R1rho with no exchange).
+    @type r1rho_prime:          numpy float array of rank [NE][NS][NM][NO][ND]
+    @keyword omega:             The chemical shift for the spin in rad/s.
+    @type omega:                numpy float array of rank [NE][NS][NM][NO][ND]
+    @keyword offset:            The spin-lock offsets for the data.
+    @type offset:               numpy float array of rank [NE][NS][NM][NO][ND]
+    @keyword pA:                The population of state A.
+    @type pA:                   float
+    @keyword dw:                The chemical exchange difference between states A and B in rad/s.
+    @type dw:                   numpy float array of rank [NE][NS][NM][NO][ND]
+    @keyword kex:               The kex parameter value (the exchange rate in rad/s).
+    @type kex:                  float
+    @keyword R1:                The R1 relaxation rate.
+    @type R1:                   numpy float array of rank [NE][NS][NM][NO][ND]
+    @keyword spin_lock_fields:  The R1rho spin-lock field strengths (in rad.s^-1).
+    @type spin_lock_fields:     numpy float array of rank [NE][NS][NM][NO][ND]
+    @keyword spin_lock_fields2: The R1rho spin-lock field strengths squared (in rad^2.s^-2).  This is for speed.
+    @type spin_lock_fields2:    numpy float array of rank [NE][NS][NM][NO][ND]
+    @keyword dback_calc:        The array for holding the partial derivatives of the R1rho' values with respect to R1, R1rho', dw (in rad/s), pA and kex, in that order.
+    @type dback_calc:           numpy float array of rank [5][NE][NS][NM][NO][ND]
+    """
+
+    # Parameter conversions.
+    pB = 1.0 - pA
+    kex2 = kex**2
+
+    # Repetitive calculations (to speed up calculations).
+    Wa = omega                  # Larmor frequency [s^-1].
+    Wb = omega + dw             # Larmor frequency [s^-1].
+    W = pA*Wa + pB*Wb           # Pop-averaged Larmor frequency [s^-1].
+    da = Wa - offset            # Effective field at A [s^-1].
+    db = Wb - offset            # Effective field at B [s^-1].
+    d = W - offset              # Effective field at pop-avg Larmor frequency [s^-1].
+
+    # The effective fields, catching zeros for the population averaged field.
+    waeff2 = spin_lock_fields2 + da**2
+    wbeff2 = spin_lock_fields2 + db**2
+    weff2 = spin_lock_fields2 + d**2
+    weff2[weff2 == 0.0] = 1.0
+
+    # The rotating frame flip angle.
+    theta = arctan2(spin_lock_fields, d)
+    sin_theta2 = sin(theta)**2
+
+    # The numerator.
+    phi_ex = pA * pB * dw**2
+    numer = phi_ex * kex
+
+    # The F factor and the denominator.
+    waeff2_wbeff2 = waeff2 * wbeff2
+    G = pA*waeff2 + pB*wbeff2
+    H = waeff2_wbeff2 + weff2*kex2
+    F = 1.0 + 2.0*kex2*G / H
+    denom = waeff2_wbeff2/weff2 + kex2 - sin_theta2*phi_ex*F
+
+    # The R1 and R1rho' partial derivatives.
+    dback_calc[0] = 1.0 - sin_theta2
+    dback_calc[1] = sin_theta2
+
+    # The partial derivatives of pA, d, db, phi_ex, kex and kex^2 with respect to dw, pA and kex.
+    dpA = [0.0, 1.0, 0.0]
+    dd = [pB, -dw, 0.0]
+    ddb = [1.0, 0.0, 0.0]
+    dphi_ex = [2.0 * pA * pB * dw, (1.0 - 2.0 * pA) * dw**2, 0.0]
+    dkex = [0.0, 0.0, 1.0]
+    dkex2 = [0.0, 0.0, 2.0 * kex]
+
+    # Loop over the dw, pA and kex parameters.
+    for i in range(3):
+        # The effective field and tilt angle derivatives.
+        dwbeff2 = 2.0 * db * ddb[i]
+        dweff2 = 2.0 * d * dd[i]
+        dsin_theta2 = -sin_theta2 * dweff2 / weff2
+
+        # The numerator derivative.
+        dnumer = dphi_ex[i] * kex + phi_ex * dkex[i]
+
+        # The F factor derivative.
+        dG = dpA[i] * (waeff2 - wbeff2) + pB * dwbeff2
+        dH = waeff2 * dwbeff2 + dweff2 * kex2 + weff2 * dkex2[i]
+        dF = 2.0 * (dkex2[i] * G / H + kex2 * (dG * H - G * dH) / H**2)
+
+        # The denominator derivative.
+        ddenom = (waeff2 * dwbeff2 - waeff2_wbeff2 / weff2 * dweff2) / weff2 + dkex2[i] - (dsin_theta2 * phi_ex * F + sin_theta2 * dphi_ex[i] * F + sin_theta2 * phi_ex * dF)
+
+        # The R1rho' partial derivative.
+        dback_calc[2+i] = (r1rho_prime - R1) * dsin_theta2 + (dsin_theta2 * numer + sin_theta2 * dnumer) / denom - sin_theta2 * numer * ddenom / denom**2
+
+    # Catch errors, taking a sum over array is the fastest way to check for
+    # +/- inf (infinity) and nan (not a number).
+    if not isfinite(sum(dback_calc)):
+        # Replaces nan, inf, etc. with fill value.
+        fix_invalid(dback_calc, copy=False, fill_value=0.0)
@@ -184,3 +184,121 @@ def r1rho_TAP03(r1rho_prime=None, omega=None, offset=None, pA=None, dw=None, kex
     if not isfinite(sum(back_calc)):
         # Replaces nan, inf, etc. with fill value.
         fix_invalid(back_calc, copy=False, fill_value=1e100)
+
+
+def dr1rho_TAP03(r1rho_prime=None, omega=None, offset=None, pA=None, dw=None, kex=None, R1=0.0, spin_lock_fields=None, spin_lock_fields2=None, dback_calc=None):
+    """Calculate the partial derivatives of the R1rho' values for the TAP03 model.
+
+    The R1rho' equation is written as::
+
+        R1rho' = R1.cos^2(theta) + R1rho'.sin^2(theta) + sin^2(hat_theta) * numer / denom / gamma ,
+
+    and the dw, pA and kex partial derivatives are propagated through gamma, the effective fields, both tilt angles, and the numerator and denominator via the chain rule, using sin^2(theta) = omega_1^2 / (omega_1^2 + d^2) and sin^2(hat_theta) = gamma.omega_1^2 / omega_eff^2.  The derivatives are zero for the points with a negative gamma value, as these R1rho' values are fixed at 1e100.
+
+
+    @keyword r1rho_prime:       The R1rho_prime parameter value (R1rho with no exchange).
+    @type r1rho_prime:          numpy float array of rank [NE][NS][NM][NO][ND]
+    @keyword omega:             The chemical shift for the spin in rad/s.
+    @type omega:                numpy float array of rank [NE][NS][NM][NO][ND]
+    @keyword offset:            The spin-lock offsets for the data.
+    @type offset:               numpy float array of rank [NE][NS][NM][NO][ND]
+    @keyword pA:                The population of state A.
+    @type pA:                   float
+    @keyword dw:                The chemical exchange difference between states A and B in rad/s.
+    @type dw:                   numpy float array of rank [NE][NS][NM][NO][ND]
+    @keyword kex:               The kex parameter value (the exchange rate in rad/s).
+    @type kex:                  float
+    @keyword R1:                The R1 relaxation rate.
+    @type R1:                   numpy float array of rank [NE][NS][NM][NO][ND]
+    @keyword spin_lock_fields:  The R1rho spin-lock field strengths (in rad.s^-1).
+    @type spin_lock_fields:     numpy float array of rank [NE][NS][NM][NO][ND]
+    @keyword spin_lock_fields2: The R1rho spin-lock field strengths squared (in rad^2.s^-2).  This is for speed.
+    @type spin_lock_fields2:    numpy float array of rank [NE][NS][NM][NO][ND]
+    @keyword dback_calc:        The array for holding the partial derivatives of the R1rho' values with respect to R1, R1rho', dw (in rad/s), pA and kex, in that order.
+    @type dback_calc:           numpy float array of rank [5][NE][NS][NM][NO][ND]
+    """
+
+    # Parameter conversions.
+    pB = 1.0 - pA
+    kex2 = kex**2
+
+    # Repetitive calculations (to speed up calculations).
+    Wa = omega                  # Larmor frequency [s^-1].
+    Wb = omega + dw             # Larmor frequency [s^-1].
+    W = pA*Wa + pB*Wb           # Pop-averaged Larmor frequency [s^-1].
+    phi_ex = pA * pB * dw**2    # Phi of the exchange.
+    numer = phi_ex * kex
+    da = Wa - offset            # Effective field at A [s^-1].
+    db = Wb - offset            # Effective field at B [s^-1].
+    d = W - offset              # Effective field at pop-avg Larmor frequency [s^-1].
+
+    # The gamma factor, with the negative values set to zero as in r1rho_TAP03().
+    sigma = pB*da + pA*db
+    sigma2 = sigma**2
+    gamma_numer = sigma2 - kex2 + spin_lock_fields2
+    gamma_denom = sigma2 + kex2 + spin_lock_fields2
+    gamma = 1.0 + phi_ex*gamma_numer / gamma_denom**2
+    mask_gamma_neg = gamma < 0.0
+    gamma[mask_gamma_neg] = 0.0
+
+    # The effective fields.
+    waeff2 = gamma*spin_lock_fields2 + da**2
+    wbeff2 = gamma*spin_lock_fields2 + db**2
+    weff2 = gamma*spin_lock_fields2 + d**2
+    weff2[weff2 == 0.0] = 1.0
+    w1_d2 = spin_lock_fields2 + d**2
+    w1_d2[w1_d2 == 0.0] = 1.0
+
+    # The rotating frame flip angles.
+    sin_theta2 = sin(arctan2(spin_lock_fields, d))**2
+    hat_sin_theta2 = sin(arctan2(sqrt(gamma)*spin_lock_fields, d))**2
+
+    # The denominator and the exchange term.
+    waeff2_wbeff2_weff2 = waeff2*wbeff2/weff2
+    denom = waeff2_wbeff2_weff2 + kex2 - 2.0*hat_sin_theta2*phi_ex + (1.0 - gamma)*spin_lock_fields2
+    gamma[gamma == 0.0] = 1.0
+    rex = hat_sin_theta2 * numer / denom / gamma
+
+    # The R1 and R1rho' partial derivatives.
+    dback_calc[0] = 1.0 - sin_theta2
+    dback_calc[1] = sin_theta2
+
+    # The partial derivatives of d, db, sigma, phi_ex and kex with respect to dw, pA and kex.
+    dd = [pB, -dw, 0.0]
+    ddb = [1.0, 0.0, 0.0]
+    dsigma = [pA, dw, 0.0]
+    dphi_ex = [2.0 * pA * pB * dw, (1.0 - 2.0 * pA) * dw**2, 0.0]
+    dkex = [0.0, 0.0, 1.0]
+
+    # Loop over the dw, pA and kex parameters.
+    for i in range(3):
+        # The gamma factor derivative.
+        dgamma_numer = 2.0 * sigma * dsigma[i] - 2.0 * kex * dkex[i]
+        dgamma_denom = 2.0 * sigma * dsigma[i] + 2.0 * kex * dkex[i]
+        dgamma = (dphi_ex[i] * gamma_numer + phi_ex * dgamma_numer) / gamma_denom**2 - 2.0 * phi_ex * gamma_numer * dgamma_denom / gamma_denom**3
+
+        # The effective field derivatives.
+        dwaeff2 = dgamma * spin_lock_fields2
+        dwbeff2 = dgamma * spin_lock_fields2 + 2.0 * db * ddb[i]
+        dweff2 = dgamma * spin_lock_fields2 + 2.0 * d * dd[i]
+
+        # The tilt angle derivatives.
+        dsin_theta2 = -sin_theta2 * 2.0 * d * dd[i] / w1_d2
+        dhat_sin_theta2 = (dgamma * spin_lock_fields2 - hat_sin_theta2 * dweff2) / weff2
+
+        # The numerator and denominator derivatives.
+        dnumer = dphi_ex[i] * kex + phi_ex * dkex[i]
+        ddenom = (dwaeff2 * wbeff2 + waeff2 * dwbeff2 - waeff2_wbeff2_weff2 * dweff2) / weff2 + 2.0 * kex * dkex[i] - 2.0 * (dhat_sin_theta2 * phi_ex + hat_sin_theta2 * dphi_ex[i]) - dgamma * spin_lock_fields2
+
+        # The R1rho' partial derivative.
+        dback_calc[2+i] = (r1rho_prime - R1) * dsin_theta2 + (dhat_sin_theta2 * numer + hat_sin_theta2 * dnumer) / denom / gamma - rex * (ddenom / denom + dgamma / gamma)
+
+    # The R1rho' values are fixed at 1e100 for negative gamma values.
+    if any(mask_gamma_neg):
+        dback_calc[:, mask_gamma_neg] = 0.0
+
+    # Catch errors, taking a sum over array is the fastest way to check for
+    # +/- inf (infinity) and nan (not a number).
+    if not isfinite(sum(dback_calc)):
+        # Replaces nan, inf, etc. with fill value.
+        fix_invalid(dback_calc, copy=False, fill_value=0.0)
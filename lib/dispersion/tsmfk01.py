@@ -67,7 +67,7 @@ More information on the TSMFK01 model can be found in the:
 """
 
 # Python module imports.
-from numpy import fabs, min, sin, isfinite, sum
+from numpy import cos, fabs, min, ndarray, sin, isfinite, sum
 from numpy.ma import fix_invalid, masked_where
 
 
@@ -76,6 +76,8 @@ def r2eff_TSMFK01(r20a=None, dw=None, dw_orig=None, k_AB=None, tcp=None, back_ca
 
     See the module docstring for details.
 
+    For evaluating multiple parameter points in one call, k_AB can be supplied as numpy arrays of rank [NP][1][1][1][1][1] together with the other arrays having the additional first dimension [NP].
+
 
     @keyword r20a:          The R20 parameter value of state A (R2 with no exchange).
     @type r20a:             numpy float array of rank [NE][NS][NM][NO][ND]
@@ -84,7 +86,7 @@ def r2eff_TSMFK01(r20a=None, dw=None, dw_orig=None, k_AB=None, tcp=None, back_ca
     @keyword dw_orig:       The chemical exchange difference between states A and B in ppm. This is only for faster checking of zero value, which result in no exchange.
     @type dw_orig:          numpy float array of rank-1
     @keyword k_AB:          The k_AB parameter value (the forward exchange rate in rad/s).
-    @type k_AB:             float
+    @type k_AB:             float or numpy float array of rank [NP][1][1][1][1][1]
     @keyword tcp:           The tau_CPMG times (1 / 4.nu1).
     @type tcp:              numpy float array of rank [NE][NS][NM][NO][ND]
     @keyword back_calc:     The array for holding the back calculated R2eff values.  Each element corresponds to one of the CPMG nu1 frequencies.
@@ -94,9 +96,14 @@ def r2eff_TSMFK01(r20a=None, dw=None, dw_orig=None, k_AB=None, tcp=None, back_ca
     # Flag to tell if values should be replaced if max_etapos in cosh function is violated.
     t_dw_zero = False
 
+    # Multiple parameter points.
+    batch = isinstance(k_AB, ndarray)
+
     # Catch parameter values that will result in no exchange, returning flat R2eff = R20 lines (when kex = 0.0, k_AB = 0.0).
     # Test if k_AB is zero.
-    if k_AB == 0.0:
+    if batch:
+        mask_no_rex = (k_AB == 0.0).reshape(-1)
+    elif k_AB == 0.0:
         back_calc[:] = r20a
         return
 
@@ -111,9 +118,13 @@ def r2eff_TSMFK01(r20a=None, dw=None, dw_orig=None, k_AB=None, tcp=None, back_ca
     # The numerator.
     numer = sin(denom)
 
-    # Catch zeros (to avoid pointless mathematical operations).
+    # Catch zeros (to avoid pointless mathematical operations), point by point for multiple parameter points.
     # This will result in no exchange, returning flat lines.
-    if min(fabs(numer)) == 0.0:
+    if batch:
+        mask_numer_zero = (fabs(numer) == 0.0).reshape(len(numer), -1).any(axis=1)
+        back_calc[:] = r20a + k_AB - k_AB * numer / denom
+        back_calc[mask_numer_zero] = (r20a + k_AB)[mask_numer_zero]
+    elif min(fabs(numer)) == 0.0:
         # Calculate R2eff for forward.
         back_calc[:] = r20a + k_AB
     else:
@@ -130,3 +141,61 @@ def r2eff_TSMFK01(r20a=None, dw=None, dw_orig=None, k_AB=None, tcp=None, back_ca
     if not isfinite(sum(back_calc)):
         # Replaces nan, inf, etc. with fill value.
         fix_invalid(back_calc, copy=False, fill_value=1e100)
+
+    # The point specific replacements for multiple parameter points.
+    if batch:
+        back_calc[mask_no_rex] = r20a[mask_no_rex]
+
+
+def dr2eff_TSMFK01(r20a=None, dw=None, k_AB=None, tcp=None, dback_calc=None):
+    """Calculate the partial derivatives of the R2eff values for the TSMFK01 model.
+
+    With x = dw * tau_cpmg, the partial derivatives of the exchange contribution k_AB * (1 - sin(x)/x) are::
+
+        dR2eff
+        ------  =  1 - sin(x)/x ,
+        dk_AB
+
+        dR2eff                  cos(x) - sin(x)/x
+        ------  =  - k_AB * tcp * ----------------- ,
+         d dw                           x
+
+    whereby the cases of a zero sin(x) value are handled as in r2eff_TSMFK01().
+
+
+    @keyword r20a:          The R20 parameter value of state A (R2 with no exchange).
+    @type r20a:             numpy float array of rank [NE][NS][NM][NO][ND]
+    @keyword dw:            The chemical exchange difference between states A and B in rad/s.
+    @type dw:               numpy float array of rank [NE][NS][NM][NO][ND]
+    @keyword k_AB:          The k_AB parameter value (the forward exchange rate in rad/s).
+    @type k_AB:             float
+    @keyword tcp:           The tau_CPMG times (1 / 4.nu1).
+    @type tcp:              numpy float array of rank [NE][NS][NM][NO][ND]
+    @keyword dback_calc:    The array for holding the partial derivatives of the R2eff values with respect to R20A, dw (in rad/s) and k_AB, in that order.
+    @type dback_calc:       numpy float array of rank [3][NE][NS][NM][NO][ND]
+    """
+
+    # Repetitive calculations (to speed up calculations).
+    x = dw * tcp
+    numer = sin(x)
+
+    # The R20A partial derivative.
+    dback_calc[0] = 1.0
+
+    # Catch zeros, as r2eff_TSMFK01() then sets R2eff = R20A + k_AB for all points (or R20A for dw = 0).
+    if min(fabs(numer)) == 0.0:
+        dback_calc[1] = 0.0
+        dback_calc[2] = 1.0
+        dback_calc[2][dw == 0.0] = 0.0
+        return
+
+    # The dw and k_AB partial derivatives.
+    sinc = numer / x
+    dback_calc[1] = -k_AB * tcp * (cos(x) - sinc) / x
+    dback_calc[2] = 1.0 - sinc
+
+    # Catch errors, taking a sum over array is the fastest way to check for
+    # +/- inf (infinity) and nan (not a number).
+    if not isfinite(sum(dback_calc)):
+        # Replaces nan, inf, etc. with fill value.
+        fix_invalid(dback_calc, copy=False, fill_value=0.0)
@@ -402,6 +402,10 @@ MODEL_LIST_DW_MIX_QUADRUPLE = [MODEL_NS_MMQ_3SITE, MODEL_NS_MMQ_3SITE_LINEAR]
 # The models which currently support R1 fitting via target function switching.
 MODEL_LIST_FIT_R1 = [MODEL_NOREX, MODEL_DPL94, MODEL_TP02, MODEL_TAP03, MODEL_MP05, MODEL_NS_R1RHO_2SITE]
 
+## The models with analytic chi-squared gradients and Hessians, allowing for gradient based optimisation.
+MODEL_LIST_JACOBIAN = [MODEL_LM63, MODEL_CR72, MODEL_CR72_FULL, MODEL_IT99, MODEL_TSMFK01, MODEL_B14, MODEL_B14_FULL, MODEL_DPL94, MODEL_TP02, MODEL_TAP03, MODEL_MP05]
+"""The list of models with analytic Jacobians, for which the gradient based optimisation algorithms are allowed."""
+
 
 # The defined models, which is used for nesting.
 MODEL_NEST_CPMG = MODEL_CR72
@@ -24,14 +24,14 @@
 
 # Python module imports.
 from math import cos, pi
-from numpy import divide, dot, eye, float64, multiply, sinc, swapaxes, tensordot
+from numpy import sinc
 try:
     from scipy.integrate import tplquad
 except ImportError:
     pass
 
 # relax module imports.
-from lib.frame_order.matrix_ops import pcs_pivot_motion_full_qr_int, pcs_pivot_motion_full_quad_int, rotate_daeg
+from lib.frame_order.matrix_ops import pcs_numeric_qr_int, pcs_pivot_motion_full_quad_int, rotate_daeg
 
 
 def compile_1st_matrix_iso_cone(matrix, R_eigen, cone_theta, sigma_max):
@@ -154,53 +154,14 @@ def pcs_numeric_qr_int_iso_cone(points=None, max_points=None, theta_max=None, si
     @type missing_pcs:          numpy rank-2 array
     """
 
-    # Clear the data structures.
-    pcs_theta[:] = 0.0
-    pcs_theta_err[:] = 0.0
-
-    # Fast frame shift.
-    Ri = dot(R_eigen, tensordot(Ri_prime, RT_eigen, axes=1))
-    Ri = swapaxes(Ri, 0, 1)
-
     # Unpack the points.
     theta, phi, sigma = points
 
-    # Loop over the samples.
-    num = 0
-    for i in range(len(points[0])):
-        # The maximum number of points has been reached (well, surpassed by one so exit the loop before it is used).
-        if num == max_points:
-            break
-
-        # Outside of the distribution, so skip the point.
-        if theta[i] > theta_max:
-            continue
-        if abs(sigma[i]) > sigma_max:
-            continue
-
-        # Calculate the PCSs for this state.
-        pcs_pivot_motion_full_qr_int(full_in_ref_frame=full_in_ref_frame, r_pivot_atom=r_pivot_atom, r_pivot_atom_rev=r_pivot_atom_rev, r_ln_pivot=r_ln_pivot, A=A, Ri=Ri[i], pcs_theta=pcs_theta, pcs_theta_err=pcs_theta_err, missing_pcs=missing_pcs)
-
-        # Increment the number of points.
-        num += 1
-
-    # Default to the rigid state if no points lie in the distribution.
-    if num == 0:
-        # Fast identity frame shift.
-        Ri_prime = eye(3, dtype=float64)
-        Ri = dot(R_eigen, tensordot(Ri_prime, RT_eigen, axes=1))
-        Ri = swapaxes(Ri, 0, 1)
-
-        # Calculate the PCSs for this state.
-        pcs_pivot_motion_full_qr_int(full_in_ref_frame=full_in_ref_frame, r_pivot_atom=r_pivot_atom, r_pivot_atom_rev=r_pivot_atom_rev, r_ln_pivot=r_ln_pivot, A=A, Ri=Ri, pcs_theta=pcs_theta, pcs_theta_err=pcs_theta_err, missing_pcs=missing_pcs)
-
-        # Multiply the constant.
-        multiply(c, pcs_theta, pcs_theta)
-
-    # Average the PCS.
-    else:
-        multiply(c, pcs_theta, pcs_theta)
-        divide(pcs_theta, float(num), pcs_theta)
+    # The points inside the distribution.
+    mask = ~((theta > theta_max) | (abs(sigma) > sigma_max))
+
+    # Calculate the averaged PCSs.
+    pcs_numeric_qr_int(mask=mask, max_points=max_points, c=c, full_in_ref_frame=full_in_ref_frame, r_pivot_atom=r_pivot_atom, r_pivot_atom_rev=r_pivot_atom_rev, r_ln_pivot=r_ln_pivot, A=A, R_eigen=R_eigen, RT_eigen=RT_eigen, Ri_prime=Ri_prime, pcs_theta=pcs_theta, pcs_theta_err=pcs_theta_err, missing_pcs=missing_pcs)
 
 
 def pcs_numeric_quad_int_iso_cone(theta_max=None, sigma_max=None, c=None, r_pivot_atom=None, r_ln_pivot=None, A=None, R_eigen=None, RT_eigen=None, Ri_prime=None):
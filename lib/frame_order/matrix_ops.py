@@ -24,13 +24,17 @@
 
 # Python module imports.
 from math import cos, sin
-from numpy import dot, transpose
+from numpy import add, divide, dot, einsum, eye, float64, multiply, newaxis, swapaxes, tensordot, transpose, where, zeros
 from numpy.linalg import norm
 
 # relax module imports.
 from lib.compat import norm
 from lib.linear_algebra.kronecker_product import transpose_23
 
+# The number of atomic positions rotated at once in the quasi-random PCS numerical integration.
+QR_INT_BLOCK_SIZE = 1000000
+"""The memory limiting block size of pcs_pivot_motion_qr_int_batch(), as the number of states multiplied by the number of atoms."""
+
 
 def daeg_to_rotational_superoperator(daeg, Rsuper):
     """Convert the frame order matrix (daeg) to the rotational superoperator.
@@ -90,9 +94,18 @@ def daeg_to_rotational_superoperator(daeg, Rsuper):
     transpose_23(daeg)
 
 
-def pcs_pivot_motion_full_qr_int(full_in_ref_frame=None, r_pivot_atom=None, r_pivot_atom_rev=None, r_ln_pivot=None, A=None, Ri=None, pcs_theta=None, pcs_theta_err=None, missing_pcs=None):
-    """Calculate the PCS value after a pivoted motion for the isotropic cone model.
+def pcs_numeric_qr_int(mask=None, max_points=None, c=None, full_in_ref_frame=None, r_pivot_atom=None, r_pivot_atom_rev=None, r_ln_pivot=None, r_inter_pivot=None, A=None, R_eigen=None, RT_eigen=None, Ri_prime=None, Ri2_prime=None, pcs_theta=None, pcs_theta_err=None, missing_pcs=None):
+    """Determine the averaged PCS value via quasi-random numerical integration for any frame order model.
+
+    The Sobol' points are selected in bulk by the model specific mask, and the PCS values for all states inside the distribution are then calculated at once by pcs_pivot_motion_qr_int_batch().
+
 
+    @keyword mask:              The mask of Sobol' points lying inside the distribution, with True for points to be used.
+    @type mask:                 numpy rank-1 bool array
+    @keyword max_points:        The maximum number of Sobol' points to use.  Only the first points of the mask up to this number are used.
+    @type max_points:           int
+    @keyword c:                 The PCS constant (without the interatomic distance and in Angstrom units).
+    @type c:                    numpy rank-2 array
     @keyword full_in_ref_frame: An array of flags specifying if the tensor in the reference frame is the full or reduced tensor.
     @type full_in_ref_frame:    numpy rank-1 array
     @keyword r_pivot_atom:      The pivot point to atom vector.
@@ -101,10 +114,18 @@ def pcs_pivot_motion_full_qr_int(full_in_ref_frame=None, r_pivot_atom=None, r_pi
     @type r_pivot_atom_rev:     numpy rank-2, 3D array
     @keyword r_ln_pivot:        The lanthanide position to pivot point vector.
     @type r_ln_pivot:           numpy rank-2, 3D array
+    @keyword r_inter_pivot:     The vector between the two pivots, for the double motion models.
+    @type r_inter_pivot:        None or numpy rank-2, 3D array
     @keyword A:                 The full alignment tensor of the non-moving domain.
-    @type A:                    numpy rank-2, 3D array
-    @keyword Ri:                The frame-shifted, pre-calculated rotation matrix for state i.
-    @type Ri:                   numpy rank-2, 3D array
+    @type A:                    numpy rank-3, array of 3D arrays
+    @keyword R_eigen:           The eigenframe rotation matrix.
+    @type R_eigen:              numpy rank-2, 3D array
+    @keyword RT_eigen:          The transpose of the eigenframe rotation matrix (for faster calculations).
+    @type RT_eigen:             numpy rank-2, 3D array
+    @keyword Ri_prime:          The array of pre-calculated rotation matrices for the in-frame motion, one for each Sobol' point.
+    @type Ri_prime:             numpy rank-3, array of 3D arrays
+    @keyword Ri2_prime:         The array of pre-calculated rotation matrices for the 2nd mode of motion of the double motion models.
+    @type Ri2_prime:            None or numpy rank-3, array of 3D arrays
     @keyword pcs_theta:         The storage structure for the back-calculated PCS values.
     @type pcs_theta:            numpy rank-2 array
     @keyword pcs_theta_err:     The storage structure for the back-calculated PCS errors.
@@ -113,35 +134,35 @@ def pcs_pivot_motion_full_qr_int(full_in_ref_frame=None, r_pivot_atom=None, r_pi
     @type missing_pcs:          numpy rank-2 array
     """
 
-    # Pre-calculate all the new vectors.
-    rot_vect = dot(r_pivot_atom, Ri) + r_ln_pivot
+    # Clear the data structures.
+    pcs_theta[:] = 0.0
+    pcs_theta_err[:] = 0.0
 
-    # The vector length (to the 5th power).
-    length = 1.0 / norm(rot_vect, axis=1)**5
+    # The indices of the Sobol' points inside the distribution, up to the maximum number of points.
+    indices = mask.nonzero()[0][:max_points]
+    num = len(indices)
 
-    # The reverse vectors and lengths.
-    if min(full_in_ref_frame) == 0:
-        rot_vect_rev = dot(r_pivot_atom_rev, Ri) + r_ln_pivot
-        length_rev = 1.0 / norm(rot_vect_rev, axis=1)**5
+    # Default to the rigid state if no points lie in the distribution.
+    if num == 0:
+        Ri_prime = eye(3, dtype=float64)[newaxis]
+        if Ri2_prime is not None:
+            Ri2_prime = Ri_prime
+
+    # The rotations of the states inside the distribution.
+    else:
+        Ri_prime = Ri_prime[indices]
+        if Ri2_prime is not None:
+            Ri2_prime = Ri2_prime[indices]
 
-    # Loop over the atoms.
-    for j in range(len(r_pivot_atom[:, 0])):
-        # Loop over the alignments.
-        for i in range(len(pcs_theta)):
-            # Skip missing data.
-            if missing_pcs[i, j]:
-                continue
+    # Sum the PCSs over all states.
+    pcs_pivot_motion_qr_int_batch(full_in_ref_frame=full_in_ref_frame, r_pivot_atom=r_pivot_atom, r_pivot_atom_rev=r_pivot_atom_rev, r_ln_pivot=r_ln_pivot, r_inter_pivot=r_inter_pivot, A=A, R_eigen=R_eigen, RT_eigen=RT_eigen, Ri_prime=Ri_prime, Ri2_prime=Ri2_prime, pcs_theta=pcs_theta, missing_pcs=missing_pcs)
 
-            # The projection.
-            if full_in_ref_frame[i]:
-                proj = dot(rot_vect[j], dot(A[i], rot_vect[j]))
-                length_i = length[j]
-            else:
-                proj = dot(rot_vect_rev[j], dot(A[i], rot_vect_rev[j]))
-                length_i = length_rev[j]
+    # Multiply the constant.
+    multiply(c, pcs_theta, pcs_theta)
 
-            # The PCS.
-            pcs_theta[i, j] += proj * length_i
+    # Average the PCS.
+    if num:
+        divide(pcs_theta, float(num), pcs_theta)
 
 
 def pcs_pivot_motion_full_quad_int(theta_i, phi_i, sigma_i, r_pivot_atom, r_ln_pivot, A, R_eigen, RT_eigen, Ri_prime):
@@ -207,8 +228,11 @@ def pcs_pivot_motion_full_quad_int(theta_i, phi_i, sigma_i, r_pivot_atom, r_ln_p
     return pcs
 
 
-def pcs_pivot_motion_torsionless_qr_int(full_in_ref_frame=None, r_pivot_atom=None, r_pivot_atom_rev=None, r_ln_pivot=None, A=None, Ri=None, pcs_theta=None, pcs_theta_err=None, missing_pcs=None):
-    """Calculate the PCS value after a pivoted motion for the isotropic cone model.
+def pcs_pivot_motion_qr_int_batch(full_in_ref_frame=None, r_pivot_atom=None, r_pivot_atom_rev=None, r_ln_pivot=None, r_inter_pivot=None, A=None, R_eigen=None, RT_eigen=None, Ri_prime=None, Ri2_prime=None, pcs_theta=None, missing_pcs=None):
+    """Calculate the sum of the PCS values after a pivoted motion for a stack of states, for all frame order models.
+
+    For each atom j, the rotated vectors r of all states n are reduced to the tensor sum_n r_n r_n^T / |r_n|^5, so that the PCS sum for alignment i is simply the contraction of this tensor with A_i.  The states are processed in blocks of QR_INT_BLOCK_SIZE atomic positions, to limit the memory usage.
+
 
     @keyword full_in_ref_frame: An array of flags specifying if the tensor in the reference frame is the full or reduced tensor.
     @type full_in_ref_frame:    numpy rank-1 array
@@ -218,47 +242,69 @@ def pcs_pivot_motion_torsionless_qr_int(full_in_ref_frame=None, r_pivot_atom=Non
     @type r_pivot_atom_rev:     numpy rank-2, 3D array
     @keyword r_ln_pivot:        The lanthanide position to pivot point vector.
     @type r_ln_pivot:           numpy rank-2, 3D array
+    @keyword r_inter_pivot:     The vector between the two pivots, for the double motion models.
+    @type r_inter_pivot:        None or numpy rank-2, 3D array
     @keyword A:                 The full alignment tensor of the non-moving domain.
-    @type A:                    numpy rank-2, 3D array
-    @keyword Ri:                The frame-shifted, pre-calculated rotation matrix for state i.
-    @type Ri:                   numpy rank-2, 3D array
-    @keyword pcs_theta:         The storage structure for the back-calculated PCS values.
+    @type A:                    numpy rank-3, array of 3D arrays
+    @keyword R_eigen:           The eigenframe rotation matrix.
+    @type R_eigen:              numpy rank-2, 3D array
+    @keyword RT_eigen:          The transpose of the eigenframe rotation matrix (for faster calculations).
+    @type RT_eigen:             numpy rank-2, 3D array
+    @keyword Ri_prime:          The in-frame rotation matrices of the states.
+    @type Ri_prime:             numpy rank-3, array of 3D arrays
+    @keyword Ri2_prime:         The in-frame rotation matrices of the states for the 2nd mode of motion of the double motion models.
+    @type Ri2_prime:            None or numpy rank-3, array of 3D arrays
+    @keyword pcs_theta:         The storage structure for the back-calculated PCS values.  The PCS sums are added to this structure.
     @type pcs_theta:            numpy rank-2 array
-    @keyword pcs_theta_err:     The storage structure for the back-calculated PCS errors.
-    @type pcs_theta_err:        numpy rank-2 array
     @keyword missing_pcs:       A structure used to indicate which PCS values are missing.
     @type missing_pcs:          numpy rank-2 array
     """
 
-    # Pre-calculate all the new vectors.
-    rot_vect = dot(r_pivot_atom, Ri) + r_ln_pivot
+    # The number of states per block.
+    chunk = max(1, QR_INT_BLOCK_SIZE // len(r_pivot_atom))
 
-    # The vector length (to the 5th power).
-    length = 1.0 / norm(rot_vect, axis=1)**5
-
-    # The reverse vectors and lengths.
+    # The vectors to rotate (the reversed vectors are only needed for the reduced tensors).
+    vectors = [r_pivot_atom]
     if min(full_in_ref_frame) == 0:
-        rot_vect_rev = dot(r_pivot_atom_rev, Ri) + r_ln_pivot
-        length_rev = 1.0 / norm(rot_vect_rev, axis=1)**5
-
-    # Loop over the atoms.
-    for j in range(len(r_pivot_atom[:, 0])):
-        # Loop over the alignments.
-        for i in range(len(pcs_theta)):
-            # Skip missing data.
-            if missing_pcs[i, j]:
-                continue
-
-            # The projection.
-            if full_in_ref_frame[i]:
-                proj = dot(rot_vect[j], dot(A[i], rot_vect[j]))
-                length_i = length[j]
-            else:
-                proj = dot(rot_vect_rev[j], dot(A[i], rot_vect_rev[j]))
-                length_i = length_rev[j]
-
-            # The PCS.
-            pcs_theta[i, j] += proj * length_i
+        vectors.append(r_pivot_atom_rev)
+
+    # The sums of the outer products of the rotated vectors, scaled by the inverse of the 5th power of their lengths.
+    tensors = zeros((len(vectors), len(r_pivot_atom), 3, 3), float64)
+
+    # Loop over the blocks of states.
+    for i in range(0, len(Ri_prime), chunk):
+        # Fast frame shift.
+        Ri = swapaxes(dot(R_eigen, tensordot(Ri_prime[i:i+chunk], RT_eigen, axes=1)), 0, 1)
+        if Ri2_prime is not None:
+            Ri2 = swapaxes(dot(R_eigen, tensordot(Ri2_prime[i:i+chunk], RT_eigen, axes=1)), 0, 1)
+
+        # Loop over the forwards and reversed vectors.
+        for k in range(len(vectors)):
+            # Rotate all vectors for all states, as an array of states x atoms x 3.
+            rot_vect = swapaxes(dot(vectors[k], Ri), 0, 1)
+
+            # The 2nd mode of motion about the 2nd pivot.
+            if Ri2_prime is not None:
+                rot_vect = einsum('njk,nkl->njl', rot_vect + r_inter_pivot, Ri2)
+
+            # Add the lanthanide to pivot vector.
+            rot_vect += r_ln_pivot
+
+            # The inverse of the vector length to the 5th power.
+            length = (rot_vect**2).sum(axis=2)**-2.5
+
+            # Sum the scaled outer products over the states.
+            tensors[k] += einsum('njk,njl->jkl', rot_vect * length[:, :, newaxis], rot_vect)
+
+    # The PCS sums, using the reversed vectors for the reduced tensors.
+    pcs = einsum('ikl,jkl->ij', A, tensors[0])
+    if len(vectors) == 2:
+        pcs_rev = einsum('ikl,jkl->ij', A, tensors[1])
+        pcs = where(full_in_ref_frame[:, newaxis], pcs, pcs_rev)
+
+    # Add the PCSs, skipping missing data.
+    pcs[missing_pcs.astype(bool)] = 0.0
+    add(pcs_theta, pcs, pcs_theta)
 
 
 def pcs_pivot_motion_torsionless_quad_int(theta_i, phi_i, r_pivot_atom, r_ln_pivot, A, R_eigen, RT_eigen, Ri_prime):
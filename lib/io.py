@@ -372,7 +372,7 @@ def open_read_file(file_name=None, dir=None, verbosity=1):
     return file_obj
 
 
-def open_write_file(file_name=None, dir=None, force=False, compress_type=0, verbosity=1, return_path=False):
+def open_write_file(file_name=None, dir=None, force=False, compress_type=0, verbosity=1, return_path=False, binary=False):
     """Function for opening a file for writing and creating directories if necessary.
 
     @keyword file_name:     The name of the file to extract the data from.
@@ -387,6 +387,8 @@ def open_write_file(file_name=None, dir=None, force=False, compress_type=0, verb
     @type verbosity:        int
     @keyword return_path:   If True, the function will return a tuple of the file object and the full file path.
     @type return_path:      bool
+    @keyword binary:        If True, the uncompressed file will be opened in binary mode.
+    @type binary:           bool
     @return:                The open, writable file object and, if the return_path is True, then the full file path is returned as well.
     @rtype:                 writable file object (if return_path, then a tuple of the writable file and the full file path)
     """
@@ -426,8 +428,8 @@ def open_write_file(file_name=None, dir=None, force=False, compress_type=0, verb
     # File path.
     file_path = get_file_path(file_name, dir)
 
-    # If no compression is supplied, determine the compression to be used from the file extension.
-    if compress_type == 0:
+    # If no compression is supplied, determine the compression to be used from the file extension (binary files are never compressed).
+    if compress_type == 0 and not binary:
         if search('.bz2$', file_path):
             compress_type = 1
         elif search('.gz$', file_path):
@@ -458,8 +460,12 @@ def open_write_file(file_name=None, dir=None, force=False, compress_type=0, verb
         if verbosity:
             print("Opening the file " + repr(file_path) + " for writing.")
 
+        # Uncompressed binary data.
+        if compress_type == 0 and binary:
+            file_obj = open(file_path, 'wb')
+
         # Uncompressed text.
-        if compress_type == 0:
+        elif compress_type == 0:
             file_obj = open(file_path, 'w')
 
         # Bzip2 compressed text.
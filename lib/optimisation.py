@@ -0,0 +1,338 @@
+###############################################################################
+#                                                                             #
+# Copyright (C) 2026 Troels E. Linnet                                         #
+#                                                                             #
+# This file is part of the program relax (http://www.nmr-relax.com).          #
+#                                                                             #
+# This program is free software: you can redistribute it and/or modify        #
+# it under the terms of the GNU General Public License as published by        #
+# the Free Software Foundation, either version 3 of the License, or           #
+# (at your option) any later version.                                         #
+#                                                                             #
+# This program is distributed in the hope that it will be useful,             #
+# but WITHOUT ANY WARRANTY; without even the implied warranty of              #
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the               #
+# GNU General Public License for more details.                                #
+#                                                                             #
+# You should have received a copy of the GNU General Public License           #
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.       #
+#                                                                             #
+###############################################################################
+
+# Module docstring.
+"""Module of optimisation tools complementing the minfx library."""
+
+# Python module imports.
+from numpy import arange, argsort, array, concatenate, dot, float64, inf, linspace, maximum, minimum, ones, prod, repeat, tile, unravel_index, zeros
+
+
+def grid_batch(func_batch=None, args=(), num_incs=None, lower=None, upper=None, A=None, b=None, block_size=10000, verbosity=0, print_prefix=''):
+    """A grid search using a target function which evaluates multiple parameter vectors in one call.
+
+    This is equivalent to the minfx.grid.grid() function, but with the grid points passed to the target function in blocks rather than one at a time.  The first parameter dimension varies the fastest, and the first encountered grid point with the lowest function value is returned.  Grid points violating the linear constraints A.x >= b are never generated, see grid_points().
+
+
+    @keyword func_batch:    The target function.  This must accept a numpy rank-2 array of parameter vectors, one per row, and return a numpy rank-1 array of function values.
+    @type func_batch:       function
+    @keyword args:          The tuple of arguments to supply to the target function.
+    @type args:             tuple
+    @keyword num_incs:      The number of increments for each dimension of the grid.
+    @type num_incs:         list of int
+    @keyword lower:         The lower bounds of the grid.
+    @type lower:            list of float
+    @keyword upper:         The upper bounds of the grid.
+    @type upper:            list of float
+    @keyword A:             The linear constraint matrix.
+    @type A:                numpy rank-2 array or None
+    @keyword b:             The linear constraint scalar vector.
+    @type b:                numpy rank-1 array or None
+    @keyword block_size:    The maximum number of grid points to generate and send to the target function at once.
+    @type block_size:       int
+    @keyword verbosity:     The verbosity level.
+    @type verbosity:        int
+    @keyword print_prefix:  The text to place before the printed output.
+    @type print_prefix:     str
+    @return:                The optimised parameter vector, the function value at this point, the number of function evaluations, and the warning (always None).
+    @rtype:                 tuple of numpy rank-1 array, float, int, None
+    """
+
+    # Printout.
+    if verbosity:
+        print("%sGrid search of %i points, evaluated in blocks of up to %i points." % (print_prefix, int(prod(num_incs)), block_size))
+
+    # The search.
+    x_best, f_best, f_count = grid_best(func_batch=func_batch, args=args, num_incs=num_incs, lower=lower, upper=upper, A=A, b=b, best=1, block_size=block_size)
+
+    # Printout.
+    if verbosity:
+        print("%sNumber of feasible grid points evaluated: %i" % (print_prefix, f_count))
+        print("%sMinimum function value: %s" % (print_prefix, f_best[0] if len(f_best) else inf))
+
+    # No feasible points.
+    if not len(f_best):
+        return None, inf, f_count, None
+
+    # Return the results.
+    return x_best[0], f_best[0], f_count, None
+
+
+def grid_best(func_batch=None, args=(), num_incs=None, lower=None, upper=None, A=None, b=None, best=1, block_size=10000):
+    """Evaluate all feasible grid points and return the best candidates.
+
+    @keyword func_batch:    The target function.  This must accept a numpy rank-2 array of parameter vectors, one per row, and return a numpy rank-1 array of function values.
+    @type func_batch:       function
+    @keyword args:          The tuple of arguments to supply to the target function.
+    @type args:             tuple
+    @keyword num_incs:      The number of increments for each dimension of the grid.
+    @type num_incs:         list of int
+    @keyword lower:         The lower bounds of the grid.
+    @type lower:            list of float
+    @keyword upper:         The upper bounds of the grid.
+    @type upper:            list of float
+    @keyword A:             The linear constraint matrix.
+    @type A:                numpy rank-2 array or None
+    @keyword b:             The linear constraint scalar vector.
+    @type b:                numpy rank-1 array or None
+    @keyword best:          The number of candidates to return.
+    @type best:             int
+    @keyword block_size:    The maximum number of grid points to generate and send to the target function at once.
+    @type block_size:       int
+    @return:                The candidate parameter vectors sorted by function value, the function values, and the number of function evaluations.  Of equal function values, the first encountered grid point comes first.
+    @rtype:                 numpy rank-2 array, numpy rank-1 array, int
+    """
+
+    # Initialise.
+    x_best = zeros((0, len(num_incs)), float64)
+    f_best = zeros(0, float64)
+    f_count = 0
+
+    # Loop over the blocks of feasible grid points.
+    for points in grid_points(num_incs=num_incs, lower=lower, upper=upper, A=A, b=b, block_size=block_size):
+        # Evaluate the block.
+        f = func_batch(*(points,)+args)
+        f_count += len(points)
+
+        # Merge with the current candidates, keeping the order of first encounter for equal values.
+        x_best = concatenate((x_best, points))
+        f_best = concatenate((f_best, f))
+        index = argsort(f_best, kind='mergesort')[:best]
+        x_best = x_best[index]
+        f_best = f_best[index]
+
+    # Return the candidates.
+    return x_best, f_best, f_count
+
+
+def grid_points(num_incs=None, lower=None, upper=None, A=None, b=None, block_size=10000):
+    """Generator for the blocks of grid points which satisfy the linear constraints A.x >= b.
+
+    The first dimension varies the fastest.  Rather than generating the full Cartesian product and then discarding the infeasible points, the grid is built up from the last, slowest dimension.  At each stage, a partial grid point is discarded together with its entire sub-grid if the constraints cannot be satisfied even with the most favourable values of the remaining dimensions.  As the constraints are linear, this bound is the sum of the per-dimension maxima of A_ij.x_j.  Each surviving point is finally checked exactly.
+
+
+    @keyword num_incs:      The number of increments for each dimension of the grid.
+    @type num_incs:         list of int
+    @keyword lower:         The lower bounds of the grid.
+    @type lower:            list of float
+    @keyword upper:         The upper bounds of the grid.
+    @type upper:            list of float
+    @keyword A:             The linear constraint matrix.
+    @type A:                numpy rank-2 array or None
+    @keyword b:             The linear constraint scalar vector.
+    @type b:                numpy rank-1 array or None
+    @keyword block_size:    The approximate maximum number of grid points per block.
+    @type block_size:       int
+    @return:                The blocks of feasible grid points, one point per row.
+    @rtype:                 numpy rank-2 array
+    """
+
+    # The grid increments for each dimension.
+    n = len(num_incs)
+    incs = []
+    for i in range(n):
+        incs.append(linspace(lower[i], upper[i], num_incs[i]))
+
+    # The unconstrained grid.
+    if A is None:
+        shape = tuple(num_incs)
+        total = int(prod(shape))
+        for start in range(0, total, block_size):
+            # The grid indices for this block, with the first dimension varying the fastest.
+            indices = unravel_index(arange(start, min(start+block_size, total)), shape, order='F')
+
+            # The grid points.
+            points = zeros((len(indices[0]), n), float64)
+            for i in range(n):
+                points[:, i] = incs[i][indices[i]]
+            yield points
+        return
+
+    # The maximum constraint contribution of each dimension, and the cumulative maxima of the faster dimensions.
+    A = array(A, float64)
+    b = array(b, float64)
+    cont_max = zeros((n, len(b)), float64)
+    for i in range(n):
+        cont_max[i] = maximum(A[:, i]*incs[i][0], A[:, i]*incs[i][-1])
+    rem_max = zeros((n+1, len(b)), float64)
+    for i in range(n):
+        rem_max[i+1] = rem_max[i] + cont_max[i]
+
+    # A relative tolerance for the bound, so that the exact check alone decides on the borderline points.
+    tol = 1e-10 * (abs(b) + abs(rem_max[n]) + 1.0)
+
+    # The number of inner dimensions which are fully expanded per outer point.
+    inner_dims = 0
+    inner_size = 1
+    while inner_dims < n and inner_size * num_incs[inner_dims] <= block_size:
+        inner_size *= num_incs[inner_dims]
+        inner_dims += 1
+
+    # The outer partial grid points, built from the slowest dimension while pruning infeasible sub-grids.
+    outer = ones((1, 0), float64)
+    outer_cont = zeros((1, len(b)), float64)
+    for i in range(n-1, inner_dims-1, -1):
+        # Expand the dimension, which varies faster than all current outer dimensions.
+        values = tile(incs[i], len(outer)).reshape(-1, 1)
+        outer = concatenate((values, repeat(outer, num_incs[i], axis=0)), axis=1)
+        outer_cont = repeat(outer_cont, num_incs[i], axis=0) + values * A[:, i]
+
+        # Prune the sub-grids which cannot satisfy the constraints.
+        feasible = (outer_cont + rem_max[i] - b >= -tol).all(axis=1)
+        outer = outer[feasible]
+        outer_cont = outer_cont[feasible]
+        if not len(outer):
+            return
+
+    # The fully expanded inner grid and its constraint contributions.
+    inner = zeros((inner_size, inner_dims), float64)
+    if inner_dims:
+        indices = unravel_index(arange(inner_size), tuple(num_incs[:inner_dims]), order='F')
+        for i in range(inner_dims):
+            inner[:, i] = incs[i][indices[i]]
+    inner_cont = dot(inner, A[:, :inner_dims].T)
+
+    # Loop over chunks of outer points.
+    chunk = max(1, block_size // inner_size)
+    for start in range(0, len(outer), chunk):
+        # Alias the chunk.
+        outer_chunk = outer[start:start+chunk]
+        cont_chunk = outer_cont[start:start+chunk]
+
+        # The candidate points, with the inner dimensions varying the fastest.
+        feasible = (inner_cont[None, :, :] + cont_chunk[:, None, :] - b >= -tol).all(axis=2)
+        outer_index, inner_index = feasible.nonzero()
+        if not len(outer_index):
+            continue
+        points = concatenate((inner[inner_index], outer_chunk[outer_index]), axis=1)
+
+        # The exact constraint check.
+        points = points[(dot(points, A.T) - b >= 0.0).all(axis=1)]
+        if len(points):
+            yield points
+
+
+def grid_refine(func_batch=None, args=(), num_incs=None, lower=None, upper=None, A=None, b=None, levels=1, best=1, block_size=10000, verbosity=0, print_prefix=''):
+    """A coarse-to-fine grid search, automatically refining the grid around the best candidates.
+
+    The full grid is first searched using grid_best().  Then for each refinement level, a new grid with the same number of increments is placed around each of the best candidates, spanning one grid step of the previous level on either side and clipped to the original bounds.  The best candidates of all grids searched so far are carried to the next level.  Dimensions with a single increment are kept fixed.
+
+
+    @keyword func_batch:    The target function.  This must accept a numpy rank-2 array of parameter vectors, one per row, and return a numpy rank-1 array of function values.
+    @type func_batch:       function
+    @keyword args:          The tuple of arguments to supply to the target function.
+    @type args:             tuple
+    @keyword num_incs:      The number of increments for each dimension of the grid.
+    @type num_incs:         list of int
+    @keyword lower:         The lower bounds of the grid.
+    @type lower:            list of float
+    @keyword upper:         The upper bounds of the grid.
+    @type upper:            list of float
+    @keyword A:             The linear constraint matrix.
+    @type A:                numpy rank-2 array or None
+    @keyword b:             The linear constraint scalar vector.
+    @type b:                numpy rank-1 array or None
+    @keyword levels:        The number of refinement levels.
+    @type levels:           int
+    @keyword best:          The number of best candidates to refine around at each level.
+    @type best:             int
+    @keyword block_size:    The maximum number of grid points to generate and send to the target function at once.
+    @type block_size:       int
+    @keyword verbosity:     The verbosity level.
+    @type verbosity:        int
+    @keyword print_prefix:  The text to place before the printed output.
+    @type print_prefix:     str
+    @return:                The optimised parameter vector, the function value at this point, the number of function evaluations, and the warning (always None).
+    @rtype:                 tuple of numpy rank-1 array, float, int, None
+    """
+
+    # The initial grid.
+    lower = array(lower, float64)
+    upper = array(upper, float64)
+    x_best, f_best, f_count = grid_best(func_batch=func_batch, args=args, num_incs=num_incs, lower=lower, upper=upper, A=A, b=b, best=best, block_size=block_size)
+
+    # Printout.
+    if verbosity:
+        print("%sCoarse grid search of %i points, %i feasible points evaluated." % (print_prefix, int(prod(num_incs)), f_count))
+
+    # The grid step sizes, zero for fixed dimensions.
+    step = zeros(len(num_incs), float64)
+    for i in range(len(num_incs)):
+        if num_incs[i] > 1:
+            step[i] = (upper[i] - lower[i]) / (num_incs[i] - 1)
+
+    # The refinement levels.
+    for level in range(levels):
+        # Refine around each candidate.
+        x_new = [x_best]
+        f_new = [f_best]
+        for j in range(len(x_best)):
+            # The clipped sub-grid bounds.
+            lower_j = maximum(x_best[j] - step, lower)
+            upper_j = minimum(x_best[j] + step, upper)
+
+            # The sub-grid search.
+            x_j, f_j, count = grid_best(func_batch=func_batch, args=args, num_incs=num_incs, lower=lower_j, upper=upper_j, A=A, b=b, best=best, block_size=block_size)
+            f_count += count
+            x_new.append(x_j)
+            f_new.append(f_j)
+
+        # The best candidates of all grids.
+        x_all = concatenate(x_new)
+        f_all = concatenate(f_new)
+        index = argsort(f_all, kind='mergesort')
+
+        # Remove duplicate points from overlapping sub-grids.
+        x_best = []
+        f_best = []
+        for i in index:
+            duplicate = False
+            for x in x_best:
+                if (x == x_all[i]).all():
+                    duplicate = True
+                    break
+            if not duplicate:
+                x_best.append(x_all[i])
+                f_best.append(f_all[i])
+            if len(x_best) == best:
+                break
+        x_best = array(x_best, float64).reshape((-1, len(num_incs)))
+        f_best = array(f_best, float64)
+
+        # The finer step size.
+        for i in range(len(num_incs)):
+            if num_incs[i] > 1:
+                step[i] = 2.0 * step[i] / (num_incs[i] - 1)
+
+        # Printout.
+        if verbosity:
+            print("%sRefinement level %i, minimum function value: %s" % (print_prefix, level+1, f_best[0] if len(f_best) else inf))
+
+    # Printout.
+    if verbosity:
+        print("%sTotal number of function evaluations: %i" % (print_prefix, f_count))
+
+    # No feasible points.
+    if not len(f_best):
+        return None, inf, f_count, None
+
+    # Return the results.
+    return x_best[0], f_best[0], f_count, None
@@ -27,6 +27,10 @@
 import re
 
 
+# The regular expression special characters, used for skipping the expensive pattern matching of plain strings.
+SPECIAL_CHARS = re.compile(r'[.^$*+?{}\[\]\\|()\n]')
+
+
 def search(pattern, id):
     """Determine if id matches the pattern, or vice versa, allowing for regular expressions.
 
@@ -70,6 +74,10 @@ def search(pattern, id):
         if id == pattern:
             return True
 
+        # Plain strings, so no match is possible.
+        if not SPECIAL_CHARS.search(pattern) and not SPECIAL_CHARS.search(id):
+            continue
+
         # First replace any '*' with '.*' (relax to re conversion).
         pattern_re = pattern.replace('*', '.*')
         id_re =      id.replace('*', '.*')
@@ -25,6 +25,7 @@ from __future__ import absolute_import
 """Module for the molecule, residue and atom selections."""
 
 # Python module imports.
+from collections import OrderedDict
 from warnings import warn
 
 # relax module imports.
@@ -34,6 +35,13 @@ from lib.errors import RelaxError
 from lib.warnings import RelaxWarning
 
 
+# The maximum number of parsed selection strings to keep in the least recently used cache.
+SELECTION_CACHE_SIZE = 1000
+
+# The least recently used cache of parsed selections, mapping selection strings to Selection instances.
+_selection_cache = OrderedDict()
+
+
 def parse_token(token, verbosity=False):
     """Parse the token string and return a list of identifying numbers and names.
 
@@ -354,6 +362,8 @@ class Selection(object):
     """An object containing mol-res-spin selections.
 
     A Selection object represents either a set of selected molecules, residues and spins, or the union or intersection of two other Selection objects.
+
+    The parsed selections are kept in a least recently used cache of up to SELECTION_CACHE_SIZE selection strings, so that the same selection string is only tokenised once.
     """
 
     def __init__(self, select_string):
@@ -367,6 +377,17 @@ class Selection(object):
         if is_unicode(select_string):
             select_string = str(select_string)
 
+        # Reuse a previously parsed selection, moving it to the end of the least recently used cache.
+        if select_string in _selection_cache:
+            cached = _selection_cache.pop(select_string)
+            _selection_cache[select_string] = cached
+            self._union = cached._union
+            self._intersect = cached._intersect
+            self.molecules = cached.molecules
+            self.residues = cached.residues
+            self.spins = cached.spins
+            return
+
         self._union = None
         self._intersect = None
 
@@ -398,6 +419,11 @@ class Selection(object):
             self.residues = parse_token(res_token)
             self.spins = parse_token(spin_token)
 
+        # Store the parsed selection in the cache, discarding the least recently used selection if full.
+        _selection_cache[select_string] = self
+        if len(_selection_cache) > SELECTION_CACHE_SIZE:
+            _selection_cache.popitem(last=False)
+
 
     def contains_mol(self, mol=None):
         """Determine if the molecule name, in string form, is contained in this selection object.
@@ -614,6 +640,30 @@ class Selection(object):
         self._intersect = (select_obj0, select_obj1)
 
 
+    def residue_numbers(self):
+        """Return the residue numbers of a simple selection of residue numbers.
+
+        @return:            The residue numbers, or None if the selection is a boolean combination of selections or if residue names are present.
+        @rtype:             list of int or None
+        """
+
+        # Boolean combinations.
+        if self._union or self._intersect:
+            return None
+
+        # No residues.
+        if not self.residues:
+            return None
+
+        # Residue names.
+        for res in self.residues:
+            if not isinstance(res, int):
+                return None
+
+        # The residue numbers.
+        return self.residues
+
+
     def union(self, select_obj0, select_obj1):
         """Make this Selection object the union of two other Selection objects.
 
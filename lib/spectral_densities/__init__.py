@@ -23,6 +23,7 @@
 """The relax-lib NMR package - a library of functions for power spectral density functions."""
 
 __all__ = [
+    'lorentzian',
     'model_free',
     'model_free_components'
 ]
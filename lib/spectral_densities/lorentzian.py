@@ -0,0 +1,98 @@
+###############################################################################
+#                                                                             #
+# Copyright (C) 2026 Troels E. Linnet                                         #
+#                                                                             #
+# This file is part of the program relax (http://www.nmr-relax.com).          #
+#                                                                             #
+# This program is free software: you can redistribute it and/or modify        #
+# it under the terms of the GNU General Public License as published by        #
+# the Free Software Foundation, either version 3 of the License, or           #
+# (at your option) any later version.                                         #
+#                                                                             #
+# This program is distributed in the hope that it will be useful,             #
+# but WITHOUT ANY WARRANTY; without even the implied warranty of              #
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the               #
+# GNU General Public License for more details.                                #
+#                                                                             #
+# You should have received a copy of the GNU General Public License           #
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.       #
+#                                                                             #
+###############################################################################
+
+# Module docstring.
+"""The Lorentzian terms of the model-free spectral density functions, for stacked arrays."""
+
+
+def lorentzian(frq_sqrd, ti, te=None, order=0):
+    """Calculate the Lorentzian term of the model-free spectral density and its partial derivatives.
+
+    The Lorentzian is::
+
+                      tau
+        L(w)  =  ---------------- ,
+                 1 + (w.tau)**2
+
+    where the effective correlation time is either the global correlation time ti or, for internal motions, the combination::
+
+                   ti.te
+        tau  =  ---------- .
+                 ti + te
+
+    The partial derivatives are with respect to ti and te.  All arguments are numpy arrays or floats which are broadcast against each other, so that the values for all frequencies, correlation time components and spins can be calculated at once.
+
+
+    @param frq_sqrd:    The squared angular frequencies.
+    @type frq_sqrd:     numpy array
+    @param ti:          The global correlation time components.
+    @type ti:           numpy array
+    @keyword te:        The internal correlation time.  If None, the effective correlation time is ti.
+    @type te:           numpy array or None
+    @keyword order:     The order of the partial derivatives to calculate, from 0 to 2.
+    @type order:        int
+    @return:            The Lorentzian values for order 0.  For order 1, this is followed by the ti and te derivatives.  For order 2, this is followed by the ti-ti, ti-te and te-te second derivatives.  The te derivatives are None if te is None.
+    @rtype:             tuple of numpy arrays
+    """
+
+    # The effective correlation time and its ti derivatives.
+    if te is None:
+        tau = ti
+        dtau_dti = 1.0
+        d2tau_dti2 = 0.0
+    else:
+        inv_sum = 1.0 / (ti + te)
+        tau = ti * te * inv_sum
+        dtau_dti = (te * inv_sum)**2
+        d2tau_dti2 = -2.0 * dtau_dti * inv_sum
+
+    # The Lorentzian.
+    w_tau_sqrd = frq_sqrd * tau**2
+    fact = 1.0 / (1.0 + w_tau_sqrd)
+    L = tau * fact
+    if order == 0:
+        return L,
+
+    # The tau derivative.
+    dL_dtau = (1.0 - w_tau_sqrd) * fact**2
+
+    # The ti and te derivatives.
+    dL_dti = dL_dtau * dtau_dti
+    dL_dte = None
+    if te is not None:
+        dtau_dte = (ti * inv_sum)**2
+        dL_dte = dL_dtau * dtau_dte
+    if order == 1:
+        return L, dL_dti, dL_dte
+
+    # The tau second derivative.
+    d2L_dtau2 = -2.0 * frq_sqrd * tau * (3.0 - w_tau_sqrd) * fact**3
+
+    # The second derivatives.
+    d2L_dti2 = d2L_dtau2 * dtau_dti**2 + dL_dtau * d2tau_dti2
+    d2L_dtidte = None
+    d2L_dte2 = None
+    if te is not None:
+        d2L_dtidte = d2L_dtau2 * dtau_dti * dtau_dte + dL_dtau * 2.0 * ti * te * inv_sum**3
+        d2L_dte2 = d2L_dtau2 * dtau_dte**2 - dL_dtau * 2.0 * dtau_dte * inv_sum
+
+    # Return the values.
+    return L, dL_dti, dL_dte, d2L_dti2, d2L_dtidte, d2L_dte2
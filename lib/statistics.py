@@ -25,7 +25,7 @@
 
 # Python module imports.
 from math import exp
-from numpy import absolute, array, diag, dot, eye, float64, log, multiply, transpose
+from numpy import absolute, array, diag, dot, eye, float64, isnan, log, maximum, multiply, nan, nanpercentile, ones, transpose, where
 from numpy.linalg import inv, qr
 
 # Python module imports.
@@ -85,6 +85,32 @@ def bucket(values=None, lower=0.0, upper=200.0, inc=100, verbose=False):
     return dist
 
 
+def confidence_interval_array(values=None, select=None, level=0.95):
+    """Calculate the percentile confidence intervals of each row of values, skipping values if asked.
+
+    @keyword values:    The values, with the last dimension being the samples (i.e. the Monte Carlo simulations).
+    @type values:       numpy rank-N float64 array
+    @keyword select:    An optional boolean array, broadcastable to the shape of the values, for which an element of False will cause the corresponding value to not be included in the calculation.
+    @type select:       numpy rank-N bool array or None
+    @keyword level:     The confidence level, for example 0.95 for the 95% confidence interval.
+    @type level:        float
+    @return:            The lower and upper bounds of the confidence intervals.  Rows without selected values are set to NaN.
+    @rtype:             numpy rank-(N-1) float64 array, numpy rank-(N-1) float64 array
+    """
+
+    # Replace the deselected values with NaN.
+    values = array(values, float64)
+    if select is not None:
+        values = where(select, values, nan)
+
+    # The percentiles.
+    lower = nanpercentile(values, 50.0 * (1.0 - level), axis=-1)
+    upper = nanpercentile(values, 50.0 * (1.0 + level), axis=-1)
+
+    # Return the bounds.
+    return lower, upper
+
+
 def gaussian(x=None, mu=0.0, sigma=1.0):
     """Calculate the probability for a Gaussian probability distribution for a given x value.
 
@@ -216,6 +242,43 @@ def std(values=None, skip=None, dof=1):
     return sd
 
 
+def std_array(values=None, select=None, dof=1):
+    """Calculate the standard deviations of each row of values in one pass, skipping values if asked.
+
+    This is the array equivalent of the std() function, whereby the standard deviation is calculated along the last dimension of the values.  Missing values, such as those of failed Monte Carlo simulations, are given as NaN and are skipped, so that N is the number of remaining values of each row.
+
+
+    @keyword values:    The values, with the last dimension being the samples (i.e. the Monte Carlo simulations).  Values of NaN are skipped.
+    @type values:       numpy rank-N float64 array
+    @keyword select:    An optional boolean array, broadcastable to the shape of the values, for which an element of False will cause the corresponding value to not be included in the calculation.
+    @type select:       numpy rank-N bool array or None
+    @keyword dof:       The degrees of freedom, whereby the standard deviation is multipled by 1/(N - dof).
+    @type dof:          int
+    @return:            The standard deviations.
+    @rtype:             numpy rank-(N-1) float64 array
+    """
+
+    # The selection mask as weights, skipping the missing values.
+    values = array(values, float64)
+    weights = ones(values.shape, float64) * ~isnan(values)
+    if select is not None:
+        weights = select * weights
+
+    # The number of points, and the mean of the selected points.
+    n = weights.sum(axis=-1)
+    Xsum = (where(weights, values, 0.0)).sum(axis=-1)
+    Xav = Xsum / maximum(n, 1.0)
+
+    # The sum part of the standard deviation.
+    sd = (where(weights, values - Xav[..., None], 0.0)**2).sum(axis=-1)
+
+    # Calculate the standard deviation, with zero for 1 point or less.
+    sd = where(n > 1, sd / maximum(n - float(dof), 1.0), 0.0)**0.5
+
+    # Return the SDs.
+    return sd
+
+
 def multifit_covar(J=None, epsrel=0.0, weights=None):
     """This is the implementation of the multifit covariance.
 
@@ -23,16 +23,142 @@
 """The objects representing molecules in the internal structural object."""
 
 # Python module imports.
+from numpy import array, delete, empty, float64, isnan, nan, ndarray
 from re import search
 from string import digits
 from warnings import warn
 
 # relax module import.
+from lib.compat import intern
 from lib.errors import RelaxError, RelaxFromXMLNotEmptyError
 from lib.periodic_table import periodic_table
 from lib.structure import pdb_read
 from lib.warnings import RelaxWarning
-from lib.xml import fill_object_contents, xml_to_object
+from lib.xml import fill_object_contents, object_to_xml, xml_to_object
+
+# The coordinate names and their indices in the position array.
+COORD_AXES = {'x': 0, 'y': 1, 'z': 2}
+
+
+class Coordinate_axis:
+    """A list-like view of one axis of the contiguous atomic position array of a molecule.
+
+    Missing coordinates are stored as NaN in the array, and are seen as None through this view.
+    """
+
+    def __init__(self, mol, axis):
+        """Set up the view.
+
+        @param mol:     The molecule container.
+        @type mol:      MolContainer instance
+        @param axis:    The coordinate axis index, 0 for x, 1 for y, and 2 for z.
+        @type axis:     int
+        """
+
+        # Store the arguments.
+        self._mol = mol
+        self._axis = axis
+
+
+    def __eq__(self, other):
+        """Compare the coordinates to a list or another axis view."""
+
+        # Compare as lists.
+        try:
+            return self.tolist() == list(other)
+        except TypeError:
+            return False
+
+
+    def __getitem__(self, index):
+        """Return the coordinate(s) of the given atom index or slice."""
+
+        # The value.
+        value = self._mol.coord_array()[index, self._axis]
+
+        # Convert to Python floats.
+        if isinstance(value, ndarray):
+            return [_to_python(element) for element in value]
+        return _to_python(value)
+
+
+    def __iter__(self):
+        """Iterate over the coordinates."""
+
+        return iter(self.tolist())
+
+
+    def __len__(self):
+        """The number of atoms."""
+
+        return self._mol._pos_len
+
+
+    def __ne__(self, other):
+        """Compare the coordinates to a list or another axis view."""
+
+        return not self.__eq__(other)
+
+
+    def __repr__(self):
+        """The list representation of the coordinates."""
+
+        return repr(self.tolist())
+
+
+    def __setitem__(self, index, value):
+        """Set the coordinate of the given atom index."""
+
+        # Missing coordinates.
+        if value is None:
+            value = nan
+
+        # Set the value.
+        self._mol.coord_array()[index, self._axis] = value
+
+
+    def tolist(self):
+        """Return the coordinates as a list of Python floats.
+
+        @return:    The coordinates, with None for missing values.
+        @rtype:     list of float or None
+        """
+
+        return [_to_python(element) for element in self._mol.coord_array()[:, self._axis]]
+
+
+
+def _intern(string):
+    """Intern the string so that a single copy is shared by all atoms.
+
+    @param string:  The string, or any other object.
+    @type string:   str or anything
+    @return:        The interned string, or the unmodified object.
+    @rtype:         str or anything
+    """
+
+    # Only intern normal strings.
+    if isinstance(string, str):
+        return intern(string)
+    return string
+
+
+def _to_python(value):
+    """Convert the coordinate array element to a Python float, or None if missing.
+
+    @param value:   The array element.
+    @type value:    numpy float64
+    @return:        The coordinate.
+    @rtype:         float or None
+    """
+
+    # Missing data.
+    if isnan(value):
+        return None
+
+    # Convert.
+    return float(value)
+
 
 
 class MolContainer:
@@ -56,6 +182,12 @@ class MolContainer:
 
     All arrays should be of equal length so that an atom index can retrieve all the corresponding
     data.  Only the atom identification string is compulsory, all other arrays can contain None.
+
+    The atomic positions are stored in a single contiguous rank-2 float64 array of atoms by
+    coordinates, accessible without copying through the coord_array() method.  The x, y, and z
+    objects are list-like views of the columns of this array.  The string data is interned so that
+    the names of the atoms, residues, chains, elements, and PDB records are shared between atoms and
+    models.
     """
 
 
@@ -89,14 +221,69 @@ class MolContainer:
         # The segment ID (array of int).
         self.seg_id = []
 
-        # The x coordinate (array of float).
-        self.x = []
+        # The atomic positions (rank-2 float64 array, with spare rows for fast atom addition).
+        self._pos = empty((0, 3), float64)
+        self._pos_len = 0
+
+
+    def __getattr__(self, name):
+        """Return the list-like views of the x, y, and z coordinates.
+
+        @param name:    The name of the object.
+        @type name:     str
+        @return:        The coordinate view.
+        @rtype:         Coordinate_axis instance
+        """
+
+        # The coordinate views.
+        if name in COORD_AXES:
+            return Coordinate_axis(self, COORD_AXES[name])
 
-        # The y coordinate (array of float).
-        self.y = []
+        # Normal behaviour.
+        raise AttributeError(name)
 
-        # The z coordinate (array of float).
-        self.z = []
+
+    def __setattr__(self, name, value):
+        """Store the x, y, and z coordinates in the position array.
+
+        @param name:    The name of the object.
+        @type name:     str
+        @param value:   The value of the object.
+        @type value:    anything
+        """
+
+        # The coordinates.
+        if name in COORD_AXES:
+            self._set_axis(COORD_AXES[name], value)
+
+        # Normal behaviour.
+        else:
+            self.__dict__[name] = value
+
+
+    def _set_axis(self, axis, values):
+        """Set all coordinates of one axis, resizing the position array if needed.
+
+        @param axis:    The coordinate axis index, 0 for x, 1 for y, and 2 for z.
+        @type axis:     int
+        @param values:  The coordinates, with None for missing values.
+        @type values:   list of float or None, or numpy rank-1 array
+        """
+
+        # Convert, handling None values.
+        values = array([nan if value is None else value for value in values], float64)
+
+        # Resize the position array.
+        if len(values) != self._pos_len:
+            pos = empty((len(values), 3), float64)
+            pos.fill(nan)
+            num = min(len(values), self._pos_len)
+            pos[:num] = self._pos[:num]
+            self._pos = pos
+            self._pos_len = len(values)
+
+        # Set the values.
+        self._pos[:self._pos_len, axis] = values
 
 
     def _atom_index(self, atom_num):
@@ -275,9 +462,7 @@ class MolContainer:
         self.res_name = [self.res_name[i] for i in indices]
         self.res_num = [self.res_num[i] for i in indices]
         self.seg_id = [self.seg_id[i] for i in indices]
-        self.x = [self.x[i] for i in indices]
-        self.y = [self.y[i] for i in indices]
-        self.z = [self.z[i] for i in indices]
+        self.set_coord_array(self.coord_array()[indices])
 
         # Change the bonded numbers, as the indices are now different.
         for i in range(len(self.bonded)):
@@ -324,24 +509,90 @@ class MolContainer:
         @rtype:                 int
         """
 
-        # Append to all the arrays.
+        # Append to all the arrays, sharing the string data.
         self.atom_num.append(atom_num)
-        self.atom_name.append(atom_name)
+        self.atom_name.append(_intern(atom_name))
         self.bonded.append([])
-        self.chain_id.append(chain_id)
-        self.element.append(element)
-        self.pdb_record.append(pdb_record)
-        self.res_name.append(res_name)
+        self.chain_id.append(_intern(chain_id))
+        self.element.append(_intern(element))
+        self.pdb_record.append(_intern(pdb_record))
+        self.res_name.append(_intern(res_name))
         self.res_num.append(res_num)
-        self.seg_id.append(segment_id)
-        self.x.append(pos[0])
-        self.y.append(pos[1])
-        self.z.append(pos[2])
+        self.seg_id.append(_intern(segment_id))
+
+        # Double the size of the position array when full.
+        if self._pos_len == len(self._pos):
+            new_pos = empty((max(2*len(self._pos), 16), 3), float64)
+            new_pos[:self._pos_len] = self._pos[:self._pos_len]
+            self._pos = new_pos
+
+        # Add the position.
+        for j in range(3):
+            if pos[j] is None:
+                self._pos[self._pos_len, j] = nan
+            else:
+                self._pos[self._pos_len, j] = pos[j]
+        self._pos_len += 1
 
         # Return the index.
         return len(self.atom_num) - 1
 
 
+    def atom_add_block(self, atom_name=None, res_name=None, res_num=None, pos=None, element=None, atom_num=None, pdb_record=None):
+        """Method for adding a block of atoms to the structural data object.
+
+        This is equivalent to calling the atom_add() method for each atom, but with the position array resized only once.  The chain and segment identifiers are set to None.
+
+
+        @keyword atom_name:     The atom names.
+        @type atom_name:        list of str or None
+        @keyword res_name:      The residue names.
+        @type res_name:         list of str or None
+        @keyword res_num:       The residue numbers.
+        @type res_num:          list of int or None
+        @keyword pos:           The position vectors of the atoms, with None for missing coordinates.
+        @type pos:              list of lists (length = 3)
+        @keyword element:       The element symbols.
+        @type element:          list of str or None
+        @keyword atom_num:      The atom numbers.
+        @type atom_num:         list of int or None
+        @keyword pdb_record:    The optional PDB record names, e.g. 'ATOM' or 'HETATM'.
+        @type pdb_record:       list of str or None
+        """
+
+        # The number of atoms.
+        num = len(atom_name)
+        if not num:
+            return
+
+        # The shared string data, interning each unique string only once.
+        strings = {}
+        for values in [atom_name, element, pdb_record, res_name]:
+            for name in set(values):
+                strings[name] = _intern(name)
+
+        # Extend all the arrays.
+        self.atom_num.extend(atom_num)
+        self.atom_name.extend([strings[name] for name in atom_name])
+        self.bonded.extend([[] for i in range(num)])
+        self.chain_id.extend([None]*num)
+        self.element.extend([strings[name] for name in element])
+        self.pdb_record.extend([strings[name] for name in pdb_record])
+        self.res_name.extend([strings[name] for name in res_name])
+        self.res_num.extend(res_num)
+        self.seg_id.extend([None]*num)
+
+        # Resize the position array, if needed.
+        if self._pos_len + num > len(self._pos):
+            new_pos = empty((max(2*len(self._pos), self._pos_len + num, 16), 3), float64)
+            new_pos[:self._pos_len] = self._pos[:self._pos_len]
+            self._pos = new_pos
+
+        # Add the positions.
+        self._pos[self._pos_len:self._pos_len+num] = array(pos, float64)
+        self._pos_len += num
+
+
     def atom_connect(self, index1=None, index2=None):
         """Method for connecting two atoms within the data structure object.
 
@@ -361,6 +612,41 @@ class MolContainer:
             self.bonded[index2].append(index1)
 
 
+    def coord_array(self, indices=None):
+        """Return the atomic positions as a rank-2 array of atoms by coordinates.
+
+        If all atoms, or a contiguous set of atoms, are requested, the array will be a view of the internal position array.  Modifications of the array will therefore modify the structural data.  Only non-contiguous selections will produce copies.
+
+
+        @keyword indices:   The atom indices to return the positions of.  If None, all atoms will be returned.
+        @type indices:      None or list of int
+        @return:            The atomic positions.
+        @rtype:             numpy rank-2, Nx3 float64 array
+        """
+
+        # All atoms.
+        if indices is None:
+            return self._pos[:self._pos_len]
+
+        # A contiguous range, as a view.
+        if len(indices) and list(indices) == list(range(indices[0], indices[0]+len(indices))):
+            return self._pos[indices[0]:indices[0]+len(indices)]
+
+        # All other selections.
+        return self._pos[:self._pos_len][indices]
+
+
+    def coord_delete(self, indices):
+        """Delete the positions of the given atoms.
+
+        @param indices: The indices of the atoms to delete.
+        @type indices:  list of int
+        """
+
+        # Delete and resize.
+        self.set_coord_array(delete(self.coord_array(), indices, axis=0))
+
+
     def fill_object_from_gaussian(self, records):
         """Method for generating a complete Structure_container object from the given Gaussian log records.
 
@@ -387,7 +673,7 @@ class MolContainer:
             self.atom_add(atom_name=atom_name, atom_num=atom_number, pos=[x, y, z], element=atom_name)
 
 
-    def fill_object_from_pdb(self, records, alt_loc_select=None, reset_serial=True):
+    def fill_object_from_pdb(self, records, alt_loc_select=None, reset_serial=True, sel_obj=None):
         """Method for generating a complete Structure_container object from the given PDB records.
 
         @param records:             A list of structural PDB records.
@@ -396,56 +682,67 @@ class MolContainer:
         @type alt_loc_select:       str or None
         @keyword reset_serial:      A flag which if True will cause the first serial number (or atom number) to be reset to 1, and all other numbers shifted.
         @type reset_serial:         bool
+        @keyword sel_obj:           The atom ID selection object.  If supplied, only matching atoms will be added.  The name of the molecule must be set prior to calling this method.
+        @type sel_obj:              lib.selection.Selection instance or None
         """
 
-        # Loop over the records.
+        # Parse all of the ATOM and HETATM records at once.
+        atoms = list(zip(*pdb_read.atom_block([record for record in records if record[:4] == 'ATOM' or record[:6] == 'HETATM'])))
+
+        # Loop over the parsed atoms.
         water = []
         missing_connect = []
+        skipped = set()
         number_offset = None
-        for record in records:
-            # Nothing to do.
-            if not record or record == '\n':
+        block = {'atom_name': [], 'res_name': [], 'res_num': [], 'pos': [], 'element': [], 'atom_num': [], 'pdb_record': []}
+        for record_type, serial, name, alt_loc, res_name, chain_id, res_seq, icode, x, y, z, occupancy, temp_factor, element, charge in atoms:
+            # The serial number.
+            if reset_serial:
+                # The first number.
+                if number_offset == None:
+                    number_offset = serial - 1
+
+                # Reset.
+                serial -= number_offset
+
+            # Skip waters.
+            if res_name == 'HOH':
+                water.append(res_seq)
                 continue
 
-            # Add the atom.
-            if record[:4] == 'ATOM' or record[:6] == 'HETATM':
-                # Parse the record.
-                if record[:4] == 'ATOM':
-                    record_type, serial, name, alt_loc, res_name, chain_id, res_seq, icode, x, y, z, occupancy, temp_factor, element, charge = pdb_read.atom(record)
-                if record[:6] == 'HETATM':
-                    record_type, serial, name, alt_loc, res_name, chain_id, res_seq, icode, x, y, z, occupancy, temp_factor, element, charge = pdb_read.hetatm(record)
-
-                # The serial number.
-                if reset_serial:
-                    # The first number.
-                    if number_offset == None:
-                        number_offset = serial - 1
-
-                    # Reset.
-                    serial -= number_offset
+            # Handle the alternate locations.
+            if alt_loc != None:
+                # Don't know what to do.
+                if alt_loc_select == None:
+                    raise RelaxError("Multiple alternate location indicators are present in the PDB file, but the desired coordinate set has not been specified.")
 
-                # Skip waters.
-                if res_name == 'HOH':
-                    water.append(res_seq)
+                # Skip non-matching locations.
+                if alt_loc != alt_loc_select:
                     continue
 
-                # Handle the alternate locations.
-                if alt_loc != None:
-                    # Don't know what to do.
-                    if alt_loc_select == None:
-                        raise RelaxError("Multiple alternate location indicators are present in the PDB file, but the desired coordinate set has not been specified.")
+            # Skip atoms not matching the selection.
+            if sel_obj != None and not sel_obj.contains_spin(serial, name, res_seq, res_name, self.mol_name):
+                skipped.add(serial)
+                continue
 
-                    # Skip non-matching locations.
-                    if alt_loc != alt_loc_select:
-                        continue
+            # Attempt at determining the element, if missing.
+            if not element:
+                element = self._det_pdb_element(name)
 
-                # Attempt at determining the element, if missing.
-                if not element:
-                    element = self._det_pdb_element(name)
+            # Store the atom for the block addition.
+            block['atom_name'].append(name)
+            block['res_name'].append(res_name)
+            block['res_num'].append(res_seq)
+            block['pos'].append([nan if x is None else x, nan if y is None else y, nan if z is None else z])
+            block['element'].append(element)
+            block['atom_num'].append(serial)
+            block['pdb_record'].append(record_type)
 
-                # Add.
-                self.atom_add(pdb_record=record_type, atom_num=serial, atom_name=name, res_name=res_name, res_num=res_seq, pos=[x, y, z], element=element)
+        # Add all atoms at once.
+        self.atom_add_block(**block)
 
+        # Loop over the records, to connect the atoms.
+        for record in records:
             # Connect atoms.
             if record[:6] == 'CONECT':
                 # Parse the record.
@@ -472,6 +769,10 @@ class MolContainer:
                     serial_index = self._atom_index(serial)
                     bonded_index = self._atom_index(bonded)
 
+                    # Skip connections to the atoms excluded by the selection.
+                    if serial in skipped or bonded in skipped:
+                        continue
+
                     # Skip broken CONECT records (for when the record points to a non-existent atom).
                     if serial_index == None:
                         if serial not in missing_connect:
@@ -553,9 +854,7 @@ class MolContainer:
         if not self.res_name == []: return False
         if not self.res_num == []: return False
         if not self.seg_id == []: return False
-        if not self.x == []: return False
-        if not self.y == []: return False
-        if not self.z == []: return False
+        if self._pos_len: return False
 
         # Ok, now this thing must be empty.
         return True
@@ -612,6 +911,18 @@ class MolContainer:
                 self.atom_connect(index1=i+curr_index+1, index2=mol_cont.bonded[i][j]+curr_index+1)
 
 
+    def set_coord_array(self, pos):
+        """Replace all atomic positions.
+
+        @param pos: The atomic positions.
+        @type pos:  numpy rank-2, Nx3 float64 array
+        """
+
+        # Store a contiguous copy.
+        self._pos = array(pos, float64).reshape((-1, 3))
+        self._pos_len = len(self._pos)
+
+
     def to_xml(self, doc, element):
         """Create XML elements for the contents of this molecule container.
 
@@ -632,6 +943,12 @@ class MolContainer:
         # Add all simple python objects within the MolContainer to the XML element.
         fill_object_contents(doc, mol_element, object=self, blacklist=list(self.__class__.__dict__.keys()))
 
+        # Add the coordinates, as lists.
+        for name in ['x', 'y', 'z']:
+            sub_element = doc.createElement(name)
+            mol_element.appendChild(sub_element)
+            object_to_xml(doc, sub_element, value=getattr(self, name).tolist())
+
 
 
 class MolList(list):
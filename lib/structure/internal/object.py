@@ -27,7 +27,8 @@
 
 # Python module imports.
 from copy import deepcopy
-from numpy import array, dot, float64, linalg, zeros
+from itertools import chain
+from numpy import array, dot, float64, linalg, transpose, zeros
 import os
 from os import F_OK, access, curdir, sep
 from os.path import abspath
@@ -146,7 +147,8 @@ class Internal:
         """
 
         # Central atom info.
-        centre = array([mol.x[index], mol.y[index], mol.z[index]], float64)
+        coord = mol.coord_array()
+        centre = coord[index]
 
         # Atom loop.
         dist_list = []
@@ -158,7 +160,7 @@ class Internal:
                 continue
 
             # The atom's position.
-            pos = array([mol.x[i], mol.y[i], mol.z[i]], float64)
+            pos = coord[i]
 
             # The distance from the centre.
             dist = linalg.norm(centre-pos)
@@ -335,14 +337,18 @@ class Internal:
         return lines[i:]
 
 
-    def _parse_pdb_coord(self, lines):
+    def _parse_pdb_coord(self, lines, read_model=None):
         """Generator function for looping over the models in the PDB file.
 
         These are the records identified in the PDB version 3.30 documentation at U{http://www.wwpdb.org/documentation/file-format/format33/sect9.html}.
 
+        The lines are consumed lazily so that the records of only one model are held in memory at a time.  The records of models not in the read_model list are not stored, and the parsing terminates as soon as all of the desired models have been read.
+
 
         @param lines:       The lines of the coordinate section.
-        @type lines:        list of str
+        @type lines:        iterable of str
+        @keyword read_model:    The PDB models to extract from the file.  If set to None, then all models will be yielded.
+        @type read_model:       None or list of int
         @return:            The model number and all the records for that model.
         @rtype:             tuple of int and array of str
         """
@@ -350,33 +356,47 @@ class Internal:
         # Init.
         model = None
         records = []
+        skip = False
+        remaining = None
+        if read_model:
+            remaining = set(read_model)
 
         # Loop over the data.
-        for i in range(len(lines)):
+        for line in lines:
             # A new model record.
-            if lines[i][:5] == 'MODEL':
+            if line[:5] == 'MODEL':
                 try:
-                    model = int(lines[i].split()[1])
+                    model = int(line.split()[1])
                 except:
-                    raise RelaxError("The MODEL record " + repr(lines[i]) + " is corrupt, cannot read the PDB file.")
+                    raise RelaxError("The MODEL record " + repr(line) + " is corrupt, cannot read the PDB file.")
+
+                # Skip the records of undesired models.
+                skip = remaining != None and model not in read_model
 
             # Skip all records prior to the first ATOM or HETATM record.
-            if not (lines[i][:4] == 'ATOM' or lines[i][:6] == 'HETATM') and not len(records):
+            if not (line[:4] == 'ATOM' or line[:6] == 'HETATM') and not len(records):
                 continue
 
             # End of the model.
-            if lines[i][:6] == 'ENDMDL':
+            if line[:6] == 'ENDMDL':
                 # Yield the info.
                 yield model, records
 
                 # Reset the records.
                 records = []
 
+                # All desired models have been read.
+                if remaining != None:
+                    remaining.discard(model)
+                    if not len(remaining):
+                        return
+
                 # Skip the rest of this loop.
                 continue
 
             # Append the line as a record of the model.
-            records.append(lines[i])
+            if not skip:
+                records.append(line)
 
         # If records is not empty then there are no models, so yield the lot.
         if len(records):
@@ -1257,9 +1277,9 @@ class Internal:
                 mol.res_name.append(mol_from.res_name[i])
                 mol.res_num.append(mol_from.res_num[i])
                 mol.seg_id.append(mol_from.seg_id[i])
-                mol.x.append(mol_from.x[i])
-                mol.y.append(mol_from.y[i])
-                mol.z.append(mol_from.z[i])
+
+            # Copy the atomic positions.
+            mol.set_coord_array(mol_from.coord_array())
 
         # Return the model.
         return self.structural_data[-1]
@@ -1421,83 +1441,62 @@ class Internal:
         # Obtain all data from the first model (except the position data).
         model = self.structural_data[0]
 
-        # Loop over all molecules and atoms in the selection.
-        for mol_index, i in selection.loop():
+        # Loop over all molecules in the selection.
+        for mol_index in selection.mol_loop():
+            # Alias.
             mol = model.mol[mol_index]
+            indices = selection.atom_indices(mol_index)
+            num = len(indices)
 
-            # Initialise.
-            res_num = mol.res_num[i]
-            res_name = mol.res_name[i]
-            atom_num = mol.atom_num[i]
-            atom_name = mol.atom_name[i]
-            element = mol.element[i]
+            # Extract the atomic information of all selected atoms of the molecule at once.
+            fields = []
+            for flag, values in [[mol_name_flag, None], [res_num_flag, mol.res_num], [res_name_flag, mol.res_name], [atom_num_flag, mol.atom_num], [atom_name_flag, mol.atom_name], [element_flag, mol.element]]:
+                if not flag:
+                    continue
+                if values is None:
+                    fields.append([mol.mol_name] * num)
+                else:
+                    fields.append([values[i] for i in indices])
 
-            # The atom position.
+            # The atom positions of all models, as a models x atoms x 3 block.
             if pos_flag:
-                # Average the position.
+                # Sanity check for averaging.
                 if ave:
-                    # Initialise.
-                    pos = zeros(3, float64)
-
-                    # Loop over the models.
-                    for model in self.model_loop(model=model_num):
-                        # Alias.
-                        mol2 = model.mol[mol_index]
-
-                        # Some sanity checks.
-                        if mol2.atom_num[i] != atom_num:
+                    atom_nums = [mol.atom_num[i] for i in indices]
+                    for model2 in self.model_loop(model=model_num):
+                        if [model2.mol[mol_index].atom_num[i] for i in indices] != atom_nums:
                             raise RelaxError("The loaded structures do not contain the same atoms.  The average structural properties can not be calculated.")
 
-                        # Sum the atom positions.
-                        pos = pos + array([mol2.x[i], mol2.y[i], mol2.z[i]], float64)
+                # Stack the positions of the selected atoms.
+                pos_block = zeros((0, num, 3), float64)
+                pos_list = [model2.mol[mol_index].coord_array(indices) for model2 in self.model_loop(model=model_num)]
+                if len(pos_list):
+                    pos_block = array(pos_list, float64)
+
+                # Average the positions (divide by the number of models).
+                if ave:
+                    fields.append(pos_block.sum(axis=0) / len(self.structural_data))
 
-                    # Average the position array (divide by the number of models).
-                    pos = pos / len(self.structural_data)
+                # No models.
+                elif not len(pos_list):
+                    fields.append([array([], float64)] * num)
 
-                # All positions.
+                # All positions, with the atoms as the first dimension.
                 else:
-                    # Initialise.
-                    pos = []
-
-                    # Loop over the models.
-                    for model in self.model_loop(model=model_num):
-                        # Alias.
-                        mol2 = model.mol[mol_index]
-
-                        # Append the position.
-                        pos.append([mol2.x[i], mol2.y[i], mol2.z[i]])
-
-                    # Convert.
-                    pos = array(pos, float64)
-
-            # The molecule name.
-            mol_name = mol.mol_name
-
-            # Build the tuple to be yielded.
-            atomic_tuple = ()
-            if mol_name_flag:
-                atomic_tuple = atomic_tuple + (mol_name,)
-            if res_num_flag:
-                atomic_tuple = atomic_tuple + (res_num,)
-            if res_name_flag:
-                atomic_tuple = atomic_tuple + (res_name,)
-            if atom_num_flag:
-                atomic_tuple = atomic_tuple + (atom_num,)
-            if atom_name_flag:
-                atomic_tuple = atomic_tuple + (atom_name,)
-            if element_flag:
-                atomic_tuple = atomic_tuple + (element,)
-            if pos_flag:
-                atomic_tuple = atomic_tuple + (pos,)
+                    fields.append(pos_block.transpose((1, 0, 2)))
+
+            # The molecule and atom indices.
             if mol_index_flag:
-                atomic_tuple += (mol_index,)
+                fields.append([mol_index] * num)
             if index_flag:
-                atomic_tuple += (i,)
+                fields.append(indices)
 
-            # Yield the information.
-            if len(atomic_tuple) == 1:
-                atomic_tuple = atomic_tuple[0]
-            yield atomic_tuple
+            # Yield the information, atom by atom.
+            for j in range(num):
+                atomic_tuple = tuple([field[j] for field in fields])
+                if len(atomic_tuple) == 1:
+                    atomic_tuple = atomic_tuple[0]
+                yield atomic_tuple
 
 
     def bond_vectors(self, attached_atom=None, model_num=None, mol_name=None, res_num=None, res_name=None, spin_num=None, spin_name=None, return_name=False, return_warnings=False):
@@ -1572,7 +1571,7 @@ class Internal:
                         continue
 
                     # The bond vector.
-                    vector = array(pos, float64) - array([mol.x[index], mol.y[index], mol.z[index]], float64)
+                    vector = array(pos, float64) - mol.coord_array()[index]
 
                     # Append the vector to the vectors array.
                     vectors.append(vector)
@@ -1639,6 +1638,44 @@ class Internal:
             mol.atom_connect(index1=index1, index2=index2)
 
 
+    def coord_array(self, selection=None, model_num=None):
+        """Return the atomic positions of the selection for all models as a single array.
+
+        The positions of each molecule are copied from the contiguous position arrays of the molecule containers in one operation per model.  For the positions of a single model and molecule without copying, see the MolContainer.coord_array() method.
+
+
+        @keyword selection: The internal structural selection object.  This is obtained by calling the selection() method with the atom ID string.  If None, all atoms will be used.
+        @type selection:    lib.structure.internal.Internal_selection instance or None
+        @keyword model_num: Only use a specific model.
+        @type model_num:    int or None
+        @return:            The atomic positions, with the first dimension being the model, the second the atoms of all selected molecules, and the third the coordinates.
+        @rtype:             numpy rank-3 float64 array
+        """
+
+        # Check that the structure is loaded.
+        if not len(self.structural_data):
+            raise RelaxNoPdbError
+
+        # All atoms.
+        if selection == None:
+            selection = self.selection()
+
+        # Initialise.
+        models = list(self.model_loop(model=model_num))
+        coord = zeros((len(models), selection.count_atoms(), 3), float64)
+
+        # Loop over the models and molecules.
+        for model_index in range(len(models)):
+            start = 0
+            for mol_index in selection.mol_loop():
+                indices = selection.atom_indices(mol_index)
+                coord[model_index, start:start+len(indices)] = models[model_index].mol[mol_index].coord_array(indices)
+                start += len(indices)
+
+        # Return the positions.
+        return coord
+
+
     def delete(self, model=None, selection=None, verbosity=1):
         """Deletion of structural information.
 
@@ -1692,6 +1729,9 @@ class Internal:
                     # Generate a residue data dictionary for the metadata trimming (prior to atom deletion).
                     res_data = self._residue_data(res_nums=mol.res_num, res_names=mol.res_name)
 
+                    # Delete the atomic positions.
+                    mol.coord_delete(indices[mol_index])
+
                     # Loop over the reverse indices and pop out the data.
                     for i in indices[mol_index]:
                         mol.atom_num.pop(i)
@@ -1703,9 +1743,6 @@ class Internal:
                         mol.res_name.pop(i)
                         res_num = mol.res_num.pop(i)
                         mol.seg_id.pop(i)
-                        mol.x.pop(i)
-                        mol.y.pop(i)
-                        mol.z.pop(i)
 
                         # The residue no longer exists.
                         if res_num not in mol.res_num and res_num not in del_res_nums:
@@ -2000,7 +2037,7 @@ class Internal:
         return True
 
 
-    def load_pdb(self, file_path, read_mol=None, set_mol_name=None, read_model=None, set_model_num=None, alt_loc=None, verbosity=False, merge=False):
+    def load_pdb(self, file_path, read_mol=None, set_mol_name=None, read_model=None, set_model_num=None, alt_loc=None, atom_id=None, verbosity=False, merge=False):
         """Method for loading structures from a PDB file.
 
         @param file_path:       The full path of the PDB file.
@@ -2015,6 +2052,8 @@ class Internal:
         @type set_model_num:    None, int, or list of int
         @keyword alt_loc:       The PDB ATOM record 'Alternate location indicator' field value to select which coordinates to use.
         @type alt_loc:          str or None
+        @keyword atom_id:       The atom ID selection string.  If supplied, only the matching atoms will be loaded.
+        @type atom_id:          str or None
         @keyword verbosity:     A flag which if True will cause messages to be printed.
         @type verbosity:        bool
         @keyword merge:         A flag which if set to True will try to merge the PDB structure into the currently loaded structures.
@@ -2054,11 +2093,17 @@ class Internal:
 
         # Open the PDB file.
         pdb_file = open_read_file(file_path, verbosity=verbosity)
-        pdb_lines = pdb_file.readlines()
-        pdb_file.close()
+
+        # Read the header lines, up to and including the first coordinate section record, leaving the rest of the file to be streamed.
+        pdb_lines = []
+        for line in pdb_file:
+            pdb_lines.append(line)
+            if line[:5] == 'MODEL' or line[:4] == 'ATOM' or line[:6] == 'HETATM':
+                break
 
         # Check for empty files.
         if pdb_lines == []:
+            pdb_file.close()
             raise RelaxError("The PDB file is empty.")
 
         # Pre-process the lines, fixing PDB violations.
@@ -2077,12 +2122,20 @@ class Internal:
         pdb_lines = self._parse_pdb_misc(pdb_lines)
         pdb_lines = self._parse_pdb_transform(pdb_lines)
 
+        # The coordinate section, with the remaining lines pre-processed as they are streamed from the file.
+        pdb_lines = chain(pdb_lines, ("%-80s" % line.rstrip('\r\n') for line in pdb_file))
+
+        # The atom ID selection object.
+        sel_obj = None
+        if atom_id:
+            sel_obj = Selection(atom_id)
+
         # Loop over all models in the PDB file.
         model_index = 0
         orig_model_num = []
         mol_conts = []
         orig_mol_num = []
-        for model_num, model_records in self._parse_pdb_coord(pdb_lines):
+        for model_num, model_records in self._parse_pdb_coord(pdb_lines, read_model=read_model):
             # Only load the desired model.
             if read_model and model_num not in read_model:
                 continue
@@ -2123,9 +2176,10 @@ class Internal:
 
                 # Generate the molecule container.
                 mol = MolContainer()
+                mol.mol_name = new_mol_name[-1]
 
                 # Fill the molecular data object.
-                mol.fill_object_from_pdb(mol_records, alt_loc_select=alt_loc, reset_serial=reset_serial)
+                mol.fill_object_from_pdb(mol_records, alt_loc_select=alt_loc, reset_serial=reset_serial, sel_obj=sel_obj)
 
                 # Store the molecule container.
                 mol_conts[model_index].append(mol)
@@ -2142,6 +2196,9 @@ class Internal:
             # Increment the model index.
             model_index = model_index + 1
 
+        # Close the file.
+        pdb_file.close()
+
         # No data, so throw a warning and exit.
         if not len(mol_conts):
             warn(RelaxWarning("No structural data could be read from the file '%s'." % file_path))
@@ -2267,24 +2324,19 @@ class Internal:
         # The selection object.
         selection = self.selection()
 
-        # Loop over the molecules and atoms.
-        for mol_index, i in selection.loop():
-            # Set the mean structure coordinate to zero.
-            mean_model.mol[mol_index].x[i] = 0.0
-            mean_model.mol[mol_index].y[i] = 0.0
-            mean_model.mol[mol_index].z[i] = 0.0
+        # Loop over the molecules, operating on all atomic positions at once.
+        for mol_index in selection.mol_loop():
+            # The atomic positions of the mean structure.
+            indices = selection.atom_indices(mol_index)
+            pos = zeros((len(indices), 3), float64)
 
             # Loop over the models and sum the coordinates.
             for model_index in range(num):
                 model_cont = self.structural_data[model_index]
-                mean_model.mol[mol_index].x[i] += model_cont.mol[mol_index].x[i]
-                mean_model.mol[mol_index].y[i] += model_cont.mol[mol_index].y[i]
-                mean_model.mol[mol_index].z[i] += model_cont.mol[mol_index].z[i]
+                pos += model_cont.mol[mol_index].coord_array(indices)
 
             # Averages.
-            mean_model.mol[mol_index].x[i] /= num
-            mean_model.mol[mol_index].y[i] /= num
-            mean_model.mol[mol_index].z[i] /= num
+            mean_model.mol[mol_index].coord_array()[indices] = pos / num
 
         # Delete all models but the mean.
         for model_index in reversed(list(range(num))):
@@ -2632,21 +2684,16 @@ class Internal:
 
         # Loop over the models.
         for model_cont in self.model_loop(model):
-            # Loop over all molecules and atoms in the selection.
-            for mol_index, i in selection.loop():
-                mol = model_cont.mol[mol_index]
+            # Loop over all molecules of the selection, rotating all atoms at once.
+            for mol_index in selection.mol_loop():
+                indices = selection.atom_indices(mol_index)
+                coord = model_cont.mol[mol_index].coord_array()
 
-                # The origin to atom vector.
-                vect = array([mol.x[i], mol.y[i], mol.z[i]], float64) - origin
+                # The origin to atom vectors.
+                vect = coord[indices] - origin
 
-                # Rotation.
-                rot_vect = dot(R, vect)
-
-                # The new position.
-                pos = rot_vect + origin
-                mol.x[i] = pos[0]
-                mol.y[i] = pos[1]
-                mol.z[i] = pos[2]
+                # Rotation and the new positions.
+                coord[indices] = dot(vect, transpose(R)) + origin
 
 
     def selection(self, atom_id=None, inv=False):
@@ -2775,14 +2822,13 @@ class Internal:
 
         # Loop over the models.
         for model_cont in self.model_loop(model):
-            # Loop over all molecules and atoms in the selection.
-            for mol_index, i in selection.loop():
-                mol = model_cont.mol[mol_index]
+            # Loop over all molecules of the selection, translating all atoms at once.
+            for mol_index in selection.mol_loop():
+                indices = selection.atom_indices(mol_index)
+                coord = model_cont.mol[mol_index].coord_array()
 
                 # Translate.
-                mol.x[i] = mol.x[i] + T[0]
-                mol.y[i] = mol.y[i] + T[1]
-                mol.z[i] = mol.z[i] + T[2]
+                coord[indices] = coord[indices] + T[:3]
 
 
     def to_xml(self, doc, element):
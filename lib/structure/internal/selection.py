@@ -66,6 +66,22 @@ class Internal_selection:
         self._atom_indices.append([])
 
 
+    def atom_indices(self, mol_index=None):
+        """Return the atom indices of the given molecule.
+
+        @keyword mol_index:     The index of the molecule.
+        @type mol_index:        int
+        @return:                The indices of all selected atoms of the molecule.
+        @rtype:                 list of int
+        """
+
+        # Find the molecule index.
+        index = self._mol_indices.index(mol_index)
+
+        # Return the atom indices.
+        return self._atom_indices[index]
+
+
     def count_atoms(self):
         """Return the number of atoms in the selection."""
 
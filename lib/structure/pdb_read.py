@@ -25,6 +25,9 @@
 This module currently used the PDB format version 3.30 from July, 2011 U{http://www.wwpdb.org/documentation/file-format/format33/v3.3.html}.
 """
 
+# Python module imports.
+from numpy import array, ascontiguousarray, char, float64
+
 # relax module imports.
 from lib.errors import RelaxImplementError
 
@@ -232,6 +235,54 @@ def atom(record):
     return tuple(fields)
 
 
+def atom_block(records):
+    """Parse a block of ATOM and HETATM records, field by field rather than record by record.
+
+    This is a fast alternative to calling the atom() and hetatm() functions for each record of a large structure.  The records are converted into a single fixed-width character array, and each field is then extracted as a column for all records at once.  The real number fields are converted in one operation.
+
+
+    @param records:         The PDB ATOM and HETATM records.
+    @type records:          list of str
+    @return:                The columns of the record name, atom serial number, atom name, alternate location indicator, residue name, chain identifier, sequence number, insertion code, orthogonal coordinates for X in Angstroms, orthogonal coordinates for Y in Angstroms, orthogonal coordinates for Z in Angstroms, occupancy, temperature factor, element symbol, and charge on the atom.  These match the fields of the atom() function.
+    @rtype:                 tuple of 15 lists
+    """
+
+    # No records.
+    if not len(records):
+        return tuple([[] for i in range(15)])
+
+    # The records as a rank-2 array of characters.
+    chars = array(records, 'U80').view('U1').reshape((len(records), 80))
+
+    # Extract all fields.
+    fields = []
+    for start, end in [(0, 6), (6, 11), (12, 16), (16, 17), (17, 20), (21, 22), (22, 26), (26, 27), (30, 38), (38, 46), (46, 54), (54, 60), (60, 66), (76, 78), (78, 80)]:
+        # The stripped column of text.
+        column = char.strip(ascontiguousarray(chars[:, start:end]).view('U%i' % (end-start)).ravel())
+        fields.append(column)
+
+    # Convert to lists, replacing nothingness with None.
+    for i in range(len(fields)):
+        # The numeric fields, as a single conversion if possible.
+        if i in [8, 9, 10, 11, 12]:
+            try:
+                fields[i] = fields[i].astype(float64).tolist()
+                continue
+            except ValueError:
+                fields[i] = [float(field) if field else None for field in fields[i].tolist()]
+                continue
+
+        # The other fields.
+        fields[i] = [field if field else None for field in fields[i].tolist()]
+
+        # Integers.
+        if i in [1, 6]:
+            fields[i] = [int(field) if field else None for field in fields[i]]
+
+    # Return the data.
+    return tuple(fields)
+
+
 def conect(record):
     """Parse the CONECT record.
 
@@ -20,12 +20,20 @@
 ###############################################################################
 
 # Module docstring.
-"""Module containing generic functions for creation and parsing of XML representations of Python objects."""
+"""Module containing generic functions for creation and parsing of XML representations of Python objects.
+
+The binary relax format is also handled here.  This is a zip archive compatible with the numpy '.npz' format, holding the same XML document as the pure XML format together with all large numeric arrays and float lists stored natively as uncompressed '.npy' members.  These members are memory-mapped and are only loaded when accessed.
+"""
 
 # Python module imports (note that some of these are needed for the eval() function call).
+from io import BytesIO
 import numpy
-from numpy import set_printoptions, array, int16, int32, float32, float64, inf, ndarray, zeros
+from numpy import set_printoptions, array, asarray, int16, int32, float32, float64, inf, memmap, ndarray, zeros
+from numpy.lib.format import read_array_header_1_0, read_array_header_2_0, read_magic, write_array
+from os import remove
 from re import search
+from struct import unpack
+from zipfile import ZIP_STORED, ZipFile, is_zipfile
 
 # Modify numpy for better output of numbers and structures.
 set_printoptions(precision=15, threshold=inf)
@@ -37,6 +45,227 @@ from lib.compat import unicode
 from lib.float import floatAsByteArray, packBytesAsPyFloat
 from lib.errors import RelaxError
 
+# The name of the XML document within the binary relax format.
+BINARY_XML_NAME = 'relax.xml'
+
+# The minimum number of elements for a list or array to be stored natively in the binary relax format.
+BINARY_MIN_SIZE = 8
+
+# The native array storage of the binary relax format currently being written or read (None for the pure XML format).
+_binary_arrays = None
+
+
+class Binary_arrays:
+    """The native numeric array storage of the binary relax format."""
+
+    def __init__(self, file_path=None):
+        """Set up the array storage.
+
+        @keyword file_path: The path of the binary relax file to read the arrays from.  If None, the storage is for writing.
+        @type file_path:    str or None
+        """
+
+        # Store the arguments.
+        self.file_path = file_path
+
+        # The arrays to write.
+        self.arrays = []
+
+        # The offsets of the zip archive local file headers for each array name, for reading.
+        self.headers = {}
+        if file_path != None:
+            archive = ZipFile(file_path, 'r')
+            for info in archive.infolist():
+                self.headers[info.filename] = info.header_offset
+            archive.close()
+
+
+    def add(self, value):
+        """Add the numeric array or float list to the storage.
+
+        @param value:   The numeric array or float list.
+        @type value:    numpy array or list of float
+        @return:        The index of the array in the storage.
+        @rtype:         int
+        """
+
+        # Convert and store.
+        if isinstance(value, list):
+            value = array(value, float64)
+        self.arrays.append(value)
+
+        # Return the index.
+        return len(self.arrays) - 1
+
+
+    def get(self, index):
+        """Return the memory-mapped array of the given index.
+
+        @param index:   The index of the array in the storage.
+        @type index:    int
+        @return:        The copy-on-write memory-mapped array.
+        @rtype:         numpy array
+        """
+
+        # Open the file and skip the zip archive local file header.
+        name = self.member_name(index)
+        if name not in self.headers:
+            raise RelaxError("The array %s is missing from the binary relax file %s." % (repr(name), repr(self.file_path)))
+        file = open(self.file_path, 'rb')
+        file.seek(self.headers[name])
+        name_len, extra_len = unpack('<HH', file.read(30)[26:30])
+        file.seek(self.headers[name] + 30 + name_len + extra_len)
+
+        # The '.npy' header.
+        version = read_magic(file)
+        if version == (1, 0):
+            shape, fortran_order, dtype = read_array_header_1_0(file)
+        else:
+            shape, fortran_order, dtype = read_array_header_2_0(file)
+        offset = file.tell()
+
+        # Zero sized arrays cannot be memory-mapped.
+        if not numpy.prod(shape, dtype=int):
+            file.close()
+            return zeros(shape, dtype)
+
+        # Memory-map the data (as a normal numpy array view).
+        file.close()
+        order = 'C'
+        if fortran_order:
+            order = 'F'
+        return asarray(memmap(self.file_path, dtype=dtype, mode='c', offset=offset, shape=shape, order=order))
+
+
+    def member_name(self, index):
+        """Return the name of the '.npy' member of the zip archive for the given array.
+
+        @param index:   The index of the array in the storage.
+        @type index:    int
+        @return:        The name of the zip archive member.
+        @rtype:         str
+        """
+
+        return 'array_%i.npy' % index
+
+
+    def storable(self, value):
+        """Determine if the value can be stored natively.
+
+        @param value:   The Python object.
+        @type value:    anything
+        @return:        True if the value is a large numeric array or float list.
+        @rtype:         bool
+        """
+
+        # Numeric arrays.
+        if isinstance(value, ndarray):
+            return value.dtype.kind in 'biufc' and value.size >= BINARY_MIN_SIZE
+
+        # Flat float lists.
+        if isinstance(value, list) and len(value) >= BINARY_MIN_SIZE:
+            for element in value:
+                if not isinstance(element, float):
+                    return False
+            return True
+
+        # All other objects.
+        return False
+
+
+def binary_arrays(store=None):
+    """Activate the native array storage of the binary relax format.
+
+    @keyword store: The array storage to use in the object_to_xml() and xml_to_object() functions.  If None, the pure XML format will be used.
+    @type store:    Binary_arrays instance or None
+    """
+
+    # Set the module variable.
+    global _binary_arrays
+    _binary_arrays = store
+
+
+def is_binary_format(file_path):
+    """Determine if the file is in the binary relax format.
+
+    @param file_path:   The full file path.
+    @type file_path:    str
+    @return:            True if the file is in the binary relax format.
+    @rtype:             bool
+    """
+
+    # Not a zip archive.
+    if not is_zipfile(file_path):
+        return False
+
+    # Look for the XML document.
+    archive = ZipFile(file_path, 'r')
+    flag = BINARY_XML_NAME in archive.namelist()
+    archive.close()
+
+    # Return the flag.
+    return flag
+
+
+def read_binary(file_path):
+    """Open a binary relax file.
+
+    @param file_path:   The full file path.
+    @type file_path:    str
+    @return:            The XML document as a file object, and the native array storage.
+    @rtype:             BytesIO instance, Binary_arrays instance
+    """
+
+    # Extract the XML document.
+    archive = ZipFile(file_path, 'r')
+    xml_file = BytesIO(archive.read(BINARY_XML_NAME))
+    archive.close()
+
+    # Return the document and the lazy array storage.
+    return xml_file, Binary_arrays(file_path=file_path)
+
+
+def remove_binary(file_path):
+    """Remove an existing binary relax file which is about to be overwritten.
+
+    The arrays of a loaded binary relax file are memory-mapped from the file, so the file must be unlinked rather than truncated.  The existing mappings then keep the original data until they are released.
+
+
+    @param file_path:   The full file path.
+    @type file_path:    str
+    """
+
+    # Only remove binary relax files.
+    if is_binary_format(file_path):
+        remove(file_path)
+
+
+def write_binary(file, xml_text, store):
+    """Write the XML document and native arrays as a binary relax file.
+
+    @param file:        The writable and seekable binary file object.
+    @type file:         file object
+    @param xml_text:    The XML document.
+    @type xml_text:     str
+    @param store:       The native array storage.
+    @type store:        Binary_arrays instance
+    """
+
+    # The uncompressed zip archive, so that the arrays can be memory-mapped.
+    archive = ZipFile(file, 'w', ZIP_STORED, allowZip64=True)
+
+    # The XML document.
+    archive.writestr(BINARY_XML_NAME, xml_text.encode('utf-8'))
+
+    # The arrays.
+    for i in range(len(store.arrays)):
+        buffer = BytesIO()
+        write_array(buffer, store.arrays[i], allow_pickle=False)
+        archive.writestr(store.member_name(i), buffer.getvalue())
+
+    # Finish.
+    archive.close()
+
 
 def fill_object_contents(doc, elem, object=None, blacklist=[]):
     """Place all simple python objects into the XML element namespace.
@@ -101,6 +330,17 @@ def object_to_xml(doc, elem, value=None):
     @type value:            anything
     """
 
+    # The binary format - store large numeric arrays and float lists natively, outside of the XML.
+    if _binary_arrays != None and _binary_arrays.storable(value):
+        if isinstance(value, list):
+            elem.setAttribute('type', 'list')
+        else:
+            elem.setAttribute('type', repr(value.dtype))
+        array_elem = doc.createElement('array')
+        array_elem.setAttribute('index', str(_binary_arrays.add(value)))
+        elem.appendChild(array_elem)
+        return
+
     # Add the text value to the sub element.
     val_elem = doc.createElement('value')
     elem.appendChild(val_elem)
@@ -259,6 +499,14 @@ def xml_to_object(elem, base_object=None, set_fn=None, file_version=1, blacklist
                 if sub_node.localName == 'ieee_754_byte_array':
                     ieee_value = node_value_to_python(sub_node.childNodes[0])
 
+                # Native arrays of the binary format.
+                if sub_node.localName == 'array':
+                    if _binary_arrays == None:
+                        raise RelaxError("The native array of the '%s' object can only be read from the binary relax format." % name)
+                    value = _binary_arrays.get(int(sub_node.getAttribute('index')))
+                    if py_type == list:
+                        value = value.tolist()
+
             # Use IEEE-754 floats when possible.
             if ieee_value:
                 # Simple float.
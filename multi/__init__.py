@@ -26,7 +26,7 @@
 1 Introduction
 ==============
 
-This package is an abstraction of specific multi-processor implementations or fabrics such as MPI via mpi4py.  It is designed to be extended for use on other fabrics such as grid computing via SSH tunnelling, threading, etc.  It also has a uni-processor mode as the default fabric.
+This package is an abstraction of specific multi-processor implementations or fabrics such as MPI via mpi4py.  It is designed to be extended for use on other fabrics such as grid computing via SSH tunnelling, threading, etc.  It also has a uni-processor mode as the default fabric, and a local multi-processor mode via the Python multiprocessing module for using all cores of a single machine without MPI.
 
 
 2 API
@@ -122,6 +122,7 @@ __all__ = ['memo',
            'misc',
            'mpi4py_processor',
            'multi_processor_base',
+           'multiprocessing_processor',
            'processor',
            'processor_io',
            'result_commands',
@@ -144,7 +145,7 @@ from multi.slave_commands import Slave_command
 #FIXME error checking for if module required not found.
 #FIXME module loading code needs to be in a util module.
 #FIXME: remove parameters that are not required to load the module (processor_size).
-def load_multiprocessor(processor_name, callback, processor_size, verbosity=1):
+def load_multiprocessor(processor_name, callback, processor_size, verbosity=1, dispatch_mode='static'):
     """Load a multi processor given its name.
 
     Dynamically load a multi processor, the current algorithm is to search in module multi for a
@@ -159,15 +160,22 @@ def load_multiprocessor(processor_name, callback, processor_size, verbosity=1):
     @type processor_name:   str
     @keyword verbosity:     The verbosity level at initialisation.  This can be changed during program execution.  A value of 0 suppresses all output.  A value of 1 causes the basic multi-processor information to be printed.  A value of 2 will switch on a number of debugging printouts.  Values greater than 2 currently do nothing, though this might change in the future.
     @type verbosity:        int
+    @keyword dispatch_mode: The command dispatch mode of the multi-processor fabrics, either 'static' to split the command queue into one chunk per slave, or 'dynamic' to send the commands one at a time to the idle slaves, ordered by their cost estimates.
+    @type dispatch_mode:    str
     @return:                A loaded processor object or None to indicate failure.
     @rtype:                 multi.processor.Processor instance
     """
 
     # Check that the processor type is supported.
-    if processor_name not in ['uni', 'mpi4py']:
+    if processor_name not in ['uni', 'mpi4py', 'multiprocessing']:
         _sys.stderr.write("The processor type '%s' is not supported.\n" % processor_name)
         _sys.exit()
 
+    # Check the dispatch mode.
+    if dispatch_mode not in ['static', 'dynamic']:
+        _sys.stderr.write("The dispatch mode '%s' is not supported.\n" % dispatch_mode)
+        _sys.exit()
+
     # Store the verbosity level.
     _verbosity.set(verbosity)
 
@@ -187,6 +195,7 @@ def load_multiprocessor(processor_name, callback, processor_size, verbosity=1):
 
     # Instantiate the Processor.
     object = clazz(callback=callback, processor_size=processor_size)
+    object.dispatch_mode = dispatch_mode
 
     # Load the Processor_box container and store the details and Processor instance.
     processor_box = Processor_box()
@@ -70,6 +70,21 @@ class Multi_processor(Processor):
 
     #TODO: move up a level
     def chunk_queue(self, queue):
+        """Split the command queue into the chunks sent to the slaves.
+
+        In the default 'static' dispatch mode, the queue is split into one chunk per slave (times the grainyness).  In the 'dynamic' dispatch mode, each command is its own chunk so that idle slaves immediately receive the next command, and the commands are ordered so that the ones with the largest cost estimate are sent first.
+
+
+        @param queue:   The command queue.
+        @type queue:    list of Slave_command instances
+        @return:        The chunked queue, to be consumed from the end.
+        @rtype:         list of lists of Slave_command instances
+        """
+
+        # Dynamic dispatch.
+        if self.dispatch_mode == 'dynamic':
+            return self.order_queue(queue)
+
         lqueue = copy(queue)
         result = []
         processors = self.processor_size()
@@ -87,6 +102,44 @@ class Multi_processor(Processor):
         return result
 
 
+    def order_queue(self, queue):
+        """Order the commands by their cost estimates for dynamic dispatch, one command per chunk.
+
+        As the queue is consumed from the end, the command with the largest cost is placed last.  Commands without a cost estimate are treated as having the average cost of the others, and the original order is otherwise preserved.
+
+
+        @param queue:   The command queue.
+        @type queue:    list of Slave_command instances
+        @return:        The ordered queue of single command chunks.
+        @rtype:         list of lists of Slave_command instances
+        """
+
+        # The cost estimates.
+        costs = []
+        known = []
+        for command in queue:
+            cost = None
+            if hasattr(command, 'estimate_cost'):
+                cost = command.estimate_cost()
+            costs.append(cost)
+            if cost != None:
+                known.append(cost)
+
+        # Replace the unknown costs by the average.
+        average = 0.0
+        if len(known):
+            average = sum(known) / float(len(known))
+        for i in range(len(costs)):
+            if costs[i] == None:
+                costs[i] = average
+
+        # Sort the command indices by ascending cost, with the first commands last (as the queue is popped).
+        indices = sorted(range(len(queue)), key=lambda i: (costs[i], -i))
+
+        # Return the single command chunks.
+        return [[queue[i]] for i in indices]
+
+
     # FIXME move to lower level
     def on_master(self):
         if self.rank() == 0:
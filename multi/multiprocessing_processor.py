@@ -0,0 +1,311 @@
+###############################################################################
+#                                                                             #
+# Copyright (C) 2026 Troels E. Linnet                                         #
+#                                                                             #
+# This file is part of the program relax (http://www.nmr-relax.com).          #
+#                                                                             #
+# This program is free software: you can redistribute it and/or modify        #
+# it under the terms of the GNU General Public License as published by        #
+# the Free Software Foundation, either version 3 of the License, or           #
+# (at your option) any later version.                                         #
+#                                                                             #
+# This program is distributed in the hope that it will be useful,             #
+# but WITHOUT ANY WARRANTY; without even the implied warranty of              #
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the               #
+# GNU General Public License for more details.                                #
+#                                                                             #
+# You should have received a copy of the GNU General Public License           #
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.       #
+#                                                                             #
+###############################################################################
+
+# Module docstring.
+"""The local multi-processor fabric via the Python multiprocessing module.
+
+This fabric runs one master and N slave processes on the local machine, without requiring an MPI stack.  The slave processes are forked from the master at the start of Processor.run(), prior to the execution of the main program, and communicate with the master via multiprocessing queues.  The slaves then execute exactly the same Slave_command, Result_command and Memo logic as the MPI slaves.
+
+To use this fabric, start relax with::
+
+$ relax --multi multiprocessing --processors 32 script.py
+
+If the number of processors is not given, one slave per CPU core will be created.
+"""
+
+# Python module imports.
+try:
+    import multiprocessing
+except ImportError:
+    multiprocessing = None
+import os
+import platform
+import sys
+
+# relax module imports.
+from multi.multi_processor_base import Multi_processor, Too_few_slaves_exception
+from multi.result_commands import Null_result_command
+from multi.slave_commands import Exit_command
+
+
+class Multiprocessing_processor(Multi_processor):
+    """The local multiprocessing multi-processor class."""
+
+    def __init__(self, processor_size, callback):
+        """Initialise the multiprocessing processor.
+
+        @param processor_size:  The number of slave processes to create.  A value of -1 will create one slave per CPU core.
+        @type processor_size:   int
+        @param callback:        The callback object.
+        @type callback:         multi.processor.Application_callback instance
+        """
+
+        # The slaves must be forked to inherit the relax environment.
+        self._context = self._get_context()
+
+        # One slave per CPU core.
+        if processor_size == -1:
+            processor_size = multiprocessing.cpu_count()
+
+        # Checks.
+        if processor_size < 1:
+            raise Too_few_slaves_exception()
+
+        # The rank of this process (the master is 0 and the slaves are 1 to N).
+        self._rank = 0
+
+        super(Multiprocessing_processor, self).__init__(processor_size=processor_size, callback=callback)
+
+        # The slave processes and the communication queues.
+        self._slaves = []
+        self._command_queues = []
+        self._result_queue = None
+
+        # Initialise a flag for determining if we are in the run() method or not.
+        self.in_main_loop = False
+
+
+    def _broadcast_command(self, command):
+        """Send the command to all slave processes.
+
+        @param command: The slave command.
+        @type command:  Slave_command instance
+        """
+
+        for i in range(len(self._slaves)):
+            self._command_queues[i].put(command)
+
+
+    def _ditch_all_results(self):
+        """Consume all remaining results from the slaves, waiting for each slave to complete."""
+
+        # Count down the completed slaves.
+        remaining = len(self._slaves)
+        while remaining:
+            result = self._result_queue.get()
+            if result.completed:
+                remaining -= 1
+
+
+    def _get_context(self):
+        """Return the multiprocessing context for forking the slave processes.
+
+        @return:    The multiprocessing module or fork context.
+        @rtype:     module or multiprocessing.context.ForkContext instance
+        """
+
+        # No multiprocessing module.
+        if multiprocessing is None:
+            raise Exception("The Python multiprocessing module is not available.")
+
+        # The slaves can only be created by forking, as the complete relax state must be inherited.
+        if not hasattr(os, 'fork'):
+            raise Exception("The multiprocessing processor fabric requires the fork() system call, which is not supported on the '%s' platform." % sys.platform)
+
+        # Python 3.4 and above - explicitly select forking, as this is no longer the default on all POSIX systems.
+        if hasattr(multiprocessing, 'get_context'):
+            return multiprocessing.get_context('fork')
+
+        # Python 2, where forking is always used.
+        return multiprocessing
+
+
+    def _slave_main(self, rank):
+        """The entry point of the forked slave processes.
+
+        @param rank:    The rank of the slave process.
+        @type rank:     int
+        """
+
+        # Set the rank, switching this processor instance to slave mode.
+        self._rank = rank
+        self.NULL_RESULT = Null_result_command(processor=self)
+
+        # Execute the slave main loop.
+        self.run()
+
+
+    def _start_slaves(self):
+        """Fork the slave processes and set up the communication queues."""
+
+        # The result queue, shared by all slaves.
+        self._result_queue = self._context.Queue()
+
+        # Create the command queues and then fork the slaves.
+        for i in range(self.processor_size()):
+            self._command_queues.append(self._context.Queue())
+        for i in range(self.processor_size()):
+            slave = self._context.Process(target=self._slave_main, args=(i+1,), name='relax slave %i' % (i+1))
+            slave.daemon = True
+            slave.start()
+            self._slaves.append(slave)
+
+
+    def _terminate_slaves(self):
+        """Forcibly terminate all slave processes."""
+
+        for slave in self._slaves:
+            if slave.is_alive():
+                slave.terminate()
+        for slave in self._slaves:
+            slave.join()
+        self._slaves = []
+
+
+    def abort(self):
+        """Shutdown the multiprocessing fabric in exceptional conditions, killing all slaves."""
+
+        # Kill the slaves.
+        if self.on_master():
+            self._terminate_slaves()
+
+        # Terminate the program.
+        sys.exit(1)
+
+
+    def assert_on_master(self):
+        """Make sure that this is the master processor and not a slave.
+
+        @raises Exception:  If not on the master processor.
+        """
+
+        # Check if this processor is a slave, and if so throw an exception.
+        if self.on_slave():
+            msg = 'running on slave when expected master with rank == 0, rank was %d'% self.rank()
+            raise Exception(msg)
+
+
+    def exit(self, status=0):
+        """Shut down the slave processes.
+
+        @keyword status:    The program exit status.
+        @type status:       int
+        """
+
+        # Execution on the slave.
+        if self.on_slave():
+            # Catch sys.exit being called on an executing slave.
+            if self.in_main_loop:
+                raise Exception('sys.exit unexpectedly called on slave!')
+            return
+
+        # Nothing to do.
+        if not len(self._slaves):
+            return
+
+        # Send the exit command to all slaves.
+        self._broadcast_command(Exit_command())
+
+        # Dump all results.
+        self._ditch_all_results()
+
+        # Wait for the slaves to terminate.
+        for slave in self._slaves:
+            slave.join()
+        self._slaves = []
+
+
+    def get_intro_string(self):
+        """Return the string to append to the end of the relax introduction string.
+
+        @return:    The string describing this Processor fabric.
+        @rtype:     str
+        """
+
+        # Return the string.
+        return "Local multi-processor running via the Python multiprocessing module with %i slave processes & 1 master." % self.processor_size()
+
+
+    def get_name(self):
+        return '%s-pid%s' % (platform.node(), os.getpid())
+
+
+    def master_queue_command(self, command, dest):
+        """Master to slave processor data transfer - send the slave command to the slave.
+
+        @param command: The slave command to send to the slave.
+        @type command:  Slave_command instance
+        @param dest:    The destination processor's rank.
+        @type dest:     int
+        """
+
+        # Place the command on the slave's own queue.
+        self._command_queues[dest-1].put(command)
+
+
+    def master_receive_result(self):
+        """Slave to master processor data transfer - receive the result command from the slave.
+
+        This is invoked by the master processor.
+
+        @return:        The result command sent by the slave.
+        @rtype:         Result_command instance
+        """
+
+        # Catch and return the result command.
+        return self._result_queue.get()
+
+
+    def pre_run(self):
+        """Fork the slave processes prior to executing the main program on the master."""
+
+        # Execute the base class method.
+        super(Multiprocessing_processor, self).pre_run()
+
+        # Fork the slaves from the master, only once.
+        if self.on_master() and not len(self._slaves):
+            self._start_slaves()
+
+
+    def rank(self):
+        """The rank of the process, 0 for the master and 1 to N for the slaves.
+
+        @return:    The processor rank.
+        @rtype:     int
+        """
+
+        return self._rank
+
+
+    def return_result_command(self, result_object):
+        """Slave to master processor data transfer - send the result command from the slave.
+
+        @param result_object:   The result command to send to the master.
+        @type result_object:    Result_command instance
+        """
+
+        self._result_queue.put(result_object)
+
+
+    def run(self):
+        self.in_main_loop = True
+        super(Multiprocessing_processor, self).run()
+        self.in_main_loop = False
+
+
+    def slave_receive_commands(self):
+        """Receive the slave commands sent from the master.
+
+        @return:        The slave commands.
+        @rtype:         Slave_command instance or list of Slave_command instances
+        """
+
+        return self._command_queues[self._rank-1].get()
@@ -102,7 +102,7 @@ import time, datetime, math, sys
 
 # multi module imports.
 from multi.misc import Capturing_exception, raise_unimplemented, Verbosity; verbosity = Verbosity()
-from multi.result_queue import Threaded_result_queue
+from multi.result_queue import Immediate_result_queue, Threaded_result_queue
 from multi.processor_io import Redirect_text
 from multi.result_commands import Batched_result_command, Null_result_command, Result_exception
 from multi.slave_commands import Slave_storage_command
@@ -179,6 +179,18 @@ class Processor(object):
         self.threaded_result_processing = True
         """Flag for the handling of result processing via self.run_command_queue()."""
 
+        self.dispatch_mode = 'static'
+        """The command dispatch mode, either 'static' for splitting the queue into one chunk per slave, or 'dynamic' for sending the commands one at a time, most expensive first, to whichever slave is idle."""
+
+        self.utilisation = None
+        """The per-rank utilisation statistics of the last self.run_command_queue() call, as a dictionary of rank keys and [busy time, command count] values."""
+
+        self.utilisation_time = 0.0
+        """The wall time of the last self.run_command_queue() call, in seconds."""
+
+        self.queue_held = False
+        """Flag which, if True, causes self.run_queue() to leave the queued commands for later execution (see self.hold_queue())."""
+
 
     def abort(self):
         """Shutdown the multi processor in exceptional conditions - designed for overriding.
@@ -224,6 +236,20 @@ class Processor(object):
         raise_unimplemented(self.assert_on_master)
 
 
+    def discard_queue(self):
+        """Release the command queue held by self.hold_queue() without executing the queued commands.
+
+        This is for cleaning up after a failure while the queue is held, so that the original error is not masked by the execution of the queued commands.
+        """
+
+        # Unset the flag.
+        self.queue_held = False
+
+        # Remove the queued commands and their memos.
+        del self.command_queue[:]
+        self.memo_map.clear()
+
+
     def exit(self, status=0):
         """Exit the processor with the given status.
 
@@ -344,6 +370,16 @@ class Processor(object):
         return time_delta_str
 
 
+    def hold_queue(self):
+        """Hold the command queue, so that commands from many sources can be executed together.
+
+        While the queue is held, the self.run_queue() calls at the end of the individual user functions do nothing and the slave commands accumulate in the queue.  All of these are then executed as a single queue by self.release_queue().  This can only be used when the queued commands are independent of each other.
+        """
+
+        # Set the flag.
+        self.queue_held = True
+
+
     def is_queued(self):
         """Determine if any slave commands are queued.
 
@@ -414,6 +450,28 @@ class Processor(object):
             self.start_time = time.time()
 
 
+    def print_utilisation(self, wall_time):
+        """Print out the per-rank utilisation statistics of the last run of the command queue.
+
+        @param wall_time:   The total time taken to run the queue, in seconds.
+        @type wall_time:    float
+        """
+
+        # Nothing to do.
+        if not self.utilisation:
+            return
+
+        # Avoid division by zero for queues completing within the timer resolution.
+        wall_time = max(wall_time, 1e-6)
+
+        # Printout.
+        print("\nSlave processor utilisation (%s dispatch, %.3f s wall time):" % (self.dispatch_mode, wall_time))
+        print("%-8s %10s %14s %14s" % ("Rank", "Commands", "Busy time (s)", "Utilisation"))
+        for rank in sorted(self.utilisation.keys()):
+            busy, count = self.utilisation[rank]
+            print("%-8i %10i %14.3f %13.1f%%" % (rank, count, busy, 100.0 * busy / wall_time))
+
+
     def processor_size(self):
         """Get the number of slave processors - designed for overriding.
 
@@ -463,6 +521,16 @@ class Processor(object):
         return int(math.ceil(math.log10(self.processor_size())))
 
 
+    def release_queue(self):
+        """Release the command queue held by self.hold_queue() and execute all queued commands."""
+
+        # Unset the flag.
+        self.queue_held = False
+
+        # Execute the accumulated commands.
+        self.run_queue()
+
+
     def return_object(self, result):
         """Return a result to the master processor from a slave - an abstract method.
 
@@ -586,44 +654,53 @@ class Processor(object):
         running_set = set()
         idle_set = set([i for i in range(1, self.processor_size()+1)])
 
+        # The utilisation statistics.
+        start_time = time.time()
+        send_time = {}
+        self.utilisation = {}
+        for rank in idle_set:
+            self.utilisation[rank] = [0.0, 0]
+
         if self.threaded_result_processing:
             result_queue = Threaded_result_queue(self)
         else:
             result_queue = Immediate_result_queue(self)
 
-        while len(queue) != 0:
-
-            while len(idle_set) != 0:
-                if len(queue) != 0:
-                    command = queue.pop()
-                    dest = idle_set.pop()
-                    self.master_queue_command(command=command, dest=dest)
-                    running_set.add(dest)
-                else:
-                    break
+        # Loop until the queue of calculations is depleted and all slaves have finished.
+        while len(queue) != 0 or len(running_set) != 0:
+            # Send commands to all idle slaves.
+            while len(idle_set) != 0 and len(queue) != 0:
+                command = queue.pop()
+                dest = idle_set.pop()
+                self.master_queue_command(command=command, dest=dest)
+                running_set.add(dest)
+                send_time[dest] = time.time()
 
-            # Loop until the queue of calculations is depleted.
-            while len(running_set) != 0:
-                # Get the result.
-                result = self.master_receive_result()
+            # Get the result.
+            result = self.master_receive_result()
 
-                # Debugging printout.
-                if verbosity.level():
-                    print('\nIdle set:    %s' % idle_set)
-                    print('Running set: %s' % running_set)
+            # Debugging printout.
+            if verbosity.level():
+                print('\nIdle set:    %s' % idle_set)
+                print('Running set: %s' % running_set)
 
-                # Shift the processor rank to the idle set.
-                if result.completed:
-                    idle_set.add(result.rank)
-                    running_set.remove(result.rank)
+            # Shift the processor rank to the idle set, so that it can immediately receive the next command.
+            if result.completed:
+                idle_set.add(result.rank)
+                running_set.remove(result.rank)
+                self.utilisation[result.rank][0] += time.time() - send_time[result.rank]
+                self.utilisation[result.rank][1] += 1
 
-                # Add to the result queue for instant or threaded processing.
-                result_queue.put(result)
+            # Add to the result queue for instant or threaded processing.
+            result_queue.put(result)
 
         # Process the threaded results.
         if self.threaded_result_processing:
             result_queue.run_all()
 
+        # The wall time, for the utilisation statistics.
+        self.utilisation_time = time.time() - start_time
+
 
     def run_queue(self):
         """Run the processor queue - an abstract method.
@@ -632,6 +709,10 @@ class Processor(object):
         thread to block until the command has completed.
         """
 
+        # The queue is held.
+        if self.queue_held:
+            return
+
         #FIXME: need a finally here to cleanup exceptions states
         lqueue = self.chunk_queue(self.command_queue)
         self.run_command_queue(lqueue)
@@ -639,6 +720,9 @@ class Processor(object):
         del self.command_queue[:]
         self.memo_map.clear()
 
+        # Report the per-rank utilisation.
+        self.print_utilisation(self.utilisation_time)
+
 
     def send_data_to_slaves(self, name=None, value=None):
         """Transfer the given data from the master to all slaves.
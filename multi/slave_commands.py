@@ -46,6 +46,20 @@ class Slave_command(object):
         self.memo_id = None
 
 
+    def estimate_cost(self):
+        """Estimate the relative computational cost of the command - designed for overriding.
+
+        This is used in the 'dynamic' dispatch mode of the multi-processor fabrics to send the most expensive commands to the slaves first.  The value only needs to be meaningful relative to the other commands in the same queue, for example the number of spins times the number of parameters times the number of data points.
+
+
+        @return:    The relative cost estimate, or None if unknown.
+        @rtype:     float or None
+        """
+
+        # Unknown.
+        return None
+
+
     def run(self, processor, completed):
         """Run the slave command on the slave processor
         
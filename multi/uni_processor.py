@@ -177,6 +177,10 @@ class Uni_processor(Processor):
     def run_queue(self):
         """Safely run each command in the queue, cleaning up after failures."""
 
+        # The queue is held.
+        if self.queue_held:
+            return
+
         # Run each command in the queue.
         try:
             last_command = len(self.command_queue)-1
@@ -24,12 +24,15 @@
 """Module for performing Monte Carlo simulations for error analysis."""
 
 # Python module imports.
-from numpy import diag, ndarray, sqrt
-from random import gauss
+from numpy import array, diag, dot, float64, isnan, maximum, sqrt, where
+from numpy.random import standard_normal
+import sys
 
 # relax module imports.
 from lib import statistics
 from lib.errors import RelaxError
+from lib.io import write_data
+from lib.text.sectioning import subsection
 from pipe_control.pipes import check_pipe
 from specific_analyses.api import return_api
 
@@ -112,7 +115,10 @@ def monte_carlo_create_data(method=None, distribution=None, fixed_error=None):
     # The specific analysis API object.
     api = return_api()
 
-    # Loop over the models.
+    # Collect the base data, with the mean and standard deviation of the Gaussian distribution for each data point.
+    base_data = []
+    means = []
+    sds = []
     for data_index in api.base_data_loop():
         # Create the Monte Carlo data.
         if method == 'back_calc':
@@ -133,65 +139,69 @@ def monte_carlo_create_data(method=None, distribution=None, fixed_error=None):
         # Get the errors.
         error = api.return_error(data_index)
 
-        # List type data.
-        if isinstance(data, list) or isinstance(data, ndarray):
-            # Loop over the Monte Carlo simulations.
-            random = []
-            for j in range(cdp.sim_number):
-                # Randomise the data.
-                random.append([])
-                for k in range(len(data)):
-                    # No data or errors.
-                    if data[k] == None or error[k] == None:
-                        random[j].append(None)
-                        continue
-
-                    # Gaussian randomisation.
-                    if distribution == 'fixed':
-                        random[j].append(gauss(data[k], float(fixed_error)))
-
-                    else:
-                        random[j].append(gauss(data[k], error[k]))
-
-        # Dictionary type data.
+        # The data keys.
         if isinstance(data, dict):
-            # Loop over the Monte Carlo simulations.
-            random = []
-            for j in range(cdp.sim_number):
-                # Randomise the data.
-                random.append({})
-                for id in data:
-                    # No data or errors.
-                    if data[id] == None or error[id] == None:
-                        random[j][id] = None
-                        continue
-
-                    # If errors are drawn from the reduced chi2 distribution.
-                    if distribution == 'red_chi2':
-                        # Gaussian randomisation, centered at 0, with width of reduced chi2 distribution.
-                        g_error = gauss(0.0, error_red_chi2[id])
-
-                        # We need to scale the gauss error, before adding to datapoint.
-                        new_point = data[id] + g_error * error[id]
-
-                    # If errors are drawn from fixed distribution.
-                    elif distribution == 'fixed':
-                        # Gaussian randomisation, centered at data point, with width of fixed error.
-                        new_point = gauss(data[id], float(fixed_error))
-
-                    # If errors are drawn from measured values.
-                    else:
-                        # Gaussian randomisation, centered at data point, with width of measured error.
-                        new_point = gauss(data[id], error[id])
-
-                    # Assign datapoint the new value.
-                    random[j][id] = new_point
+            keys = list(data.keys())
+        else:
+            keys = list(range(len(data)))
+
+        # Loop over the data points, storing the index into the Gaussian distribution arrays.
+        indices = []
+        for key in keys:
+            # No data or errors.
+            if data[key] is None or error[key] is None:
+                indices.append(None)
+                continue
+
+            # If errors are drawn from the reduced chi2 distribution (a Gaussian centered at 0 with the width of the reduced chi2 distribution, scaled by the measured error).
+            if distribution == 'red_chi2' and isinstance(data, dict):
+                sd = error_red_chi2[key] * error[key]
+
+            # If errors are drawn from fixed distribution.
+            elif distribution == 'fixed':
+                sd = float(fixed_error)
+
+            # If errors are drawn from measured values.
+            else:
+                sd = error[key]
+
+            # Store the distribution.
+            indices.append(len(means))
+            means.append(data[key])
+            sds.append(sd)
+
+        # Store the data (copying list indices, as some base_data_loop() generators modify and yield the same list).
+        if isinstance(data_index, list):
+            data_index = data_index[:]
+        base_data.append([data_index, data, keys, indices])
+
+    # Randomise all data points of all Monte Carlo simulations in a single draw.
+    random_points = standard_normal((cdp.sim_number, len(means))) * array(sds, float64) + array(means, float64)
+
+    # Loop over the base data.
+    for data_index, data, keys, indices in base_data:
+        # Loop over the Monte Carlo simulations.
+        random = []
+        for j in range(cdp.sim_number):
+            # The randomised data.
+            points = [None] * len(keys)
+            for k in range(len(keys)):
+                if indices[k] is not None:
+                    points[k] = float(random_points[j, indices[k]])
+
+            # Dictionary type data.
+            if isinstance(data, dict):
+                random.append(dict(zip(keys, points)))
+
+            # List type data.
+            else:
+                random.append(points)
 
         # Pack the simulation data.
         api.sim_pack_data(data_index, random)
 
 
-def monte_carlo_error_analysis():
+def monte_carlo_error_analysis(conf_level=None, covariance=False):
     """Function for calculating errors from the Monte Carlo simulations.
 
     The standard deviation formula used to calculate the errors is the square root of the
@@ -203,9 +213,17 @@ def monte_carlo_error_analysis():
                \/   n - 1
 
     where
-        - n is the total number of simulations.
+        - n is the total number of selected simulations, skipping failed simulations with the parameter value None.
         - Xi is the parameter value for simulation i.
         - Xav is the mean parameter value for all simulations.
+
+    The simulation parameter values of all models are first gathered into a single numpy block, with one row per parameter element of each model (the flattened n_models x n_params dimensions) and one column per simulation, so that the standard deviations of the selected simulations are calculated in one pass.
+
+
+    @keyword conf_level:    The optional confidence level, for example 0.95, for reporting the percentile confidence intervals of the simulation parameter values.
+    @type conf_level:       None or float
+    @keyword covariance:    A flag which if True will cause the covariance matrix of the simulation parameter values of each model to be reported.
+    @type covariance:       bool
     """
 
     # Test if the current data pipe exists.
@@ -215,72 +233,182 @@ def monte_carlo_error_analysis():
     if not hasattr(cdp, 'sim_state'):
         raise RelaxError("Monte Carlo simulations have not been set up.")
 
+    # Check the confidence level.
+    if conf_level != None and (conf_level <= 0.0 or conf_level >= 1.0):
+        raise RelaxError("The confidence level %s must be between 0 and 1." % conf_level)
+
     # The specific analysis API object.
     api = return_api()
 
-    # Loop over the models.
+    # Gather the simulation parameters of all models.
+    models = []
+    rows = []
+    select = []
     for model_info in api.model_loop():
         # Get the selected simulation array.
         select_sim = api.sim_return_selected(model_info=model_info)
 
-        # Loop over the parameters.
+        # Loop over the parameters, storing the parameter index, type, keys or elements, and first row in the block.
+        params = []
         index = 0
         while True:
             # Get the array of simulation parameters for the index.
             param_array = api.sim_return_param(index, model_info=model_info)
 
             # Break (no more parameters).
-            if param_array == None:
+            if param_array is None:
                 break
 
-            # Handle dictionary type parameters.
-            if isinstance(param_array[0], dict):
-                # Initialise the standard deviation structure as a dictionary.
-                sd = {}
+            # The first simulation with a value, as failed simulations have the value None.
+            first = None
+            for value in param_array:
+                if value is not None:
+                    first = value
+                    break
 
-                # Loop over each key.
-                for key in param_array[0]:
-                    # Create a list of the values for the current key.
-                    data = []
-                    for i in range(len(param_array)):
-                        data.append(param_array[i][key])
+            # Handle dictionary type parameters, transposing the simulations into one row per key.
+            if isinstance(first, dict):
+                params.append([index, 'dict', list(first.keys()), len(rows)])
+                rows.extend(zip(*[[None if value is None else value.get(key) for key in params[-1][2]] for value in param_array]))
 
-                    # Calculate and store the SD.
-                    sd[key] = statistics.std(values=data, skip=select_sim)
+            # Handle list type parameters, transposing the simulations into one row per element.
+            elif isinstance(first, list):
+                params.append([index, 'list', list(range(len(first))), len(rows)])
+                rows.extend(zip(*[[None]*len(first) if value is None else value for value in param_array]))
 
-            # Handle list type parameters.
-            elif isinstance(param_array[0], list):
-                # Initialise the standard deviation structure as a list.
-                sd = []
+            # Simulation parameters with values (ie not None).
+            elif first is not None:
+                params.append([index, 'value', [None], len(rows)])
+                rows.append(param_array)
 
-                # Loop over each element.
-                for j in range(len(param_array[0])):
-                    # Create a list of the values for the current key.
-                    data = []
-                    for i in range(len(param_array)):
-                        data.append(param_array[i][j])
+            # Simulation parameters with the value None.
+            else:
+                params.append([index, None, [], len(rows)])
+
+            # The simulation selection for the rows of the parameter.
+            select.extend([select_sim] * len(params[-1][2]))
 
-                    # Calculate and store the SD.
-                    sd.append(statistics.std(values=data, skip=select_sim))
+            # Increment the parameter index.
+            index = index + 1
 
-             # SD of simulation parameters with values (ie not None).
-            elif param_array[0] != None:
-                sd = statistics.std(values=param_array, skip=select_sim)
+        # Store the model.
+        models.append([model_info, params])
+
+    # Calculate the standard deviations of all rows in one pass.
+    block, mask, sd = None, None, []
+    if len(rows):
+        try:
+            # The simulation block, converting the values of failed simulations (None) to NaN.
+            block = array(rows, float64)
+
+            # The selection mask, skipping the deselected and failed simulations.
+            mask = array([[True]*block.shape[1] if flags is None else flags for flags in select], bool)
+            mask &= ~isnan(block)
+            sd = statistics.std_array(values=block, select=mask)
+
+        # Irregular simulation data, so fall back to calculating the standard deviation one row at a time.
+        except (TypeError, ValueError):
+            block = None
+            sd = []
+            for i in range(len(rows)):
+                values = [rows[i][j] for j in range(len(rows[i])) if rows[i][j] is not None and (select[i] is None or select[i][j])]
+                sd.append(statistics.std(values=values))
+
+    # Set the parameter errors.
+    for model_info, params in models:
+        for index, param_type, elements, row in params:
+            # Dictionary type parameters.
+            if param_type == 'dict':
+                error = {}
+                for j in range(len(elements)):
+                    error[elements[j]] = float(sd[row+j])
+
+            # List type parameters.
+            elif param_type == 'list':
+                error = [float(sd[row+j]) for j in range(len(elements))]
+
+            # Single values.
+            elif param_type == 'value':
+                error = float(sd[row])
 
             # Simulation parameters with the value None.
             else:
-                sd = None
+                error = None
 
             # Set the parameter error.
-            api.set_error(index, sd, model_info=model_info)
+            api.set_error(index, error, model_info=model_info)
 
-            # Increment the parameter index.
-            index = index + 1
+    # Report the confidence intervals and covariance matrices.
+    if block is not None and (conf_level != None or covariance):
+        monte_carlo_report(models=models, block=block, mask=mask, sd=sd, conf_level=conf_level, covariance=covariance)
 
     # Turn off the Monte Carlo simulation state, as the MC analysis is now finished.
     cdp.sim_state = False
 
 
+def monte_carlo_report(models=None, block=None, mask=None, sd=None, conf_level=None, covariance=False):
+    """Print out the confidence intervals and covariance matrices of the simulation parameter values.
+
+    @keyword models:        The list of model information and parameter structure pairs, as gathered by monte_carlo_error_analysis().
+    @type models:           list of lists
+    @keyword block:         The simulation parameter values, one row per parameter element and one column per simulation.
+    @type block:            numpy rank-2 float64 array
+    @keyword mask:          The simulation selection flags matching the block.
+    @type mask:             numpy rank-2 bool array
+    @keyword sd:            The standard deviations of each row of the block.
+    @type sd:               numpy rank-1 float64 array
+    @keyword conf_level:    The confidence level, or None to skip the confidence intervals.
+    @type conf_level:       None or float
+    @keyword covariance:    A flag which if True will cause the covariance matrices to be printed.
+    @type covariance:       bool
+    """
+
+    # The means and confidence intervals of all rows.
+    n = mask.sum(axis=1)
+    mean = where(mask, block, 0.0).sum(axis=1) / maximum(n, 1)
+    if conf_level != None:
+        lower, upper = statistics.confidence_interval_array(values=block, select=mask, level=conf_level)
+
+    # Loop over the models.
+    for model_index in range(len(models)):
+        # The row labels and indices for the model.
+        labels = []
+        model_rows = []
+        for index, param_type, elements, row in models[model_index][1]:
+            for j in range(len(elements)):
+                if param_type == 'value':
+                    labels.append("%i" % index)
+                else:
+                    labels.append("%i[%s]" % (index, elements[j]))
+                model_rows.append(row + j)
+        if not len(model_rows):
+            continue
+
+        # Printout.
+        subsection(file=sys.stdout, text="Monte Carlo simulation statistics for model %i" % (model_index+1), prespace=1)
+
+        # The statistics table.
+        headings = ["Param_index", "Mean", "SD"]
+        if conf_level != None:
+            headings += ["CI_%g%%_lower" % (100.0*conf_level), "CI_%g%%_upper" % (100.0*conf_level)]
+        data = []
+        for i in range(len(model_rows)):
+            row = model_rows[i]
+            data.append([labels[i], "%.10g" % mean[row], "%.10g" % sd[row]])
+            if conf_level != None:
+                data[-1] += ["%.10g" % lower[row], "%.10g" % upper[row]]
+        write_data(out=sys.stdout, headings=headings, data=data)
+
+        # The covariance matrix, using the simulations selected and successful for all parameters of the model.
+        if covariance:
+            sel = mask[model_rows].all(axis=0)
+            X = block[model_rows][:, sel]
+            X = X - X.mean(axis=1)[:, None]
+            covar = dot(X, X.T) / max(sel.sum() - 1, 1)
+            print("\nCovariance matrix:\n")
+            write_data(out=sys.stdout, headings=["Param_index"] + labels, data=[[labels[i]] + ["%.5g" % x for x in covar[i]] for i in range(len(labels))])
+
+
 def monte_carlo_initial_values():
     """Set the initial simulation parameter values."""
 
@@ -179,7 +179,7 @@ def grid_search(lower=None, upper=None, inc=None, verbosity=1, constraints=True,
     processor_box = Processor_box() 
     processor = processor_box.processor
 
-    # Monte Carlo simulation grid search.
+    # Monte Carlo simulation grid search, with all simulations queued together (see minimise()).
     if hasattr(cdp, 'sim_state') and cdp.sim_state == 1:
         # Loop over the simulations.
         for i in range(cdp.sim_number):
@@ -415,6 +415,29 @@ def grid_setup(lower=None, upper=None, inc=None, verbosity=1, skip_preset=True):
     return model_lower, model_upper, model_inc
 
 
+def grid_refine(levels=0, best=1):
+    """Store the settings for the coarse-to-fine grid search.
+
+    @keyword levels:    The number of refinement levels.  A value of 0 turns the refinement off.
+    @type levels:       int
+    @keyword best:      The number of best grid points to refine around at each level.
+    @type best:         int
+    """
+
+    # Test if the current data pipe exists.
+    check_pipe()
+
+    # Check the values.
+    if levels < 0:
+        raise RelaxError("The number of grid refinement levels cannot be negative.")
+    if best < 1:
+        raise RelaxError("At least one grid point must be refined around.")
+
+    # Store the values.
+    cdp.grid_refine_levels = levels
+    cdp.grid_refine_best = best
+
+
 def grid_zoom(level=0):
     """Store the grid zoom level.
 
@@ -496,7 +519,16 @@ def minimise(min_algor=None, line_search=None, hessian_mod=None, hessian_type=No
         # Optimise.
         api.minimise(min_algor=min_algor, min_options=min_options, func_tol=func_tol, grad_tol=grad_tol, max_iterations=max_iter, constraints=constraints, scaling_matrix=scaling_matrix, verbosity=verbosity, sim_index=sim_index)
 
-    # Monte Carlo simulation minimisation.
+    # Batched Monte Carlo simulation minimisation, with all simulations optimised together by the analysis API.
+    elif hasattr(cdp, 'sim_state') and cdp.sim_state == 1 and api.sim_batch(min_algor=min_algor, constraints=constraints):
+        # Reset the minimisation statistics.
+        for i in range(cdp.sim_number):
+            reset_min_stats(sim_index=i, verbosity=verbosity)
+
+        # Optimisation.
+        api.minimise_sims(min_algor=min_algor, min_options=min_options, func_tol=func_tol, grad_tol=grad_tol, max_iterations=max_iter, constraints=constraints, scaling_matrix=scaling_matrix, verbosity=verbosity, sim_indices=list(range(cdp.sim_number)))
+
+    # Monte Carlo simulation minimisation.  The analysis APIs add the slave commands for each simulation to the processor queue without executing it, so that all simulation and model pairs are executed together as independent slave commands below.
     elif hasattr(cdp, 'sim_state') and cdp.sim_state == 1:
         for i in range(cdp.sim_number):
             # Reset the minimisation statistics.
@@ -873,11 +873,15 @@ def create_spin(spin_num=None, spin_name=None, res_num=None, res_name=None, mol_
                     create_residue(mol_name=mol_name, res_num=res_num, res_name=res_name, pipe=pipe)
                     res_index = len(dp.mol[i].res) - 1
 
+            # The residues to loop over.
+            if res_index != None:
+                res_indices = [res_index]
+            else:
+                res_indices = range(len(dp.mol[i].res))
+
             # Loop over the residues.
-            for j in range(len(dp.mol[i].res)):
+            for j in res_indices:
                 # Skip non-matching residues.
-                if res_index != None and res_index != j:
-                    continue
                 if res_name and dp.mol[i].res[j].name != res_name:
                     continue
 
@@ -1874,6 +1878,10 @@ def index_residue(res_num=None, res_name=None, mol_index=None, pipe=None):
     if len(dp.mol[mol_index].res) == 1 and res_num == dp.mol[mol_index].res[0].num and res_name == dp.mol[mol_index].res[0].name:
         return 0
 
+    # A number match, using the look up table.
+    if res_num != None:
+        return dp.mol[mol_index].res.index_num(res_num)
+
     # Loop over the residues.
     i = 0
     for res in dp.mol[mol_index].res:
@@ -1960,7 +1968,7 @@ def metadata_cleanup(mol_index=None, res_index=None, spin_index=None, pipe=None)
     dp = pipes.get_pipe(pipe)
 
     # Update the metadata info counts.
-    metadata_counts(pipe_cont=dp)
+    metadata_counts(pipe_cont=dp, mol_index=mol_index, res_index=res_index)
 
     # Loop over the molecules.
     to_remove = []
@@ -1972,11 +1980,13 @@ def metadata_cleanup(mol_index=None, res_index=None, spin_index=None, pipe=None)
         # Alias.
         mol = dp.mol[i]
 
+        # The residues to loop over.
+        res_indices = range(len(mol.res))
+        if res_index != None:
+            res_indices = [res_index]
+
         # Loop over the residues.
-        for j in range(len(mol.res)):
-            # Residue skipping.
-            if res_index != None and res_index != j:
-                continue
+        for j in res_indices:
 
             # Alias.
             res = mol.res[j]
@@ -2008,13 +2018,38 @@ def metadata_cleanup(mol_index=None, res_index=None, spin_index=None, pipe=None)
                         dp.mol._spin_id_lookup.pop(spin_id)
 
 
-def metadata_counts(pipe_cont=None):
+def metadata_counts(pipe_cont=None, mol_index=None, res_index=None):
     """Update the molecule, residue, and spin name and number count metadata.
 
+    If the molecule index is supplied, then only the counts for the matching residues and their spins are updated, by replacing their previous contributions.  Otherwise all counts are recalculated.
+
+
     @keyword pipe_cont: The data pipe object.
     @type pipe_cont:    PipeContainer instance
+    @keyword mol_index: The index of the molecule to update the counts for.  If not supplied, all counts will be recalculated.
+    @type mol_index:    int or None
+    @keyword res_index: The index of the residue to update the counts for.  If not supplied, all residues of the molecule will be updated.
+    @type res_index:    int or None
     """
 
+    # Update only the counts of the given residues, if the counts exist.
+    if mol_index != None and hasattr(pipe_cont.mol, '_res_name_count') and hasattr(pipe_cont.mol[mol_index], '_res_name_count'):
+        # Alias.
+        mol = pipe_cont.mol[mol_index]
+
+        # The residues to loop over.
+        res_indices = range(len(mol.res))
+        if res_index != None:
+            res_indices = [res_index]
+
+        # Loop over the residues.
+        for j in res_indices:
+            # Replace the counts.
+            metadata_counts_residue(pipe_cont=pipe_cont, mol=mol, res=mol.res[j], replace=True)
+
+        # Nothing more to do.
+        return
+
     # The top level counts.
     pipe_cont.mol._res_name_count = {}
     pipe_cont.mol._res_num_count = {}
@@ -2034,85 +2069,125 @@ def metadata_counts(pipe_cont=None):
 
         # Loop over the residues.
         for j in range(len(mol.res)):
-            # Alias.
-            res = mol.res[j]
+            metadata_counts_residue(pipe_cont=pipe_cont, mol=mol, res=mol.res[j])
 
-            # Count the residue names.
-            if res.name != None:
-                # Top level.
-                if res.name not in pipe_cont.mol._res_name_count:
-                    pipe_cont.mol._res_name_count[res.name] = 1
-                else:
-                    pipe_cont.mol._res_name_count[res.name] += 1
 
-                # Molecule level.
-                if res.name not in mol._res_name_count:
-                    mol._res_name_count[res.name] = 1
-                else:
-                    mol._res_name_count[res.name] += 1
+def metadata_counts_residue(pipe_cont=None, mol=None, res=None, replace=False):
+    """Add the residue and spin name and number counts of the residue to the count metadata.
 
-            # Count the residue numbers.
-            if res.num != None:
-                # Top level.
-                if res.num not in pipe_cont.mol._res_num_count:
-                    pipe_cont.mol._res_num_count[res.num] = 1
-                else:
-                    pipe_cont.mol._res_num_count[res.num] += 1
+    The names and numbers counted are stored in the private res._counted tuple, so that the contribution of the residue can later be removed.
 
-                # Molecule level.
-                if res.num not in mol._res_num_count:
-                    mol._res_num_count[res.num] = 1
-                else:
-                    mol._res_num_count[res.num] += 1
 
-            # The residue level counts.
-            res._spin_name_count = {}
-            res._spin_num_count = {}
+    @keyword pipe_cont: The data pipe object.
+    @type pipe_cont:    PipeContainer instance
+    @keyword mol:       The molecule container holding the residue.
+    @type mol:          MoleculeContainer instance
+    @keyword res:       The residue container.
+    @type res:          ResidueContainer instance
+    @keyword replace:   A flag which if True will cause the previous contribution of the residue to be removed first.
+    @type replace:      bool
+    """
 
-            # Loop over the spins.
-            for k in range(len(res.spin)):
-                # Alias.
-                spin = res.spin[k]
+    # Remove the previous counts.
+    if replace and hasattr(res, '_counted'):
+        res_name, res_num, spin_info = res._counted
+        if res_name != None:
+            pipe_cont.mol._res_name_count[res_name] -= 1
+            mol._res_name_count[res_name] -= 1
+        if res_num != None:
+            pipe_cont.mol._res_num_count[res_num] -= 1
+            mol._res_num_count[res_num] -= 1
+        for spin_name, spin_num in spin_info:
+            if spin_name != None:
+                pipe_cont.mol._spin_name_count[spin_name] -= 1
+                mol._spin_name_count[spin_name] -= 1
+            if spin_num != None:
+                pipe_cont.mol._spin_num_count[spin_num] -= 1
+                mol._spin_num_count[spin_num] -= 1
+
+    # Count the residue names.
+    if res.name != None:
+        # Top level.
+        if res.name not in pipe_cont.mol._res_name_count:
+            pipe_cont.mol._res_name_count[res.name] = 1
+        else:
+            pipe_cont.mol._res_name_count[res.name] += 1
 
-                # Count the spin names.
-                if spin.name != None:
-                    # Top level.
-                    if spin.name not in pipe_cont.mol._spin_name_count:
-                        pipe_cont.mol._spin_name_count[spin.name] = 1
-                    else:
-                        pipe_cont.mol._spin_name_count[spin.name] += 1
+        # Molecule level.
+        if res.name not in mol._res_name_count:
+            mol._res_name_count[res.name] = 1
+        else:
+            mol._res_name_count[res.name] += 1
 
-                    # Molecule level.
-                    if spin.name not in mol._spin_name_count:
-                        mol._spin_name_count[spin.name] = 1
-                    else:
-                        mol._spin_name_count[spin.name] += 1
+    # Count the residue numbers.
+    if res.num != None:
+        # Top level.
+        if res.num not in pipe_cont.mol._res_num_count:
+            pipe_cont.mol._res_num_count[res.num] = 1
+        else:
+            pipe_cont.mol._res_num_count[res.num] += 1
 
-                    # Residue level.
-                    if spin.name not in res._spin_name_count:
-                        res._spin_name_count[spin.name] = 1
-                    else:
-                        res._spin_name_count[spin.name] += 1
+        # Molecule level.
+        if res.num not in mol._res_num_count:
+            mol._res_num_count[res.num] = 1
+        else:
+            mol._res_num_count[res.num] += 1
 
-                # Count the spin numbers.
-                if spin.num != None:
-                    # Top level.
-                    if spin.num not in pipe_cont.mol._spin_num_count:
-                        pipe_cont.mol._spin_num_count[spin.num] = 1
-                    else:
-                        pipe_cont.mol._spin_num_count[spin.num] += 1
+    # The residue level counts.
+    res._spin_name_count = {}
+    res._spin_num_count = {}
 
-                    # Molecule level.
-                    if spin.num not in mol._spin_num_count:
-                        mol._spin_num_count[spin.num] = 1
-                    else:
-                        mol._spin_num_count[spin.num] += 1
+    # Loop over the spins.
+    spin_info = []
+    for k in range(len(res.spin)):
+        # Alias.
+        spin = res.spin[k]
 
-                    # Residue level.
-                    if spin.num not in res._spin_num_count:
-                        res._spin_num_count[spin.num] = 1
-                    else:
-                        res._spin_num_count[spin.num] += 1
+        # Store the counted info.
+        spin_info.append((spin.name, spin.num))
+
+        # Count the spin names.
+        if spin.name != None:
+            # Top level.
+            if spin.name not in pipe_cont.mol._spin_name_count:
+                pipe_cont.mol._spin_name_count[spin.name] = 1
+            else:
+                pipe_cont.mol._spin_name_count[spin.name] += 1
+
+            # Molecule level.
+            if spin.name not in mol._spin_name_count:
+                mol._spin_name_count[spin.name] = 1
+            else:
+                mol._spin_name_count[spin.name] += 1
+
+            # Residue level.
+            if spin.name not in res._spin_name_count:
+                res._spin_name_count[spin.name] = 1
+            else:
+                res._spin_name_count[spin.name] += 1
+
+        # Count the spin numbers.
+        if spin.num != None:
+            # Top level.
+            if spin.num not in pipe_cont.mol._spin_num_count:
+                pipe_cont.mol._spin_num_count[spin.num] = 1
+            else:
+                pipe_cont.mol._spin_num_count[spin.num] += 1
+
+            # Molecule level.
+            if spin.num not in mol._spin_num_count:
+                mol._spin_num_count[spin.num] = 1
+            else:
+                mol._spin_num_count[spin.num] += 1
+
+            # Residue level.
+            if spin.num not in res._spin_num_count:
+                res._spin_num_count[spin.num] = 1
+            else:
+                res._spin_num_count[spin.num] += 1
+
+    # Store what has been counted.
+    res._counted = (res.name, res.num, spin_info)
 
 
 def metadata_prune(mol_index=None, res_index=None, spin_index=None, pipe=None):
@@ -2139,7 +2214,7 @@ def metadata_prune(mol_index=None, res_index=None, spin_index=None, pipe=None):
     dp = pipes.get_pipe(pipe)
 
     # Update the metadata info counts.
-    metadata_counts(pipe_cont=dp)
+    metadata_counts(pipe_cont=dp, mol_index=mol_index, res_index=res_index)
 
     # Loop over the molecules.
     to_remove = []
@@ -2151,15 +2226,21 @@ def metadata_prune(mol_index=None, res_index=None, spin_index=None, pipe=None):
         # Alias.
         mol = dp.mol[i]
 
+        # The residues to loop over.
+        res_indices = range(len(mol.res))
+        if res_index != None:
+            res_indices = [res_index]
+
         # Loop over the residues.
-        for j in range(len(mol.res)):
-            # Residue skipping.
-            if res_index != None and res_index != j:
-                continue
+        for j in res_indices:
 
             # Alias.
             res = mol.res[j]
 
+            # Remove the residue from the residue number look up table.
+            if spin_index == None and res.num != None and mol.res._res_num_lookup.get(res.num) == j:
+                mol.res._res_num_lookup.pop(res.num)
+
             # Loop over the spins.
             for k in range(len(res.spin)):
                 # Spin skipping.
@@ -2215,7 +2296,7 @@ def metadata_update(mol_index=None, res_index=None, spin_index=None, pipe=None):
     dp = pipes.get_pipe(pipe)
 
     # Update the metadata info counts.
-    metadata_counts(pipe_cont=dp)
+    metadata_counts(pipe_cont=dp, mol_index=mol_index, res_index=res_index)
 
     # Loop over the molecules.
     for i in range(len(dp.mol)):
@@ -2229,11 +2310,17 @@ def metadata_update(mol_index=None, res_index=None, spin_index=None, pipe=None):
         # Update the molecule metadata.
         mol._mol_index = i
 
+        # Rebuild the residue number look up table, if all residues are to be updated.
+        if res_index == None:
+            mol.res.update_num_lookup()
+
+        # The residues to loop over.
+        res_indices = range(len(mol.res))
+        if res_index != None:
+            res_indices = [res_index]
+
         # Loop over the residues.
-        for j in range(len(mol.res)):
-            # Residue skipping.
-            if res_index != None and res_index != j:
-                continue
+        for j in res_indices:
 
             # Alias.
             res = mol.res[j]
@@ -2243,6 +2330,10 @@ def metadata_update(mol_index=None, res_index=None, spin_index=None, pipe=None):
             res._mol_index = i
             res._res_index = j
 
+            # Update the residue number look up table.
+            if res_index != None:
+                mol.res.register_num(j)
+
             # Loop over the spins.
             for k in range(len(res.spin)):
                 # Spin skipping.
@@ -2771,6 +2862,7 @@ def return_residue(selection=None, pipe=None, indices=False):
 
     # Parse the selection string.
     select_obj = Selection(selection)
+    res_nums = select_obj.residue_numbers()
 
     # Loop over the molecules.
     res = None
@@ -2784,8 +2876,18 @@ def return_residue(selection=None, pipe=None, indices=False):
         # Store the molecule index.
         mol_index = i
 
+        # The residues to loop over, using the look up table for residue number selections.
+        res_indices = range(len(dp.mol[i].res))
+        if res_nums != None:
+            res_indices = set()
+            for num in res_nums:
+                index = dp.mol[i].res.index_num(num)
+                if index != None:
+                    res_indices.add(index)
+            res_indices = sorted(res_indices)
+
         # Loop over the residues.
-        for j in range(len(dp.mol[i].res)):
+        for j in res_indices:
             # Skip the residue if there is no match to the selection.
             if not select_obj.contains_res(res_num=dp.mol[i].res[j].num, res_name=dp.mol[i].res[j].name, mol=dp.mol[i].name):
                 continue
@@ -2830,6 +2932,17 @@ def return_residue_by_info(mol=None, res_name=None, res_num=None):
         # Return the residue.
         return mol.res[0]
 
+    # Find the residue number using the look up table.
+    if res_num != None:
+        # No such residue.
+        index = mol.res.index_num(res_num)
+        if index == None:
+            return None
+
+        # Return the matching residue.
+        if res_name == None or mol.res[index].name == res_name:
+            return mol.res[index]
+
     # Loop over the residues.
     for res in mol.res:
         # Return the matching residue.
@@ -2959,6 +3072,14 @@ def return_spin_from_selection(selection=None, pipe=None, full_info=False, multi
     # Parse the selection string.
     select_obj = Selection(selection)
 
+    # A unique spin ID, possibly intersected with other selections, so that only the spin from the look up table needs to be checked.
+    indices = None
+    if selection and '|' not in selection:
+        for spin_id in selection.split('&'):
+            if spin_id.strip() in dp.mol._spin_id_lookup:
+                indices = dp.mol._spin_id_lookup[spin_id.strip()]
+                break
+
     # Loop over the molecules.
     spin_num = 0
     spins = []
@@ -2966,19 +3087,28 @@ def return_spin_from_selection(selection=None, pipe=None, full_info=False, multi
     res_nums = []
     res_names = []
     spin_ids = []
-    for mol in dp.mol:
+    mol_list = dp.mol
+    if indices:
+        mol_list = [dp.mol[indices[0]]]
+    for mol in mol_list:
         # Skip the molecule if there is no match to the selection.
         if not select_obj.contains_mol(mol=mol.name):
             continue
 
         # Loop over the residues.
-        for res in mol.res:
+        res_list = mol.res
+        if indices:
+            res_list = [mol.res[indices[1]]]
+        for res in res_list:
             # Skip the residue if there is no match to the selection.
             if not select_obj.contains_res(res_num=res.num, res_name=res.name, mol=mol.name):
                 continue
 
             # Loop over the spins.
-            for spin in res.spin:
+            spin_list = res.spin
+            if indices:
+                spin_list = [res.spin[indices[2]]]
+            for spin in spin_list:
                 # Skip the spin if there is no match to the selection.
                 if not select_obj.contains_spin(spin_num=spin.num, spin_name=spin.name, res_num=res.num, res_name=res.name, mol=mol.name):
                     continue
@@ -26,7 +26,7 @@
 
 # Python module imports.
 from copy import deepcopy
-from numpy import float64, array, zeros
+from numpy import arange, argmin, array, float64, isnan, repeat, tile, where, zeros
 from time import asctime, localtime
 
 # relax module imports.
@@ -38,7 +38,7 @@ from pipe_control import value
 from specific_analyses.api import return_api
 
 
-def map(params=None, map_type='Iso3D', spin_id=None, inc=20, lower=None, upper=None, axis_incs=10, file_prefix="map", dir="dx", point=None, point_file="point", chi_surface=None, create_par_file=False):
+def map(params=None, map_type='Iso3D', spin_id=None, inc=20, lower=None, upper=None, axis_incs=10, file_prefix="map", dir="dx", point=None, point_file="point", chi_surface=None, create_par_file=False, refine=0):
     """Map the space corresponding to the spin identifier and create the OpenDX files.
 
     @keyword params:            The list of model parameters to map.
@@ -66,6 +66,8 @@ def map(params=None, map_type='Iso3D', spin_id=None, inc=20, lower=None, upper=N
     @type point_file:           str or None
     @keyword create_par_file:   Whether to create a file with parameters and associated chi2 value.
     @type create_par_file:      bool
+    @keyword refine:            The number of adaptive refinement levels.  Each level creates an additional map, with the same number of increments, spanning two increments either side of the lowest chi2 point of the previous map.
+    @type refine:               int
     """
 
     # Check the args.
@@ -80,7 +82,29 @@ def map(params=None, map_type='Iso3D', spin_id=None, inc=20, lower=None, upper=N
             raise RelaxError("The 3D isosurface map requires a 3 parameter model.")
 
         # Create the map.
-        Map(params, spin_id, inc, lower, upper, axis_incs, file_prefix, dir, point, point_file, chi_surface, create_par_file)
+        space = Map(params, spin_id, inc, lower, upper, axis_incs, file_prefix, dir, point, point_file, chi_surface, create_par_file)
+
+        # Adaptive refinement around the minimum.
+        for level in range(1, refine+1):
+            # No minimum found.
+            if space.min_point is None:
+                break
+
+            # The box of two increments either side of the minimum, kept within the previous map.
+            lower = space.min_point - 2.0 * space.step_size
+            upper = space.min_point + 2.0 * space.step_size
+            lower = where(lower < space.bounds[:, 0], space.bounds[:, 0], lower)
+            upper = where(upper > space.bounds[:, 1], space.bounds[:, 1], upper)
+
+            # The refinement file names.
+            suffix = "_refine%i" % level
+            level_point_file = point_file
+            if point_file != None:
+                level_point_file = point_file + suffix
+
+            # Create the refined map.
+            print("\nRefinement level %i, with the minimum chi2 value of %s at %s." % (level, space.min_chi2, space.min_point))
+            space = Map(params, spin_id, inc, list(lower), list(upper), axis_incs, file_prefix+suffix, dir, point, level_point_file, chi_surface, create_par_file)
     else:
         raise RelaxError("The map type '" + map_type + "' is not supported.")
 
@@ -152,6 +176,9 @@ class Map:
         self.step_size = zeros(self.n, float64)
         self.step_size = (self.bounds[:, 1] - self.bounds[:, 0]) / self.inc
 
+        # The vectorised mapping function of the analysis, if available.
+        self.func = self.api.map_func(params=self.params, spin_id=self.spin_id)
+
 
         # Create all the OpenDX data and files.
         #######################################
@@ -203,24 +230,30 @@ class Map:
             write_point(file_prefix=self.point_file, dir=self.dir, inc=self.inc, point=self.point, num_points=self.num_points, bounds=self.bounds, N=self.n)
 
 
-    def calc_point_par_chi2(self):
-        """Function for chi2 value for the points."""
+    def calc_chi2(self, points):
+        """Calculate the chi2 values for the given points.
 
-        # Print out.
-        print("\nCalculate chi2 value for the point parameters.")
+        The vectorised mapping function of the analysis is used if available.  Otherwise the parameter values are set, the function values calculated, and the chi2 value of the model statistics returned for each point in turn.
 
-        # Define nested listed, which holds parameter values and chi2 value.
-        par_chi2_vals = []
 
-        # Loop over the points.
-        for i in range(self.num_points):
-            i_point = self.point[i]
+        @param points:  The parameter values, one point per row.
+        @type points:   numpy rank-2 float64 array
+        @return:        The chi2 values.
+        @rtype:         numpy rank-1 float64 array
+        """
+
+        # All points at once.
+        if self.func != None:
+            return array(self.func(points), float64)
 
+        # Loop over the points.
+        chi2 = zeros(len(points), float64)
+        for i in range(len(points)):
             # Set the parameter values.
             if self.spin_id:
-                value.set(val=i_point, param=self.params, spin_id=self.spin_id, force=True)
+                value.set(val=points[i], param=self.params, spin_id=self.spin_id, verbosity=0, force=True)
             else:
-                value.set(val=i_point, param=self.params, force=True)
+                value.set(val=points[i], param=self.params, verbosity=0, force=True)
 
             # Calculate the function values.
             if self.spin_id:
@@ -230,12 +263,28 @@ class Map:
 
             # Get the minimisation statistics for the model.
             if self.spin_id:
-                k, n, chi2 = self.api.model_statistics(spin_id=self.spin_id)
+                k, n, chi2[i] = self.api.model_statistics(spin_id=self.spin_id)
             else:
-                k, n, chi2 = self.api.model_statistics(model_info=0)
+                k, n, chi2[i] = self.api.model_statistics(model_info=0)
+
+        # Return the values.
+        return chi2
+
+
+    def calc_point_par_chi2(self):
+        """Function for chi2 value for the points."""
 
-            # Assign value to nested list.
-            par_chi2_vals.append([i, i_point[0], i_point[1], i_point[2], chi2])
+        # Print out.
+        print("\nCalculate chi2 value for the point parameters.")
+
+        # The chi2 values for all points.
+        points = array(self.point, float64)
+        chi2 = self.calc_chi2(points)
+
+        # Define nested listed, which holds parameter values and chi2 value.
+        par_chi2_vals = []
+        for i in range(self.num_points):
+            par_chi2_vals.append([i, points[i, 0], points[i, 1], points[i, 2], chi2[i]])
 
         # Return list
         return par_chi2_vals
@@ -314,16 +363,26 @@ class Map:
 
 
     def map_3D_text(self, map_file):
-        """Function for creating the text of a 3D map."""
+        """Function for creating the text of a 3D map.
+
+        The grid points are evaluated one plane of the first parameter at a time, and the map is written from the resulting array of chi2 values.
+        """
 
         # Initialise.
-        values = zeros(3, float64)
+        num = self.inc + 1
         percent = 0.0
-        percent_inc = 100.0 / (self.inc + 1.0)**(self.n - 1.0)
+        percent_inc = 100.0 / num
         print("%-10s%8.3f%-1s" % ("Progress:", percent, "%"))
 
-        # Collect all chi2, to help finding a reasobale chi level for the Innermost, Inner, Middle and Outer Isosurface.
-        all_chi = []
+        # The parameter values along each axis.
+        axes = []
+        for i in range(self.n):
+            axes.append(self.bounds[i, 0] + arange(num) * self.step_size[i])
+
+        # The points of a single plane, with the third parameter changing fastest.
+        points = zeros((num**2, 3), float64)
+        points[:, 1] = repeat(axes[1], num)
+        points[:, 2] = tile(axes[2], num)
 
         # Fix the diffusion tensor.
         unfix = False
@@ -331,76 +390,49 @@ class Map:
             cdp.diff_tensor.fixed = True
             unfix = True
 
-        # Initial value of the first parameter.
-        values[0] = self.bounds[0, 0]
-
-        # Define counter
-        counter = 0
-
-        # Loop over the first parameter.
-        for i in range((self.inc + 1)):
-            # Initial value of the second parameter.
-            values[1] = self.bounds[1, 0]
-
-            # Loop over the second parameter.
-            for j in range((self.inc + 1)):
-                # Initial value of the third parameter.
-                values[2] = self.bounds[2, 0]
-
-                # Loop over the third parameter.
-                for k in range((self.inc + 1)):
-                    # Set the parameter values.
-                    if self.spin_id:
-                        value.set(val=values, param=self.params, spin_id=self.spin_id, verbosity=0, force=True)
-                    else:
-                        value.set(val=values, param=self.params, verbosity=0, force=True)
+        # Loop over the planes of the first parameter.
+        all_points = zeros((num**3, 3), float64)
+        all_chi2 = zeros(num**3, float64)
+        for i in range(num):
+            # The chi2 values of the plane.
+            points[:, 0] = axes[0][i]
+            chi2 = self.calc_chi2(points)
 
-                    # Calculate the function values.
-                    if self.spin_id:
-                        self.api.calculate(spin_id=self.spin_id, verbosity=0)
-                    else:
-                        self.api.calculate(verbosity=0)
+            # Store the values.
+            all_points[i*num**2:(i+1)*num**2] = points
+            all_chi2[i*num**2:(i+1)*num**2] = chi2
 
-                    # Get the minimisation statistics for the model.
-                    if self.spin_id:
-                        k, n, chi2 = self.api.model_statistics(spin_id=self.spin_id)
-                    else:
-                        k, n, chi2 = self.api.model_statistics(model_info=0)
+            # Progress incrementation and printout.
+            percent = percent + percent_inc
+            print("%-10s%8.3f%-8s%-8g" % ("Progress:", percent, "%,  " + repr(points[-1]) + ",  f(x): ", chi2[-1]))
 
-                    # Set maximum value to 1e20 to stop the OpenDX server connection from breaking.
-                    if chi2 > 1e20:
-                        map_file.write("%30f\n" % 1e20)
-                    else:
-                        map_file.write("%30f\n" % chi2)
-
-                        # Save all values of chi2. To help find reasonale level for the Innermost, Inner, Middle and Outer Isosurface.
-                        all_chi.append(chi2)
-
-                    # Assign value to nested list.
-                    self.par_chi2_vals.append([counter, values[0], values[1], values[2], chi2])
-
-                    # Add to counter.
-                    counter += 1
+        # Unfix the diffusion tensor.
+        if unfix:
+            cdp.diff_tensor.fixed = False
 
-                    # Increment the value of the third parameter.
-                    values[2] = values[2] + self.step_size[2]
+        # Set maximum value to 1e20 to stop the OpenDX server connection from breaking.
+        capped = all_chi2 > 1e20
+        map_chi2 = where(capped, 1e20, all_chi2)
 
-                # Progress incrementation and printout.
-                percent = percent + percent_inc
-                print("%-10s%8.3f%-8s%-8g" % ("Progress:", percent, "%,  " + repr(values) + ",  f(x): ", chi2))
+        # Write the map.
+        map_file.write("".join(["%30f\n" % chi2 for chi2 in map_chi2]))
 
-                # Increment the value of the second parameter.
-                values[1] = values[1] + self.step_size[1]
+        # Save all values of chi2, excluding the capped values.  To help find reasonable levels for the Innermost, Inner, Middle and Outer Isosurface.
+        self.all_chi = all_chi2[~capped]
 
-            # Increment the value of the first parameter.
-            values[0] = values[0] + self.step_size[0]
+        # The nested list of parameter values and chi2 values.
+        for i in range(num**3):
+            self.par_chi2_vals.append([i, all_points[i, 0], all_points[i, 1], all_points[i, 2], all_chi2[i]])
 
-        # Unfix the diffusion tensor.
-        if unfix:
-            cdp.diff_tensor.fixed = False
+        # The minimum of the map.
+        self.min_point = None
+        self.min_chi2 = None
+        valid = ~isnan(all_chi2)
+        if valid.any():
+            index = argmin(where(valid, all_chi2, float('inf')))
+            self.min_point = all_points[index]
+            self.min_chi2 = all_chi2[index]
 
-        # Save all chi2 values.
-        self.all_chi = all_chi
 
     def map_axes(self):
         """Function for creating labels, tick locations, and tick values for an OpenDX map."""
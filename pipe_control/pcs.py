@@ -26,14 +26,14 @@
 # Python module imports.
 from copy import deepcopy
 from math import ceil, floor, pi, sqrt
-from numpy import array, eye, float64, int32, ones, std, zeros
+from numpy import array, float64, int32, ones, std, zeros
 from numpy.linalg import norm
-from numpy.random import multivariate_normal
+from numpy.random import normal
 import sys
 from warnings import warn
 
 # relax module imports.
-from lib.alignment.pcs import ave_pcs_tensor, pcs_tensor
+from lib.alignment.pcs import ave_pcs_tensor, pcs_tensor_batch
 from lib.check_types import is_float
 from lib.errors import RelaxError, RelaxNoAlignError, RelaxNoPdbError, RelaxNoPCSError, RelaxNoSequenceError
 from lib.io import open_write_file, write_data
@@ -1079,7 +1079,7 @@ def setup_pseudoatom_pcs():
                 spin.select = False
 
 
-def structural_noise(align_id=None, rmsd=0.2, sim_num=1000, file=None, dir=None, force=False):
+def structural_noise(align_id=None, rmsd=0.2, sim_num=1000, file=None, dir=None, force=False, chunk=None):
     """Determine the PCS error due to structural noise via simulation.
 
     For the simulation the following must already be set up in the current data pipe:
@@ -1098,6 +1098,8 @@ def structural_noise(align_id=None, rmsd=0.2, sim_num=1000, file=None, dir=None,
 
     If the alignment ID string is not supplied, the procedure will be applied to the PCS data from all alignments.
 
+    The randomised positions of a block of spins are generated together, and the PCS values for all alignments are back calculated together using lib.alignment.pcs.pcs_tensor_batch().
+
 
     @keyword align_id:  The alignment tensor ID string.
     @type align_id:     str
@@ -1111,6 +1113,8 @@ def structural_noise(align_id=None, rmsd=0.2, sim_num=1000, file=None, dir=None,
     @type dir:          None or str
     @keyword force:     A flag which if True will cause any pre-existing file to be overwritten.
     @type force:        bool
+    @keyword chunk:     The number of spins to simulate at once, to limit the memory usage.  If None, the number of spins is chosen so that one million positions are simulated at once.
+    @type chunk:        None or int
     """
 
     # Check the pipe setup.
@@ -1124,19 +1128,23 @@ def structural_noise(align_id=None, rmsd=0.2, sim_num=1000, file=None, dir=None,
 
     # Initialise some numpy data structures for use in the simulations.
     grace_data = []
-    unit_vect = zeros(3, float64)
-    pcs = {}
     for id in align_ids:
         grace_data.append([])
-        pcs[id] = zeros(sim_num, float64)
 
-    # Pre-calculate the covariance matrix as the spherical covariance.
-    cov = rmsd**2 * eye(3)
+    # The PCS constants without the distance dependence, and the alignment tensors.
+    consts = zeros(len(align_ids), float64)
+    tensors = zeros((len(align_ids), 3, 3), float64)
+    for i in range(len(align_ids)):
+        consts[i] = pcs_constant(cdp.temperature[align_ids[i]], cdp.spectrometer_frq[align_ids[i]] * 2.0 * pi / periodic_table.gyromagnetic_ratio('1H'), 1.0)
+        tensors[i] = cdp.align_tensors[get_tensor_index(align_ids[i])].A
 
     # Print out.
     print("Executing %i simulations for each spin system." % sim_num)
 
-    # Loop over the spins.
+    # Collect the spins and their positions.
+    spins = []
+    spin_ids = []
+    positions = []
     for spin, spin_id in spin_loop(return_id=True):
         # Deselected spins.
         if not spin.select:
@@ -1160,63 +1168,61 @@ def structural_noise(align_id=None, rmsd=0.2, sim_num=1000, file=None, dir=None,
                 pos += spin.pos[i]
             pos = pos / len(spin.pos)
 
-        # The original vector length (for the Grace plot).
-        orig_vect = pos - cdp.paramagnetic_centre
-        orig_r = norm(orig_vect)
-
-        # Sample from the multivariate normal distribution.
-        new_pos = multivariate_normal(pos, cov, sim_num)
-
-        # Loop over the N randomisations.
-        for i in range(sim_num):
-            # The vector and length.
-            vect = new_pos[i] - cdp.paramagnetic_centre
-            r = norm(vect)
-            vect = vect / r
-
-            # Loop over the alignments.
-            for id in align_ids:
-                # No PCS value, so skip.
-                if id not in spin.pcs:
-                    continue
+        # Store the data.
+        spins.append(spin)
+        spin_ids.append(spin_id)
+        positions.append(pos)
+    positions = array(positions, float64)
 
-                # Calculate the PCS constant.
-                dj = pcs_constant(cdp.temperature[id], cdp.spectrometer_frq[id] * 2.0 * pi / periodic_table.gyromagnetic_ratio('1H'), r/1e10)
+    # The number of spins per block.
+    if chunk == None:
+        chunk = max(1, 1000000 // sim_num)
+
+    # Loop over the blocks of spins.
+    sd = zeros((len(align_ids), len(spins)), float64)
+    for i in range(0, len(spins), chunk):
+        # Sample from the spherical multivariate normal distribution.
+        new_pos = normal(scale=rmsd, size=(len(positions[i:i+chunk]), sim_num, 3)) + positions[i:i+chunk, None, :]
 
-                # Calculate the PCS value (in ppm).
-                pcs[id][i] = pcs_tensor(dj, vect, cdp.align_tensors[get_tensor_index(id)].A) * 1e6
+        # The vectors, in meters.
+        vect = (new_pos - cdp.paramagnetic_centre) / 1e10
+
+        # The PCS standard deviations (in ppm) for all alignments.
+        sd[:, i:i+chunk] = std(pcs_tensor_batch(consts, vect, tensors) * 1e6, axis=2)
+
+    # Loop over the spins.
+    for j in range(len(spins)):
+        spin = spins[j]
+        spin_id = spin_ids[j]
+
+        # The original vector length (for the Grace plot).
+        orig_r = norm(positions[j] - cdp.paramagnetic_centre)
 
         # Initialise if necessary.
         if not hasattr(spin, 'pcs_struct_err'):
             spin.pcs_struct_err = {}
 
         # Loop over the alignments.
-        align_index = 0
-        for id in align_ids:
+        for align_index in range(len(align_ids)):
+            id = align_ids[align_index]
+
             # No PCS value, so skip.
             if id not in spin.pcs or spin.pcs[id] == None:
-                align_index += 1
                 continue
 
-            # The PCS standard deviation.
-            sd = std(pcs[id])
-
             # Remove the previous error.
             if id in spin.pcs_struct_err:
                 warn(RelaxWarning("Removing the previous structural error value from the PCS error of the spin '%s' for the alignment ID '%s'." % (spin_id, id)))
                 spin.pcs_err[id] = sqrt(spin.pcs_err[id]**2 - spin.pcs_struct_err[id]**2)
 
             # Store the structural error.
-            spin.pcs_struct_err[id] = sd
+            spin.pcs_struct_err[id] = sd[align_index, j]
 
             # Add it to the PCS error (with variance addition).
-            spin.pcs_err[id] = sqrt(spin.pcs_err[id]**2 + sd**2)
+            spin.pcs_err[id] = sqrt(spin.pcs_err[id]**2 + sd[align_index, j]**2)
 
             # Store the data for the Grace plot.
-            grace_data[align_index].append([orig_r, sd, spin_id])
-
-            # Increment the alignment index.
-            align_index += 1
+            grace_data[align_index].append([orig_r, sd[align_index, j], spin_id])
 
     # The Grace output.
     if file:
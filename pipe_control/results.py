@@ -29,8 +29,10 @@ import sys
 
 # relax module imports.
 from data_store import Relax_data_store; ds = Relax_data_store()
+from lib.check_types import is_filetype
 from lib.errors import RelaxError, RelaxFileEmptyError
-from lib.io import extract_data, get_file_path, open_read_file, open_write_file, strip
+from lib.io import determine_compression, extract_data, get_file_path, open_read_file, open_write_file, strip
+from lib.xml import is_binary_format, remove_binary
 from pipe_control import interatomic, mol_res_spin, pipes
 from pipe_control.pipes import check_pipe
 from specific_analyses.model_free.back_compat import read_columnar_results
@@ -86,6 +88,14 @@ def read(file='results', dir=None):
     # Get the full file path, for later use.
     file_path = get_file_path(file_name=file, dir=dir)
 
+    # The binary relax format.
+    binary_path = determine_compression(file_path)[1]
+    if is_binary_format(binary_path):
+        ds.from_binary(binary_path, dir=dirname(file_path), pipe_to=pipes.cdp_name())
+        mol_res_spin.metadata_update()
+        interatomic.metadata_update()
+        return
+
     # Open the file.
     file = open_read_file(file_name=file_path)
 
@@ -120,8 +130,22 @@ def read(file='results', dir=None):
     interatomic.metadata_update()
 
 
-def write(file="results", dir=None, force=False, compress_type=1, verbosity=1):
-    """Create the results file."""
+def write(file="results", dir=None, force=False, compress_type=1, format='xml', verbosity=1):
+    """Create the results file.
+
+    @keyword file:          The name of the file to output results to.
+    @type file:             str or file object
+    @keyword dir:           The directory name.  The special name 'pipe_name' will place the file into a directory with the same name as the current data pipe.
+    @type dir:              str or None
+    @keyword force:         A flag which if True will cause the results file to be overwritten.
+    @type force:            bool
+    @keyword compress_type: The compression type.  The integer values correspond to the compression type: 0, no compression; 1, Bzip2 compression; 2, Gzip compression.
+    @type compress_type:    int
+    @keyword format:        The format of the results file, either 'xml' or 'binary'.  The binary format is never compressed.
+    @type format:           str
+    @keyword verbosity:     The verbosity level.
+    @type verbosity:        int
+    """
 
     # Test if the current data pipe exists.
     check_pipe()
@@ -130,11 +154,19 @@ def write(file="results", dir=None, force=False, compress_type=1, verbosity=1):
     if dir == 'pipe_name':
         dir = pipes.cdp_name()
 
-    # Open the file for writing.
-    results_file = open_write_file(file_name=file, dir=dir, force=force, compress_type=compress_type, verbosity=verbosity)
+    # Unlink rather than truncate an overwritten binary relax file, as its arrays may be memory-mapped by the relax data store.
+    if force and not is_filetype(file):
+        remove_binary(get_file_path(file, dir))
 
-    # Write the results.
-    ds.to_xml(results_file, pipes=pipes.cdp_name())
+    # Write the results in the binary format.
+    if format == 'binary':
+        results_file = open_write_file(file_name=file, dir=dir, force=force, compress_type=0, verbosity=verbosity, binary=True)
+        ds.to_binary(results_file, pipes=pipes.cdp_name())
+
+    # Write the results as XML.
+    else:
+        results_file = open_write_file(file_name=file, dir=dir, force=force, compress_type=compress_type, verbosity=verbosity)
+        ds.to_xml(results_file, pipes=pipes.cdp_name())
 
     # Close the results file.
     results_file.close()
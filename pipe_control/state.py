@@ -24,8 +24,10 @@
 
 # relax module imports.
 from data_store import Relax_data_store; ds = Relax_data_store()
+from lib.check_types import is_filetype
 from lib.errors import RelaxError
-from lib.io import open_read_file, open_write_file
+from lib.io import determine_compression, get_file_path, open_read_file, open_write_file
+from lib.xml import is_binary_format, remove_binary
 from pipe_control import interatomic, mol_res_spin, pipes
 from pipe_control.reset import reset
 from status import Status; status = Status()
@@ -45,7 +47,7 @@ def load_pickle(file):
     file.close()
 
     # Black list of objects (all dict objects, non-modifiable objects, data store specific methods, and other special objects).
-    black_list = dir(dict) + ['__weakref__', '__dict__', '__module__', '__reset__', '_back_compat_hook', 'add', 'from_xml', 'is_empty', 'to_xml']
+    black_list = dir(dict) + ['__weakref__', '__dict__', '__module__', '__reset__', '_back_compat_hook', 'add', 'from_binary', 'from_xml', 'is_empty', 'to_binary', 'to_xml']
 
     # Loop over the objects in the saved state, and dump them into the relax data store.
     for name in dir(state):
@@ -84,8 +86,18 @@ def load_state(state=None, dir=None, verbosity=1, force=False):
     @type force:        bool
     """
 
+    # The binary relax format.
+    binary_path = None
+    if not is_filetype(state):
+        binary_path = determine_compression(get_file_path(state, dir))[1]
+        if not is_binary_format(binary_path):
+            binary_path = None
+
     # Open the file for reading.
-    file = open_read_file(file_name=state, dir=dir, verbosity=verbosity)
+    if binary_path == None:
+        file = open_read_file(file_name=state, dir=dir, verbosity=verbosity)
+    elif verbosity:
+        print("Opening the binary relax file " + repr(binary_path) + " for reading.")
 
     # Reset.
     if force:
@@ -95,8 +107,13 @@ def load_state(state=None, dir=None, verbosity=1, force=False):
     if not ds.is_empty():
         raise RelaxError("The relax data store is not empty.")
 
+    # Restore from the binary format.
+    if binary_path != None:
+        ds.from_binary(binary_path)
+
     # Restore from the XML.
-    ds.from_xml(file)
+    else:
+        ds.from_xml(file)
 
     # Update all of the required metadata structures.
     for pipe, pipe_name in pipes.pipe_loop(name=True):
@@ -110,7 +127,7 @@ def load_state(state=None, dir=None, verbosity=1, force=False):
     status.observers.state_load.notify()
 
 
-def save_state(state=None, dir=None, compress_type=1, verbosity=1, force=False):
+def save_state(state=None, dir=None, compress_type=1, format='xml', verbosity=1, force=False):
     """Function for saving the program state.
 
     @keyword state:         The saved state file.
@@ -125,13 +142,24 @@ def save_state(state=None, dir=None, compress_type=1, verbosity=1, force=False):
     @keyword compress_type: The compression type.  The integer values correspond to the compression
                             type: 0, no compression; 1, Bzip2 compression; 2, Gzip compression.
     @type compress_type:    int
+    @keyword format:        The format of the state file, either 'xml' or 'binary'.  The binary
+                            format is never compressed.
+    @type format:           str
     """
 
-    # Open the file for writing.
-    file = open_write_file(file_name=state, dir=dir, verbosity=verbosity, force=force, compress_type=compress_type)
+    # Unlink rather than truncate an overwritten binary relax file, as its arrays may be memory-mapped by the relax data store.
+    if force and not is_filetype(state):
+        remove_binary(get_file_path(state, dir))
+
+    # Save in the binary format.
+    if format == 'binary':
+        file = open_write_file(file_name=state, dir=dir, verbosity=verbosity, force=force, compress_type=0, binary=True)
+        ds.to_binary(file)
 
     # Save as XML.
-    ds.to_xml(file)
+    else:
+        file = open_write_file(file_name=state, dir=dir, verbosity=verbosity, force=force, compress_type=compress_type)
+        ds.to_xml(file)
 
     # Close the file.
     file.close()
@@ -1190,7 +1190,7 @@ def read_gaussian(file=None, dir=None, set_mol_name=None, set_model_num=None, ve
     cdp.structure.load_gaussian(file_path, set_mol_name=set_mol_name, set_model_num=set_model_num, verbosity=verbosity)
 
 
-def read_pdb(file=None, dir=None, read_mol=None, set_mol_name=None, read_model=None, set_model_num=None, alt_loc=None, verbosity=1, merge=False, fail=True):
+def read_pdb(file=None, dir=None, read_mol=None, set_mol_name=None, read_model=None, set_model_num=None, alt_loc=None, atom_id=None, verbosity=1, merge=False, fail=True):
     """The PDB loading function.
 
     @keyword file:          The name of the PDB file to read.
@@ -1207,6 +1207,8 @@ def read_pdb(file=None, dir=None, read_mol=None, set_mol_name=None, read_model=N
     @type set_model_num:    None, int, or list of int
     @keyword alt_loc:       The PDB ATOM record 'Alternate location indicator' field value to select which coordinates to use.
     @type alt_loc:          str or None
+    @keyword atom_id:       The atom ID selection string.  If supplied, only the matching atoms will be loaded.
+    @type atom_id:          str or None
     @keyword verbosity:     The amount of information to print to screen.  Zero corresponds to minimal output while higher values increase the amount of output.  The default value is 1.
     @type verbosity:        int
     @keyword merge:         A flag which if set to True will try to merge the PDB structure into the currently loaded structures.
@@ -1244,7 +1246,7 @@ def read_pdb(file=None, dir=None, read_mol=None, set_mol_name=None, read_model=N
         cdp.structure = Internal()
 
     # Load the structures.
-    cdp.structure.load_pdb(file_path, read_mol=read_mol, set_mol_name=set_mol_name, read_model=read_model, set_model_num=set_model_num, alt_loc=alt_loc, verbosity=verbosity, merge=merge)
+    cdp.structure.load_pdb(file_path, read_mol=read_mol, set_mol_name=set_mol_name, read_model=read_model, set_model_num=set_model_num, alt_loc=alt_loc, atom_id=atom_id, verbosity=verbosity, merge=merge)
 
     # Load into Molmol (if running).
     molmol.molmol_obj.open_pdb()
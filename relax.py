@@ -89,6 +89,7 @@ def start(mode=None, profile_flag=False):
         relax.tee_file = None
         relax.multiprocessor_type = 'uni'
         relax.n_processors = 1
+        relax.dispatch_mode = 'static'
 
     # Process the command line arguments.
     else:
@@ -102,7 +103,7 @@ def start(mode=None, profile_flag=False):
     verbosity = 0
     if status.debug:
         verbosity = 1
-    processor = load_multiprocessor(relax.multiprocessor_type, callbacks, processor_size=relax.n_processors, verbosity=verbosity)
+    processor = load_multiprocessor(relax.multiprocessor_type, callbacks, processor_size=relax.n_processors, verbosity=verbosity, dispatch_mode=relax.dispatch_mode)
 
     # Place the processor fabric intro string into the info box.
     info = Info_box()
@@ -293,8 +294,9 @@ class Relax:
 
         # Recognised command line options for the multiprocessor.
         group = OptionGroup(parser, 'Multi-processor options')
-        group.add_option('-m', '--multi', action='store', type='string', dest='multiprocessor', default='uni', help='set multi processor method')
+        group.add_option('-m', '--multi', action='store', type='string', dest='multiprocessor', default='uni', help="set multi processor method, one of 'uni', 'mpi4py' or 'multiprocessing'")
         group.add_option('-n', '--processors', action='store', type='int', dest='n_processors', default=-1, help='set number of processors (may be ignored)')
+        group.add_option('--dispatch', action='store', type='choice', choices=['static', 'dynamic'], dest='dispatch_mode', default='static', help="set the multi processor command dispatch mode, either 'static' for one chunk of commands per slave or 'dynamic' for sending the most expensive commands first to whichever slave is idle")
         parser.add_option_group(group)
 
         # Recognised command line options for IO redirection.
@@ -406,10 +408,13 @@ class Relax:
         # Set the multi-processor type and number.
         self.multiprocessor_type = options.multiprocessor
         self.n_processors = options.n_processors
+        self.dispatch_mode = options.dispatch_mode
 
         # Checks for the multiprocessor mode.
         if self.multiprocessor_type == 'mpi4py' and not dep_check.mpi4py_module:
             parser.error(dep_check.mpi4py_message)
+        if self.multiprocessor_type == 'multiprocessing' and not dep_check.multiprocessing_module:
+            parser.error(dep_check.multiprocessing_message)
 
 
         # Determine the relax mode and test for mutually exclusive modes.
@@ -386,6 +386,24 @@ class API_base(object):
         raise RelaxImplementError('map_bounds')
 
 
+    def map_func(self, params=None, spin_id=None):
+        """Create the function for the vectorised OpenDX chi-squared space mapping.
+
+        The returned function accepts a rank-2 array of parameter values, one point per row and one column per mapped parameter, and returns the chi-squared value of each point without modifying the current data pipe.
+
+
+        @keyword params:    The names of the parameters to map.
+        @type params:       list of str
+        @keyword spin_id:   The spin identification string.
+        @type spin_id:      None or str
+        @return:            The mapping function, or None if the point by point value.set(), calculate() and model_statistics() calls are to be used instead.
+        @rtype:             function or None
+        """
+
+        # No vectorised mapping by default.
+        return None
+
+
     def minimise(self, min_algor=None, min_options=None, func_tol=None, grad_tol=None, max_iterations=None, constraints=False, scaling_matrix=None, verbosity=0, sim_index=None, lower=None, upper=None, inc=None):
         """Minimisation method.
 
@@ -419,6 +437,36 @@ class API_base(object):
         raise RelaxImplementError('minimise')
 
 
+    def minimise_sims(self, min_algor=None, min_options=None, func_tol=None, grad_tol=None, max_iterations=None, constraints=False, scaling_matrix=None, verbosity=0, sim_indices=None):
+        """Batched minimisation of a set of Monte Carlo simulations.
+
+        This is only called if sim_batch() returns True.
+
+
+        @keyword min_algor:         The minimisation algorithm to use.
+        @type min_algor:            str
+        @keyword min_options:       An array of options to be used by the minimisation algorithm.
+        @type min_options:          array of str
+        @keyword func_tol:          The function tolerance which, when reached, terminates optimisation.  Setting this to None turns of the check.
+        @type func_tol:             None or float
+        @keyword grad_tol:          The gradient tolerance which, when reached, terminates optimisation.  Setting this to None turns of the check.
+        @type grad_tol:             None or float
+        @keyword max_iterations:    The maximum number of iterations for the algorithm.
+        @type max_iterations:       int
+        @keyword constraints:       If True, constraints are used during optimisation.
+        @type constraints:          bool
+        @keyword scaling_matrix:    The per-model list of diagonal and square scaling matrices.
+        @type scaling_matrix:       list of numpy rank-2, float64 array or list of None
+        @keyword verbosity:         The amount of information to print.  The higher the value, the greater the verbosity.
+        @type verbosity:            int
+        @keyword sim_indices:       The indices of the simulations to optimise.
+        @type sim_indices:          list of int
+        """
+
+        # Not implemented.
+        raise RelaxImplementError('minimise_sims')
+
+
     def model_desc(self, model_info=None):
         """Return a description of the model.
 
@@ -749,6 +797,21 @@ class API_base(object):
         raise RelaxImplementError('set_update')
 
 
+    def sim_batch(self, min_algor=None, constraints=False):
+        """Determine if all Monte Carlo simulations can be optimised together by the minimise_sims() method.
+
+        @keyword min_algor:     The minimisation algorithm to use.
+        @type min_algor:        str
+        @keyword constraints:   If True, constraints are used during optimisation.
+        @type constraints:      bool
+        @return:                True if the simulations can be optimised as a batch, False if they are to be optimised one by one.
+        @rtype:                 bool
+        """
+
+        # The simulations are optimised one by one by default.
+        return False
+
+
     def sim_init_values(self):
         """Initialise the Monte Carlo parameter values."""
 
@@ -604,13 +604,15 @@ def simulate(file="simulation.pdb.bz2", dir=None, step_size=2.0, snapshot=10, to
     file.close()
 
 
-def sobol_setup(max_num=200, oversample=100):
+def sobol_setup(max_num=200, oversample=100, cache_dir=None):
     """Oversampling setup for the quasi-random Sobol' sequence used for numerical PCS integration.
 
     @keyword max_num:       The maximum number of integration points N.
     @type max_num:          int
     @keyword oversample:    The oversampling factor Ov used for the N * Ov * 10**M, where M is the number of dimensions or torsion-tilt angles for the system.
     @type oversample:       int
+    @keyword cache_dir:     The optional directory for caching the Sobol' points on disk.
+    @type cache_dir:        None or str
     """
 
     # Test if the current data pipe exists.
@@ -623,6 +625,7 @@ def sobol_setup(max_num=200, oversample=100):
     # Store the values.
     cdp.sobol_max_points = max_num
     cdp.sobol_oversample = oversample
+    cdp.sobol_cache_dir = cache_dir
 
     # Count the number of Sobol' points for the current model.
     count_sobol_points()
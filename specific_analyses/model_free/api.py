@@ -487,7 +487,7 @@ class Model_free(API_base, API_common):
                     raise RelaxMultiVectorError
 
                 # The interacting spin.
-                if spin_id != interatom.spin_id1:
+                if id != interatom.spin_id1:
                     spin_id2 = interatom.spin_id1
                 else:
                     spin_id2 = interatom.spin_id2
@@ -545,7 +545,7 @@ class Model_free(API_base, API_common):
                     continue
 
                 # The surrounding spins.
-                if spin_id != interatoms[i].spin_id1:
+                if id != interatoms[i].spin_id1:
                     spin_id2 = interatoms[i].spin_id1
                 else:
                     spin_id2 = interatoms[i].spin_id2
@@ -1076,6 +1076,91 @@ class Model_free(API_base, API_common):
             return [-100 * 1e-6, -300 * 1e-6]
 
 
+    def map_func(self, params=None, spin_id=None):
+        """Create the function for the vectorised OpenDX chi-squared space mapping of a single spin.
+
+        The model-free target function is set up once and all other parameters of the spin are held at their current values.
+
+
+        @keyword params:    The names of the parameters to map.
+        @type params:       list of str
+        @keyword spin_id:   The spin identification string.  If None, the first selected spin is mapped.
+        @type spin_id:      None or str
+        @return:            The mapping function, or None for the diffusion tensor models.
+        @rtype:             function or None
+        """
+
+        # Determine the model type.
+        model_type = determine_model_type()
+
+        # The global models are mapped point by point.
+        if model_type != 'mf' and model_type != 'local_tm':
+            return None
+
+        # The first selected spin container matching the ID, and its full ID.
+        spin = None
+        for spin_cont, id in spin_loop(spin_id, return_id=True):
+            if spin_cont.select:
+                spin = spin_cont
+                break
+        if spin == None:
+            raise RelaxError("No selected spin could be found for the spin ID '%s'." % spin_id)
+
+        # Spins which are skipped by the optimisation are mapped point by point.
+        if not hasattr(spin, 'ri_data') or not hasattr(spin, 'ri_data_err') or not len(return_interatom_list(spin_hash=spin._hash)):
+            return None
+
+        # The parameter vector positions of the mapped parameters.
+        indices = []
+        for name in params:
+            # Not a model parameter.
+            if name not in spin.params:
+                raise RelaxError("The parameter '%s' is not part of the '%s' model." % (name, spin.model))
+
+            # The position.
+            indices.append(spin.params.index(name))
+
+        # Container for the model-free data.
+        data_store = Data_container()
+        data_store.h_bar = h_bar
+        data_store.mu0 = mu0
+        data_store.model_type = model_type
+        data_store.num_spins = 1
+        data_store.spin_id = id
+        data_store.scaling_matrix = None
+
+        # The current parameter vector.
+        param_vector = assemble_param_vector(spin=spin, model_type=model_type)
+
+        # Get the data for the target function.
+        minimise_data_setup(data_store, None, 1, None, spin=spin)
+
+        # Initialise the model-free function.
+        mf = Mf(init_params=param_vector, model_type=data_store.model_type, diff_type=data_store.diff_type, diff_params=data_store.diff_params, scaling_matrix=data_store.scaling_matrix, num_spins=data_store.num_spins, equations=data_store.equations, param_types=data_store.param_types, param_values=data_store.param_values, relax_data=data_store.ri_data, errors=data_store.ri_data_err, bond_length=data_store.r, csa=data_store.csa, num_frq=data_store.num_frq, frq=data_store.frq, num_ri=data_store.num_ri, remap_table=data_store.remap_table, noe_r1_table=data_store.noe_r1_table, ri_labels=data_store.ri_types, gx=data_store.gx, gh=data_store.gh, h_bar=data_store.h_bar, mu0=data_store.mu0, num_params=data_store.num_params, vectors=data_store.xh_unit_vectors)
+
+        # The mapping function.
+        def func(points):
+            # The full parameter vectors, one per point.
+            vectors = zeros((len(points), len(param_vector)), float64)
+            vectors[:] = param_vector
+            for i in range(len(params)):
+                vectors[:, indices[i]] = points[:, i]
+
+            # Evaluate all points.
+            chi2 = zeros(len(points), float64)
+            for i in range(len(points)):
+                try:
+                    chi2[i] = mf.func(vectors[i])
+                except OverflowError:
+                    chi2[i] = 1e200
+
+            # Return the chi-squared values.
+            return chi2
+
+        # Return the function.
+        return func
+
+
     def minimise(self, min_algor=None, min_options=None, func_tol=None, grad_tol=None, max_iterations=None, constraints=False, scaling_matrix=None, verbosity=0, sim_index=None, lower=None, upper=None, inc=None):
         """Model-free minimisation function.
 
@@ -1364,8 +1449,13 @@ class Model_free(API_base, API_common):
                 # Print out.
                 print("Parallelised diffusion tensor grid search.")
 
+                # Monte Carlo simulations are queued together and provide the parallelism, so the grid is not subdivided.
+                divisions = processor.processor_size()
+                if sim_index != None:
+                    divisions = 1
+
                 # Loop over each grid subdivision.
-                for subdivision in grid_split(divisions=processor.processor_size(), lower=opt_params.lower, upper=opt_params.upper, inc=opt_params.inc, verbosity=verbosity):
+                for subdivision in grid_split(divisions=divisions, lower=opt_params.lower, upper=opt_params.upper, inc=opt_params.inc, verbosity=verbosity):
                     # Set the points.
                     opt_params.subdivision = subdivision
 
@@ -1379,8 +1469,9 @@ class Model_free(API_base, API_common):
                     memo = MF_memo(model_free=self, model_type=data_store.model_type, spin=spin, sim_index=sim_index, scaling_matrix=data_store.scaling_matrix)
                     processor.add_to_queue(command, memo)
 
-                # Execute the queued elements.
-                processor.run_queue()
+                # Execute the queued elements, leaving the Monte Carlo simulations queued for execution of all simulations at once.
+                if sim_index == None:
+                    processor.run_queue()
 
                 # Exit this method.
                 return
@@ -1400,8 +1491,9 @@ class Model_free(API_base, API_common):
             memo = MF_memo(model_free=self, model_type=data_store.model_type, spin=spin, sim_index=sim_index, scaling_matrix=data_store.scaling_matrix)
             processor.add_to_queue(command, memo)
 
-        # Execute the queued elements.
-        processor.run_queue()
+        # Execute the queued elements, leaving the Monte Carlo simulations queued for execution of all simulations at once.
+        if sim_index == None:
+            processor.run_queue()
 
 
     def model_desc(self, model_info=None):
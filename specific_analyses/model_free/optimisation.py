@@ -533,6 +533,17 @@ class MF_minimise_command(Slave_command):
         super(MF_minimise_command, self).__init__()
 
 
+    def estimate_cost(self):
+        """Estimate the relative cost of the optimisation for the dynamic dispatch of the multi-processor.
+
+        @return:    The number of parameters times the number of relaxation data points summed over all spins.
+        @rtype:     int
+        """
+
+        # The parameter and data point counts.
+        return max(1, len(self.opt_params.param_vector)) * max(1, sum(self.data.num_ri))
+
+
     def optimise(self):
         """Model-free optimisation.
 
@@ -591,6 +602,25 @@ class MF_grid_command(MF_minimise_command):
         super(MF_grid_command, self).__init__()
 
 
+    def estimate_cost(self):
+        """Estimate the relative cost of the grid search for the dynamic dispatch of the multi-processor.
+
+        @return:    The number of grid points times the number of relaxation data points summed over all spins.
+        @rtype:     int
+        """
+
+        # The number of grid points.
+        if hasattr(self.opt_params, 'subdivision'):
+            points = len(self.opt_params.subdivision)
+        else:
+            points = 1
+            for inc in self.opt_params.inc:
+                points *= inc
+
+        # The cost.
+        return points * max(1, sum(self.data.num_ri))
+
+
     def optimise(self):
         """Model-free grid search.
 
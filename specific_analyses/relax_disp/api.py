@@ -36,7 +36,7 @@ from types import MethodType
 
 # relax module imports.
 from lib.arg_check import is_list, is_str_list
-from lib.dispersion.variables import EXP_TYPE_CPMG_PROTON_MQ, EXP_TYPE_CPMG_PROTON_SQ, MODEL_LIST_MMQ, MODEL_R2EFF, PARAMS_R20
+from lib.dispersion.variables import EXP_TYPE_CPMG_PROTON_MQ, EXP_TYPE_CPMG_PROTON_SQ, MODEL_LIST_JACOBIAN, MODEL_LIST_MMQ, MODEL_R2EFF, PARAMS_R20
 from lib.errors import RelaxError, RelaxImplementError
 from lib.text.sectioning import subsection
 from multi import Processor_box
@@ -50,7 +50,7 @@ from specific_analyses.api_base import API_base
 from specific_analyses.api_common import API_common
 from specific_analyses.relax_disp.checks import check_model_type
 from specific_analyses.relax_disp.data import average_intensity, calc_rotating_frame_params, find_intensity_keys, generate_r20_key, has_exponential_exp_type, has_proton_mmq_cpmg, loop_cluster, loop_exp_frq, loop_exp_frq_offset_point, loop_time, pack_back_calc_r2eff, return_param_key_from_data, spin_ids_to_containers
-from specific_analyses.relax_disp.optimisation import Disp_memo, Disp_minimise_command, back_calc_peak_intensities, back_calc_r2eff, calculate_r2eff, minimise_r2eff
+from specific_analyses.relax_disp.optimisation import Disp_memo, Disp_minimise_command, back_calc_peak_intensities, back_calc_r2eff, calculate_r2eff, map_func_r2eff, minimise_r2eff, minimise_r2eff_batch
 from specific_analyses.relax_disp.parameter_object import Relax_disp_params
 from specific_analyses.relax_disp.parameters import get_param_names, get_value, loop_parameters, param_index_to_param_info, param_num, r1_setup
 
@@ -618,8 +618,13 @@ class Relax_disp(API_base, API_common):
         @type sim_index:            int
         """
 
+        # The coarse-to-fine grid refinement settings, passed on as the minimisation options.
+        min_options = None
+        if hasattr(cdp, 'grid_refine_levels') and cdp.grid_refine_levels:
+            min_options = (cdp.grid_refine_levels, cdp.grid_refine_best)
+
         # Minimisation.
-        self.minimise(min_algor='grid', lower=lower, upper=upper, inc=inc, scaling_matrix=scaling_matrix, constraints=constraints, verbosity=verbosity, sim_index=sim_index)
+        self.minimise(min_algor='grid', min_options=min_options, lower=lower, upper=upper, inc=inc, scaling_matrix=scaling_matrix, constraints=constraints, verbosity=verbosity, sim_index=sim_index)
 
 
     def map_bounds(self, param, spin_id=None):
@@ -669,6 +674,49 @@ class Relax_disp(API_base, API_common):
                 return [self._PARAMS.grid_lower(param, incs=0, model_info=[spin_id]), self._PARAMS.grid_upper(param, incs=0, model_info=[spin_id])]
 
 
+    def map_func(self, params=None, spin_id=None):
+        """Create the function for the vectorised OpenDX chi-squared space mapping of the spin cluster.
+
+        @keyword params:    The names of the parameters to map.
+        @type params:       list of str
+        @keyword spin_id:   The spin identification string.  If None, the first spin cluster is mapped.
+        @type spin_id:      None or str
+        @return:            The mapping function, or None for the R2eff model.
+        @rtype:             function or None
+        """
+
+        # The R2eff values are calculated directly for fixed time period data, so use the standard mapping.
+        if cdp.model_type == MODEL_R2EFF:
+            return None
+
+        # The spin container to map.
+        spin = None
+        if spin_id != None:
+            spin = return_spin(spin_id=spin_id)
+
+        # Find the spin cluster.
+        for spin_ids in self.model_loop():
+            spins = spin_ids_to_containers(spin_ids)
+
+            # The first selected cluster.
+            if spin == None:
+                skip = True
+                for cluster_spin in spins:
+                    if cluster_spin.select:
+                        skip = False
+                if skip:
+                    continue
+                return map_func_r2eff(spins=spins, spin_ids=spin_ids, params=params)
+
+            # The cluster containing the spin.
+            for si in range(len(spins)):
+                if spins[si] is spin:
+                    return map_func_r2eff(spins=spins, spin_ids=spin_ids, params=params, spin_index=si)
+
+        # No cluster found.
+        raise RelaxError("The spin cluster for the spin ID '%s' could not be found." % spin_id)
+
+
     def minimise(self, min_algor=None, min_options=None, func_tol=None, grad_tol=None, max_iterations=None, constraints=False, scaling_matrix=None, verbosity=0, sim_index=None, lower=None, upper=None, inc=None):
         """Relaxation dispersion curve fitting function.
 
@@ -728,8 +776,8 @@ class Relax_disp(API_base, API_common):
                 elif match('^[Nn]ewton$', algor):
                     allow = True
 
-                # Newton minimisation.
-                elif match('^[Nn]ewton$', algor):
+                # Levenberg-Marquardt minimisation (the batched C curve fitting).
+                elif match('[Ll][Mm]$', algor) or match('[Ll]evenburg-[Mm]arquardt$', algor):
                     allow = True
 
                 # Constrained method, Method of Multipliers.
@@ -748,6 +796,15 @@ class Relax_disp(API_base, API_common):
                 elif match('^[Ss]implex$', algor):
                     allow = True
 
+                # The gradient based algorithms, for the models with analytic Jacobians.
+                elif match('^[Bb][Ff][Gg][Ss]$', algor) or match('^[Nn]ewton$', algor) or match('[Ll][Mm]$', algor) or match('[Ll]evenburg-[Mm]arquardt$', algor) or match('^[Mm][Oo][Mm]$', algor) or match('[Mm]ethod of [Mm]ultipliers$', algor) or match('^[Ll]og [Bb]arrier$', algor):
+                    allow = True
+                    for spin, spin_id in spin_loop(return_id=True, skip_desel=True):
+                        if spin.model not in MODEL_LIST_JACOBIAN:
+                            allow = False
+                            model_type = spin.model
+                            break
+
         # Do not allow, if no model has been specified.
         else:
             model_type = 'None'
@@ -755,7 +812,7 @@ class Relax_disp(API_base, API_common):
             allow = False
 
         if not allow:
-            raise RelaxError("Minimisation algorithm '%s' is not allowed, since function gradients for model '%s' is not implemented.  Only the 'simplex' minimisation algorithm is supported for the relaxation dispersion analysis of this model."%(algor, model_type))
+            raise RelaxError("Minimisation algorithm '%s' is not allowed, since function gradients for model '%s' is not implemented.  Only the 'grid search' and 'simplex' minimisation algorithms are supported for the relaxation dispersion analysis of this model, the gradient based algorithms being limited to the models %s."%(algor, model_type, MODEL_LIST_JACOBIAN))
 
         # Initialise some empty data pipe structures so that the target function set up does not fail.
         if not hasattr(cdp, 'cpmg_frqs_list'):
@@ -825,6 +882,84 @@ class Relax_disp(API_base, API_common):
             processor.add_to_queue(command, memo)
 
 
+    def minimise_sims(self, min_algor=None, min_options=None, func_tol=None, grad_tol=None, max_iterations=None, constraints=False, scaling_matrix=None, verbosity=0, sim_indices=None):
+        """Batched optimisation of the Monte Carlo simulations of the R2eff model exponential curves.
+
+        The curves of all spin clusters and all simulations are fitted in a single Levenberg-Marquardt call to the C module.  Each simulation is warm started from the optimised parameter values set by monte_carlo.initial_values, and each curve terminates individually once the function tolerance is reached.
+
+
+        @keyword min_algor:         The minimisation algorithm to use.
+        @type min_algor:            str
+        @keyword min_options:       An array of options to be used by the minimisation algorithm.
+        @type min_options:          array of str
+        @keyword func_tol:          The function tolerance which, when reached, terminates optimisation.  Setting this to None turns of the check.
+        @type func_tol:             None or float
+        @keyword grad_tol:          The gradient tolerance which, when reached, terminates optimisation.  Setting this to None turns of the check.
+        @type grad_tol:             None or float
+        @keyword max_iterations:    The maximum number of iterations for the algorithm.
+        @type max_iterations:       int
+        @keyword constraints:       If True, constraints are used during optimisation.
+        @type constraints:          bool
+        @keyword scaling_matrix:    The per-model list of diagonal and square scaling matrices.
+        @type scaling_matrix:       list of numpy rank-2, float64 array or list of None
+        @keyword verbosity:         The amount of information to print.  The higher the value, the greater the verbosity.
+        @type verbosity:            int
+        @keyword sim_indices:       The indices of the simulations to optimise.
+        @type sim_indices:          list of int
+        """
+
+        # Data checks.
+        check_mol_res_spin_data()
+        check_model_type()
+
+        # Sanity checks.
+        if not has_exponential_exp_type():
+            raise RelaxError("The R2eff model with the fixed time period dispersion experiments cannot be optimised.")
+
+        # Collect the exponential curves of all spin clusters and simulations.
+        curves = []
+        model_index = -1
+        for spin_ids in self.model_loop():
+            # Increment the model index.
+            model_index += 1
+
+            # The spin containers.
+            spins = spin_ids_to_containers(spin_ids)
+
+            # Loop over the simulations.
+            for sim_index in sim_indices:
+                minimise_r2eff(spins=spins, spin_ids=spin_ids, min_algor=min_algor, min_options=min_options, func_tol=func_tol, grad_tol=grad_tol, max_iterations=max_iterations, constraints=constraints, scaling_matrix=scaling_matrix[model_index], verbosity=verbosity, sim_index=sim_index, curves=curves)
+
+        # No data.
+        if not len(curves):
+            return
+
+        # Fit all curves.
+        chi2, iter_count = minimise_r2eff_batch(curves=curves, func_tol=func_tol, max_iterations=max_iterations, verbosity=verbosity)
+
+        # The per-simulation convergence statistics.
+        if verbosity:
+            # Sum the statistics of the curves.
+            stats = {}
+            for i in range(len(curves)):
+                sim_index = curves[i][2]
+                if sim_index not in stats:
+                    stats[sim_index] = [0, 0.0, 0, 0, 0]
+                stats[sim_index][0] += 1
+                stats[sim_index][1] += chi2[i]
+                stats[sim_index][2] += iter_count[i]
+                stats[sim_index][3] = max(stats[sim_index][3], iter_count[i])
+                if iter_count[i] >= max_iterations:
+                    stats[sim_index][4] += 1
+
+            # Print out.
+            print("\n%-12s%10s%20s%16s%16s%16s" % ("Simulation", "Curves", "Chi2 sum", "Mean iter", "Max iter", "Unconverged"))
+            for sim_index in sim_indices:
+                if sim_index in stats:
+                    num, chi2_sum, iter_sum, iter_max, unconverged = stats[sim_index]
+                    print("%-12i%10i%20.6g%16.2f%16i%16i" % (sim_index+1, num, chi2_sum, float(iter_sum)/num, iter_max, unconverged))
+
+
     def model_desc(self, model_info=None):
         """Return a description of the model.
 
@@ -1335,6 +1470,34 @@ class Relax_disp(API_base, API_common):
             spin.select_sim = deepcopy(select_sim)
 
 
+    def sim_batch(self, min_algor=None, constraints=False):
+        """Determine if all Monte Carlo simulations can be optimised together by the minimise_sims() method.
+
+        This is the case for the unconstrained Levenberg-Marquardt optimisation of the R2eff model exponential curves.
+
+
+        @keyword min_algor:     The minimisation algorithm to use.
+        @type min_algor:        str
+        @keyword constraints:   If True, constraints are used during optimisation.
+        @type constraints:      bool
+        @return:                True if the simulations can be optimised as a batch, False if they are to be optimised one by one.
+        @rtype:                 bool
+        """
+
+        # Only the R2eff model.
+        if not hasattr(cdp, 'model_type') or cdp.model_type != MODEL_R2EFF:
+            return False
+
+        # Unconstrained Levenberg-Marquardt optimisation.
+        if constraints:
+            return False
+        if match('[Ll][Mm]$', min_algor) or match('[Ll]evenburg-[Mm]arquardt$', min_algor):
+            return True
+
+        # All other algorithms.
+        return False
+
+
     def sim_init_values(self):
         """Initialise the Monte Carlo parameter values."""
 
@@ -104,6 +104,319 @@ INTERPOLATE_OFFSET = "offset"
 # Default hardcoded colours (one colour for each magnetic field strength).
 COLOUR_ORDER = [4, 15, 2, 13, 11, 1, 3, 5, 6, 7, 8, 9, 10, 12, 14] * 1000
 
+# The data pipe metadata defining the layout of the dispersion data, used to validate the packed data layout cache.
+PACKED_METADATA = ['spectrum_ids', 'exp_type', 'exp_type_list', 'spectrometer_frq', 'spectrometer_frq_list', 'cpmg_frqs', 'cpmg_frqs_list', 'spin_lock_nu1', 'spin_lock_nu1_list', 'spin_lock_offset', 'spin_lock_offset_list', 'relax_times', 'relax_time_list']
+
+
+class Packed_layout:
+    """The spin independent layout of the dispersion data of the current data pipe.
+
+    This holds the results of the exp, frq, offset, point and time loops over the spectrum metadata, so that the target function data structures of each spin cluster and Monte Carlo simulation can be packed without repeating these loops.  The structures are shared between all users and must not be modified.
+    """
+
+    def __init__(self):
+        """Assemble the layout from the metadata of the current data pipe."""
+
+        # The experiment types and spectrometer frequencies.
+        self.exp_list = list(loop_exp())
+        self.frq_list = list(loop_frq())
+        self.exp_frq = list(loop_exp_frq(return_indices=True))
+
+        # The experiment types with data points, in loop order.
+        self.exp_types = []
+
+        # The per experiment type and field data, with the dimensions {Ei, Mi, Oi} and {Ei, Mi, Oi, Di}.
+        self.offsets = []
+        self.keys = []
+        self.relax_times = []
+        self.fields = []
+        self.ids = []
+        for exp_type, ei in loop_exp(return_indices=True):
+            # Add new dimensions.
+            self.offsets.append([])
+            self.keys.append([])
+            self.relax_times.append([])
+            self.fields.append([])
+            self.ids.append([])
+
+            # The R1rho flag.
+            r1rho_flag = exp_type in EXP_TYPE_LIST_R1RHO
+
+            # Loop over the spectrometer frequencies and offsets.
+            for frq, mi in loop_frq(return_indices=True):
+                self.offsets[ei].append([])
+                self.keys[ei].append([])
+                self.relax_times[ei].append([])
+                self.fields[ei].append([])
+                self.ids[ei].append([])
+                for offset, oi in loop_offset(exp_type=exp_type, frq=frq, return_indices=True):
+                    # The offset.
+                    self.offsets[ei][mi].append(offset)
+
+                    # The data keys and relaxation times of the dispersion points.
+                    keys = []
+                    times = []
+                    for point in loop_point(exp_type=exp_type, frq=frq, offset=offset):
+                        keys.append(return_param_key_from_data(exp_type=exp_type, frq=frq, offset=offset, point=point))
+                        times.append(array(list(loop_time(exp_type=exp_type, frq=frq, offset=offset, point=point)), float64))
+                    self.keys[ei][mi].append(keys)
+                    self.relax_times[ei][mi].append(times)
+
+                    # The experiment type.
+                    if len(keys) and exp_type not in self.exp_types:
+                        self.exp_types.append(exp_type)
+
+                    # The nu_CPMG frequencies or spin-lock field strengths, without the reference.
+                    if not r1rho_flag:
+                        self.fields[ei][mi].append(return_cpmg_frqs_single(exp_type=exp_type, frq=frq, offset=offset, ref_flag=False))
+                    else:
+                        self.fields[ei][mi].append(return_spin_lock_nu1_single(exp_type=exp_type, frq=frq, offset=offset, ref_flag=False))
+
+                    # The first matching experiment ID, for the offset data.
+                    self.ids[ei][mi].append(None)
+                    for id in cdp.exp_type:
+                        # Skip non-matching experiments.
+                        if cdp.exp_type[id] != exp_type:
+                            continue
+
+                        # Skip non-matching spectrometer frequencies.
+                        if hasattr(cdp, 'spectrometer_frq') and cdp.spectrometer_frq[id] != frq:
+                            continue
+
+                        # Skip non-matching offsets.
+                        if r1rho_flag and hasattr(cdp, 'spin_lock_offset') and cdp.spin_lock_offset[id] != offset:
+                            continue
+
+                        # Found.
+                        self.ids[ei][mi][oi] = id
+                        break
+
+        # The dispersion point structures without the reference points, with the dimensions {Ei, Mi, Oi}.
+        self.cpmg_frqs = return_cpmg_frqs(ref_flag=False)
+        self.spin_lock_nu1 = return_spin_lock_nu1(ref_flag=False)
+
+        # The packed data of the spin clusters, keyed by the tuple of spin IDs (see return_r2eff_arrays()).
+        self.data = {}
+
+
+
+class Packed_data:
+    """The packed R2eff/R1rho values, errors and missing data flags of a spin cluster.
+
+    The values of the measured data and of all Monte Carlo simulations are stacked along the first axis of the {Ei, Si, Mi, Oi} arrays, the measured values being the first row and simulation i being row i+1.  Copies of the spin data which has been packed are kept to detect changes to the data.  The structures are shared between all users and must not be modified.
+    """
+
+    def __init__(self, spins=None, spin_ids=None, layout=None):
+        """Pack the R2eff/R1rho data of the spin cluster.
+
+        @keyword spins:     The list of spin containers in the cluster.
+        @type spins:        list of SpinContainer instances
+        @keyword spin_ids:  The list of spin IDs for the cluster.  In the case of multi-quantum systems, these will be different to the spins argument and instead refer to the second spin of the pair.
+        @type spin_ids:     list of str
+        @keyword layout:    The spin independent data layout.
+        @type layout:       Packed_layout instance
+        """
+
+        # The spins, their selection, and the copies of the data of each packed spin container.
+        self.spins = list(spins)
+        self.select = [spin.select for spin in spins]
+        self.copies = []
+
+        # 1H MMQ flag.
+        proton_mmq_flag = has_proton_mmq_cpmg()
+
+        # The selected spins and their attached protons.
+        spin_data = []
+        for spin_index in range(len(spins)):
+            # Skip deselected spins.
+            if not spins[spin_index].select:
+                continue
+
+            # Alias the spin.
+            spin = spins[spin_index]
+            spin_id = spin_ids[spin_index]
+
+            # Get the attached proton.
+            proton = None
+            if proton_mmq_flag:
+                # Get all protons - for multi-quantum systems the spins and spin_ids do not correspond to the same spin!
+                proton_spins = return_attached_protons(spin_hash=return_spin(spin_id=spin_id)._hash)
+
+                # Only one allowed.
+                if len(proton_spins) > 1:
+                    raise RelaxError("Only one attached proton is supported for the MMQ-type models.")
+
+                # Missing proton.
+                if not len(proton_spins):
+                    raise RelaxError("No proton attached to the spin '%s' could be found.  This is required for the MMQ-type models." % spin_id)
+
+                # Alias the single proton.
+                proton = proton_spins[0]
+
+            # Store the containers.
+            spin_data.append([spin, spin_id, proton])
+
+            # Copy the data, including that of spins without data.
+            self.copies.append([spin, self.data_copy(spin)])
+            if proton != None:
+                self.copies.append([proton, self.data_copy(proton)])
+
+        # The number of stacked data sets, the measured data followed by the simulations.
+        set_num = 1
+        for container, data in self.copies:
+            if data[3] != None and len(data[3]) >= set_num:
+                set_num = len(data[3]) + 1
+
+        # Initialise the data structures for the target function.
+        self.values = []
+        self.errors = []
+        self.missing = []
+        self.frqs = []
+        self.frqs_H = []
+        for ei in range(len(layout.exp_list)):
+            self.values.append([])
+            self.errors.append([])
+            self.missing.append([])
+            self.frqs.append([])
+            self.frqs_H.append([])
+            for si in range(len(spin_data)):
+                self.values[ei].append([])
+                self.errors[ei].append([])
+                self.missing[ei].append([])
+                self.frqs[ei].append([])
+                self.frqs_H[ei].append([])
+                for mi in range(len(layout.frq_list)):
+                    self.values[ei][si].append([])
+                    self.errors[ei][si].append([])
+                    self.missing[ei][si].append([])
+                    self.frqs[ei][si].append(0.0)
+                    self.frqs_H[ei][si].append(0.0)
+                    for oi in range(len(layout.offsets[ei][mi])):
+                        self.values[ei][si][mi].append(zeros((set_num, 0), float64))
+                        self.errors[ei][si][mi].append(zeros(0, float64))
+                        self.missing[ei][si][mi].append(zeros(0, int32))
+
+        # Pack the R2eff/R1rho data.
+        data_flag = False
+        for si in range(len(spin_data)):
+            # Alias the containers.
+            spin, spin_id, proton = spin_data[si]
+
+            # No data.
+            if not hasattr(spin, 'r2eff') and not hasattr(proton, 'r2eff'):
+                continue
+            data_flag = True
+
+            # No isotope information.
+            if not hasattr(spin, 'isotope'):
+                raise RelaxSpinTypeError(spin_id=spin_id)
+
+            # Loop over the experiment types and spectrometer frequencies.
+            for exp_type, frq, ei, mi in layout.exp_frq:
+                # Alias the correct spin.
+                current_spin = spin
+                if exp_type in [EXP_TYPE_CPMG_PROTON_SQ, EXP_TYPE_CPMG_PROTON_MQ]:
+                    current_spin = proton
+
+                # The data of the spin, followed by that of all simulations.
+                point_num = sum([len(keys) for keys in layout.keys[ei][mi]])
+                if point_num:
+                    r2eff = current_spin.r2eff
+                    data_sets = [r2eff]
+                    if hasattr(current_spin, 'r2eff_sim'):
+                        data_sets += current_spin.r2eff_sim
+
+                # The Larmor frequency for this spin (and that of an attached proton for the MMQ models) and field strength (in MHz*2pi to speed up the ppm to rad/s conversion).
+                if frq != None and point_num:
+                    self.frqs[ei][si][mi] = 2.0 * pi * frq / periodic_table.gyromagnetic_ratio('1H') * periodic_table.gyromagnetic_ratio(spin.isotope) * 1e-6
+                    self.frqs_H[ei][si][mi] = 2.0 * pi * frq * 1e-6
+
+                # Loop over the offsets, packing the data of all dispersion points at once.
+                for oi in range(len(layout.offsets[ei][mi])):
+                    # The data keys.
+                    keys = layout.keys[ei][mi][oi]
+
+                    # Missing data.
+                    missing_flags = [key not in r2eff for key in keys]
+                    self.missing[ei][si][mi][oi] = array(missing_flags, int32)
+
+                    # No data, so the errors and simulation values are not needed.
+                    if all(missing_flags):
+                        self.values[ei][si][mi][oi] = zeros((set_num, len(keys)), float64)
+                        self.errors[ei][si][mi][oi] = ones(len(keys), float64)
+                        continue
+
+                    # The stacked values and the errors.
+                    self.values[ei][si][mi][oi] = array([[0.0 if flag else data[key] for key, flag in zip(keys, missing_flags)] for data in data_sets], float64)
+                    self.errors[ei][si][mi][oi] = array([1.0 if flag else current_spin.r2eff_err[key] for key, flag in zip(keys, missing_flags)], float64)
+
+        # No R2eff/R1rho data for the spin cluster.
+        if not data_flag:
+            raise RelaxError("No R2eff/R1rho data could be found for the spin cluster %s." % spin_ids)
+
+
+    def data_copy(self, container):
+        """Copy the data of the spin container which is packed, for detecting changes to the data.
+
+        @param container:   The spin container.
+        @type container:    SpinContainer instance
+        @return:            The isotope, and copies of the R2eff/R1rho values, errors and simulation values.
+        @rtype:             list
+        """
+
+        # The values and errors.
+        r2eff = getattr(container, 'r2eff', None)
+        if r2eff != None:
+            r2eff = dict(r2eff)
+        r2eff_err = getattr(container, 'r2eff_err', None)
+        if r2eff_err != None:
+            r2eff_err = dict(r2eff_err)
+
+        # The simulation values.
+        r2eff_sim = getattr(container, 'r2eff_sim', None)
+        if r2eff_sim != None:
+            r2eff_sim = [dict(data) for data in r2eff_sim]
+
+        # Return the copies.
+        return [getattr(container, 'isotope', None), r2eff, r2eff_err, r2eff_sim]
+
+
+    def is_current(self, spins=None, sim_index=None):
+        """Determine if the packed data still corresponds to the data of the spins.
+
+        Only the simulation to be returned is compared, the other simulations being compared when they are returned.
+
+
+        @keyword spins:     The list of spin containers in the cluster.
+        @type spins:        list of SpinContainer instances
+        @keyword sim_index: The index of the simulation to compare.  This should be None if only the normal data is required.
+        @type sim_index:    None or int
+        @return:            True if the spin data has not changed since it was packed.
+        @rtype:             bool
+        """
+
+        # Different spins or spin selections.
+        if len(spins) != len(self.spins) or [spin.select for spin in spins] != self.select:
+            return False
+        for i in range(len(spins)):
+            if spins[i] is not self.spins[i]:
+                return False
+
+        # Compare the data of all spin containers.
+        for container, data in self.copies:
+            # The isotope, values and errors.
+            if getattr(container, 'isotope', None) != data[0] or getattr(container, 'r2eff', None) != data[1] or getattr(container, 'r2eff_err', None) != data[2]:
+                return False
+
+            # The simulation values.
+            if sim_index != None and data[1] != None:
+                r2eff_sim = getattr(container, 'r2eff_sim', None)
+                if r2eff_sim == None or data[3] == None or len(r2eff_sim) != len(data[3]) or r2eff_sim[sim_index] != data[3][sim_index]:
+                    return False
+
+        # Unchanged.
+        return True
+
 
 def average_intensity(spin=None, exp_type=None, frq=None, offset=None, point=None, time=None, sim_index=None, error=False):
     """Return the average peak intensity for the spectrometer frequency, dispersion point, and relaxation time.
@@ -3954,8 +4267,10 @@ def return_offset_data(spins=None, spin_ids=None, field_count=None, spin_lock_of
     @rtype:                     rank-3 list of numpy rank-1 float arrays, rank-4 list of numpy rank-1 float arrays, rank-2 list of numpy rank-1 float arrays, rank-4 list of numpy rank-1 float arrays, rank-4 list of numpy rank-1 float arrays, rank-4 list of numpy rank-1 float arrays
     """
 
+    # The cached spin independent data layout.
+    layout = return_packed_layout()
+
     # The counts.
-    exp_num = num_exp_types()
     spin_num = 0
     for spin in spins:
         if spin.select:
@@ -3970,7 +4285,7 @@ def return_offset_data(spins=None, spin_ids=None, field_count=None, spin_lock_of
     Domega = []
     w_e = []
 
-    for exp_type, ei in loop_exp(return_indices=True):
+    for ei in range(len(layout.exp_list)):
         shifts.append([])
         offsets.append([])
         spin_lock_fields_inter.append([])
@@ -3983,7 +4298,7 @@ def return_offset_data(spins=None, spin_ids=None, field_count=None, spin_lock_of
             tilt_angles[ei].append([])
             Domega[ei].append([])
             w_e[ei].append([])
-            for frq, mi in loop_frq(return_indices=True):
+            for mi in range(len(layout.frq_list)):
                 shifts[ei][si].append(None)
                 offsets[ei][si].append([])
                 spin_lock_fields_inter[ei].append([])
@@ -3999,7 +4314,7 @@ def return_offset_data(spins=None, spin_ids=None, field_count=None, spin_lock_of
                         Domega[ei][si][mi].append([])
                         w_e[ei][si][mi].append([])
                 else:
-                    for offset, oi in loop_offset(exp_type=exp_type, frq=frq, return_indices=True):
+                    for offset in layout.offsets[ei][mi]:
                         offsets[ei][si][mi].append(None)
                         spin_lock_fields_inter[ei][mi].append([])
                         tilt_angles[ei][si][mi].append([])
@@ -4027,7 +4342,7 @@ def return_offset_data(spins=None, spin_ids=None, field_count=None, spin_lock_of
 
         # Loop over the experiments and spectrometer frequencies.
         data_flag = True
-        for exp_type, frq, ei, mi in loop_exp_frq(return_indices=True):
+        for exp_type, frq, ei, mi in layout.exp_frq:
             # The R1rho and off-resonance R1rho flag.
             r1rho_flag = False
             if exp_type in EXP_TYPE_LIST_R1RHO:
@@ -4104,40 +4419,21 @@ def return_offset_data(spins=None, spin_ids=None, field_count=None, spin_lock_of
 
             else:
                 # Loop over offset.
-                for offset, oi in loop_offset(exp_type=exp_type, frq=frq, return_indices=True):
+                for oi in range(len(layout.offsets[ei][mi])):
                     # The spin-lock data.
                     if fields_orig != None:
                         fields = fields_orig[ei][mi][oi]
                     else:
-                        if not r1rho_flag:
-                            fields = return_cpmg_frqs_single(exp_type=exp_type, frq=frq, offset=offset, ref_flag=False)
-                        else:
-                            fields = return_spin_lock_nu1_single(exp_type=exp_type, frq=frq, offset=offset, ref_flag=False)
+                        fields = layout.fields[ei][mi][oi]
 
                     # Save the fields to list.
                     spin_lock_fields_inter[ei][mi][oi] = fields
 
-                    # Find a matching experiment ID.
-                    found = False
-                    for id in cdp.exp_type:
-                        # Skip non-matching experiments.
-                        if cdp.exp_type[id] != exp_type:
-                            continue
-
-                        # Skip non-matching spectrometer frequencies.
-                        if hasattr(cdp, 'spectrometer_frq') and cdp.spectrometer_frq[id] != frq:
-                            continue
-
-                        # Skip non-matching offsets.
-                        if r1rho_flag and hasattr(cdp, 'spin_lock_offset') and cdp.spin_lock_offset[id] != offset:
-                            continue
-
-                        # Found.
-                        found = True
-                        break
+                    # The matching experiment ID.
+                    id = layout.ids[ei][mi][oi]
 
                     # No data.
-                    if not found:
+                    if id == None:
                         continue
 
                     # Store the offset in rad/s.  Only once and using the first key.
@@ -4184,6 +4480,31 @@ def return_offset_data(spins=None, spin_ids=None, field_count=None, spin_lock_of
     return offsets, spin_lock_fields_inter, shifts, tilt_angles, Domega, w_e
 
 
+def return_packed_layout():
+    """Return the spin independent layout of the dispersion data of the current data pipe.
+
+    The layout is cached in the data pipe.  It is rebuilt if any of the metadata it depends on, for example as set by the spectrum, relax_time, cpmg_setup or spin_lock_field user functions, has changed.
+
+
+    @return:    The packed data layout.
+    @rtype:     Packed_layout instance
+    """
+
+    # The signature of the metadata.
+    signature = repr([getattr(cdp, name, None) for name in PACKED_METADATA])
+
+    # Use the cached layout.
+    if hasattr(cdp, '_packed_layout') and cdp._packed_layout[0] == signature:
+        return cdp._packed_layout[1]
+
+    # Assemble and cache the layout.
+    layout = Packed_layout()
+    cdp._packed_layout = [signature, layout]
+
+    # Return the layout.
+    return layout
+
+
 def return_param_key_from_data(exp_type=None, frq=0.0, offset=0.0, point=0.0):
     """Generate the unique key from the spectrometer frequency and dispersion point.
 
@@ -4452,6 +4773,9 @@ def return_r1_err_data(spins=None, spin_ids=None, field_count=None, sim_index=No
 def return_r2eff_arrays(spins=None, spin_ids=None, fields=None, field_count=None, sim_index=None):
     """Return numpy arrays of the R2eff/R1rho values and errors.
 
+    The spin independent structure of the data, including the relaxation times, is taken from the cached data layout of return_packed_layout().  The R2eff/R1rho data of the cluster is packed once, with all Monte Carlo simulations, and cached in the layout until the spin data changes (see the Packed_data class).  The returned structures must therefore not be modified.
+
+
     @keyword spins:         The list of spin containers in the cluster.
     @type spins:            list of SpinContainer instances
     @keyword spin_ids:      The list of spin IDs for the cluster.  In the case of multi-quantum systems, these will be different to the spins argument and instead refer to the second spin of the pair.
@@ -4466,152 +4790,29 @@ def return_r2eff_arrays(spins=None, spin_ids=None, fields=None, field_count=None
     @rtype:                 lists of numpy float arrays, lists of numpy float arrays, lists of numpy float arrays, numpy rank-2 int array
     """
 
-    # The counts.
-    exp_num = num_exp_types()
-    spin_num = count_spins(spins)
-
-    # 1H MMQ flag.
-    proton_mmq_flag = has_proton_mmq_cpmg()
-
-    # Initialise the data structures for the target function.
-    exp_types = []
-    values = []
-    errors = []
-    missing = []
-    frqs = []
-    frqs_H = []
-    relax_times = []
-    for exp_type, ei in loop_exp(return_indices=True):
-        values.append([])
-        errors.append([])
-        missing.append([])
-        frqs.append([])
-        frqs_H.append([])
-        relax_times.append([])
-        for si in range(spin_num):
-            values[ei].append([])
-            errors[ei].append([])
-            missing[ei].append([])
-            frqs[ei].append([])
-            frqs_H[ei].append([])
-            for frq, mi in loop_frq(return_indices=True):
-                values[ei][si].append([])
-                errors[ei][si].append([])
-                missing[ei][si].append([])
-                frqs[ei][si].append(0.0)
-                frqs_H[ei][si].append(0.0)
-                relax_times[ei].append([])
-                for offset, oi in loop_offset(exp_type=exp_type, frq=frq, return_indices=True):
-                    values[ei][si][mi].append([])
-                    errors[ei][si][mi].append([])
-                    missing[ei][si][mi].append([])
-                    relax_times[ei][mi].append([])
-                    for point, di in loop_point(exp_type=exp_type, frq=frq, offset=offset, return_indices=True):
-                        relax_times[ei][mi][oi].append([])
-
-    # Pack the R2eff/R1rho data.
-    data_flag = False
-    si = 0
-    for spin_index in range(len(spins)):
-        # Skip deselected spins.
-        if not spins[spin_index].select:
-            continue
-
-        # Alias the spin.
-        spin = spins[spin_index]
-        spin_id = spin_ids[spin_index]
-
-        # Get the attached proton.
-        proton = None
-        if proton_mmq_flag:
-            # Get all protons - for multi-quantum systems the spins and spin_ids do not correspond to the same spin!
-            proton_spins = return_attached_protons(spin_hash=return_spin(spin_id=spin_id)._hash)
-
-            # Only one allowed.
-            if len(proton_spins) > 1:
-                raise RelaxError("Only one attached proton is supported for the MMQ-type models.")
-
-            # Missing proton.
-            if not len(proton_spins):
-                raise RelaxError("No proton attached to the spin '%s' could be found.  This is required for the MMQ-type models." % spin_id)
-
-            # Alias the single proton.
-            proton = proton_spins[0]
-
-        # No data.
-        if not hasattr(spin, 'r2eff') and not hasattr(proton, 'r2eff'):
-            continue
-        data_flag = True
-
-        # No isotope information.
-        if not hasattr(spin, 'isotope'):
-            raise RelaxSpinTypeError(spin_id=spin_ids[si])
+    # The cached spin independent data layout.
+    layout = return_packed_layout()
 
-        # Loop over the R2eff data.
-        for exp_type, frq, offset, point, ei, mi, oi, di in loop_exp_frq_offset_point(return_indices=True):
-            # Alias the correct spin.
-            current_spin = spin
-            if exp_type in [EXP_TYPE_CPMG_PROTON_SQ, EXP_TYPE_CPMG_PROTON_MQ]:
-                current_spin = proton
-
-            # Add the experiment type.
-            if exp_type not in exp_types:
-                exp_types.append(exp_type)
-
-            # The key.
-            key = return_param_key_from_data(exp_type=exp_type, frq=frq, offset=offset, point=point)
-            if mi == 0:
-                fact = 60.83831274541046
-            else:
-                fact = 81.11775032721394
-            
-            # The Larmor frequency for this spin (and that of an attached proton for the MMQ models) and field strength (in MHz*2pi to speed up the ppm to rad/s conversion).
-            if frq != None:
-                frqs[ei][si][mi] = 2.0 * pi * frq / periodic_table.gyromagnetic_ratio('1H') * periodic_table.gyromagnetic_ratio(spin.isotope) * 1e-6
-                frqs_H[ei][si][mi] = 2.0 * pi * frq * 1e-6
-
-            # The relaxation times.
-            for time, ti in loop_time(exp_type=exp_type, frq=frq, offset=offset, point=point, return_indices=True):
-                relax_times[ei][mi][oi][di].append(time)
-
-            # Missing data.
-            if key not in current_spin.r2eff:
-                values[ei][si][mi][oi].append(0.0)
-                errors[ei][si][mi][oi].append(1.0)
-                missing[ei][si][mi][oi].append(1)
-                continue
-            else:
-                missing[ei][si][mi][oi].append(0)
+    # The packed data of the spin cluster, repacking it if the spin data has changed.
+    key = tuple(spin_ids)
+    if key not in layout.data or not layout.data[key].is_current(spins=spins, sim_index=sim_index):
+        layout.data[key] = Packed_data(spins=spins, spin_ids=spin_ids, layout=layout)
+    packed = layout.data[key]
 
-            # The values.
-            if sim_index == None:
-                values[ei][si][mi][oi].append(current_spin.r2eff[key])
-            else:
-                values[ei][si][mi][oi].append(current_spin.r2eff_sim[sim_index][key])
-
-            # The errors.
-            errors[ei][si][mi][oi].append(current_spin.r2eff_err[key])
-
-        # Increment the spin index.
-        si += 1
+    # The row of the stacked values.
+    row = 0
+    if sim_index != None:
+        row = sim_index + 1
 
-    # No R2eff/R1rho data for the spin cluster.
-    if not data_flag:
-        raise RelaxError("No R2eff/R1rho data could be found for the spin cluster %s." % spin_ids)
+    # The values of the measured data or of the simulation.
+    values = [[[[stack[row] for stack in offset_stacks] for offset_stacks in spin_stacks] for spin_stacks in exp_stacks] for exp_stacks in packed.values]
 
-    # Convert to numpy arrays.
-    for exp_type, ei in loop_exp(return_indices=True):
-        for si in range(spin_num):
-            for frq, mi in loop_frq(return_indices=True):
-                for offset, oi in loop_offset(exp_type=exp_type, frq=frq, return_indices=True):
-                    values[ei][si][mi][oi] = array(values[ei][si][mi][oi], float64)
-                    errors[ei][si][mi][oi] = array(errors[ei][si][mi][oi], float64)
-                    missing[ei][si][mi][oi] = array(missing[ei][si][mi][oi], int32)
-                    for point, di in loop_point(exp_type=exp_type, frq=frq, offset=offset, return_indices=True):
-                        relax_times[ei][mi][oi][di] = array(relax_times[ei][mi][oi][di], float64)
+    # The experiment types and relaxation times.
+    exp_types = list(layout.exp_types)
+    relax_times = layout.relax_times
 
     # Return the structures.
-    return values, errors, missing, frqs, frqs_H, exp_types, relax_times
+    return values, packed.errors, packed.missing, packed.frqs, packed.frqs_H, exp_types, relax_times
 
 
 def return_relax_times():
@@ -24,7 +24,7 @@
 
 # Python module imports.
 from copy import deepcopy
-from numpy import array, asarray, diag, exp, log, ones, sqrt, sum, transpose, zeros
+from numpy import array, asarray, diag, diagonal, errstate, exp, float64, inf, log, ones, sqrt, sum, transpose, where, zeros
 from minfx.generic import generic_minimise
 import sys
 from warnings import warn
@@ -52,6 +52,9 @@ if scipy_module:
 def estimate_r2eff_err(spin_id=None, epsrel=0.0, verbosity=1):
     """This will estimate the R2eff and i0 errors from the covariance matrix Qxx.  Qxx is calculated from the Jacobian matrix and the optimised parameters.
 
+    The covariance matrices of all exponential curves of all spins are calculated at once by covariance_batch().
+
+
     @keyword spin_id:       The spin identification string.
     @type spin_id:          str
     @param epsrel:          Any columns of R which satisfy |R_{kk}| <= epsrel |R_{11}| are considered linearly-dependent and are excluded from the covariance matrix, where the corresponding rows and columns of the covariance matrix are set to zero.
@@ -60,10 +63,6 @@ def estimate_r2eff_err(spin_id=None, epsrel=0.0, verbosity=1):
     @type verbosity:        int
     """
 
-    # Check that the C modules have been compiled.
-    if not C_module_exp_fn:
-        raise RelaxError("Relaxation curve fitting is not available.  Try compiling the C modules on your platform.")
-
     # Perform checks.
     check_model_type(model=MODEL_R2EFF)
 
@@ -82,26 +81,277 @@ def estimate_r2eff_err(spin_id=None, epsrel=0.0, verbosity=1):
                 text = "Spin %s contains a gradient count of 0.0.  Is the R2eff parameter optimised?  Try execute: minimise.execute(min_algor='Newton', constraints=False)" %(spin_string)
                 warn(RelaxWarning("%s." % text))
 
-        # Print information.
-        if verbosity >= 1:
-            # Individual spin block section.
-            top = 2
-            if verbosity >= 2:
-                top += 2
-            subsection(file=sys.stdout, text="Estimating R2eff error for spin: %s"%spin_string, prespace=top)
+    # The stacked exponential curves of all spins.
+    curves, times, values, errors, mask = return_r2eff_curves(spin_id=spin_id)
+
+    # The optimised parameters.
+    params = zeros((len(curves), 2), float64)
+    for i in range(len(curves)):
+        cur_spin, param_key = curves[i][0], curves[i][2]
+        params[i] = [cur_spin.r2eff[param_key], cur_spin.i0[param_key]]
+
+    # The parameter errors from the covariance matrices of all curves.
+    covar = covariance_batch(params=params, times=times, errors=errors, mask=mask)
+    param_errors = sqrt(diagonal(covar, axis1=1, axis2=2))
+
+    # Store the errors.
+    store_r2eff_batch(curves=curves, params=params, param_errors=param_errors, times=times, mask=mask, verbosity=verbosity)
+
+
+def estimate_r2eff_batch(spin_id=None, func_tol=1e-25, max_iterations=10000000, verbosity=1):
+    """Estimate r2eff and errors by fitting all exponential curves of all spins in one stacked Levenberg-Marquardt optimisation.
+
+    The starting parameters are found by the linear least squares solution of the logarithm of the intensities, and the errors are taken from the covariance matrices of the best-fit parameters.  This replaces both the per-curve optimisation and the Monte Carlo simulations for the R2eff model.
+
+
+    @keyword spin_id:           The spin identification string.
+    @type spin_id:              str
+    @keyword func_tol:          The function tolerance which, when reached, terminates the optimisation of a curve.
+    @type func_tol:             float
+    @keyword max_iterations:    The maximum number of iterations per curve.
+    @type max_iterations:       int
+    @keyword verbosity:         The amount of information to print.  The higher the value, the greater the verbosity.
+    @type verbosity:            int
+    """
+
+    # Perform checks.
+    check_model_type(model=MODEL_R2EFF)
+
+    # The stacked exponential curves of all spins.
+    curves, times, values, errors, mask = return_r2eff_curves(spin_id=spin_id)
+
+    # Fit all curves.
+    params, chi2, iter_count = minimise_batch(times=times, values=values, errors=errors, mask=mask, func_tol=func_tol, max_iterations=max_iterations)
+
+    # The parameter errors from the covariance matrices of all curves.
+    covar = covariance_batch(params=params, times=times, errors=errors, mask=mask)
+    param_errors = sqrt(diagonal(covar, axis1=1, axis2=2))
+
+    # Store the parameters, errors and statistics.
+    store_r2eff_batch(curves=curves, params=params, param_errors=param_errors, times=times, mask=mask, chi2=chi2, iter_count=iter_count, max_iterations=max_iterations, verbosity=verbosity)
+
+
+def covariance_batch(params=None, times=None, errors=None, mask=None):
+    """Calculate the covariance matrices of the best-fit parameters of all exponential curves at once.
+
+    This is the stacked equivalent of lib.statistics.multifit_covar() for the 2-parameter exponential, where the covariance matrix of each curve is given by::
+
+        covar = (J^T.W.J)^-1 ,
+
+    with the weight matrix W = I x 1/errors^2.  The 2x2 matrices are inverted analytically, and singular matrices give infinite variances.
+
+
+    @keyword params:    The parameters [r2eff, i0] of each curve.
+    @type params:       numpy rank-2 float array with dimensions {N, 2}
+    @keyword times:     The time points of each curve, padded to the longest curve.
+    @type times:        numpy rank-2 float array with dimensions {N, T}
+    @keyword errors:    The standard deviation of the measured intensity values, padded to the longest curve.
+    @type errors:       numpy rank-2 float array with dimensions {N, T}
+    @keyword mask:      The flags for the real time points of each curve.
+    @type mask:         numpy rank-2 bool array with dimensions {N, T}
+    @return:            The covariance matrix of each curve.
+    @rtype:             numpy rank-3 float array with dimensions {N, 2, 2}
+    """
+
+    # The weights, zero for the padding.
+    weights = mask / errors**2
+
+    # The Jacobian columns of the exponential curves.
+    r2eff = params[:, 0:1]
+    i0 = params[:, 1:2]
+    d_i0 = exp(-r2eff * times)
+    d_r2eff = -times * i0 * d_i0
+
+    # The J^T.W.J elements.
+    a00 = sum(weights * d_r2eff**2, axis=1)
+    a01 = sum(weights * d_r2eff * d_i0, axis=1)
+    a11 = sum(weights * d_i0**2, axis=1)
+
+    # The analytic inverse.
+    covar = zeros((len(params), 2, 2), float64)
+    det = a00 * a11 - a01**2
+    singular = det == 0.0
+    det[singular] = 1.0
+    covar[:, 0, 0] = a11 / det
+    covar[:, 0, 1] = -a01 / det
+    covar[:, 1, 0] = -a01 / det
+    covar[:, 1, 1] = a00 / det
+    covar[singular] = inf
+
+    # Return the matrices.
+    return covar
+
+
+def estimate_x0_exp_batch(times=None, values=None, mask=None):
+    """Estimate the starting parameters x0 = [r2eff_est, i0_est] of all exponential curves at once.
+
+    This is the stacked equivalent of Exp.estimate_x0_exp(), solving the linear least squares problem ln(Intensity[j]) = ln(i0) - time[j]* r2eff for each curve.  Non-positive intensities are skipped, and curves with less than two positive intensities start from r2eff=1.0 and the maximum intensity.
+
+
+    @keyword times:     The time points of each curve, padded to the longest curve.
+    @type times:        numpy rank-2 float array with dimensions {N, T}
+    @keyword values:    The measured intensity values, padded to the longest curve.
+    @type values:       numpy rank-2 float array with dimensions {N, T}
+    @keyword mask:      The flags for the real time points of each curve.
+    @type mask:         numpy rank-2 bool array with dimensions {N, T}
+    @return:            The estimated parameters [r2eff_est, i0_est] of each curve.
+    @rtype:             numpy rank-2 float array with dimensions {N, 2}
+    """
+
+    # The points usable for the linear problem.
+    valid = mask * (values > 0.0)
+    n = sum(valid, axis=1)
+
+    # Convert to the linear problem.
+    w = log(where(valid, values, 1.0))
+    x = -1. * times * valid
+
+    # The sums.
+    sum_x = sum(x, axis=1)
+    sum_w = sum(w, axis=1)
+    sum_xw = sum(x*w, axis=1)
+    sum_xx = sum(x**2, axis=1)
+
+    # Solve by linear least squares, protecting against degenerate curves.
+    n_safe = where(n > 0, n, 1)
+    denom = sum_xx - 1./n_safe * sum_x**2
+    ok = (n >= 2) * (denom > 0.0)
+    denom = where(ok, denom, 1.0)
+    b = (sum_xw - 1./n_safe * sum_x * sum_w) / denom
+    a = 1./n_safe * sum_w - b * 1./n_safe * sum_x
+
+    # Convert back from linear to exp function.
+    x0 = zeros((len(values), 2), float64)
+    x0[:, 0] = where(ok, b, 1.0)
+    x0[:, 1] = where(ok, exp(a), (abs(values) * mask).max(axis=1))
+
+    # Return the estimates.
+    return x0
+
+
+def minimise_batch(times=None, values=None, errors=None, mask=None, x0=None, func_tol=1e-25, max_iterations=10000000):
+    """Fit all 2-parameter exponential curves at once with a stacked Levenberg-Marquardt algorithm.
+
+    The curves are padded to the longest curve and optimised together, each with its own Marquardt parameter.  The normal equations are 2x2 and are solved analytically, so that every iteration is a handful of numpy array operations over all curves.  Curves are frozen once the chi-squared decrease falls to func_tol, when no downhill step can be found, or when max_iterations is reached.
+
+
+    @keyword times:             The time points of each curve, padded to the longest curve.
+    @type times:                numpy rank-2 float array with dimensions {N, T}
+    @keyword values:            The measured intensity values, padded to the longest curve.
+    @type values:               numpy rank-2 float array with dimensions {N, T}
+    @keyword errors:            The standard deviation of the measured intensity values, padded to the longest curve.
+    @type errors:               numpy rank-2 float array with dimensions {N, T}
+    @keyword mask:              The flags for the real time points of each curve.
+    @type mask:                 numpy rank-2 bool array with dimensions {N, T}
+    @keyword x0:                The starting parameters [r2eff, i0] of each curve.  If None, these are estimated by estimate_x0_exp_batch().
+    @type x0:                   None or numpy rank-2 float array with dimensions {N, 2}
+    @keyword func_tol:          The function tolerance which, when reached, terminates the optimisation of a curve.
+    @type func_tol:             float
+    @keyword max_iterations:    The maximum number of iterations per curve.
+    @type max_iterations:       int
+    @return:                    The optimised parameters [r2eff, i0], the chi-squared values and the iteration counts of each curve.
+    @rtype:                     numpy rank-2 float array, numpy rank-1 float array, numpy rank-1 int array
+    """
+
+    # The initial parameters.
+    if x0 is None:
+        x0 = estimate_x0_exp_batch(times=times, values=values, mask=mask)
+    params = array(x0, float64)
+
+    # The weights, zero for the padding.
+    weights = mask / errors**2
+
+    # Initialise the per-curve state.
+    num = len(params)
+    lam = ones(num, float64) * 1e-3
+    iter_count = zeros(num, int)
+    chi2 = sum(weights * (values - params[:, 1:2] * exp(-params[:, 0:1] * times))**2, axis=1)
+    active = ones(num, bool)
+    if max_iterations <= 0:
+        active[:] = False
+
+    # Iterate until all curves are frozen.
+    with errstate(over='ignore', invalid='ignore'):
+        while active.any():
+            # Alias the active curves.
+            index = active.nonzero()[0]
+            t = times[index]
+            y = values[index]
+            w = weights[index]
+            p = params[index]
+
+            # The back calculated intensities and the Jacobian columns.
+            d_i0 = exp(-p[:, 0:1] * t)
+            back_calc = p[:, 1:2] * d_i0
+            d_r2eff = -t * back_calc
+            resid = y - back_calc
+
+            # The curvature matrix and gradient.
+            a00 = sum(w * d_r2eff**2, axis=1)
+            a01 = sum(w * d_r2eff * d_i0, axis=1)
+            a11 = sum(w * d_i0**2, axis=1)
+            b0 = sum(w * resid * d_r2eff, axis=1)
+            b1 = sum(w * resid * d_i0, axis=1)
+
+            # The augmented diagonal (Marquardt scaling).
+            l = lam[index]
+            c00 = where(a00 > 0.0, a00 * (1.0 + l), l)
+            c11 = where(a11 > 0.0, a11 * (1.0 + l), l)
+
+            # The analytic 2x2 solution of the step.
+            det = c00 * c11 - a01**2
+            solvable = det != 0.0
+            det = where(solvable, det, 1.0)
+            trial = p * 1.0
+            trial[:, 0] = p[:, 0] + (c11 * b0 - a01 * b1) / det
+            trial[:, 1] = p[:, 1] + (c00 * b1 - a01 * b0) / det
+
+            # The trial chi-squared values.
+            trial_chi2 = sum(w * (y - trial[:, 1:2] * exp(-trial[:, 0:1] * t))**2, axis=1)
+            accept = solvable * (trial_chi2 <= chi2[index])
+
+            # Accept the downhill steps.
+            acc = index[accept]
+            decrease = chi2[acc] - trial_chi2[accept]
+            params[acc] = trial[accept]
+            chi2[acc] = trial_chi2[accept]
+            lam[acc] = lam[acc] / 10.0
+            iter_count[acc] += 1
+
+            # Freeze the converged curves.
+            active[acc[decrease <= func_tol]] = False
+            active[acc[iter_count[acc] >= max_iterations]] = False
+
+            # Increase the Marquardt parameter for the rejected steps, freezing curves for which no downhill step exists.
+            rej = index[~accept]
+            lam[rej] = lam[rej] * 10.0
+            active[rej[lam[rej] > 1e16]] = False
+
+    # Return the results.
+    return params, chi2, iter_count
+
+
+def return_r2eff_curves(spin_id=None):
+    """Collect the exponential curves of all selected spins as stacked and padded arrays.
+
+    @keyword spin_id:   The spin identification string.
+    @type spin_id:      str
+    @return:            The list of curve information, each element being the spin container, spin string, parameter key, experiment type, frequency, offset and dispersion point, followed by the time points, intensities, intensity errors and mask arrays with dimensions {N, T}.
+    @rtype:             list of list, numpy rank-2 float array, numpy rank-2 float array, numpy rank-2 float array, numpy rank-2 bool array
+    """
+
+    # Loop over the spins and curves, collecting the data.
+    curves = []
+    data = []
+    for cur_spin, mol_name, resi, resn, cur_spin_id in spin_loop(selection=spin_id, full_info=True, return_id=True, skip_desel=True):
+        # Generate spin string.
+        spin_string = generate_spin_string(spin=cur_spin, mol_name=mol_name, res_num=resi, res_name=resn)
 
         # Loop over each spectrometer frequency and dispersion point.
-        for exp_type, frq, offset, point, ei, mi, oi, di in loop_exp_frq_offset_point(return_indices=True):
+        for exp_type, frq, offset, point in loop_exp_frq_offset_point():
             # The parameter key.
             param_key = return_param_key_from_data(exp_type=exp_type, frq=frq, offset=offset, point=point)
 
-            # Extract values.
-            r2eff = getattr(cur_spin, 'r2eff')[param_key]
-            i0 = getattr(cur_spin, 'i0')[param_key]
-
-            # Pack data
-            param_vector = [r2eff, i0]
-
             # The peak intensities, errors and times.
             values = []
             errors = []
@@ -111,59 +361,114 @@ def estimate_r2eff_err(spin_id=None, epsrel=0.0, verbosity=1):
                 errors.append(average_intensity(spin=cur_spin, exp_type=exp_type, frq=frq, offset=offset, point=point, time=time, error=True))
                 times.append(time)
 
-            # Convert to numpy array.
-            values = asarray(values)
-            errors = asarray(errors)
-            times = asarray(times)
-
-            # Initialise data in C code.
-            scaling_list = [1.0, 1.0]
-            model = Relax_fit_opt(model='exp', num_params=len(param_vector), values=values, errors=errors, relax_times=times, scaling_matrix=scaling_list)
+            # Store.
+            curves.append([cur_spin, spin_string, param_key, exp_type, frq, offset, point])
+            data.append([times, values, errors])
+
+    # The padded arrays, with unit errors for the padding.
+    num_times = 1
+    for times, values, errors in data:
+        num_times = max(num_times, len(times))
+    times_array = zeros((len(data), num_times), float64)
+    values_array = zeros((len(data), num_times), float64)
+    errors_array = ones((len(data), num_times), float64)
+    mask = zeros((len(data), num_times), bool)
+    for i in range(len(data)):
+        times, values, errors = data[i]
+        times_array[i, :len(times)] = times
+        values_array[i, :len(times)] = values
+        errors_array[i, :len(times)] = errors
+        mask[i, :len(times)] = True
+
+    # Return the curves.
+    return curves, times_array, values_array, errors_array, mask
+
+
+def store_r2eff_batch(curves=None, params=None, param_errors=None, times=None, mask=None, chi2=None, iter_count=None, max_iterations=None, verbosity=1):
+    """Store the stacked exponential curve results in the spin containers.
+
+    @keyword curves:            The list of curve information from return_r2eff_curves().
+    @type curves:               list of list
+    @keyword params:            The parameters [r2eff, i0] of each curve.
+    @type params:               numpy rank-2 float array with dimensions {N, 2}
+    @keyword param_errors:      The parameter errors of each curve.
+    @type param_errors:         numpy rank-2 float array with dimensions {N, 2}
+    @keyword times:             The time points of each curve, padded to the longest curve.
+    @type times:                numpy rank-2 float array with dimensions {N, T}
+    @keyword mask:              The flags for the real time points of each curve.
+    @type mask:                 numpy rank-2 bool array with dimensions {N, T}
+    @keyword chi2:              The chi-squared values of the fitted curves.  If None, the parameters are not stored and the spin chi-squared value is printed.
+    @type chi2:                 None or numpy rank-1 float array
+    @keyword iter_count:        The iteration counts of the fitted curves.
+    @type iter_count:           None or numpy rank-1 int array
+    @keyword max_iterations:    The maximum number of iterations per curve, for the optimisation warning.
+    @type max_iterations:       None or int
+    @keyword verbosity:         The amount of information to print.  The higher the value, the greater the verbosity.
+    @type verbosity:            int
+    """
 
-            # Use the direct Jacobian from function.
-            jacobian_matrix_exp = transpose(asarray( model.jacobian(param_vector) ) )
-            weights = 1. / errors**2
+    # Loop over the curves.
+    spin_string_last = None
+    for i in range(len(curves)):
+        # Unpack.
+        cur_spin, spin_string, param_key, exp_type, frq, offset, point = curves[i]
+        r2eff, i0 = params[i]
+        r2eff_err, i0_err = param_errors[i]
 
-            # Get the co-variance
-            pcov = multifit_covar(J=jacobian_matrix_exp, weights=weights)
+        # Print the spin section.
+        if verbosity >= 1 and spin_string != spin_string_last:
+            top = 2
+            if verbosity >= 2:
+                top += 2
+            subsection(file=sys.stdout, text="Estimating R2eff error for spin: %s"%spin_string, prespace=top)
+        spin_string_last = spin_string
 
-            # To compute one standard deviation errors on the parameters, take the square root of the diagonal covariance.
-            param_vector_error = sqrt(diag(pcov))
+        # The fitted parameters and statistics.
+        if chi2 is not None:
+            # Disassemble the parameter vector.
+            disassemble_param_vector(param_vector=params[i], spins=[cur_spin], key=param_key)
 
-            # Extract values.
-            r2eff_err, i0_err = param_vector_error
+            # Chi-squared statistic.
+            cur_spin.chi2 = chi2[i]
 
-            # Copy r2eff dictionary, to r2eff_err dictionary. They have same keys to the dictionary,
-            if not hasattr(cur_spin, 'r2eff_err'):
-                setattr(cur_spin, 'r2eff_err', deepcopy(getattr(cur_spin, 'r2eff')))
-            if not hasattr(cur_spin, 'i0_err'):
-                setattr(cur_spin, 'i0_err', deepcopy(getattr(cur_spin, 'i0')))
+            # Iterations.
+            cur_spin.iter = int(iter_count[i])
+            cur_spin.f_count = int(iter_count[i])
+            cur_spin.g_count = int(iter_count[i])
+            cur_spin.h_count = 0
 
-            # Set error.
-            cur_spin.r2eff_err[param_key] = r2eff_err
-            cur_spin.i0_err[param_key] = i0_err
+            # Warning.
+            cur_spin.warning = None
+            if iter_count[i] >= max_iterations:
+                cur_spin.warning = "Maximum number of iterations reached"
 
-            # Get other relevant information.
-            chi2 = getattr(cur_spin, 'chi2')
+        # Copy r2eff dictionary, to r2eff_err dictionary. They have same keys to the dictionary,
+        if not hasattr(cur_spin, 'r2eff_err'):
+            setattr(cur_spin, 'r2eff_err', deepcopy(getattr(cur_spin, 'r2eff')))
+        if not hasattr(cur_spin, 'i0_err'):
+            setattr(cur_spin, 'i0_err', deepcopy(getattr(cur_spin, 'i0')))
 
-            # Print information.
-            print_strings = []
-            if verbosity >= 1:
-                # Add print strings.
-                point_info = "%s at %3.1f MHz, for offset=%3.3f ppm and dispersion point %-5.1f, with %i time points." % (exp_type, frq/1E6, offset, point, len(times))
-                print_strings.append(point_info)
+        # Set error.
+        cur_spin.r2eff_err[param_key] = r2eff_err
+        cur_spin.i0_err[param_key] = i0_err
 
-                par_info = "r2eff=%3.3f r2eff_err=%3.4f, i0=%6.1f, i0_err=%3.4f, chi2=%3.3f.\n" % ( r2eff, r2eff_err, i0, i0_err, chi2)
-                print_strings.append(par_info)
+        # Print information.
+        if verbosity >= 1:
+            # The chi-squared value.
+            if chi2 is not None:
+                chi2_i = chi2[i]
+            else:
+                chi2_i = getattr(cur_spin, 'chi2')
 
-                if verbosity >= 2:
-                    time_info = ', '.join(map(str, times))
-                    print_strings.append('For time array: '+time_info+'.\n\n')
+            # The curve information.
+            point_info = "%s at %3.1f MHz, for offset=%3.3f ppm and dispersion point %-5.1f, with %i time points." % (exp_type, frq/1E6, offset, point, sum(mask[i]))
+            print(point_info)
+            par_info = "r2eff=%3.3f r2eff_err=%3.4f, i0=%6.1f, i0_err=%3.4f, chi2=%3.3f.\n" % (r2eff, r2eff_err, i0, i0_err, chi2_i)
+            print(par_info)
 
-            # Print info
-            if len(print_strings) > 0:
-                for print_string in print_strings:
-                    print(print_string),
+            if verbosity >= 2:
+                time_info = ', '.join(map(str, times[i][mask[i]]))
+                print('For time array: '+time_info+'.\n\n')
 
 
 #### This class is only for testing.
@@ -507,7 +812,7 @@ def estimate_r2eff(method='minfx', min_algor='simplex', c_code=True, constraints
     Then solving initial guess by linear least squares of: ln(Intensity[j]) = ln(i0) - time[j]* r2eff.
 
 
-    @keyword method:            The method to minimise and estimate errors.  Options are: 'minfx' or 'scipy.optimize.leastsq'.
+    @keyword method:            The method to minimise and estimate errors.  Options are: 'minfx', 'scipy.optimize.leastsq' or 'batch' for the stacked Levenberg-Marquardt fit of all curves by estimate_r2eff_batch().
     @type method:               string
     @keyword min_algor:         The minimisation algorithm
     @type min_algor:            string
@@ -538,6 +843,11 @@ def estimate_r2eff(method='minfx', min_algor='simplex', c_code=True, constraints
     if not C_module_exp_fn and method == 'minfx':
         raise RelaxError("Relaxation curve fitting is not available.  Try compiling the C modules on your platform.")
 
+    # The stacked fit of all curves.
+    if method == 'batch':
+        estimate_r2eff_batch(spin_id=spin_id, verbosity=verbosity)
+        return
+
     # Set class scipy setting.
     E = Exp(verbosity=verbosity)
     E.set_settings_leastsq(ftol=ftol, xtol=xtol, maxfev=maxfev, factor=factor)
@@ -605,7 +915,7 @@ def estimate_r2eff(method='minfx', min_algor='simplex', c_code=True, constraints
                 # Acquire results.
                 results = minimise_minfx(E=E)
             else:
-                raise RelaxError("Method for minimisation not known. Try setting: method='scipy.optimize.leastsq'.")
+                raise RelaxError("Method for minimisation not known. Try setting: method='scipy.optimize.leastsq' or method='batch'.")
 
             # Unpack results
             param_vector, param_vector_error, chi2, iter_count, f_count, g_count, h_count, warning = results
@@ -26,7 +26,7 @@
 # Python module imports.
 from minfx.generic import generic_minimise
 from minfx.grid import grid
-from numpy import dot, float64, int32, ones, zeros
+from numpy import array, dot, float64, int32, ones, zeros
 from numpy.linalg import inv
 from operator import mul
 from re import match, search
@@ -38,15 +38,16 @@ from dep_check import C_module_exp_fn
 from lib.dispersion.two_point import calc_two_point_r2eff, calc_two_point_r2eff_err
 from lib.dispersion.variables import EXP_TYPE_LIST_CPMG, MODEL_CR72, MODEL_CR72_FULL, MODEL_LM63, MODEL_M61, MODEL_MP05, MODEL_TAP03, MODEL_TP02
 from lib.errors import RelaxError
+from lib.optimisation import grid_batch, grid_refine
 from lib.text.sectioning import subsection
 from lib.warnings import RelaxWarning
 from multi import Memo, Result_command, Slave_command
 from pipe_control.mol_res_spin import generate_spin_string, spin_loop
 from specific_analyses.relax_disp.checks import check_disp_points, check_exp_type, check_exp_type_fixed_time
-from specific_analyses.relax_disp.data import average_intensity, count_spins, find_intensity_keys, has_exponential_exp_type, has_proton_mmq_cpmg, is_r1_optimised, loop_exp, loop_exp_frq_offset_point, loop_exp_frq_offset_point_time, loop_frq, loop_offset, loop_time, pack_back_calc_r2eff, return_cpmg_frqs, return_offset_data, return_param_key_from_data, return_r1_data, return_r2eff_arrays, return_spin_lock_nu1
-from specific_analyses.relax_disp.parameters import assemble_param_vector, disassemble_param_vector, linear_constraints, param_conversion, param_num, r1_setup
+from specific_analyses.relax_disp.data import average_intensity, count_spins, find_intensity_keys, has_exponential_exp_type, has_proton_mmq_cpmg, is_r1_optimised, loop_exp, loop_exp_frq_offset_point, loop_exp_frq_offset_point_time, loop_frq, loop_offset, loop_time, pack_back_calc_r2eff, return_offset_data, return_packed_layout, return_param_key_from_data, return_r1_data, return_r2eff_arrays
+from specific_analyses.relax_disp.parameters import assemble_param_vector, disassemble_param_vector, linear_constraints, loop_parameters, param_conversion, param_num, r1_setup
 from target_functions.relax_disp import Dispersion
-from target_functions.relax_fit_wrapper import Relax_fit_opt
+from target_functions.relax_fit_wrapper import Relax_fit_opt, fit_curves
 
 
 def back_calc_peak_intensities(spin=None, spin_id=None, exp_type=None, frq=None, offset=None, point=None):
@@ -163,8 +164,9 @@ def back_calc_r2eff(spins=None, spin_ids=None, cpmg_frqs=None, spin_lock_offset=
     # The dispersion data.
     recalc_tau = True
     if cpmg_frqs == None and spin_lock_nu1 == None and spin_lock_offset == None:
-        cpmg_frqs = return_cpmg_frqs(ref_flag=False)
-        spin_lock_nu1 = return_spin_lock_nu1(ref_flag=False)
+        layout = return_packed_layout()
+        cpmg_frqs = layout.cpmg_frqs
+        spin_lock_nu1 = layout.spin_lock_nu1
 
     # Reset the cpmg_frqs if interpolating R1rho models.
     elif cpmg_frqs == None and spin_lock_offset != None:
@@ -310,7 +312,73 @@ def calculate_r2eff():
                 spin.r2eff_err[param_key] = calc_two_point_r2eff_err(relax_time=time, I_ref=ref_intensity, I=intensity, I_ref_err=ref_intensity_err, I_err=intensity_err)
 
 
-def minimise_r2eff(spins=None, spin_ids=None, min_algor=None, min_options=None, func_tol=None, grad_tol=None, max_iterations=None, constraints=False, scaling_matrix=None, verbosity=0, sim_index=None, lower=None, upper=None, inc=None):
+def map_func_r2eff(spins=None, spin_ids=None, params=None, spin_index=None):
+    """Create the chi-squared space mapping function for the given spin cluster.
+
+    The dispersion target function is set up once and all other parameters of the cluster are held at their current values.  Each mapped parameter is substituted into all of its parameter vector positions, i.e. the R20 type parameters are set to the same value for all spectrometer frequencies, as is done by the value.set user function.
+
+
+    @keyword spins:         The list of specific spin data container for cluster.
+    @type spins:            List of SpinContainer instances
+    @keyword spin_ids:      The list of spin ID strings for the spin containers in cluster.
+    @type spin_ids:         list of str
+    @keyword params:        The names of the parameters to map.
+    @type params:           list of str
+    @keyword spin_index:    The index of the mapped spin in the cluster, or None for all spins.
+    @type spin_index:       None or int
+    @return:                The function which converts the rank-2 array of points, one row per point and one column per mapped parameter, into the rank-1 array of chi-squared values.
+    @rtype:                 function
+    """
+
+    # The current parameter vector.
+    param_vector = assemble_param_vector(spins=spins)
+
+    # The parameter vector positions of the mapped parameters.
+    indices = []
+    for name in params:
+        indices.append([])
+        for param_name, param_index, si, r20_key in loop_parameters(spins=spins):
+            if param_name == name and (si == None or spin_index == None or si == spin_index):
+                indices[-1].append(param_index)
+
+        # Not a model parameter.
+        if not len(indices[-1]):
+            raise RelaxError("The parameter '%s' is not part of the '%s' model." % (name, spins[0].model))
+
+    # Number of spectrometer fields.
+    fields = [None]
+    field_count = 1
+    if hasattr(cdp, 'spectrometer_frq_count'):
+        fields = cdp.spectrometer_frq_list
+        field_count = cdp.spectrometer_frq_count
+
+    # Initialise the data structures for the target function.
+    values, errors, missing, frqs, frqs_H, exp_types, relax_times = return_r2eff_arrays(spins=spins, spin_ids=spin_ids, fields=fields, field_count=field_count)
+    offsets, spin_lock_fields_inter, chemical_shifts, tilt_angles, Delta_omega, w_eff = return_offset_data(spins=spins, spin_ids=spin_ids, field_count=field_count)
+    r1 = return_r1_data(spins=spins, spin_ids=spin_ids, field_count=field_count)
+    r1_fit = is_r1_optimised(spins[0].model)
+    layout = return_packed_layout()
+
+    # Initialise the relaxation dispersion fit functions.
+    model = Dispersion(model=spins[0].model, num_params=param_num(spins=spins), num_spins=len(spins), num_frq=field_count, exp_types=exp_types, values=values, errors=errors, missing=missing, frqs=frqs, frqs_H=frqs_H, cpmg_frqs=layout.cpmg_frqs, spin_lock_nu1=layout.spin_lock_nu1, chemical_shifts=chemical_shifts, offset=offsets, tilt_angles=tilt_angles, r1=r1, relax_times=relax_times, r1_fit=r1_fit)
+
+    # The mapping function.
+    def func(points):
+        # The full parameter vectors, one per point.
+        vectors = zeros((len(points), len(param_vector)), float64)
+        vectors[:] = param_vector
+        for i in range(len(params)):
+            for index in indices[i]:
+                vectors[:, index] = points[:, i]
+
+        # Evaluate all points.
+        return model.func_batch(vectors)
+
+    # Return the function.
+    return func
+
+
+def minimise_r2eff(spins=None, spin_ids=None, min_algor=None, min_options=None, func_tol=None, grad_tol=None, max_iterations=None, constraints=False, scaling_matrix=None, verbosity=0, sim_index=None, lower=None, upper=None, inc=None, curves=None):
     """Optimise the R2eff model by fitting the 2-parameter exponential curves.
 
     This mimics the R1 and R2 relax_fit analysis.
@@ -344,12 +412,21 @@ def minimise_r2eff(spins=None, spin_ids=None, min_algor=None, min_options=None,
     @type upper:                list of numbers
     @keyword inc:               The model specific increments for each dimension of the space for the grid search. The number of elements in the array must equal to the number of parameters in the model.  This argument is only used when doing a grid search.
     @type inc:                  list of int
+    @keyword curves:            A list for collecting the exponential curves of the unconstrained Levenberg-Marquardt optimisation.  If supplied, the curves are appended to this list for a later call to minimise_r2eff_batch() rather than being optimised.
+    @type curves:               None or list
     """
 
     # Check that the C modules have been compiled.
     if not C_module_exp_fn:
         raise RelaxError("Relaxation curve fitting is not available.  Try compiling the C modules on your platform.")
 
+    # Unconstrained Levenberg-Marquardt optimisation, collecting all curves for a single batched call to the C module.
+    batch_curves = None
+    if not constraints and (match('[Ll][Mm]$', min_algor) or match('[Ll]evenburg-[Mm]arquardt$', min_algor)):
+        batch_curves = []
+        if curves != None:
+            batch_curves = curves
+
     # Loop over the spins.
     for si in range(len(spins)):
         # Skip deselected spins.
@@ -374,7 +451,7 @@ def minimise_r2eff(spins=None, spin_ids=None, min_algor=None, min_options=None,
                 A, b = linear_constraints(spins=[spins[si]], scaling_matrix=scaling_matrix)
 
             # Print out.
-            if verbosity >= 1:
+            if verbosity >= 1 and batch_curves == None:
                 # Individual spin section.
                 top = 2
                 if verbosity >= 2:
@@ -420,6 +497,11 @@ def minimise_r2eff(spins=None, spin_ids=None, min_algor=None, min_options=None,
                 point_info = "%s at %3.1f MHz, for offset=%3.3f ppm and dispersion point %-5.1f, with %i time points." % (exp_type, frq/1E6, offset, point, len(times))
                 raise RelaxError("The data setup points to exponential curve fitting, but only %i time points was found, where 3 time points is minimum.  If calculating R2eff values for fixed relaxation time period data, check that a reference intensity has been specified for each offset value."%(len(times)))
 
+            # Store the curve for the batched optimisation.
+            if batch_curves != None:
+                batch_curves.append([spins[si], param_key, sim_index, values, errors, times, assemble_param_vector(spins=[spins[si]], key=param_key, sim_index=sim_index)])
+                continue
+
             # The scaling matrix in a diagonalised list form.
             scaling_list = []
             if scaling_matrix is None:
@@ -458,45 +540,125 @@ def minimise_r2eff(spins=None, spin_ids=None, min_algor=None, min_options=None,
             # Disassemble the parameter vector.
             disassemble_param_vector(param_vector=param_vector, spins=[spins[si]], key=param_key, sim_index=sim_index)
 
-            # Monte Carlo minimisation statistics.
-            if sim_index != None:
-                # Chi-squared statistic.
-                spins[si].chi2_sim[sim_index] = chi2
+            # Store the minimisation statistics.
+            store_r2eff_stats(spin=spins[si], sim_index=sim_index, chi2=chi2, iter_count=iter_count, f_count=f_count, g_count=g_count, h_count=h_count, warning=warning)
 
-                # Iterations.
-                spins[si].iter_sim[sim_index] = iter_count
+    # The batched Levenberg-Marquardt optimisation of all curves.
+    if curves == None and batch_curves != None and len(batch_curves):
+        minimise_r2eff_batch(curves=batch_curves, func_tol=func_tol, max_iterations=max_iterations, verbosity=verbosity)
 
-                # Function evaluations.
-                spins[si].f_count_sim[sim_index] = f_count
 
-                # Gradient evaluations.
-                spins[si].g_count_sim[sim_index] = g_count
 
-                # Hessian evaluations.
-                spins[si].h_count_sim[sim_index] = h_count
+def minimise_r2eff_batch(curves=None, func_tol=None, max_iterations=None, verbosity=0):
+    """Optimise the R2eff model exponential curves in a single batched call to the C module.
 
-                # Warning.
-                spins[si].warning_sim[sim_index] = warning
+    All curves are fitted by the Levenberg-Marquardt algorithm of the relax_fit C module, avoiding the Python target function overhead of the per-curve optimisation.  The curves can belong to different spins and Monte Carlo simulations, each curve starting from its current parameter values and terminating individually once the function tolerance is reached.
 
-            # Normal statistics.
-            else:
-                # Chi-squared statistic.
-                spins[si].chi2 = chi2
 
-                # Iterations.
-                spins[si].iter = iter_count
+    @keyword curves:            The list of curves, each being the spin container, the parameter key, the simulation index, the peak intensities, errors and relaxation times, and the initial parameter vector.
+    @type curves:               list of list
+    @keyword func_tol:          The function tolerance which, when reached, terminates optimisation.  Setting this to None turns of the check.
+    @type func_tol:             None or float
+    @keyword max_iterations:    The maximum number of iterations for the algorithm.
+    @type max_iterations:       int
+    @keyword verbosity:         The amount of information to print.  The higher the value, the greater the verbosity.
+    @type verbosity:            int
+    @return:                    The chi-squared values and iteration counts of all curves.
+    @rtype:                     list of float, list of int
+    """
 
-                # Function evaluations.
-                spins[si].f_count = f_count
+    # Print out.
+    if verbosity >= 1:
+        subsection(file=sys.stdout, text="Batched Levenberg-Marquardt fitting of %i exponential curves" % len(curves), prespace=2)
 
-                # Gradient evaluations.
-                spins[si].g_count = g_count
+    # The tolerance.
+    if func_tol == None:
+        func_tol = 0.0
 
-                # Hessian evaluations.
-                spins[si].h_count = h_count
+    # Fit all curves.
+    params, chi2, iter_count = fit_curves(model='exp', values=[curve[3] for curve in curves], errors=[curve[4] for curve in curves], relax_times=[curve[5] for curve in curves], params=[curve[6] for curve in curves], func_tol=func_tol, max_iterations=max_iterations)
 
-                # Warning.
-                spins[si].warning = warning
+    # Store the results.
+    for i in range(len(curves)):
+        # Alias.
+        spin, param_key, sim_index = curves[i][0], curves[i][1], curves[i][2]
+
+        # Disassemble the parameter vector.
+        disassemble_param_vector(param_vector=params[i], spins=[spin], key=param_key, sim_index=sim_index)
+
+        # The optimisation warning.
+        warning = None
+        if iter_count[i] >= max_iterations:
+            warning = "Maximum number of iterations reached"
+
+        # Store the minimisation statistics.
+        store_r2eff_stats(spin=spin, sim_index=sim_index, chi2=float(chi2[i]), iter_count=int(iter_count[i]), f_count=int(iter_count[i]), g_count=int(iter_count[i]), h_count=0, warning=warning)
+
+    # Return the statistics.
+    return chi2, iter_count
+
+
+
+def store_r2eff_stats(spin=None, sim_index=None, chi2=None, iter_count=None, f_count=None, g_count=None, h_count=None, warning=None):
+    """Store the minimisation statistics of an R2eff model exponential curve fit in the spin container.
+
+    @keyword spin:          The spin container.
+    @type spin:             SpinContainer instance
+    @keyword sim_index:     The index of the simulation.  This should be None for the normal optimisation.
+    @type sim_index:        None or int
+    @keyword chi2:          The chi-squared value.
+    @type chi2:             float
+    @keyword iter_count:    The number of iterations.
+    @type iter_count:       int
+    @keyword f_count:       The number of function calls.
+    @type f_count:          int
+    @keyword g_count:       The number of gradient calls.
+    @type g_count:          int
+    @keyword h_count:       The number of Hessian calls.
+    @type h_count:          int
+    @keyword warning:       The optimisation warning.
+    @type warning:          None or str
+    """
+
+    # Monte Carlo minimisation statistics.
+    if sim_index != None:
+        # Chi-squared statistic.
+        spin.chi2_sim[sim_index] = chi2
+
+        # Iterations.
+        spin.iter_sim[sim_index] = iter_count
+
+        # Function evaluations.
+        spin.f_count_sim[sim_index] = f_count
+
+        # Gradient evaluations.
+        spin.g_count_sim[sim_index] = g_count
+
+        # Hessian evaluations.
+        spin.h_count_sim[sim_index] = h_count
+
+        # Warning.
+        spin.warning_sim[sim_index] = warning
+
+    # Normal statistics.
+    else:
+        # Chi-squared statistic.
+        spin.chi2 = chi2
+
+        # Iterations.
+        spin.iter = iter_count
+
+        # Function evaluations.
+        spin.f_count = f_count
+
+        # Gradient evaluations.
+        spin.g_count = g_count
+
+        # Hessian evaluations.
+        spin.h_count = h_count
+
+        # Warning.
+        spin.warning = warning
 
 
 
@@ -622,10 +784,40 @@ class Disp_minimise_command(Slave_command):
         # Parameter number.
         self.param_num = param_num(spins=spins)
 
-        # The dispersion data.
+        # The dispersion data, from the cached data layout.
         self.dispersion_points = cdp.dispersion_points
-        self.cpmg_frqs = return_cpmg_frqs(ref_flag=False)
-        self.spin_lock_nu1 = return_spin_lock_nu1(ref_flag=False)
+        layout = return_packed_layout()
+        self.cpmg_frqs = layout.cpmg_frqs
+        self.spin_lock_nu1 = layout.spin_lock_nu1
+
+
+    def estimate_cost(self):
+        """Estimate the relative cost of the optimisation for the dynamic dispatch of the multi-processor.
+
+        @return:    The number of spins times the number of parameters times the number of data points, multiplied by the number of grid points for the grid search.
+        @rtype:     int
+        """
+
+        # Count the data points which are not missing.
+        points = 0
+        for ei in range(len(self.missing)):
+            for si in range(len(self.missing[ei])):
+                for mi in range(len(self.missing[ei][si])):
+                    for oi in range(len(self.missing[ei][si][mi])):
+                        for flag in self.missing[ei][si][mi][oi]:
+                            if not flag:
+                                points += 1
+
+        # The cost.
+        cost = count_spins(spins=self.spins) * max(1, self.param_num) * max(1, points)
+
+        # Grid search.
+        if search('^[Gg]rid', self.min_algor):
+            for inc in self.inc:
+                cost *= inc
+
+        # Return the cost.
+        return cost
 
 
     def run(self, processor, completed):
@@ -649,9 +841,20 @@ class Disp_minimise_command(Slave_command):
         # Initialise the function to minimise.
         model = Dispersion(model=self.spins[0].model, num_params=self.param_num, num_spins=count_spins(self.spins), num_frq=len(self.fields), exp_types=self.exp_types, values=self.values, errors=self.errors, missing=self.missing, frqs=self.frqs, frqs_H=self.frqs_H, cpmg_frqs=self.cpmg_frqs, spin_lock_nu1=self.spin_lock_nu1, chemical_shifts=self.chemical_shifts, offset=self.offsets, tilt_angles=self.tilt_angles, r1=self.r1, relax_times=self.relax_times, scaling_matrix=self.scaling_matrix, r1_fit=self.r1_fit)
 
-        # Grid search.
+        # Grid search, evaluating blocks of grid points at once for the models with vectorised target functions.
         if search('^[Gg]rid', self.min_algor):
-            results = grid(func=model.func, args=(), num_incs=self.inc, lower=self.lower, upper=self.upper, A=self.A, b=self.b, verbosity=self.verbosity)
+            # The coarse-to-fine grid search, with the grid points of the other models evaluated one by one.
+            if self.min_options:
+                func_batch = model.func_batch
+                if model.back_calc_batch == None:
+                    func_batch = lambda points: array([model.func(point) for point in points], float64)
+                results = grid_refine(func_batch=func_batch, args=(), num_incs=self.inc, lower=self.lower, upper=self.upper, A=self.A, b=self.b, levels=self.min_options[0], best=self.min_options[1], verbosity=self.verbosity)
+
+            # The single grid search.
+            elif model.back_calc_batch != None:
+                results = grid_batch(func_batch=model.func_batch, args=(), num_incs=self.inc, lower=self.lower, upper=self.upper, A=self.A, b=self.b, verbosity=self.verbosity)
+            else:
+                results = grid(func=model.func, args=(), num_incs=self.inc, lower=self.lower, upper=self.upper, A=self.A, b=self.b, verbosity=self.verbosity)
 
             # Unpack the results.
             param_vector, chi2, iter_count, warning = results
@@ -661,7 +864,16 @@ class Disp_minimise_command(Slave_command):
 
         # Minimisation.
         else:
-            results = generic_minimise(func=model.func, args=(), x0=self.param_vector, min_algor=self.min_algor, min_options=self.min_options, func_tol=self.func_tol, grad_tol=self.grad_tol, maxiter=self.max_iterations, A=self.A, b=self.b, full_output=True, print_flag=self.verbosity)
+            # Levenberg-Marquardt minimisation, adding the Jacobian function and the errors of the valid points to the options.
+            min_options = self.min_options
+            algor = self.min_algor
+            if match('^[Ll]og [Bb]arrier$', algor) or match('^[Mm][Oo][Mm]$', algor) or match('[Mm]ethod of [Mm]ultipliers$', algor):
+                algor = min_options[0]
+            if match('[Ll][Mm]$', algor) or match('[Ll]evenburg-[Mm]arquardt$', algor):
+                min_options = tuple(min_options) + (model.lm_dri, model.lm_errors)
+
+            # Optimise, using the analytic gradient and Hessian for the models which have them.
+            results = generic_minimise(func=model.func, dfunc=model.dfunc, d2func=model.d2func, args=(), x0=self.param_vector, min_algor=self.min_algor, min_options=min_options, func_tol=self.func_tol, grad_tol=self.grad_tol, maxiter=self.max_iterations, A=self.A, b=self.b, full_output=True, print_flag=self.verbosity)
 
             # Unpack the results.
             if results == None:
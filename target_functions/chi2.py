@@ -106,6 +106,26 @@ def chi2_rankN(data, back_calc_vals, errors):
     return sum((1.0 / errors * (data - back_calc_vals))**2)
 
 
+def chi2_rankN_points(data, back_calc_vals, errors):
+    """Function to calculate the chi-squared values for multiple parameter points.
+
+    This is the same as the chi2_rankN() function, except that the first axis of the back calculated values corresponds to the different parameter points, and a chi-squared value is returned for each point.
+
+
+    @param data:            The multi dimensional vectors of yi values.
+    @type data:             numpy multi dimensional array
+    @param back_calc_vals:  The multi dimensional vectors of yi(theta) values, with the additional first dimension of the parameter points.
+    @type back_calc_vals:   numpy multi dimensional array
+    @param errors:          The multi dimensional vectors of sigma_i values.
+    @type errors:           numpy multi dimensional array
+    @return:                The chi-squared values for each parameter point.
+    @rtype:                 numpy rank-1 float array
+    """
+
+    # Calculate the chi-squared statistics.
+    return sum(((1.0 / errors * (data - back_calc_vals))**2).reshape(len(back_calc_vals), -1), axis=1)
+
+
 # Chi-squared gradient.
 #######################
 
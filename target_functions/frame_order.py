@@ -24,11 +24,18 @@
 
 # Python module imports.
 from copy import deepcopy
-from math import acos, cos, pi, sin, sqrt
-from numpy import add, array, dot, float32, float64, ones, outer, subtract, transpose, uint8, zeros
+from math import pi, sqrt
+from numpy import add, array, dot, float32, float64, load, ones, outer, savez, subtract, transpose, uint8, zeros
+from numpy import arccos as np_arccos
+from numpy import cos as np_cos
+from numpy import sin as np_sin
+from os import F_OK, access, rename
+from os.path import dirname
+from tempfile import NamedTemporaryFile
+from warnings import warn
 
 # relax module imports.
-from extern.sobol.sobol_lib import i4_sobol_generate
+from extern.sobol.sobol_lib import i4_sobol_generate_vect
 from lib.alignment.alignment_tensor import to_5D, to_tensor
 from lib.alignment.pcs import pcs_tensor
 from lib.alignment.rdc import rdc_tensor
@@ -48,16 +55,18 @@ from lib.frame_order.pseudo_ellipse_torsionless import compile_2nd_matrix_pseudo
 from lib.frame_order.rotor import compile_2nd_matrix_rotor, pcs_numeric_quad_int_rotor, pcs_numeric_qr_int_rotor
 from lib.frame_order.variables import MODEL_DOUBLE_ROTOR, MODEL_FREE_ROTOR, MODEL_ISO_CONE, MODEL_ISO_CONE_FREE_ROTOR, MODEL_ISO_CONE_TORSIONLESS, MODEL_PSEUDO_ELLIPSE, MODEL_PSEUDO_ELLIPSE_FREE_ROTOR, MODEL_PSEUDO_ELLIPSE_TORSIONLESS, MODEL_RIGID, MODEL_ROTOR
 from lib.geometry.coord_transform import spherical_to_cartesian
-from lib.geometry.rotations import euler_to_R_zyz, tilt_torsion_to_R, two_vect_to_R
+from lib.geometry.rotations import euler_to_R_zyz, two_vect_to_R
+from lib.io import get_file_path, mkdir_nofail
 from lib.linear_algebra.kronecker_product import kron_prod
 from lib.physical_constants import pcs_constant
+from lib.warnings import RelaxWarning
 from target_functions.chi2 import chi2
 
 
 class Frame_order:
     """Class containing the target function of the optimisation of Frame Order matrix components."""
 
-    def __init__(self, model=None, init_params=None, full_tensors=None, full_in_ref_frame=None, rdcs=None, rdc_errors=None, rdc_weights=None, rdc_vect=None, dip_const=None, pcs=None, pcs_errors=None, pcs_weights=None, atomic_pos=None, temp=None, frq=None, paramag_centre=zeros(3), scaling_matrix=None, sobol_max_points=200, sobol_oversample=100, com=None, ave_pos_pivot=zeros(3), pivot=None, pivot_opt=False, quad_int=False):
+    def __init__(self, model=None, init_params=None, full_tensors=None, full_in_ref_frame=None, rdcs=None, rdc_errors=None, rdc_weights=None, rdc_vect=None, dip_const=None, pcs=None, pcs_errors=None, pcs_weights=None, atomic_pos=None, temp=None, frq=None, paramag_centre=zeros(3), scaling_matrix=None, sobol_max_points=200, sobol_oversample=100, sobol_cache_dir=None, com=None, ave_pos_pivot=zeros(3), pivot=None, pivot_opt=False, quad_int=False):
         """Set up the target functions for the Frame Order theories.
 
         @keyword model:             The name of the Frame Order model.
@@ -98,6 +107,8 @@ class Frame_order:
         @type sobol_max_points:     int
         @keyword sobol_oversample:  The oversampling factor Ov used for the total number of points N * Ov * 10**M, where N is the maximum number of Sobol' points and M is the number of dimensions or torsion-tilt angles for the system.
         @type sobol_oversample:     int
+        @keyword sobol_cache_dir:   The optional directory for caching the Sobol' integration points on disk, to skip their regeneration in repeated runs.
+        @type sobol_cache_dir:      None or str
         @keyword com:               The centre of mass of the system.  This is used for defining the rotor model systems.
         @type com:                  numpy 3D rank-1 array
         @keyword ave_pos_pivot:     The pivot point to rotate all atoms about to the average domain position.  In most cases this will be the centre of mass of the moving domain.  This pivot is shifted by the translation vector.
@@ -133,6 +144,7 @@ class Frame_order:
         self.total_num_params = len(init_params)
         self.sobol_max_points = sobol_max_points
         self.sobol_oversample = sobol_oversample
+        self.sobol_cache_dir = sobol_cache_dir
         self.com = deepcopy(com)
         self.pivot_opt = pivot_opt
         self.quad_int = quad_int
@@ -1996,7 +2008,7 @@ class Frame_order:
     def create_sobol_data(self, dims=None):
         """Create the Sobol' quasi-random data for numerical integration.
 
-        This uses the external sobol_lib module to create the data.  The algorithm is that modified by Antonov and Saleev.
+        This uses the external sobol_lib module to create the data.  The algorithm is that modified by Antonov and Saleev.  The angles and rotation matrices are calculated for all points at once, and the data is loaded from or saved to the on-disk cache if a cache directory has been set.
 
 
         @keyword dims:      The list of parameters.
@@ -2017,6 +2029,14 @@ class Frame_order:
         if total_num == sobol_data.total_num and self.model == sobol_data.model:
             return
 
+        # Reuse the data from the on-disk cache if available.
+        cache_file = None
+        if self.sobol_cache_dir != None:
+            cache_file = get_file_path(file_name="sobol_%s_%i_%iD.npz" % (self.model.replace(',', '').replace(' ', '_'), total_num, m), dir=self.sobol_cache_dir)
+            if sobol_data.load(file_name=cache_file, model=self.model, total_num=total_num, dims=m):
+                print("Loaded the torsion-tilt angle sampling via the Sobol' sequence from the cache file '%s'." % cache_file)
+                return
+
         # Printout (useful to see how long this takes!).
         print("Generating the torsion-tilt angle sampling via the Sobol' sequence for numerical PCS integration.")
 
@@ -2028,90 +2048,111 @@ class Frame_order:
         sobol_data.Ri2_prime = zeros((total_num, 3, 3), float32)
 
         # The Sobol' points.
-        points = i4_sobol_generate(m, total_num, 1000)
-
-        # Loop over the points.
-        for i in range(total_num):
-            # Loop over the dimensions, converting the points to angles.
-            theta = None
-            phi = None
-            sigma = None
-            for j in range(m):
-                # The tilt angle - the angle of rotation about the x-y plane rotation axis.
-                if dims[j] in ['theta']:
-                    theta = acos(2.0*points[j, i] - 1.0)
-                    sobol_data.sobol_angles[j, i] = theta
-
-                # The angle defining the x-y plane rotation axis.
-                if dims[j] in ['phi']:
-                    phi = 2.0 * pi * points[j, i]
-                    sobol_data.sobol_angles[j, i] = phi
-
-                # The 1st torsion angle - the angle of rotation about the z' axis (or y' for the double motion models).
-                if dims[j] in ['sigma']:
-                    sigma = 2.0 * pi * (points[j, i] - 0.5)
-                    sobol_data.sobol_angles[j, i] = sigma
-
-                # The 2nd torsion angle - the angle of rotation about the x' axis.
-                if dims[j] in ['sigma2']:
-                    sigma2 = 2.0 * pi * (points[j, i] - 0.5)
-                    sobol_data.sobol_angles[j, i] = sigma2
-
-            # Pre-calculate the rotation matrices for the double motion models.
-            if 'sigma2' in dims:
-                # The 1st rotation about the y-axis.
-                c_sigma = cos(sigma)
-                s_sigma = sin(sigma)
-                sobol_data.Ri_prime[i, 0, 0] =  c_sigma
-                sobol_data.Ri_prime[i, 0, 2] =  s_sigma
-                sobol_data.Ri_prime[i, 1, 1] = 1.0
-                sobol_data.Ri_prime[i, 2, 0] = -s_sigma
-                sobol_data.Ri_prime[i, 2, 2] =  c_sigma
-
-                # The 2nd rotation about the x-axis.
-                c_sigma2 = cos(sigma2)
-                s_sigma2 = sin(sigma2)
-                sobol_data.Ri2_prime[i, 0, 0] = 1.0
-                sobol_data.Ri2_prime[i, 1, 1] =  c_sigma2
-                sobol_data.Ri2_prime[i, 1, 2] = -s_sigma2
-                sobol_data.Ri2_prime[i, 2, 1] =  s_sigma2
-                sobol_data.Ri2_prime[i, 2, 2] =  c_sigma2
-
-            # Pre-calculate the rotation matrix for the full tilt-torsion.
-            elif theta != None and phi != None and sigma != None:
-                tilt_torsion_to_R(phi, theta, sigma, sobol_data.Ri_prime[i])
-
-            # Pre-calculate the rotation matrix for the torsionless models.
-            elif sigma == None:
-                c_theta = cos(theta)
-                s_theta = sin(theta)
-                c_phi = cos(phi)
-                s_phi = sin(phi)
-                c_phi_c_theta = c_phi * c_theta
-                s_phi_c_theta = s_phi * c_theta
-                sobol_data.Ri_prime[i, 0, 0] =  c_phi_c_theta*c_phi + s_phi**2
-                sobol_data.Ri_prime[i, 0, 1] =  c_phi_c_theta*s_phi - c_phi*s_phi
-                sobol_data.Ri_prime[i, 0, 2] =  c_phi*s_theta
-                sobol_data.Ri_prime[i, 1, 0] =  s_phi_c_theta*c_phi - c_phi*s_phi
-                sobol_data.Ri_prime[i, 1, 1] =  s_phi_c_theta*s_phi + c_phi**2
-                sobol_data.Ri_prime[i, 1, 2] =  s_phi*s_theta
-                sobol_data.Ri_prime[i, 2, 0] = -s_theta*c_phi
-                sobol_data.Ri_prime[i, 2, 1] = -s_theta*s_phi
-                sobol_data.Ri_prime[i, 2, 2] =  c_theta
-
-            # Pre-calculate the rotation matrix for the rotor models.
-            else:
-                c_sigma = cos(sigma)
-                s_sigma = sin(sigma)
-                sobol_data.Ri_prime[i, 0, 0] =  c_sigma
-                sobol_data.Ri_prime[i, 0, 1] = -s_sigma
-                sobol_data.Ri_prime[i, 1, 0] =  s_sigma
-                sobol_data.Ri_prime[i, 1, 1] =  c_sigma
-                sobol_data.Ri_prime[i, 2, 2] = 1.0
+        points = i4_sobol_generate_vect(m, total_num, 1000)
+
+        # Loop over the dimensions, converting the points to angles.
+        theta = None
+        phi = None
+        sigma = None
+        sigma2 = None
+        for j in range(m):
+            # The tilt angle - the angle of rotation about the x-y plane rotation axis.
+            if dims[j] in ['theta']:
+                theta = np_arccos(2.0*points[j] - 1.0)
+                sobol_data.sobol_angles[j] = theta
+
+            # The angle defining the x-y plane rotation axis.
+            if dims[j] in ['phi']:
+                phi = 2.0 * pi * points[j]
+                sobol_data.sobol_angles[j] = phi
+
+            # The 1st torsion angle - the angle of rotation about the z' axis (or y' for the double motion models).
+            if dims[j] in ['sigma']:
+                sigma = 2.0 * pi * (points[j] - 0.5)
+                sobol_data.sobol_angles[j] = sigma
+
+            # The 2nd torsion angle - the angle of rotation about the x' axis.
+            if dims[j] in ['sigma2']:
+                sigma2 = 2.0 * pi * (points[j] - 0.5)
+                sobol_data.sobol_angles[j] = sigma2
+
+        # Alias the rotation matrices.
+        R = sobol_data.Ri_prime
+        R2 = sobol_data.Ri2_prime
+
+        # Pre-calculate the rotation matrices for the double motion models.
+        if 'sigma2' in dims:
+            # The 1st rotation about the y-axis.
+            c_sigma = np_cos(sigma)
+            s_sigma = np_sin(sigma)
+            R[:, 0, 0] =  c_sigma
+            R[:, 0, 2] =  s_sigma
+            R[:, 1, 1] = 1.0
+            R[:, 2, 0] = -s_sigma
+            R[:, 2, 2] =  c_sigma
+
+            # The 2nd rotation about the x-axis.
+            c_sigma2 = np_cos(sigma2)
+            s_sigma2 = np_sin(sigma2)
+            R2[:, 0, 0] = 1.0
+            R2[:, 1, 1] =  c_sigma2
+            R2[:, 1, 2] = -s_sigma2
+            R2[:, 2, 1] =  s_sigma2
+            R2[:, 2, 2] =  c_sigma2
+
+        # Pre-calculate the rotation matrix for the full tilt-torsion (the tilt_torsion_to_R() zyz Euler angle conversion).
+        elif theta is not None and phi is not None and sigma is not None:
+            sin_a = np_sin(sigma - phi)
+            cos_a = np_cos(sigma - phi)
+            sin_b = np_sin(theta)
+            cos_b = np_cos(theta)
+            sin_g = np_sin(phi)
+            cos_g = np_cos(phi)
+            R[:, 0, 0] = -sin_a * sin_g  +  cos_a * cos_b * cos_g
+            R[:, 1, 0] =  sin_a * cos_g  +  cos_a * cos_b * sin_g
+            R[:, 2, 0] = -cos_a * sin_b
+            R[:, 0, 1] = -cos_a * sin_g  -  sin_a * cos_b * cos_g
+            R[:, 1, 1] =  cos_a * cos_g  -  sin_a * cos_b * sin_g
+            R[:, 2, 1] =  sin_a * sin_b
+            R[:, 0, 2] =  sin_b * cos_g
+            R[:, 1, 2] =  sin_b * sin_g
+            R[:, 2, 2] =  cos_b
+
+        # Pre-calculate the rotation matrix for the torsionless models.
+        elif sigma is None:
+            c_theta = np_cos(theta)
+            s_theta = np_sin(theta)
+            c_phi = np_cos(phi)
+            s_phi = np_sin(phi)
+            c_phi_c_theta = c_phi * c_theta
+            s_phi_c_theta = s_phi * c_theta
+            R[:, 0, 0] =  c_phi_c_theta*c_phi + s_phi**2
+            R[:, 0, 1] =  c_phi_c_theta*s_phi - c_phi*s_phi
+            R[:, 0, 2] =  c_phi*s_theta
+            R[:, 1, 0] =  s_phi_c_theta*c_phi - c_phi*s_phi
+            R[:, 1, 1] =  s_phi_c_theta*s_phi + c_phi**2
+            R[:, 1, 2] =  s_phi*s_theta
+            R[:, 2, 0] = -s_theta*c_phi
+            R[:, 2, 1] = -s_theta*s_phi
+            R[:, 2, 2] =  c_theta
+
+        # Pre-calculate the rotation matrix for the rotor models.
+        else:
+            c_sigma = np_cos(sigma)
+            s_sigma = np_sin(sigma)
+            R[:, 0, 0] =  c_sigma
+            R[:, 0, 1] = -s_sigma
+            R[:, 1, 0] =  s_sigma
+            R[:, 1, 1] =  c_sigma
+            R[:, 2, 2] = 1.0
 
         # Printout (useful to see how long this takes!).
         print("   Oversampled to %s points." % total_num)
 
+        # Store the data in the on-disk cache.
+        if cache_file != None:
+            sobol_data.save(file_name=cache_file)
+
 
     def reduce_and_rot(self, ave_pos_alpha=None, ave_pos_beta=None, ave_pos_gamma=None, daeg=None):
         """Reduce and rotate the alignments tensors using the frame order matrix and Euler angles.
@@ -2175,5 +2216,73 @@ class Sobol_data:
         self.total_num = None
 
 
+    def load(self, file_name=None, model=None, total_num=None, dims=None):
+        """Load the Sobol' data from the on-disk cache file, if it exists and matches.
+
+        @keyword file_name: The cache file path.
+        @type file_name:    str
+        @keyword model:     The frame order model.
+        @type model:        str
+        @keyword total_num: The total number of Sobol' points.
+        @type total_num:    int
+        @keyword dims:      The number of dimensions.
+        @type dims:         int
+        @return:            True if the data was loaded, False otherwise.
+        @rtype:             bool
+        """
+
+        # No cache file.
+        if not access(file_name, F_OK):
+            return False
+
+        # Read the data and close the file, treating corrupt files as missing.
+        try:
+            with load(file_name) as data:
+                sobol_angles = data['sobol_angles']
+                Ri_prime = data['Ri_prime']
+                Ri2_prime = data['Ri2_prime']
+        except (AttributeError, IOError, KeyError, OSError, TypeError, ValueError):
+            return False
+
+        # Check the data.
+        if sobol_angles.shape != (dims, total_num) or Ri_prime.shape != (total_num, 3, 3) or Ri2_prime.shape != (total_num, 3, 3):
+            return False
+
+        # Store the data.
+        self.model = model
+        self.total_num = total_num
+        self.sobol_angles = sobol_angles
+        self.Ri_prime = Ri_prime
+        self.Ri2_prime = Ri2_prime
+
+        # Success.
+        return True
+
+
+    def save(self, file_name=None):
+        """Save the Sobol' data to the on-disk cache file.
+
+        The data is first written to a temporary file which is then renamed, so that parallel processes never see a partially written file.
+
+
+        @keyword file_name: The cache file path.
+        @type file_name:    str
+        """
+
+        # Create the directory.
+        mkdir_nofail(dir=dirname(file_name), verbosity=0)
+
+        # Write to a temporary file in the same directory, then move it into place.
+        try:
+            file = NamedTemporaryFile(dir=dirname(file_name), suffix='.npz', delete=False)
+            savez(file, sobol_angles=self.sobol_angles, Ri_prime=self.Ri_prime, Ri2_prime=self.Ri2_prime)
+            file.close()
+            rename(file.name, file_name)
+
+        # The cache is optional, so do not fail.
+        except (IOError, OSError):
+            warn(RelaxWarning("The Sobol' points could not be saved to the cache file '%s'." % file_name))
+
+
 # Instantiate the Sobol' data container.
 sobol_data = Sobol_data()
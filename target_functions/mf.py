@@ -24,7 +24,7 @@
 
 # Python module imports.
 from math import pi
-from numpy import dot, float64, ones, sum, transpose, zeros
+from numpy import arange, array, dot, einsum, float64, newaxis, ones, prod, sum, transpose, where, zeros
 
 # relax module imports.
 from lib.auto_relaxation.ri import calc_noe, calc_dnoe, calc_d2noe, calc_r1, calc_dr1, calc_d2r1, extract_r1, extract_dr1, extract_d2r1
@@ -34,6 +34,7 @@ from lib.diffusion.correlation_time import calc_sphere_ti, calc_sphere_dti, calc
 from lib.diffusion.direction_cosine import calc_ellipsoid_di, calc_ellipsoid_ddi, calc_ellipsoid_d2di, calc_spheroid_di, calc_spheroid_ddi, calc_spheroid_d2di
 from lib.diffusion.weights import calc_sphere_ci, calc_spheroid_ci, calc_spheroid_dci, calc_spheroid_d2ci, calc_ellipsoid_ci, calc_ellipsoid_dci, calc_ellipsoid_d2ci
 from lib.errors import RelaxError
+from lib.spectral_densities.lorentzian import lorentzian
 from lib.spectral_densities.model_free import calc_jw, calc_S2_jw, calc_S2_te_jw, calc_S2f_S2_ts_jw, calc_S2f_tf_S2_ts_jw, calc_S2f_S2s_ts_jw, calc_S2f_tf_S2s_ts_jw, calc_diff_djw_dGj, calc_ellipsoid_djw_dGj, calc_diff_S2_djw_dGj, calc_ellipsoid_S2_djw_dGj, calc_diff_S2_te_djw_dGj, calc_ellipsoid_S2_te_djw_dGj, calc_diff_djw_dOj, calc_diff_S2_djw_dOj, calc_diff_S2_te_djw_dOj, calc_S2_djw_dS2, calc_S2_te_djw_dS2, calc_S2_te_djw_dte, calc_diff_S2f_S2_ts_djw_dGj, calc_ellipsoid_S2f_S2_ts_djw_dGj, calc_diff_S2f_tf_S2_ts_djw_dGj, calc_ellipsoid_S2f_tf_S2_ts_djw_dGj, calc_diff_S2f_S2_ts_djw_dOj, calc_diff_S2f_tf_S2_ts_djw_dOj, calc_S2f_S2_ts_djw_dS2, calc_S2f_S2_ts_djw_dS2f, calc_S2f_tf_S2_ts_djw_dS2f, calc_S2f_tf_S2_ts_djw_dtf, calc_S2f_S2_ts_djw_dts, calc_diff_S2f_S2s_ts_djw_dGj, calc_ellipsoid_S2f_S2s_ts_djw_dGj, calc_diff_S2f_tf_S2s_ts_djw_dGj, calc_ellipsoid_S2f_tf_S2s_ts_djw_dGj, calc_diff_S2f_S2s_ts_djw_dOj, calc_diff_S2f_tf_S2s_ts_djw_dOj, calc_S2f_S2s_ts_djw_dS2f, calc_S2f_tf_S2s_ts_djw_dS2f, calc_S2f_tf_S2s_ts_djw_dS2s, calc_S2f_tf_S2s_ts_djw_dtf, calc_S2f_S2s_ts_djw_dts, calc_diff_d2jw_dGjdGk, calc_ellipsoid_d2jw_dGjdGk, calc_diff_S2_d2jw_dGjdGk, calc_ellipsoid_S2_d2jw_dGjdGk, calc_diff_S2_te_d2jw_dGjdGk, calc_ellipsoid_S2_te_d2jw_dGjdGk, calc_diff_d2jw_dGjdOj, calc_ellipsoid_d2jw_dGjdOj, calc_diff_S2_d2jw_dGjdOj, calc_ellipsoid_S2_d2jw_dGjdOj, calc_diff_S2_te_d2jw_dGjdOj, calc_ellipsoid_S2_te_d2jw_dGjdOj, calc_diff_S2_d2jw_dGjdS2, calc_ellipsoid_S2_d2jw_dGjdS2, calc_diff_S2_te_d2jw_dGjdS2, calc_ellipsoid_S2_te_d2jw_dGjdS2, calc_diff_S2_te_d2jw_dGjdte, calc_ellipsoid_S2_te_d2jw_dGjdte, calc_diff_d2jw_dOjdOk, calc_diff_S2_d2jw_dOjdOk, calc_diff_S2_te_d2jw_dOjdOk, calc_diff_S2_d2jw_dOjdS2, calc_diff_S2_te_d2jw_dOjdS2, calc_diff_S2_te_d2jw_dOjdte, calc_S2_te_d2jw_dS2dte, calc_S2_te_d2jw_dte2, calc_diff_S2f_S2_ts_d2jw_dGjdGk, calc_ellipsoid_S2f_S2_ts_d2jw_dGjdGk, calc_diff_S2f_tf_S2_ts_d2jw_dGjdGk, calc_ellipsoid_S2f_tf_S2_ts_d2jw_dGjdGk, calc_diff_S2f_S2_ts_d2jw_dGjdOj, calc_ellipsoid_S2f_S2_ts_d2jw_dGjdOj, calc_diff_S2f_tf_S2_ts_d2jw_dGjdOj, calc_ellipsoid_S2f_tf_S2_ts_d2jw_dGjdOj, calc_diff_S2f_S2_ts_d2jw_dGjdS2, calc_ellipsoid_S2f_S2_ts_d2jw_dGjdS2, calc_diff_S2f_S2_ts_d2jw_dGjdS2f, calc_ellipsoid_S2f_S2_ts_d2jw_dGjdS2f, calc_diff_S2f_tf_S2_ts_d2jw_dGjdS2f, calc_ellipsoid_S2f_tf_S2_ts_d2jw_dGjdS2f, calc_diff_S2f_tf_S2_ts_d2jw_dGjdtf, calc_ellipsoid_S2f_tf_S2_ts_d2jw_dGjdtf, calc_diff_S2f_S2_ts_d2jw_dGjdts, calc_ellipsoid_S2f_S2_ts_d2jw_dGjdts, calc_diff_S2f_S2_ts_d2jw_dOjdOk, calc_diff_S2f_tf_S2_ts_d2jw_dOjdOk, calc_diff_S2f_S2_ts_d2jw_dOjdS2, calc_diff_S2f_S2_ts_d2jw_dOjdS2f, calc_diff_S2f_tf_S2_ts_d2jw_dOjdS2f, calc_diff_S2f_tf_S2_ts_d2jw_dOjdtf, calc_diff_S2f_S2_ts_d2jw_dOjdts, calc_S2f_S2_ts_d2jw_dS2dts, calc_S2f_tf_S2_ts_d2jw_dS2fdtf, calc_S2f_S2_ts_d2jw_dS2fdts, calc_S2f_tf_S2_ts_d2jw_dtf2, calc_S2f_S2_ts_d2jw_dts2, calc_diff_S2f_S2s_ts_d2jw_dGjdGk, calc_ellipsoid_S2f_S2s_ts_d2jw_dGjdGk, calc_diff_S2f_tf_S2s_ts_d2jw_dGjdGk, calc_ellipsoid_S2f_tf_S2s_ts_d2jw_dGjdGk, calc_diff_S2f_S2s_ts_d2jw_dGjdOj, calc_ellipsoid_S2f_S2s_ts_d2jw_dGjdOj, calc_diff_S2f_tf_S2s_ts_d2jw_dGjdOj, calc_ellipsoid_S2f_tf_S2s_ts_d2jw_dGjdOj, calc_diff_S2f_S2s_ts_d2jw_dGjdS2f, calc_ellipsoid_S2f_S2s_ts_d2jw_dGjdS2f, calc_diff_S2f_tf_S2s_ts_d2jw_dGjdS2f, calc_ellipsoid_S2f_tf_S2s_ts_d2jw_dGjdS2f, calc_diff_S2f_S2s_ts_d2jw_dGjdS2s, calc_ellipsoid_S2f_S2s_ts_d2jw_dGjdS2s, calc_diff_S2f_tf_S2s_ts_d2jw_dGjdtf, calc_ellipsoid_S2f_tf_S2s_ts_d2jw_dGjdtf, calc_diff_S2f_S2s_ts_d2jw_dGjdts, calc_ellipsoid_S2f_S2s_ts_d2jw_dGjdts, calc_diff_S2f_S2s_ts_d2jw_dOjdOk, calc_diff_S2f_tf_S2s_ts_d2jw_dOjdOk, calc_diff_S2f_S2s_ts_d2jw_dOjdS2f, calc_diff_S2f_tf_S2s_ts_d2jw_dOjdS2f, calc_diff_S2f_tf_S2s_ts_d2jw_dOjdtf, calc_diff_S2f_S2s_ts_d2jw_dOjdts, calc_S2f_S2s_ts_d2jw_dS2fdS2s, calc_S2f_tf_S2s_ts_d2jw_dS2fdtf, calc_S2f_S2s_ts_d2jw_dS2fdts, calc_S2f_S2s_ts_d2jw_dS2sdts, calc_S2f_tf_S2s_ts_d2jw_dtf2, calc_S2f_S2s_ts_d2jw_dts2
 from lib.spectral_densities.model_free_components import calc_S2_te_jw_comps, calc_S2f_S2_ts_jw_comps, calc_S2f_S2s_ts_jw_comps, calc_S2f_tf_S2_ts_jw_comps, calc_S2f_tf_S2s_ts_jw_comps, calc_diff_djw_comps, calc_S2_te_djw_comps, calc_diff_S2_te_djw_comps, calc_S2f_S2_ts_djw_comps, calc_diff_S2f_S2_ts_djw_comps, calc_S2f_tf_S2_ts_djw_comps, calc_diff_S2f_tf_S2_ts_djw_comps, calc_S2f_S2s_ts_djw_comps, calc_diff_S2f_S2s_ts_djw_comps, calc_S2f_tf_S2s_ts_djw_comps, calc_diff_S2f_tf_S2s_ts_djw_comps
 from target_functions.chi2 import chi2, dchi2_element, d2chi2_element
@@ -367,17 +368,12 @@ class Mf:
             self.dfunc = self.dfunc_local_tm
             self.d2func = self.d2func_local_tm
 
-        # Functions for minimising diffusion tensor parameters with all model-free parameters fixed.
-        elif self.model_type == 'diff':
-            self.func = self.func_diff
-            self.dfunc = self.dfunc_diff
-            self.d2func = self.d2func_diff
-
-        # Functions for minimising diffusion tensor parameters together with all model-free parameters.
-        elif self.model_type == 'all':
-            self.func = self.func_all
-            self.dfunc = self.dfunc_all
-            self.d2func = self.d2func_all
+        # Functions for minimising diffusion tensor parameters, either with all model-free parameters fixed or together with all model-free parameters, using the packed spin data.
+        elif self.model_type == 'diff' or self.model_type == 'all':
+            self.init_packed_data()
+            self.func = self.func_packed
+            self.dfunc = self.dfunc_packed
+            self.d2func = self.d2func_packed
 
 
     def func_mf(self, params):
@@ -485,11 +481,11 @@ class Mf:
         return data.chi2
 
 
-    def func_diff(self, params):
-        """Function for calculating the chi-squared value.
+    def func_packed(self, params):
+        """Function for calculating the chi-squared value using the packed spin data.
 
-        Used in the minimisation of diffusion tensor parameters with all model-free parameters
-        fixed.
+        Used in the minimisation of diffusion tensor parameters, either with all model-free
+        parameters fixed or together with all model-free parameters.
         """
 
         # Store the parameter values in self.func_test for testing.
@@ -502,81 +498,14 @@ class Mf:
         # Diffusion tensor parameters.
         self.diff_data.params = params[0:self.diff_end_index]
 
-        # Set the total chi2 to zero.
-        self.total_chi2 = 0.0
-
-        # Loop over the residues.
-        for i in range(self.num_spins):
-            # Set self.data[i] to data.
-            data = self.data[i]
-
-            # Direction cosine calculations.
-            if self.diff_data.calc_di:
-                self.diff_data.calc_di(data, self.diff_data)
-
-            # Diffusion tensor weight calculations.
-            self.diff_data.calc_ci(data, self.diff_data)
-
-            # Diffusion tensor correlation times.
-            self.diff_data.calc_ti(data, self.diff_data)
-
-            # ti spectral density components.
-            data.w_ti_sqrd = data.frq_sqrd_list_ext * data.ti ** 2
-            data.fact_ti = 1.0 / (1.0 + data.w_ti_sqrd)
-
-            # Calculate the components of the spectral densities.
-            if data.calc_jw_comps:
-                data.calc_jw_comps(data, data.param_values)
-
-            # Calculate the spectral density values.
-            data.jw = data.calc_jw(data, data.param_values)
-
-            # Calculate the relaxation formula components.
-            data.create_ri_comps(data, data.param_values)
-
-            # Calculate the R1, R2, and sigma_noe values.
-            data.ri_prime = data.create_ri_prime(data)
-
-            # Calculate the NOE values.
-            data.ri = data.ri_prime * 1.0
-            for m in range(data.num_ri):
-                if data.create_ri[m]:
-                    data.create_ri[m](data, m, data.remap_table[m], data.get_r1, data.param_values)
-
-            # Calculate the chi-squared value.
-            data.chi2 = chi2(data.relax_data, data.ri, data.errors)
-
-            # Add the residue specific chi2 to the total chi2.
-            self.total_chi2 = self.total_chi2 + data.chi2
-
-        return self.total_chi2
-
-
-    def func_all(self, params):
-        """Function for calculating the chi-squared value.
-
-        Used in the minimisation of diffusion tensor parameters together with all model-free
-        parameters.
-        """
-
-        # Store the parameter values in self.func_test for testing.
-        self.func_test = params * 1.0
-
-        # Scaling.
-        if self.scaling_flag:
-            params = dot(params, self.scaling_matrix)
-
-        # Diffusion tensor parameters.
-        self.diff_data.params = params[0:self.diff_end_index]
+        # Diffusion tensor correlation times (these are the same for all spins).
+        self.diff_data.calc_ti(self.tau_data, self.diff_data)
 
         # Set the total chi2 to zero.
         self.total_chi2 = 0.0
 
-        # Loop over the residues.
-        for i in range(self.num_spins):
-            # Set self.data[i] to data.
-            data = self.data[i]
-
+        # Loop over the groups of packed spins.
+        for data in self.packed_data:
             # Direction cosine calculations.
             if self.diff_data.calc_di:
                 self.diff_data.calc_di(data, self.diff_data)
@@ -584,37 +513,17 @@ class Mf:
             # Diffusion tensor weight calculations.
             self.diff_data.calc_ci(data, self.diff_data)
 
-            # Diffusion tensor correlation times.
-            self.diff_data.calc_ti(data, self.diff_data)
-
-            # ti spectral density components.
-            data.w_ti_sqrd = data.frq_sqrd_list_ext * data.ti ** 2
-            data.fact_ti = 1.0 / (1.0 + data.w_ti_sqrd)
-
-            # Calculate the components of the spectral densities.
-            if data.calc_jw_comps:
-                data.calc_jw_comps(data, params)
-
             # Calculate the spectral density values.
-            data.jw = data.calc_jw(data, params)
+            self.calc_packed_jw(data, params)
 
-            # Calculate the relaxation formula components.
-            data.create_ri_comps(data, params)
-
-            # Calculate the R1, R2, and sigma_noe values.
-            data.ri_prime = data.create_ri_prime(data)
-
-            # Calculate the NOE values.
-            data.ri = data.ri_prime * 1.0
-            for m in range(data.num_ri):
-                if data.create_ri[m]:
-                    data.create_ri[m](data, m, data.remap_table[m], data.get_r1, params)
+            # Calculate the relaxation values.
+            self.calc_packed_ri(data)
 
-            # Calculate the chi-squared value.
+            # Calculate the chi-squared values of all spins.
             data.chi2 = chi2(data.relax_data, data.ri, data.errors)
 
-            # Add the residue specific chi2 to the total chi2.
-            self.total_chi2 = self.total_chi2 + data.chi2
+            # Add the group chi2 to the total chi2.
+            self.total_chi2 = self.total_chi2 + sum(data.chi2)
 
         return self.total_chi2
 
@@ -735,11 +644,11 @@ class Mf:
         return data.dchi2 * 1.0
 
 
-    def dfunc_diff(self, params):
-        """Function for calculating the chi-squared gradient.
+    def dfunc_packed(self, params):
+        """Function for calculating the chi-squared gradient using the packed spin data.
 
-        Used in the minimisation of diffusion tensor parameters with all model-free parameters
-        fixed.
+        Used in the minimisation of diffusion tensor parameters, either with all model-free
+        parameters fixed or together with all model-free parameters.
         """
 
         # Test if the function has already been called, otherwise run self.func.
@@ -756,96 +665,18 @@ class Mf:
         # Diffusion tensor parameters.
         self.diff_data.params = params[0:self.diff_end_index]
 
-        # Set the total chi2 gradient to zero.
-        self.total_dchi2 = self.total_dchi2 * 0.0
-
-        # Loop over the residues.
-        for i in range(self.num_spins):
-
-            # Set self.data[i] to data.
-            data = self.data[i]
-
-            # Direction cosine calculations.
-            if self.diff_data.calc_ddi:
-                self.diff_data.calc_ddi(data, self.diff_data)
-
-            # Diffusion tensor weight calculations.
-            if self.diff_data.calc_dci:
-                self.diff_data.calc_dci(data, self.diff_data)
-
-            # Diffusion tensor correlation times.
-            self.diff_data.calc_dti(data, self.diff_data)
-
-            # Calculate the spectral density gradient components.
-            if data.calc_djw_comps:
-                data.calc_djw_comps(data, data.param_values)
-
-            # Loop over the gradient.
-            for j in range(data.total_num_params):
-                # Calculate the spectral density gradients.
-                if data.calc_djw[j]:
-                    data.djw = data.calc_djw[j](data, data.param_values, j)
-                else:
-                    data.djw = data.djw * 0.0
-
-                # Calculate the relaxation gradient components.
-                data.create_dri_comps(data, data.param_values)
-
-                # Calculate the R1, R2, and sigma_noe gradients.
-                data.dri_prime[j] = data.create_dri_prime[j](data)
-
-                # Loop over the relaxation values and modify the NOE gradients.
-                data.dri[j] = data.dri_prime[j]
-                for m in range(data.num_ri):
-                    if data.create_dri[m]:
-                        data.create_dri[m](data, m, data.remap_table[m], data.get_dr1, params, j)
-
-                # Calculate the chi-squared gradient.
-                data.dchi2[j] = dchi2_element(data.relax_data, data.ri, data.dri[j], data.errors)
-
-            # Index for the construction of the global generic model-free gradient.
-            index = self.diff_data.num_params
-
-            # Diffusion parameter part of the global generic model-free gradient.
-            self.total_dchi2[0:index] = self.total_dchi2[0:index] + data.dchi2[0:index]
-
-        # Diagonal scaling.
-        if self.scaling_flag:
-            self.total_dchi2 = dot(self.total_dchi2, self.scaling_matrix)
-
-        # Return a copy of the gradient.
-        return self.total_dchi2 * 1.0
-
-
-    def dfunc_all(self, params):
-        """Function for calculating the chi-squared gradient.
-
-        Used in the minimisation of diffusion tensor parameters together with all model-free
-        parameters.
-        """
-
-        # Test if the function has already been called, otherwise run self.func.
-        if sum(params == self.func_test) != self.total_num_params:
-            self.func(params)
-
-        # Store the parameter values in self.grad_test for testing.
-        self.grad_test = params * 1.0
-
-        # Scaling.
-        if self.scaling_flag:
-            params = dot(params, self.scaling_matrix)
-
-        # Diffusion tensor parameters.
-        self.diff_data.params = params[0:self.diff_end_index]
+        # Diffusion tensor correlation time gradients.
+        self.diff_data.calc_dti(self.tau_data, self.diff_data)
+        self.tau_data.dti_full[0:len(self.tau_data.dti)] = self.tau_data.dti
 
         # Set the total chi2 gradient to zero.
         self.total_dchi2 = self.total_dchi2 * 0.0
 
-        # Loop over the residues.
-        for i in range(self.num_spins):
-            # Set self.data[i] to data.
-            data = self.data[i]
+        # Index for the construction of the global generic model-free gradient.
+        index = self.diff_data.num_params
 
+        # Loop over the groups of packed spins.
+        for data in self.packed_data:
             # Direction cosine calculations.
             if self.diff_data.calc_ddi:
                 self.diff_data.calc_ddi(data, self.diff_data)
@@ -854,44 +685,21 @@ class Mf:
             if self.diff_data.calc_dci:
                 self.diff_data.calc_dci(data, self.diff_data)
 
-            # Diffusion tensor correlation times.
-            self.diff_data.calc_dti(data, self.diff_data)
-
-            # Calculate the spectral density gradient components.
-            if data.calc_djw_comps:
-                data.calc_djw_comps(data, params)
-
-            # Loop over the gradient.
-            for j in range(data.total_num_params):
-                # Calculate the spectral density gradients.
-                if data.calc_djw[j]:
-                    data.djw = data.calc_djw[j](data, params, j)
-                else:
-                    data.djw = data.djw * 0.0
-
-                # Calculate the relaxation gradient components.
-                data.create_dri_comps(data, params)
-
-                # Calculate the R1, R2, and sigma_noe gradients.
-                data.dri_prime[j] = data.create_dri_prime[j](data)
-
-                # Loop over the relaxation values and modify the NOE gradients.
-                data.dri[j] = data.dri_prime[j]
-                for m in range(data.num_ri):
-                    if data.create_dri[m]:
-                        data.create_dri[m](data, m, data.remap_table[m], data.get_dr1, params, j)
+            # Calculate the spectral density gradients.
+            self.calc_packed_jw(data, params, order=1)
 
-                # Calculate the chi-squared gradient.
-                data.dchi2[j] = dchi2_element(data.relax_data, data.ri, data.dri[j], data.errors)
+            # Calculate the relaxation gradients.
+            self.calc_packed_dri(data)
 
-            # Index for the construction of the global generic model-free gradient.
-            index = self.diff_data.num_params
+            # Calculate the chi-squared gradients of all spins.
+            data.dchi2 = -2.0 * sum((data.relax_data - data.ri) / data.errors**2 * data.dri, axis=1)
 
             # Diffusion parameter part of the global generic model-free gradient.
-            self.total_dchi2[0:index] = self.total_dchi2[0:index] + data.dchi2[0:index]
+            self.total_dchi2[0:index] = self.total_dchi2[0:index] + sum(data.dchi2[0:index], axis=1)
 
             # Model-free parameter part of the global generic model-free gradient.
-            self.total_dchi2[data.start_index:data.end_index] = self.total_dchi2[data.start_index:data.end_index] + data.dchi2[index:]
+            if self.model_type == 'all':
+                self.total_dchi2[data.mf_index] = self.total_dchi2[data.mf_index] + data.dchi2[index:]
 
         # Diagonal scaling.
         if self.scaling_flag:
@@ -1004,11 +812,11 @@ class Mf:
         return data.d2chi2 * 1.0
 
 
-    def d2func_diff(self, params):
-        """Function for calculating the chi-squared Hessian.
+    def d2func_packed(self, params):
+        """Function for calculating the chi-squared Hessian using the packed spin data.
 
-        Used in the minimisation of diffusion tensor parameters with all model-free parameters
-        fixed.
+        Used in the minimisation of diffusion tensor parameters, either with all model-free
+        parameters fixed or together with all model-free parameters.
         """
 
         # Test if the gradient has already been called, otherwise run self.dfunc.
@@ -1022,53 +830,52 @@ class Mf:
         # Diffusion tensor parameters.
         self.diff_data.params = params[0:self.diff_end_index]
 
+        # Diffusion tensor correlation time Hessians.
+        if self.diff_data.calc_d2ti:
+            self.diff_data.calc_d2ti(self.tau_data, self.diff_data)
+            self.tau_data.d2ti_full[0:len(self.tau_data.d2ti), 0:len(self.tau_data.d2ti)] = self.tau_data.d2ti
+
         # Set the total chi2 Hessian to zero.
         self.total_d2chi2 = self.total_d2chi2 * 0.0
 
-        # Loop over the residues.
-        for i in range(self.num_spins):
-            # Set self.data[i] to data.
-            data = self.data[i]
+        # Indices for the construction of the global generic model-free Hessian.
+        index = self.diff_data.num_params
+        diff_index = arange(index)
 
+        # Loop over the groups of packed spins.
+        for data in self.packed_data:
             # Direction cosine calculations.
             if self.diff_data.calc_d2di:
-               self.diff_data.calc_d2di(data, self.diff_data)
+                self.diff_data.calc_d2di(data, self.diff_data)
 
             # Diffusion tensor weight calculations.
             if self.diff_data.calc_d2ci:
                 self.diff_data.calc_d2ci(data, self.diff_data)
 
-            # Diffusion tensor correlation times.
-            if self.diff_data.calc_d2ti:
-               self.diff_data.calc_d2ti(data, self.diff_data)
+            # Calculate the spectral density gradients and Hessians.
+            self.calc_packed_jw(data, params, order=2)
 
-            # Loop over the lower triangle of the Hessian.
-            for j in range(data.total_num_params):
-                for k in range(j + 1):
-                    # Calculate the spectral density Hessians.
-                    if data.calc_d2jw[j][k]:
-                        data.d2jw = data.calc_d2jw[j][k](data, data.param_values, j, k)
-                    else:
-                        data.d2jw = data.d2jw * 0.0
+            # Calculate the relaxation Hessians.
+            self.calc_packed_d2ri(data)
 
-                    # Calculate the relaxation Hessian components.
-                    data.create_d2ri_comps(data, data.param_values)
+            # Calculate the chi-squared Hessians of all spins.
+            data.d2chi2 = 2.0 * sum((data.dri[:, newaxis] * data.dri[newaxis] - (data.relax_data - data.ri) * data.d2ri) / data.errors**2, axis=2)
 
-                    # Calculate the R1, R2, and sigma_noe Hessians.
-                    if data.create_d2ri_prime[j][k]:
-                        data.d2ri_prime[j, k] = data.create_d2ri_prime[j][k](data)
-
-                    # Loop over the relaxation values and modify the NOE Hessians.
-                    data.d2ri[j, k] = data.d2ri_prime[j, k]
-                    for m in range(data.num_ri):
-                        if data.create_d2ri[m]:
-                            data.create_d2ri[m](data, m, data.remap_table[m], data.get_d2r1, params, j, k)
+            # Pure diffusion parameter part of the global generic model-free Hessian.
+            self.total_d2chi2[0:index, 0:index] = self.total_d2chi2[0:index, 0:index] + sum(data.d2chi2[0:index, 0:index], axis=2)
 
-                    # Calculate the chi-squared Hessian.
-                    data.d2chi2[j, k] = data.d2chi2[k, j] = d2chi2_element(data.relax_data, data.ri, data.dri[j], data.dri[k], data.d2ri[j, k], data.errors)
+            # The model-free parameter parts.
+            if self.model_type == 'all':
+                # Pure model-free parameter part of the global generic model-free Hessian.
+                mf_index_j = data.mf_index[:, newaxis]
+                mf_index_k = data.mf_index[newaxis]
+                self.total_d2chi2[mf_index_j, mf_index_k] = self.total_d2chi2[mf_index_j, mf_index_k] + data.d2chi2[index:, index:]
 
-            # Pure diffusion parameter part of the global generic model-free Hessian.
-            self.total_d2chi2 = self.total_d2chi2 + data.d2chi2
+                # Off diagonal diffusion and model-free parameter parts of the global generic model-free Hessian.
+                diff_index_j = diff_index[:, newaxis, newaxis]
+                diff_index_k = diff_index[newaxis, :, newaxis]
+                self.total_d2chi2[diff_index_j, mf_index_k] = self.total_d2chi2[diff_index_j, mf_index_k] + data.d2chi2[0:index, index:]
+                self.total_d2chi2[mf_index_j, diff_index_k] = self.total_d2chi2[mf_index_j, diff_index_k] + data.d2chi2[index:, 0:index]
 
         # Diagonal scaling.
         if self.scaling_flag:
@@ -1078,98 +885,295 @@ class Mf:
         return self.total_d2chi2 * 1.0
 
 
-    def d2func_all(self, params):
-        """Function for calculating the chi-squared Hessian.
+    def calc_ri(self):
+        """Function for calculating relaxation values."""
 
-        Used in the minimisation of diffusion tensor parameters together with all model-free
-        parameters.
-        """
+        # Function call.
+        chi2 = self.func_mf(self.params)
 
-        # Test if the gradient has already been called, otherwise run self.dfunc.
-        if sum(params == self.grad_test) != self.total_num_params:
-            self.dfunc(params)
+        # Return the single value.
+        return self.data[0].ri[0]
 
-        # Scaling.
-        if self.scaling_flag:
-            params = dot(params, self.scaling_matrix)
 
-        # Diffusion tensor parameters.
-        self.diff_data.params = params[0:self.diff_end_index]
+    def calc_packed_coef(self, data, terms, order=0):
+        """Calculate a model-free coefficient of the spectral density components for the packed spins.
 
-        # Set the total chi2 Hessian to zero.
-        self.total_d2chi2 = self.total_d2chi2 * 0.0
+        The coefficients, such as S2, 1 - S2f, or S2f.(1 - S2s), are polynomials of the model-free
+        order parameters.
 
-        # Loop over the residues.
-        for i in range(self.num_spins):
-            # Set self.data[i] to data.
-            data = self.data[i]
 
-            # Direction cosine calculations.
-            if self.diff_data.calc_d2di:
-               self.diff_data.calc_d2di(data, self.diff_data)
+        @param data:    The packed spin data.
+        @type data:     Data instance
+        @param terms:   The polynomial terms, each being the factor and the list of local model-free
+                        parameter indices to multiply.
+        @type terms:    list of tuple of float and list of int
+        @keyword order: The order of the partial derivatives to calculate, from 0 to 2.
+        @type order:    int
+        @return:        The coefficient values, gradients, and Hessians, with the spin index as the
+                        last dimension.
+        @rtype:         numpy rank-1, rank-2, and rank-3 arrays
+        """
 
-            # Diffusion tensor weight calculations.
-            if self.diff_data.calc_d2ci:
-                self.diff_data.calc_d2ci(data, self.diff_data)
+        # Initialise.
+        value = zeros(data.num_spins, float64)
+        grad = zeros((data.num_mf, data.num_spins), float64)
+        hess = zeros((data.num_mf, data.num_mf, data.num_spins), float64)
 
-            # Diffusion tensor correlation times.
-            if self.diff_data.calc_d2ti:
-               self.diff_data.calc_d2ti(data, self.diff_data)
+        # Loop over the terms.
+        for factor, indices in terms:
+            # The value.
+            value = value + factor * prod(data.mf[indices], axis=0)
 
-            # Loop over the lower triangle of the Hessian.
-            for j in range(data.total_num_params):
-                for k in range(j + 1):
-                    # Calculate the spectral density Hessians.
-                    if data.calc_d2jw[j][k]:
-                        data.d2jw = data.calc_d2jw[j][k](data, params, j, k)
-                    else:
-                        data.d2jw = data.d2jw * 0.0
+            # The partial derivatives.
+            if order:
+                for j in range(len(indices)):
+                    others = indices[:j] + indices[j+1:]
+                    grad[indices[j]] = grad[indices[j]] + factor * prod(data.mf[others], axis=0)
+                    for k in range(len(others)):
+                        hess[indices[j], others[k]] = hess[indices[j], others[k]] + factor * prod(data.mf[others[:k] + others[k+1:]], axis=0)
 
-                    # Calculate the relaxation Hessian components.
-                    data.create_d2ri_comps(data, params)
+        # Return the coefficient.
+        return value, grad, hess
 
-                    # Calculate the R1, R2, and sigma_noe Hessians.
-                    if data.create_d2ri_prime[j][k]:
-                        data.d2ri_prime[j, k] = data.create_d2ri_prime[j][k](data)
 
-                    # Loop over the relaxation values and modify the NOE Hessians.
-                    data.d2ri[j, k] = data.d2ri_prime[j, k]
-                    for m in range(data.num_ri):
-                        if data.create_d2ri[m]:
-                            data.create_d2ri[m](data, m, data.remap_table[m], data.get_d2r1, params, j, k)
+    def calc_packed_jw(self, data, params, order=0):
+        """Calculate the spectral density values and their partial derivatives for the packed spins.
 
-                    # Calculate the chi-squared Hessian.
-                    data.d2chi2[j, k] = data.d2chi2[k, j] = d2chi2_element(data.relax_data, data.ri, data.dri[j], data.dri[k], data.d2ri[j, k], data.errors)
+        The model-free spectral density is the sum of Lorentzian components::
 
-            # Index for the construction of the global generic model-free Hessian.
-            index = self.diff_data.num_params
+                    _n_
+                 2  \        /                                                      \ 
+            J(w) = -  >  ci . | A.L(w, ti)  +  B.L(w, tf, ti)  +  C.L(w, ts, ti)   | ,
+                 5  /__      \                                                      /
+                    i=-k
+
+        where the coefficients A, B and C and the internal correlation times depend on the
+        model-free equation.  The partial derivatives are with respect to the diffusion parameters,
+        followed by the model-free parameters for the 'all' model type.  All arrays have the
+        dimensions {parameter(s), frequency, J(w) frequency, ti component, spin}.
+
+
+        @param data:    The packed spin data.
+        @type data:     Data instance
+        @param params:  The parameter vector.
+        @type params:   numpy array
+        @keyword order: The order of the partial derivatives to calculate, from 0 to 2.
+        @type order:    int
+        """
 
-            # Pure diffusion parameter part of the global generic model-free Hessian.
-            self.total_d2chi2[0:index, 0:index] = self.total_d2chi2[0:index, 0:index] + data.d2chi2[0:index, 0:index]
+        # The model-free parameter values.
+        if self.model_type == 'all':
+            data.mf = params[data.mf_index]
+
+        # Aliases.
+        num_diff = self.diff_data.num_params
+        mf_deriv = order and self.model_type == 'all'
+        ti = self.tau_data.ti[:, newaxis]
+        ci = data.ci
+        shape = data.frq_sqrd.shape[:2] + ci.shape
+        mf_shape = (data.num_mf, 1, 1, 1, data.num_spins)
+
+        # Initialise the sums over the components (g is the bracketed term above).
+        g = zeros(shape, float64)
+        if order:
+            g_t = zeros(shape, float64)
+        if mf_deriv:
+            g_m = zeros((data.num_mf,) + shape, float64)
+        if order == 2:
+            g_tt = zeros(shape, float64)
+        if order == 2 and mf_deriv:
+            g_tm = zeros((data.num_mf,) + shape, float64)
+            g_mm = zeros((data.num_mf, data.num_mf) + shape, float64)
+
+        # Loop over the spectral density components.
+        for terms, t_index in data.jw_comps:
+            # The coefficient.
+            coef, dcoef, d2coef = self.calc_packed_coef(data, terms, order=order)
+            dcoef = dcoef.reshape(mf_shape)
+
+            # The Lorentzian.
+            te = None
+            if t_index != None:
+                te = data.mf[t_index]
+            L = lorentzian(data.frq_sqrd, ti, te=te, order=order)
+
+            # Sum the values.
+            g = g + coef * L[0]
+            if order:
+                g_t = g_t + coef * L[1]
+            if order == 2:
+                g_tt = g_tt + coef * L[3]
+
+            # The model-free parameter derivatives.
+            if mf_deriv:
+                g_m = g_m + dcoef * L[0]
+                if t_index != None:
+                    g_m[t_index] = g_m[t_index] + coef * L[2]
+            if order == 2 and mf_deriv:
+                g_tm = g_tm + dcoef * L[1]
+                g_mm = g_mm + d2coef.reshape((data.num_mf,) + mf_shape) * L[0]
+                if t_index != None:
+                    g_tm[t_index] = g_tm[t_index] + coef * L[4]
+                    g_mm[t_index] = g_mm[t_index] + dcoef * L[2]
+                    g_mm[:, t_index] = g_mm[:, t_index] + dcoef * L[2]
+                    g_mm[t_index, t_index] = g_mm[t_index, t_index] + coef * L[5]
+
+        # The spectral density values.
+        data.jw = 0.4 * sum(ci * g, axis=2)
+        if not order:
+            return
+
+        # The correlation time derivatives, and weight and correlation time products.
+        dti = self.tau_data.dti_full
+        ci_g_t = ci * g_t
+
+        # The spectral density gradients.
+        data.djw = zeros((data.num_params,) + data.jw.shape, float64)
+        data.djw[0:num_diff] = 0.4 * (einsum('jkn,fwkn->jfwn', data.dci, g) + einsum('jk,fwkn->jfwn', dti, ci_g_t))
+        if mf_deriv:
+            data.djw[num_diff:] = 0.4 * sum(ci * g_m, axis=3)
+        if order == 1:
+            return
+
+        # The diffusion-diffusion spectral density Hessians.
+        d2ti = self.tau_data.d2ti_full
+        dci_dti = einsum('jkn,lk->jlkn', data.dci, dti)
+        a = dci_dti + dci_dti.swapaxes(0, 1) + d2ti[:, :, :, newaxis] * ci
+        data.d2jw = zeros((data.num_params,) + data.djw.shape, float64)
+        data.d2jw[0:num_diff, 0:num_diff] = 0.4 * (einsum('jlkn,fwkn->jlfwn', data.d2ci, g) + einsum('jlkn,fwkn->jlfwn', a, g_t) + einsum('jlk,fwkn->jlfwn', dti[:, newaxis] * dti[newaxis], ci * g_tt))
+
+        # The diffusion-model-free and model-free-model-free spectral density Hessians.
+        if mf_deriv:
+            data.d2jw[0:num_diff, num_diff:] = 0.4 * (einsum('jkn,lfwkn->jlfwn', data.dci, g_m) + einsum('jk,lfwkn->jlfwn', dti, ci * g_tm))
+            data.d2jw[num_diff:, 0:num_diff] = data.d2jw[0:num_diff, num_diff:].swapaxes(0, 1)
+            data.d2jw[num_diff:, num_diff:] = 0.4 * sum(ci * g_mm, axis=4)
+
+
+    def calc_packed_ri(self, data):
+        """Calculate the relaxation values for the packed spins.
+
+        The R1, R2, and sigma_noe values, as well as the R1 values at the NOE frequencies, are
+        calculated as the transformed relaxation values Ri'.  The NOE values are then calculated
+        from the sigma_noe and R1 values.
+
+
+        @param data:    The packed spin data.
+        @type data:     Data instance
+        """
 
-            # Pure model-free parameter part of the global generic model-free Hessian.
-            self.total_d2chi2[data.start_index:data.end_index, data.start_index:data.end_index] = self.total_d2chi2[data.start_index:data.end_index, data.start_index:data.end_index] + data.d2chi2[index:, index:]
+        # The dipolar constant.
+        if data.r_li == None:
+            r = data.bond_length
+        else:
+            r = data.mf[data.r_li]
+        data.dip_const = 0.25 * data.dip_const_fixed * r**-6
 
-            # Off diagonal diffusion and model-free parameter parts of the global generic model-free Hessian.
-            self.total_d2chi2[0:index, data.start_index:data.end_index] = self.total_d2chi2[0:index, data.start_index:data.end_index] + data.d2chi2[0:index, index:]
-            self.total_d2chi2[data.start_index:data.end_index, 0:index] = self.total_d2chi2[data.start_index:data.end_index, 0:index] + data.d2chi2[index:, 0:index]
+        # The CSA constant (without the frequency dependent component).
+        if data.csa_li == None:
+            data.csa = data.csa_fixed
+        else:
+            data.csa = data.mf[data.csa_li]
+        data.csa_const = data.csa**2
 
-        # Diagonal scaling.
-        if self.scaling_flag:
-            self.total_d2chi2 = dot(self.scaling_matrix, dot(self.total_d2chi2, self.scaling_matrix))
+        # The J(w) components of the relaxation equations.
+        data.dip_jw_comps = einsum('ifw,fwn->in', data.dip_jw, data.jw)
+        data.csa_jw_comps = einsum('ifw,fwn->in', data.csa_jw, data.jw)
 
-        # Return a copy of the Hessian.
-        return self.total_d2chi2 * 1.0
+        # The transformed relaxation values.
+        data.ri_prime = data.dip_const * data.dip_jw_comps + data.csa_const * data.csa_jw_comps
+        if data.rex_li != None:
+            data.ri_prime = data.ri_prime + data.rex_frq[:, newaxis] * data.mf[data.rex_li]
 
+        # The relaxation values.
+        data.ri = data.ri_prime[0:data.num_ri] * 1.0
 
-    def calc_ri(self):
-        """Function for calculating relaxation values."""
+        # The NOE values.
+        if len(data.noe_i):
+            sigma_noe = data.ri_prime[data.noe_i]
+            r1 = data.ri_prime[data.noe_r1_i]
+            zero = (r1 == 0.0)
+            noe = 1.0 + data.g_ratio * sigma_noe / where(zero, 1.0, r1)
+            data.ri[data.noe_i] = where(zero, where(sigma_noe == 0.0, 1.0, 1e99), noe)
 
-        # Function call.
-        chi2 = self.func_mf(self.params)
 
-        # Return the single value.
-        return self.data[0].ri[0]
+    def calc_packed_dri(self, data):
+        """Calculate the relaxation gradients for the packed spins.
+
+        @param data:    The packed spin data.
+        @type data:     Data instance
+        """
+
+        # The J(w) derivatives.
+        data.dri_prime = data.dip_const * einsum('ifw,jfwn->jin', data.dip_jw, data.djw) + data.csa_const * einsum('ifw,jfwn->jin', data.csa_jw, data.djw)
+
+        # The bond length, CSA, and Rex derivatives.
+        if self.model_type == 'all':
+            num_diff = self.diff_data.num_params
+            if data.r_li != None:
+                data.dip_const_grad = -1.5 * data.dip_const_fixed * data.mf[data.r_li]**-7
+                data.dri_prime[num_diff+data.r_li] = data.dri_prime[num_diff+data.r_li] + data.dip_const_grad * data.dip_jw_comps
+            if data.csa_li != None:
+                data.csa_const_grad = 2.0 * data.csa
+                data.dri_prime[num_diff+data.csa_li] = data.dri_prime[num_diff+data.csa_li] + data.csa_const_grad * data.csa_jw_comps
+            if data.rex_li != None:
+                data.dri_prime[num_diff+data.rex_li] = data.dri_prime[num_diff+data.rex_li] + data.rex_frq[:, newaxis]
+
+        # The relaxation gradients.
+        data.dri = data.dri_prime[:, 0:data.num_ri] * 1.0
+
+        # The NOE gradients.
+        if len(data.noe_i):
+            sigma_noe = data.ri_prime[data.noe_i]
+            r1 = data.ri_prime[data.noe_r1_i]
+            zero = (r1 == 0.0)
+            r1 = where(zero, 1.0, r1)
+            dnoe = data.g_ratio / r1**2 * (r1 * data.dri_prime[:, data.noe_i] - sigma_noe * data.dri_prime[:, data.noe_r1_i])
+            data.dri[:, data.noe_i] = where(zero, where(sigma_noe == 0.0, 0.0, 1e99), dnoe)
+
+
+    def calc_packed_d2ri(self, data):
+        """Calculate the relaxation Hessians for the packed spins.
+
+        @param data:    The packed spin data.
+        @type data:     Data instance
+        """
+
+        # The J(w) derivatives.
+        data.d2ri_prime = data.dip_const * einsum('ifw,jlfwn->jlin', data.dip_jw, data.d2jw) + data.csa_const * einsum('ifw,jlfwn->jlin', data.csa_jw, data.d2jw)
+
+        # The bond length and CSA derivatives.
+        if self.model_type == 'all':
+            num_diff = self.diff_data.num_params
+            if data.r_li != None:
+                j = num_diff + data.r_li
+                dip_jw_grad = einsum('ifw,jfwn->jin', data.dip_jw, data.djw)
+                data.d2ri_prime[j] = data.d2ri_prime[j] + data.dip_const_grad * dip_jw_grad
+                data.d2ri_prime[:, j] = data.d2ri_prime[:, j] + data.dip_const_grad * dip_jw_grad
+                data.d2ri_prime[j, j] = data.d2ri_prime[j, j] + 10.5 * data.dip_const_fixed * data.mf[data.r_li]**-8 * data.dip_jw_comps
+            if data.csa_li != None:
+                j = num_diff + data.csa_li
+                csa_jw_grad = einsum('ifw,jfwn->jin', data.csa_jw, data.djw)
+                data.d2ri_prime[j] = data.d2ri_prime[j] + data.csa_const_grad * csa_jw_grad
+                data.d2ri_prime[:, j] = data.d2ri_prime[:, j] + data.csa_const_grad * csa_jw_grad
+                data.d2ri_prime[j, j] = data.d2ri_prime[j, j] + 2.0 * data.csa_jw_comps
+
+        # The relaxation Hessians.
+        data.d2ri = data.d2ri_prime[:, :, 0:data.num_ri] * 1.0
+
+        # The NOE Hessians.
+        if len(data.noe_i):
+            sigma_noe = data.ri_prime[data.noe_i]
+            dsigma_noe = data.dri_prime[:, data.noe_i]
+            d2sigma_noe = data.d2ri_prime[:, :, data.noe_i]
+            r1 = data.ri_prime[data.noe_r1_i]
+            dr1 = data.dri_prime[:, data.noe_r1_i]
+            d2r1 = data.d2ri_prime[:, :, data.noe_r1_i]
+            zero = (r1 == 0.0)
+            r1 = where(zero, 1.0, r1)
+            a = sigma_noe * (2.0 * dr1[:, newaxis] * dr1[newaxis] - r1 * d2r1)
+            b = r1 * (dsigma_noe[:, newaxis] * dr1[newaxis] + dr1[:, newaxis] * dsigma_noe[newaxis] - r1 * d2sigma_noe)
+            d2noe = data.g_ratio / r1**3 * (a - b)
+            data.d2ri[:, :, data.noe_i] = where(zero, where(sigma_noe == 0.0, 0.0, 1e99), d2noe)
 
 
     def init_diff_data(self, diff_data):
@@ -1298,6 +1302,205 @@ class Mf:
             diff_data.d2dz_dgamma2 = zeros(3, float64)
 
 
+    def init_packed_data(self):
+        """Initialisation of the packed spin data for the global diffusion tensor optimisations.
+
+        The spins sharing the same model-free equation, parameters, and relaxation data layout are
+        grouped together.  The data of each group is stacked into numpy arrays with the spin index as
+        the last dimension, so that the chi-squared value, gradient, and Hessian of all spins of the
+        group are calculated using a small number of numpy operations rather than a Python loop over
+        the spins.
+        """
+
+        # Aliases.
+        num_diff = self.diff_data.num_params
+        num_indices = self.diff_data.num_indices
+
+        # The number of diffusion parameters affecting the correlation times.
+        if self.diff_data.type == 'sphere':
+            num_ti = 1
+        elif self.diff_data.type == 'spheroid':
+            num_ti = 2
+        elif self.diff_data.type == 'ellipsoid':
+            num_ti = 3
+
+        # The diffusion tensor correlation time data, shared by all spins.
+        self.tau_data = Data()
+        self.tau_data.ti = zeros(num_indices, float64)
+        self.tau_data.tau_comps = zeros(num_indices, float64)
+        self.tau_data.tau_comps_sqrd = zeros(num_indices, float64)
+        self.tau_data.tau_comps_cubed = zeros(num_indices, float64)
+        self.tau_data.tau_scale = zeros(num_indices, float64)
+        self.tau_data.dti = zeros((num_ti, num_indices), float64)
+        self.tau_data.d2ti = zeros((num_ti, num_ti, num_indices), float64)
+
+        # The correlation time gradient and Hessian for all diffusion parameters.
+        self.tau_data.dti_full = zeros((num_diff, num_indices), float64)
+        self.tau_data.d2ti_full = zeros((num_diff, num_diff, num_indices), float64)
+
+        # Group the spins.
+        keys = []
+        groups = []
+        ri_offsets = []
+        ri_offset = 0
+        for i in range(self.num_spins):
+            # Alias.
+            data = self.data[i]
+
+            # The Ri offset of the spin, for the Levenberg-Marquardt Jacobian.
+            ri_offsets.append(ri_offset)
+            ri_offset = ri_offset + data.num_ri
+
+            # The group.
+            key = (data.equations, tuple(data.param_types), tuple(data.ri_labels), tuple(data.remap_table), tuple(data.frq), data.g_ratio)
+            if key not in keys:
+                keys.append(key)
+                groups.append([])
+            groups[keys.index(key)].append(i)
+
+        # Pack the data of each group.
+        self.packed_data = []
+        for spin_indices in groups:
+            # The spins.
+            spins = []
+            for i in spin_indices:
+                spins.append(self.data[i])
+            first = spins[0]
+
+            # Initialise the packed data container.
+            data = Data()
+            self.packed_data.append(data)
+            data.spin_indices = spin_indices
+            data.num_spins = len(spins)
+            data.num_ri = first.num_ri
+            data.equations = first.equations
+            data.param_types = first.param_types
+            data.g_ratio = first.g_ratio
+
+            # The relaxation data and errors, with the dimensions {Ri, spin}.
+            data.relax_data = zeros((data.num_ri, data.num_spins), float64)
+            data.errors = zeros((data.num_ri, data.num_spins), float64)
+            data.ri_index = zeros((data.num_ri, data.num_spins), int)
+            for n in range(data.num_spins):
+                data.relax_data[:, n] = spins[n].relax_data
+                data.errors[:, n] = spins[n].errors
+                data.ri_index[:, n] = ri_offsets[spin_indices[n]] + arange(data.num_ri)
+
+            # The XH unit vectors and the direction cosine data structures.
+            if self.diff_data.type != 'sphere':
+                data.xh_unit_vector = zeros((data.num_spins, 3), float64)
+                for n in range(data.num_spins):
+                    data.xh_unit_vector[n] = spins[n].xh_unit_vector
+            if self.diff_data.type == 'spheroid':
+                data.ddz_dO = zeros((2, data.num_spins), float64)
+                data.d2dz_dO2 = zeros((2, 2, data.num_spins), float64)
+            elif self.diff_data.type == 'ellipsoid':
+                data.ddx_dO = zeros((3, data.num_spins), float64)
+                data.ddy_dO = zeros((3, data.num_spins), float64)
+                data.ddz_dO = zeros((3, data.num_spins), float64)
+                data.d2dx_dO2 = zeros((3, 3, data.num_spins), float64)
+                data.d2dy_dO2 = zeros((3, 3, data.num_spins), float64)
+                data.d2dz_dO2 = zeros((3, 3, data.num_spins), float64)
+
+            # The diffusion tensor weights, gradients, and Hessians.
+            data.ci = zeros((num_indices, data.num_spins), float64)
+            data.dci = zeros((num_diff, num_indices, data.num_spins), float64)
+            data.d2ci = zeros((num_diff, num_diff, num_indices, data.num_spins), float64)
+
+            # The squared frequencies, with the dimensions {frequency, J(w) frequency, ti component, spin}.
+            data.frq_sqrd = first.frq_sqrd_list[:, :, newaxis, newaxis]
+
+            # The model-free parameter indices.
+            data.num_mf = len(data.param_types)
+            data.mf_index = zeros((data.num_mf, data.num_spins), int)
+            for l in range(data.num_mf):
+                for n in range(data.num_spins):
+                    data.mf_index[l, n] = getattr(spins[n], data.param_types[l] + '_i')
+
+            # The fixed model-free parameter values.
+            if self.model_type == 'diff':
+                data.mf = zeros((data.num_mf, data.num_spins), float64)
+                for n in range(data.num_spins):
+                    data.mf[:, n] = spins[n].param_values[data.mf_index[:, n]]
+
+            # The total number of parameters of each spin.
+            data.num_params = num_diff
+            if self.model_type == 'all':
+                data.num_params = num_diff + data.num_mf
+
+            # The local model-free parameter indices.
+            local = {}
+            for l in range(data.num_mf):
+                local[data.param_types[l]] = l
+            data.r_li = local.get('r')
+            data.csa_li = local.get('csa')
+            data.rex_li = local.get('rex')
+
+            # The spectral density components, as the coefficient polynomial terms and the internal correlation time index.
+            data.jw_comps = []
+            if data.equations == 'mf_orig':
+                if 's2' in local:
+                    data.jw_comps.append(([(1.0, [local['s2']])], None))
+                else:
+                    data.jw_comps.append(([(1.0, [])], None))
+                if 'te' in local:
+                    data.jw_comps.append(([(1.0, []), (-1.0, [local['s2']])], local['te']))
+            elif data.equations == 'mf_ext':
+                data.jw_comps.append(([(1.0, [local['s2']])], None))
+                if 'tf' in local:
+                    data.jw_comps.append(([(1.0, []), (-1.0, [local['s2f']])], local['tf']))
+                data.jw_comps.append(([(1.0, [local['s2f']]), (-1.0, [local['s2']])], local['ts']))
+            elif data.equations == 'mf_ext2':
+                data.jw_comps.append(([(1.0, [local['s2f'], local['s2s']])], None))
+                if 'tf' in local:
+                    data.jw_comps.append(([(1.0, []), (-1.0, [local['s2f']])], local['tf']))
+                data.jw_comps.append(([(1.0, [local['s2f']]), (-1.0, [local['s2f'], local['s2s']])], local['ts']))
+
+            # The fixed bond lengths and CSA values.
+            data.dip_const_fixed = zeros(data.num_spins, float64)
+            for n in range(data.num_spins):
+                data.dip_const_fixed[n] = spins[n].dip_const_fixed
+            if data.r_li == None:
+                data.bond_length = array([spin.bond_length for spin in spins], float64)
+            if data.csa_li == None:
+                data.csa_fixed = array([spin.csa for spin in spins], float64)
+
+            # The NOE indices, with the R1 values at the NOE frequencies appended after the Ri' values.
+            data.noe_i = []
+            data.noe_r1_i = []
+            for i in range(data.num_ri):
+                if first.ri_labels[i] == 'NOE':
+                    data.noe_i.append(i)
+                    data.noe_r1_i.append(data.num_ri + len(data.noe_r1_i))
+
+            # The dipolar and CSA J(w) component factors, with the dimensions {Ri', frequency, J(w) frequency}, and the Rex factors.
+            num_rows = data.num_ri + len(data.noe_i)
+            data.dip_jw = zeros((num_rows, first.num_frq, 5), float64)
+            data.csa_jw = zeros((num_rows, first.num_frq, 5), float64)
+            data.rex_frq = zeros(num_rows, float64)
+            for i in range(data.num_ri):
+                frq_num = first.remap_table[i]
+                csa_fixed = first.csa_const_fixed[frq_num]
+
+                # R1:  dip.(J(wH-wX) + 3J(wX) + 6J(wH+wX)) + csa.J(wX).
+                if first.ri_labels[i] == 'R1':
+                    data.dip_jw[i, frq_num] = [0.0, 3.0, 1.0, 0.0, 6.0]
+                    data.csa_jw[i, frq_num, 1] = csa_fixed
+
+                # R2:  dip/2.(4J(0) + J(wH-wX) + 3J(wX) + 6J(wH) + 6J(wH+wX)) + csa/6.(4J(0) + 3J(wX)) + Rex.
+                elif first.ri_labels[i] == 'R2':
+                    data.dip_jw[i, frq_num] = [2.0, 1.5, 0.5, 3.0, 3.0]
+                    data.csa_jw[i, frq_num, 0:2] = [4.0 * csa_fixed / 6.0, 3.0 * csa_fixed / 6.0]
+                    data.rex_frq[i] = comp_rex_const_grad(first.frq[frq_num])
+
+                # sigma_noe:  dip.(6J(wH+wX) - J(wH-wX)), and R1 at the NOE frequency.
+                elif first.ri_labels[i] == 'NOE':
+                    data.dip_jw[i, frq_num] = [0.0, 0.0, -1.0, 0.0, 6.0]
+                    j = data.noe_r1_i[data.noe_i.index(i)]
+                    data.dip_jw[j, frq_num] = [0.0, 3.0, 1.0, 0.0, 6.0]
+                    data.csa_jw[j, frq_num, 1] = csa_fixed
+
+
     def init_res_data(self, data, diff_data):
         """Function for the initialisation of the residue specific data."""
 
@@ -1492,55 +1695,19 @@ class Mf:
         # Create dri.
         if self.model_type == 'mf' or self.model_type == 'local_tm':
             dri = self.data[0].dri
-        elif self.model_type == 'diff':
-            # Set the total dri gradient to zero.
-            self.total_dri = self.total_dri * 0.0
-
-            # Ri indices.
-            ri_start_index = 0
-            ri_end_index = 0
-
-            # Loop over the residues.
-            for i in range(self.num_spins):
-                # Set self.data[i] to data.
-                data = self.data[i]
-
-                # Increment Ri end index.
-                ri_end_index = ri_end_index + data.num_ri
-
-                # Diffusion parameter part of the global generic model-free gradient.
-                self.total_dri[0:self.diff_data.num_params, ri_start_index:ri_end_index] = self.total_dri[0:self.diff_data.num_params, ri_start_index:ri_end_index] + data.dri[0:self.diff_data.num_params]
-
-                # Increment Ri start index.
-                ri_start_index = ri_start_index + data.num_ri
-
-            # dri.
-            dri = self.total_dri
-
-        elif self.model_type == 'all':
+        else:
             # Set the total dri gradient to zero.
             self.total_dri = self.total_dri * 0.0
 
-            # Ri indices.
-            ri_start_index = 0
-            ri_end_index = 0
-
-            # Loop over the residues.
-            for i in range(self.num_spins):
-                # Set self.data[i] to data.
-                data = self.data[i]
-
-                # Increment Ri end index.
-                ri_end_index = ri_end_index + data.num_ri
-
+            # Loop over the packed spin groups.
+            num_diff = self.diff_data.num_params
+            for data in self.packed_data:
                 # Diffusion parameter part of the global generic model-free gradient.
-                self.total_dri[0:self.diff_data.num_params, ri_start_index:ri_end_index] = self.total_dri[0:self.diff_data.num_params, ri_start_index:ri_end_index] + data.dri[0:self.diff_data.num_params]
+                self.total_dri[arange(num_diff)[:, newaxis, newaxis], data.ri_index[newaxis]] = data.dri[0:num_diff]
 
                 # Model-free parameter part of the global generic model-free gradient.
-                self.total_dri[data.start_index:data.end_index, ri_start_index:ri_end_index] = self.total_dri[data.start_index:data.end_index, ri_start_index:ri_end_index] + data.dri[self.diff_data.num_params:]
-
-                # Increment Ri start index.
-                ri_start_index = ri_start_index + data.num_ri
+                if self.model_type == 'all':
+                    self.total_dri[data.mf_index[:, newaxis], data.ri_index[newaxis]] = data.dri[num_diff:]
 
             # dri.
             dri = self.total_dri
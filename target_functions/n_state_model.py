@@ -21,7 +21,7 @@
 
 # Python module imports.
 from math import sqrt
-from numpy import array, dot, eye, float64, ones, transpose, zeros
+from numpy import array, dot, einsum, eye, float64, ones, tensordot, transpose, where, zeros
 
 # relax module imports.
 from lib.alignment.alignment_tensor import dAi_dAxx, dAi_dAyy, dAi_dAxy, dAi_dAxz, dAi_dAyz, to_tensor
@@ -32,7 +32,7 @@ from lib.errors import RelaxError
 from lib.float import isNaN
 from lib.geometry.rotations import euler_to_R_zyz
 from lib.physical_constants import pcs_constant
-from target_functions.chi2 import chi2, dchi2_element, d2chi2_element
+from target_functions.chi2 import chi2, chi2_rankN, dchi2_element, d2chi2_element
 
 
 class N_state_opt:
@@ -398,10 +398,13 @@ class N_state_opt:
             self.drdc_theta = zeros((self.total_num_params, self.num_align, self.num_interatom), float64)
             self.d2rdc_theta = zeros((self.total_num_params, self.total_num_params, self.num_align, self.num_interatom), float64)
 
+            # Set up the ensemble-vectorised RDC and PCS kernels.
+            self.init_ensemble_data()
+
             # Set the target function, gradient, and Hessian.
-            self.func = self.func_standard
-            self.dfunc = self.dfunc_standard
-            self.d2func = self.d2func_standard
+            self.func = self.func_ensemble
+            self.dfunc = self.dfunc_ensemble
+            self.d2func = self.d2func_ensemble
 
         # Variable probabilities.
         self.probs_fixed = True
@@ -1196,6 +1199,272 @@ class N_state_opt:
         return self.d2chi2 * 1.0
 
 
+    def func_ensemble(self, params):
+        """The target function for optimisation of the standard N-state model, using the ensemble-vectorised kernels.
+
+        This is the same target function as func_standard(), but the RDCs and PCSs of all alignments, spin systems and states are back-calculated in a few numpy operations rather than in Python loops.  The RDCs and PCSs are::
+
+                          _N_
+                          \           /         T \ 
+            Dij(theta)  =  >   pc . Ai : mu_jc.mu_jc  ,
+                          /__         \           / 
+                          c=1
+
+        where ':' is the double contraction of the two rank-2 tensors.  The outer products of the state vectors, together with the dipolar constants (and their averaging over the pseudo-atoms), are constant and are pre-calculated in init_ensemble_data().  The outer products for the PCS are updated in paramag_info().
+
+
+        @param params:  The vector of parameter values.
+        @type params:   numpy rank-1 array
+        @return:        The chi-squared or SSE value.
+        @rtype:         float
+        """
+
+        # Scaling.
+        if self.scaling_flag:
+            params = dot(params, self.scaling_matrix)
+
+        # Initial chi-squared (or SSE) value.
+        chi2_sum = 0.0
+
+        # Unpack both the probabilities (when the paramagnetic centre is also optimised).
+        if not self.probs_fixed and not self.centre_fixed:
+            # The probabilities.
+            self.probs = params[-(self.N-1)-3:-3]
+
+        # Unpack the probabilities (located at the end of the parameter array).
+        elif not self.probs_fixed:
+            self.probs = params[-(self.N-1):]
+
+        # Unpack the paramagnetic centre (also update the paramagnetic info).
+        if not self.centre_fixed:
+            self.paramag_centre = params[-3:]
+            self.paramag_info()
+
+        # Create the alignment tensors from the parameters.
+        index = 0
+        for align_index in range(self.num_align):
+            if not self.fixed_tensors[align_index]:
+                to_tensor(self.A[align_index], params[5*index:5*index + 5])
+                index += 1
+
+        # The probabilities of all N states.
+        self.probs_full = zeros(self.N, float64)
+        self.probs_full[:len(self.probs)] = self.probs
+        if len(self.probs) < self.N:
+            self.probs_full[-1] = 1.0 - sum(self.probs)
+
+        # The back calculated RDCs.
+        if self.rdc_flag_sum:
+            # The RDC of each alignment, interatomic pair and state, and the ensemble average.
+            self.rdc_states = einsum('inm,jcnm->ijc', self.A, self.rdc_outer)
+            self.rdc_theta = dot(self.rdc_states, self.probs_full)
+
+            # Add the J coupling to convert into the back-calculated T = J+D value.
+            if self.j_couplings is not None:
+                self.rdc_theta += self.T_flags * self.j_couplings
+
+            # Take the absolute value.
+            self.rdc_theta = where(self.absolute_rdc, abs(self.rdc_theta), self.rdc_theta)
+
+            # Zero the missing data, and sum the chi-squared values.
+            self.rdc_theta *= self.rdc_mask
+            chi2_sum = chi2_sum + chi2_rankN(self.rdc[self.rdc_rows], self.rdc_theta[self.rdc_rows], self.rdc_errors[self.rdc_rows])
+
+        # The back calculated PCSs.
+        if self.pcs_flag_sum:
+            # The PCS of each alignment, spin and state, and the ensemble average.
+            self.pcs_states = self.pcs_const * einsum('inm,jcnm->ijc', self.A, self.pcs_outer)
+            self.deltaij_theta = dot(self.pcs_states, self.probs_full)
+
+            # Zero the missing data, and sum the chi-squared values.
+            self.deltaij_theta *= self.pcs_mask
+            chi2_sum = chi2_sum + chi2_rankN(self.deltaij[self.pcs_rows], self.deltaij_theta[self.pcs_rows], self.pcs_errors[self.pcs_rows])
+
+        # Return the chi-squared value.
+        return chi2_sum
+
+
+    def dfunc_ensemble(self, params):
+        """The gradient function for optimisation of the standard N-state model, using the ensemble-vectorised kernels.
+
+        This is the same gradient function as dfunc_standard().  The Amn partial derivatives of the RDCs are the contraction of the pre-calculated alignment tensor gradients and state vector outer products, weighted by the probabilities.
+
+
+        @param params:  The vector of parameter values.  This is unused as it is assumed that func() was called first.
+        @type params:   numpy rank-1 array
+        @return:        The chi-squared or SSE gradient.
+        @rtype:         numpy rank-1 array
+        """
+
+        # Initial chi-squared (or SSE) gradient.
+        self.dchi2 = self.dchi2 * 0.0
+
+        # The Amn partial derivatives, for the spins j and the five tensor elements k.
+        if self.rdc_flag_sum:
+            drdc_dAmn = einsum('jck,c->kj', self.rdc_outer_dA, self.probs_full)
+        if self.pcs_flag_sum:
+            ddeltaij_dAmn = einsum('ijc,jck,c->ikj', self.pcs_const, self.pcs_outer_dA, self.probs_full)
+
+        # Construct the Amn partial derivative components.
+        for align_index in range(self.num_align):
+            # Skip fixed tensors.
+            if self.fixed_tensors[align_index]:
+                continue
+
+            # The RDC.
+            if self.rdc_flag_sum:
+                self.drdc_theta[align_index*5:align_index*5+5, align_index] = drdc_dAmn * self.rdc_mask[align_index]
+
+                # Gradients for T = J+D data.
+                if (self.T_flags[align_index] * self.rdc_mask[align_index]).any():
+                    raise RelaxError("Gradients for T = J+D data have not been implemented yet.")
+
+            # The PCS.
+            if self.pcs_flag_sum:
+                self.ddeltaij_theta[align_index*5:align_index*5+5, align_index] = ddeltaij_dAmn[align_index] * self.pcs_mask[align_index]
+
+        # Construct the pc partial derivative gradient components, being the RDC and PCS of each state.
+        if not self.probs_fixed:
+            # Shift the parameter index if the paramagnetic position is optimised.
+            x = 0
+            if not self.centre_fixed:
+                x = 3
+
+            # The parameter indices and states.
+            start = self.num_align_params
+            num = max(self.N - 1 - x, 0)
+
+            # The RDC and PCS.
+            if self.rdc_flag_sum:
+                self.drdc_theta[start:start+num] = transpose(self.rdc_states[:, :, :num] * self.rdc_mask[:, :, None], (2, 0, 1))
+            if self.pcs_flag_sum:
+                self.ddeltaij_theta[start:start+num] = transpose(self.pcs_states[:, :, :num] * self.pcs_mask[:, :, None], (2, 0, 1))
+
+        # Construct the paramagnetic centre c partial derivative components for the PCS.
+        if not self.centre_fixed and self.pcs_flag_sum:
+            # The tensor-vector products and quadratic forms.
+            A_mu = einsum('inm,jcm->ijcn', self.A, self.paramag_unit_vect)
+            mu_A_mu = einsum('ijcn,jcn->ijc', A_mu, self.paramag_unit_vect)
+
+            # The PCS constant derivative and vector derivative parts, for each centre coordinate.
+            r = self.paramag_dist
+            grad = self.dpcs_const_theta * (r**2 * mu_A_mu)[:, :, :, None]  +  2.0 * (self.pcs_const / r)[:, :, :, None] * einsum('xn,ijcn->ijcx', self.dr_theta, A_mu)
+
+            # Average over the states, converting to the Angstrom scale as the coordinates are in Angstrom units.
+            self.ddeltaij_theta[-3:] = 1e-10 * einsum('ijcx,c->xij', grad, self.probs_full) * self.pcs_mask
+
+        # The RDC part of the chi-squared gradient.
+        if self.rdc_flag_sum:
+            weights = self.rdc_rows[:, None] / self.rdc_errors**2
+            self.dchi2 = self.dchi2 - 2.0 * tensordot(self.drdc_theta, (self.rdc - self.rdc_theta) * weights, axes=([1, 2], [0, 1]))
+
+        # The PCS part of the chi-squared gradient.
+        if self.pcs_flag_sum:
+            weights = self.pcs_rows[:, None] / self.pcs_errors**2
+            self.dchi2 = self.dchi2 - 2.0 * tensordot(self.ddeltaij_theta, (self.deltaij - self.deltaij_theta) * weights, axes=([1, 2], [0, 1]))
+
+        # Diagonal scaling.
+        if self.scaling_flag:
+            self.dchi2 = dot(self.dchi2, self.scaling_matrix)
+
+        # Return a copy of the gradient.
+        return self.dchi2 * 1.0
+
+
+    def d2func_ensemble(self, params):
+        """The Hessian function for optimisation of the standard N-state model, using the ensemble-vectorised kernels.
+
+        This is the same Hessian function as d2func_standard(), with the pc-Amn second partial derivatives taken from the pre-calculated contractions of the alignment tensor gradients and state vector outer products.
+
+
+        @param params:  The vector of parameter values.  This is unused as it is assumed that func() was called first.
+        @type params:   numpy rank-1 array
+        @return:        The chi-squared or SSE Hessian.
+        @rtype:         numpy rank-2 array
+        """
+
+        # Initial chi-squared (or SSE) Hessian.
+        self.d2chi2 = self.d2chi2 * 0.0
+
+        # Construct the pc-Amn second partial derivative Hessian components.
+        if not self.probs_fixed:
+            for align_index in range(self.num_align):
+                # Only the fixed tensors, as for d2func_standard().
+                if not self.fixed_tensors[align_index]:
+                    continue
+
+                # Loop over the states.
+                for c in range(self.N - 1):
+                    # Index in the parameter array.
+                    pc_index = self.num_align_params + c
+
+                    # The RDC Hessian component.
+                    if self.rdc_flag_sum:
+                        hess = transpose(self.rdc_outer_dA[:, c]) * self.rdc_mask[align_index]
+                        self.d2rdc_theta[pc_index, align_index*5:align_index*5+5, align_index] = hess
+                        self.d2rdc_theta[align_index*5:align_index*5+5, pc_index, align_index] = hess
+
+                    # The PCS Hessian component.
+                    if self.pcs_flag_sum:
+                        hess = transpose(self.pcs_const[align_index, :, c, None] * self.pcs_outer_dA[:, c]) * self.pcs_mask[align_index]
+                        self.d2deltaij_theta[pc_index, align_index*5:align_index*5+5, align_index] = hess
+                        self.d2deltaij_theta[align_index*5:align_index*5+5, pc_index, align_index] = hess
+
+        # Construct the paramagnetic centre c partial derivative components for the PCS.
+        if not self.centre_fixed:
+            raise RelaxError("The Hessian equations for optimising the paramagnetic centre position are not yet implemented.")
+
+        # The RDC part of the chi-squared Hessian.
+        if self.rdc_flag_sum:
+            weights = self.rdc_rows[:, None] / self.rdc_errors**2
+            self.d2chi2 = self.d2chi2 + 2.0 * tensordot(self.drdc_theta * weights, self.drdc_theta, axes=([1, 2], [1, 2])) - 2.0 * tensordot(self.d2rdc_theta, (self.rdc - self.rdc_theta) * weights, axes=([2, 3], [0, 1]))
+
+        # The PCS part of the chi-squared Hessian.
+        if self.pcs_flag_sum:
+            weights = self.pcs_rows[:, None] / self.pcs_errors**2
+            self.d2chi2 = self.d2chi2 + 2.0 * tensordot(self.ddeltaij_theta * weights, self.ddeltaij_theta, axes=([1, 2], [1, 2])) - 2.0 * tensordot(self.d2deltaij_theta, (self.deltaij - self.deltaij_theta) * weights, axes=([2, 3], [0, 1]))
+
+        # Diagonal scaling.
+        if self.scaling_flag:
+            self.d2chi2 = dot(self.d2chi2, self.scaling_matrix)
+
+        # Return a copy of the Hessian.
+        return self.d2chi2 * 1.0
+
+
+    def init_ensemble_data(self):
+        """Set up the constant data structures for the ensemble-vectorised RDC and PCS kernels.
+
+        For the RDCs, the outer products of the interatomic unit vectors of each state are pre-multiplied by the dipolar constants.  For pseudo-atoms these are averaged over the pseudo-atoms.  The contraction of these with the invariant alignment tensor gradients is also pre-calculated.  The structures for the PCS depend on the paramagnetic centre and are set up by paramag_info().
+        """
+
+        # The missing data and alignment masks.
+        if self.rdc_flag_sum:
+            self.rdc_rows = array(self.rdc_flag, bool)
+            self.rdc_mask = (1.0 - self.missing_rdc) * self.rdc_rows[:, None]
+        if self.pcs_flag_sum:
+            self.pcs_rows = array(self.pcs_flag, bool)
+            self.pcs_mask = (1.0 - self.missing_deltaij) * self.pcs_rows[:, None]
+
+        # The RDC state vector outer products.
+        if self.rdc_flag_sum:
+            self.rdc_outer = zeros((self.num_interatom, self.N, 3, 3), float64)
+            for j in range(self.num_interatom):
+                # The pseudo-atom average.
+                if self.rdc_pseudo_flags[j]:
+                    vect = array(self.dip_vect[j], float64)
+                    M = len(self.dip_const[j])
+                    self.rdc_outer[j] = einsum('d,cdn,cdm->cnm', array(self.dip_const[j], float64), vect, vect) / M
+
+                # A single vector per state.
+                else:
+                    vect = array(self.dip_vect[j], float64)
+                    self.rdc_outer[j] = self.dip_const[j] * einsum('cn,cm->cnm', vect, vect)
+
+            # The contraction with the alignment tensor gradients.
+            self.rdc_outer_dA = einsum('knm,jcnm->jck', self.dA, self.rdc_outer)
+
+
     def paramag_info(self):
         """Calculate the paramagnetic centre to spin vectors, distances and constants."""
 
@@ -1205,6 +1474,10 @@ class N_state_opt:
         else:
             vectors_centre_per_state(self.atomic_pos, self.paramag_centre, self.paramag_unit_vect, self.paramag_dist)
 
+        # The PCS state vector outer products, and their contraction with the alignment tensor gradients.
+        self.pcs_outer = einsum('jcn,jcm->jcnm', self.paramag_unit_vect, self.paramag_unit_vect)
+        self.pcs_outer_dA = einsum('knm,jcnm->jck', self.dA, self.pcs_outer)
+
         # The PCS constants.
         for align_index in range(self.num_align):
             for j in range(self.num_spins):
@@ -26,19 +26,19 @@
 
 # Python module imports.
 from copy import deepcopy
-from numpy import all, arctan2, cos, dot, float64, int16, isfinite, max, multiply, ones, rollaxis, pi, sin, sum, zeros
+from numpy import all, arange, arctan2, cos, dot, errstate, float64, indices, int16, isfinite, max, multiply, ones, rollaxis, pi, sin, sum, transpose, zeros
 from numpy.ma import masked_equal
 
 # relax module imports.
-from lib.dispersion.b14 import r2eff_B14
-from lib.dispersion.cr72 import r2eff_CR72
-from lib.dispersion.dpl94 import r1rho_DPL94
-from lib.dispersion.it99 import r2eff_IT99
-from lib.dispersion.lm63 import r2eff_LM63
+from lib.dispersion.b14 import dr2eff_B14, r2eff_B14
+from lib.dispersion.cr72 import dr2eff_CR72, r2eff_CR72
+from lib.dispersion.dpl94 import dr1rho_DPL94, r1rho_DPL94
+from lib.dispersion.it99 import dr2eff_IT99, r2eff_IT99
+from lib.dispersion.lm63 import dr2eff_LM63, r2eff_LM63
 from lib.dispersion.lm63_3site import r2eff_LM63_3site
 from lib.dispersion.m61 import r1rho_M61
 from lib.dispersion.m61b import r1rho_M61b
-from lib.dispersion.mp05 import r1rho_MP05
+from lib.dispersion.mp05 import dr1rho_MP05, r1rho_MP05
 from lib.dispersion.mmq_cr72 import r2eff_mmq_cr72
 from lib.dispersion.ns_cpmg_2site_3d import r2eff_ns_cpmg_2site_3D
 from lib.dispersion.ns_cpmg_2site_expanded import r2eff_ns_cpmg_2site_expanded
@@ -48,13 +48,17 @@ from lib.dispersion.ns_mmq_2site import r2eff_ns_mmq_2site_mq, r2eff_ns_mmq_2sit
 from lib.dispersion.ns_r1rho_2site import ns_r1rho_2site
 from lib.dispersion.ns_r1rho_3site import ns_r1rho_3site
 from lib.dispersion.ns_matrices import r180x_3d
-from lib.dispersion.tp02 import r1rho_TP02
-from lib.dispersion.tap03 import r1rho_TAP03
-from lib.dispersion.tsmfk01 import r2eff_TSMFK01
+from lib.dispersion.tp02 import dr1rho_TP02, r1rho_TP02
+from lib.dispersion.tap03 import dr1rho_TAP03, r1rho_TAP03
+from lib.dispersion.tsmfk01 import dr2eff_TSMFK01, r2eff_TSMFK01
 from lib.dispersion.variables import EXP_TYPE_CPMG_DQ, EXP_TYPE_CPMG_MQ, EXP_TYPE_CPMG_PROTON_MQ, EXP_TYPE_CPMG_PROTON_SQ, EXP_TYPE_CPMG_SQ, EXP_TYPE_CPMG_ZQ, EXP_TYPE_LIST_CPMG, EXP_TYPE_R1RHO, MODEL_B14, MODEL_B14_FULL, MODEL_CR72, MODEL_CR72_FULL, MODEL_DPL94, MODEL_IT99, MODEL_LIST_CPMG, MODEL_LIST_FULL, MODEL_LIST_DW_MIX_DOUBLE, MODEL_LIST_DW_MIX_QUADRUPLE, MODEL_LIST_INV_RELAX_TIMES, MODEL_LIST_R20B, MODEL_LIST_MMQ, MODEL_LIST_MQ_CPMG, MODEL_LIST_R1RHO, MODEL_LIST_R1RHO_OFF_RES, MODEL_LM63, MODEL_LM63_3SITE, MODEL_M61, MODEL_M61B, MODEL_MP05, MODEL_MMQ_CR72, MODEL_NOREX, MODEL_NS_CPMG_2SITE_3D, MODEL_NS_CPMG_2SITE_3D_FULL, MODEL_NS_CPMG_2SITE_EXPANDED, MODEL_NS_CPMG_2SITE_STAR, MODEL_NS_CPMG_2SITE_STAR_FULL, MODEL_NS_MMQ_2SITE, MODEL_NS_MMQ_3SITE, MODEL_NS_MMQ_3SITE_LINEAR, MODEL_NS_R1RHO_2SITE, MODEL_NS_R1RHO_3SITE, MODEL_NS_R1RHO_3SITE_LINEAR, MODEL_TAP03, MODEL_TP02, MODEL_TSMFK01
 from lib.errors import RelaxError
 from lib.float import isNaN
-from target_functions.chi2 import chi2_rankN
+from target_functions.chi2 import chi2_rankN, chi2_rankN_points
+
+
+# The maximum number of R2eff/R1rho array elements per block of parameter points for the vectorised target functions.
+BATCH_ELEMENTS = 2000000
 
 
 class Dispersion:
@@ -185,6 +189,7 @@ class Dispersion:
         self.num_params = num_params
         self.exp_types = exp_types
         self.scaling_matrix = scaling_matrix
+        self.r1_fit = r1_fit
         self.values_orig = values
         self.cpmg_frqs_orig = cpmg_frqs
         self.spin_lock_nu1_orig = spin_lock_nu1
@@ -574,6 +579,268 @@ class Dispersion:
         if model == MODEL_NS_MMQ_3SITE_LINEAR:
             self.func = self.func_ns_mmq_3site_linear
 
+        # The vectorised back-calculation functions for the evaluation of multiple parameter points via func_batch().
+        self.back_calc_batch = None
+        if model == MODEL_LM63:
+            self.back_calc_batch = self.batch_LM63
+        if model == MODEL_CR72:
+            self.back_calc_batch = self.batch_CR72
+        if model == MODEL_CR72_FULL:
+            self.back_calc_batch = self.batch_CR72_full
+        if model == MODEL_IT99:
+            self.back_calc_batch = self.batch_IT99
+        if model == MODEL_TSMFK01:
+            self.back_calc_batch = self.batch_TSMFK01
+        if model == MODEL_B14:
+            self.back_calc_batch = self.batch_B14
+        if model == MODEL_B14_FULL:
+            self.back_calc_batch = self.batch_B14_full
+
+        # The Jacobians of the back-calculated values of the analytic models, for the gradient and Hessian via dfunc() and d2func().
+        self.jacobian = None
+        if model == MODEL_LM63:
+            self.jacobian = self.jacobian_LM63
+        if model == MODEL_CR72:
+            self.jacobian = self.jacobian_CR72
+        if model == MODEL_CR72_FULL:
+            self.jacobian = self.jacobian_CR72_full
+        if model == MODEL_IT99:
+            self.jacobian = self.jacobian_IT99
+        if model == MODEL_TSMFK01:
+            self.jacobian = self.jacobian_TSMFK01
+        if model == MODEL_B14:
+            self.jacobian = self.jacobian_B14
+        if model == MODEL_B14_FULL:
+            self.jacobian = self.jacobian_B14_full
+        if model == MODEL_DPL94:
+            self.jacobian = self.jacobian_DPL94
+        if model == MODEL_TP02:
+            self.jacobian = self.jacobian_TP02
+        if model == MODEL_TAP03:
+            self.jacobian = self.jacobian_TAP03
+        if model == MODEL_MP05:
+            self.jacobian = self.jacobian_MP05
+
+        # The gradient and Hessian set up.
+        self.dfunc = None
+        self.d2func = None
+        if self.jacobian != None:
+            self.dfunc = self.dfunc_analytic
+            self.d2func = self.d2func_analytic
+
+            # The chi-squared weights of the data points, excluding the missing and padding points.
+            self.valid = (self.disp_struct * (1.0 - self.missing)) == 1.0
+            self.weights = self.valid / self.errors**2
+
+            # The errors of the data points, flattened for the Levenberg-Marquardt algorithm.
+            self.lm_errors = self.errors[self.valid]
+
+            # The experiment, spin and frequency indices of the R2 parameters.
+            self.r2_indices = indices([self.NE, self.NS, self.NM]).reshape(3, self.NE*self.NS*self.NM)
+
+
+    def batch_B14(self, points):
+        """Back-calculation of the R2eff values for multiple parameter points of the reduced Baldwin (2014) model.
+
+        @param points:  The parameter vectors, one per row.  The dimensions are {Pi, Ni}.
+        @type points:   numpy rank-2 float array
+        @return:        The back-calculated R2eff values.  The dimensions are {Pi, Ei, Si, Mi, Oi, Di}.
+        @rtype:         numpy rank-6 float array
+        """
+
+        # Unpack the parameter values.
+        R20 = points[:, :self.end_index[0]]
+        dw = points[:, self.end_index[0]:self.end_index[1]]
+        pA = points[:, self.end_index[1]]
+        kex = points[:, self.end_index[1]+1]
+
+        # Back calculate the R2eff values.
+        return self.calc_B14_batch(R20A=R20, R20B=R20, dw=dw, pA=pA, kex=kex)
+
+
+    def batch_B14_full(self, points):
+        """Back-calculation of the R2eff values for multiple parameter points of the full Baldwin (2014) model.
+
+        @param points:  The parameter vectors, one per row.  The dimensions are {Pi, Ni}.
+        @type points:   numpy rank-2 float array
+        @return:        The back-calculated R2eff values.  The dimensions are {Pi, Ei, Si, Mi, Oi, Di}.
+        @rtype:         numpy rank-6 float array
+        """
+
+        # Unpack the parameter values.
+        R20 = points[:, :self.end_index[1]].reshape(len(points), self.NS*2, self.NM)
+        R20A = R20[:, ::2].reshape(len(points), self.NS*self.NM)
+        R20B = R20[:, 1::2].reshape(len(points), self.NS*self.NM)
+        dw = points[:, self.end_index[1]:self.end_index[2]]
+        pA = points[:, self.end_index[2]]
+        kex = points[:, self.end_index[2]+1]
+
+        # Back calculate the R2eff values.
+        return self.calc_B14_batch(R20A=R20A, R20B=R20B, dw=dw, pA=pA, kex=kex)
+
+
+    def batch_CR72(self, points):
+        """Back-calculation of the R2eff values for multiple parameter points of the reduced Carver and Richards (1972) model.
+
+        @param points:  The parameter vectors, one per row.  The dimensions are {Pi, Ni}.
+        @type points:   numpy rank-2 float array
+        @return:        The back-calculated R2eff values.  The dimensions are {Pi, Ei, Si, Mi, Oi, Di}.
+        @rtype:         numpy rank-6 float array
+        """
+
+        # Unpack the parameter values.
+        R20 = points[:, :self.end_index[0]]
+        dw = points[:, self.end_index[0]:self.end_index[1]]
+        pA = points[:, self.end_index[1]]
+        kex = points[:, self.end_index[1]+1]
+
+        # Back calculate the R2eff values.
+        return self.calc_CR72_batch(R20A=R20, R20B=R20, dw=dw, pA=pA, kex=kex)
+
+
+    def batch_CR72_full(self, points):
+        """Back-calculation of the R2eff values for multiple parameter points of the full Carver and Richards (1972) model.
+
+        @param points:  The parameter vectors, one per row.  The dimensions are {Pi, Ni}.
+        @type points:   numpy rank-2 float array
+        @return:        The back-calculated R2eff values.  The dimensions are {Pi, Ei, Si, Mi, Oi, Di}.
+        @rtype:         numpy rank-6 float array
+        """
+
+        # Unpack the parameter values.
+        R20 = points[:, :self.end_index[1]].reshape(len(points), self.NS*2, self.NM)
+        R20A = R20[:, ::2].reshape(len(points), self.NS*self.NM)
+        R20B = R20[:, 1::2].reshape(len(points), self.NS*self.NM)
+        dw = points[:, self.end_index[1]:self.end_index[2]]
+        pA = points[:, self.end_index[2]]
+        kex = points[:, self.end_index[2]+1]
+
+        # Back calculate the R2eff values.
+        return self.calc_CR72_batch(R20A=R20A, R20B=R20B, dw=dw, pA=pA, kex=kex)
+
+
+    def batch_IT99(self, points):
+        """Back-calculation of the R2eff values for multiple parameter points of the Ishima and Torchia (1999) model.
+
+        @param points:  The parameter vectors, one per row.  The dimensions are {Pi, Ni}.
+        @type points:   numpy rank-2 float array
+        @return:        The back-calculated R2eff values.  The dimensions are {Pi, Ei, Si, Mi, Oi, Di}.
+        @rtype:         numpy rank-6 float array
+        """
+
+        # Unpack the parameter values.
+        R20 = points[:, :self.end_index[0]]
+        dw = points[:, self.end_index[0]:self.end_index[1]]
+        pA = points[:, self.end_index[1]]
+        tex = points[:, self.end_index[1]+1]
+
+        # Back calculate the R2eff values.
+        back_calc = zeros([len(points)] + self.numpy_array_shape, float64)
+        r2eff_IT99(r20=self.batch_r2_struct(R20), pA=self.batch_global(pA), dw=self.batch_spin_struct(dw, self.frqs), dw_orig=dw, tex=self.batch_global(tex), cpmg_frqs=self.cpmg_frqs, back_calc=back_calc)
+        return back_calc
+
+
+    def batch_LM63(self, points):
+        """Back-calculation of the R2eff values for multiple parameter points of the Luz and Meiboom (1963) 2-site model.
+
+        @param points:  The parameter vectors, one per row.  The dimensions are {Pi, Ni}.
+        @type points:   numpy rank-2 float array
+        @return:        The back-calculated R2eff values.  The dimensions are {Pi, Ei, Si, Mi, Oi, Di}.
+        @rtype:         numpy rank-6 float array
+        """
+
+        # Unpack the parameter values.
+        R20 = points[:, :self.end_index[0]]
+        phi_ex = points[:, self.end_index[0]:self.end_index[1]]
+        kex = points[:, self.end_index[1]]
+
+        # Back calculate the R2eff values.
+        back_calc = zeros([len(points)] + self.numpy_array_shape, float64)
+        r2eff_LM63(r20=self.batch_r2_struct(R20), phi_ex=self.batch_spin_struct(phi_ex, self.frqs_squared), kex=self.batch_global(kex), cpmg_frqs=self.cpmg_frqs, back_calc=back_calc)
+        return back_calc
+
+
+    def batch_TSMFK01(self, points):
+        """Back-calculation of the R2eff values for multiple parameter points of the Tollinger et al. (2001) model.
+
+        @param points:  The parameter vectors, one per row.  The dimensions are {Pi, Ni}.
+        @type points:   numpy rank-2 float array
+        @return:        The back-calculated R2eff values.  The dimensions are {Pi, Ei, Si, Mi, Oi, Di}.
+        @rtype:         numpy rank-6 float array
+        """
+
+        # Unpack the parameter values.
+        R20A = points[:, :self.end_index[0]]
+        dw = points[:, self.end_index[0]:self.end_index[1]]
+        k_AB = points[:, self.end_index[1]]
+
+        # Back calculate the R2eff values.
+        back_calc = zeros([len(points)] + self.numpy_array_shape, float64)
+        r2eff_TSMFK01(r20a=self.batch_r2_struct(R20A), dw=self.batch_spin_struct(dw, self.frqs), dw_orig=dw, k_AB=self.batch_global(k_AB), tcp=self.tau_cpmg, back_calc=back_calc)
+        return back_calc
+
+
+    def batch_global(self, param):
+        """Convert a global parameter of multiple parameter points into the rank [NP][1][1][1][1][1] structure.
+
+        @param param:   The parameter values for each point.  The dimensions are {Pi}.
+        @type param:    numpy rank-1 float array
+        @return:        The parameter structure.
+        @rtype:         numpy rank-6 float array
+        """
+
+        return param.reshape(len(param), 1, 1, 1, 1, 1)
+
+
+    def batch_r2_struct(self, r2):
+        """Convert the spin and frequency dependent R2 parameters of multiple parameter points into the [NP][NE][NS][NM][NO][ND] structure.
+
+        @param r2:      The R2 parameter values.  The dimensions are {Pi, Ei*Si*Mi}.
+        @type r2:       numpy rank-2 float array
+        @return:        The R2 structure.
+        @rtype:         numpy rank-6 float array
+        """
+
+        return multiply.outer( r2.reshape(len(r2), self.NE, self.NS, self.NM), self.no_nd_ones )
+
+
+    def batch_spin_struct(self, param, frqs):
+        """Convert the spin specific parameters of multiple parameter points into the [NP][NE][NS][NM][NO][ND] structure, scaled by the frequency structure.
+
+        @param param:   The spin specific parameter values, for example dw in ppm or phi_ex in ppm^2.  The dimensions are {Pi, Si}.
+        @type param:    numpy rank-2 float array
+        @param frqs:    The frequency structure for the unit conversion, either self.frqs or self.frqs_squared.
+        @type frqs:     numpy rank-5 float array
+        @return:        The parameter structure.
+        @rtype:         numpy rank-6 float array
+        """
+
+        return param.reshape(len(param), 1, self.NS, 1, 1, 1) * frqs
+
+
+    def calc_B14_batch(self, R20A=None, R20B=None, dw=None, pA=None, kex=None):
+        """Back-calculate the R2eff values of the Baldwin (2014) model for multiple parameter points.
+
+        @keyword R20A:  The R2 value for state A in the absence of exchange.  The dimensions are {Pi, Ei*Si*Mi}.
+        @type R20A:     numpy rank-2 float array
+        @keyword R20B:  The R2 value for state B in the absence of exchange.  The dimensions are {Pi, Ei*Si*Mi}.
+        @type R20B:     numpy rank-2 float array
+        @keyword dw:    The chemical shift differences in ppm for each spin.  The dimensions are {Pi, Si}.
+        @type dw:       numpy rank-2 float array
+        @keyword pA:    The population of state A.  The dimensions are {Pi}.
+        @type pA:       numpy rank-1 float array
+        @keyword kex:   The rate of exchange.  The dimensions are {Pi}.
+        @type kex:      numpy rank-1 float array
+        @return:        The back-calculated R2eff values.  The dimensions are {Pi, Ei, Si, Mi, Oi, Di}.
+        @rtype:         numpy rank-6 float array
+        """
+
+        # Back calculate the R2eff values.
+        back_calc = zeros([len(dw)] + self.numpy_array_shape, float64)
+        r2eff_B14(r20a=self.batch_r2_struct(R20A), r20b=self.batch_r2_struct(R20B), pA=self.batch_global(pA), dw=self.batch_spin_struct(dw, self.frqs), dw_orig=dw, kex=self.batch_global(kex), ncyc=self.power, inv_tcpmg=self.inv_relax_times, tcp=self.tau_cpmg, back_calc=back_calc)
+        return back_calc
+
+
 
     def calc_B14_chi2(self, R20A=None, R20B=None, dw=None, pA=None, kex=None):
         """Calculate the chi-squared value of the Baldwin (2014) 2-site exact solution model for all time scales.
@@ -654,6 +921,29 @@ class Dispersion:
         return chi2_rankN(self.values, self.back_calc, self.errors)
 
 
+    def calc_CR72_batch(self, R20A=None, R20B=None, dw=None, pA=None, kex=None):
+        """Back-calculate the R2eff values of the Carver and Richards (1972) model for multiple parameter points.
+
+        @keyword R20A:  The R2 value for state A in the absence of exchange.  The dimensions are {Pi, Ei*Si*Mi}.
+        @type R20A:     numpy rank-2 float array
+        @keyword R20B:  The R2 value for state B in the absence of exchange.  The dimensions are {Pi, Ei*Si*Mi}.
+        @type R20B:     numpy rank-2 float array
+        @keyword dw:    The chemical shift differences in ppm for each spin.  The dimensions are {Pi, Si}.
+        @type dw:       numpy rank-2 float array
+        @keyword pA:    The population of state A.  The dimensions are {Pi}.
+        @type pA:       numpy rank-1 float array
+        @keyword kex:   The rate of exchange.  The dimensions are {Pi}.
+        @type kex:      numpy rank-1 float array
+        @return:        The back-calculated R2eff values.  The dimensions are {Pi, Ei, Si, Mi, Oi, Di}.
+        @rtype:         numpy rank-6 float array
+        """
+
+        # Back calculate the R2eff values.
+        back_calc = zeros([len(dw)] + self.numpy_array_shape, float64)
+        r2eff_CR72(r20a=self.batch_r2_struct(R20A), r20a_orig=R20A, r20b=self.batch_r2_struct(R20B), r20b_orig=R20B, pA=self.batch_global(pA), dw=self.batch_spin_struct(dw, self.frqs), dw_orig=dw, kex=self.batch_global(kex), cpmg_frqs=self.cpmg_frqs, back_calc=back_calc)
+        return back_calc
+
+
     def calc_DPL94(self, R1=None, r1rho_prime=None, phi_ex=None, kex=None):
         """Calculation function for the Davis, Perlman and London (1994) fast 2-site off-resonance exchange model for R1rho-type experiments.
 
@@ -1083,6 +1373,88 @@ class Dispersion:
         return chi2_rankN(self.values, self.back_calc, self.errors)
 
 
+    def d2func_analytic(self, params):
+        """The Hessian of the chi-squared value for the analytic models.
+
+        This is the Gauss-Newton form of the Hessian::
+
+                           _n_
+             d2chi^2       \    1      dR2eff_i   dR2eff_i
+            ---------  =  2 >  -------- . -------- . -------- ,
+            dthj.dthk      /__ sigma_i^2    dthj       dthk
+                           i=1
+
+        built from the analytic Jacobian of the back-calculated values.  The neglected second derivative terms of the R2eff values are weighted by the residuals, hence this Hessian is exact for the R20 parameters and is positive semi-definite.
+
+
+        @param params:  The vector of parameter values.
+        @type params:   numpy rank-1 float array
+        @return:        The chi-squared Hessian.
+        @rtype:         numpy rank-2 float array
+        """
+
+        # The back-calculated values.
+        self.func(params)
+
+        # Scaling.
+        if self.scaling_flag:
+            params = dot(params, self.scaling_matrix)
+
+        # The Jacobian of the back-calculated values, flattened.
+        jacobian = self.jacobian(params).reshape(len(params), -1)
+
+        # The Hessian.
+        hessian = 2.0 * dot(jacobian * self.weights.reshape(-1), transpose(jacobian))
+
+        # Scaling.
+        if self.scaling_flag:
+            hessian = dot(self.scaling_matrix, dot(hessian, self.scaling_matrix))
+
+        # Return the Hessian.
+        return hessian
+
+
+    def dfunc_analytic(self, params):
+        """The gradient of the chi-squared value for the analytic models.
+
+        The gradient is::
+
+                          _n_
+             dchi^2       \    (yi - yi(theta))   dR2eff_i
+            -------  =  -2 >   ---------------- . -------- ,
+             dthj         /__      sigma_i^2         dthj
+                          i=1
+
+        whereby the missing data points do not contribute.
+
+
+        @param params:  The vector of parameter values.
+        @type params:   numpy rank-1 float array
+        @return:        The chi-squared gradient.
+        @rtype:         numpy rank-1 float array
+        """
+
+        # The back-calculated values.
+        self.func(params)
+
+        # Scaling.
+        if self.scaling_flag:
+            params = dot(params, self.scaling_matrix)
+
+        # The Jacobian of the back-calculated values, flattened.
+        jacobian = self.jacobian(params).reshape(len(params), -1)
+
+        # The gradient.
+        gradient = -2.0 * dot(jacobian, (self.weights * (self.values - self.back_calc)).reshape(-1))
+
+        # Scaling.
+        if self.scaling_flag:
+            gradient = dot(gradient, self.scaling_matrix)
+
+        # Return the gradient.
+        return gradient
+
+
     def experiment_type_setup(self):
         """Check the experiment types and simplify data structures.
 
@@ -1121,6 +1493,55 @@ class Dispersion:
                 raise RelaxError("The '%s' CPMG model is not compatible with the '%s' experiment type." % (self.model, self.exp_types[0]))
 
 
+    def func_batch(self, points):
+        """Target function for the evaluation of multiple parameter vectors in a single call, as used in the grid search.
+
+        For the LM63, CR72, CR72 full, IT99, TSMFK01, B14 and B14 full models, all points are evaluated together via numpy broadcasting through the lib.dispersion functions, with an additional first dimension for the points.  The points are processed in blocks to limit memory usage.  For all other models, the standard target function is called for each point.
+
+
+        @param points:  The parameter vectors, one per row.  The dimensions are {Pi, Ni}.
+        @type points:   numpy rank-2 float array
+        @return:        The chi-squared value for each point.
+        @rtype:         numpy rank-1 float array
+        """
+
+        # Initialise.
+        num_points = len(points)
+        chi2 = zeros(num_points, float64)
+
+        # No vectorised back-calculation, so evaluate each point separately.
+        if self.back_calc_batch == None:
+            for i in range(num_points):
+                chi2[i] = self.func(points[i])
+            return chi2
+
+        # Scaling.
+        if self.scaling_flag:
+            points = dot(points, self.scaling_matrix)
+
+        # The number of points per block.
+        block = int(max([1, BATCH_ELEMENTS // self.values.size]))
+
+        # Loop over the blocks of points.
+        for i in range(0, num_points, block):
+            # Back calculate the R2eff values (the numpy warnings from exceptional points are suppressed, as these points are caught and replaced).
+            with errstate(all='ignore'):
+                back_calc = self.back_calc_batch(points[i:i+block])
+
+            # Clean the data for all values, which is left over at the end of arrays.
+            back_calc *= self.disp_struct
+
+            # For all missing data points, set the back-calculated value to the measured values so that it has no effect on the chi-squared value.
+            if self.has_missing:
+                back_calc[:, self.mask_replace_blank.mask] = self.values[self.mask_replace_blank.mask]
+
+            # Calculate the chi-squared statistics.
+            chi2[i:i+block] = chi2_rankN_points(self.values, back_calc, self.errors)
+
+        # Return the chi-squared values.
+        return chi2
+
+
     def func_B14(self, params):
         """Target function for the Baldwin (2014) 2-site exact solution model for all time scales, whereby the simplification R20A = R20B is assumed.
 
@@ -2192,3 +2613,373 @@ class Dispersion:
 
         return back_calc_return
 
+
+    def jacobian_B14(self, params):
+        """The Jacobian of the back-calculated R2eff values for the reduced Baldwin (2014) model.
+
+        The R2 and dw structures set up by the preceding target function call are used.
+
+
+        @param params:  The vector of parameter values, unscaled.
+        @type params:   numpy rank-1 float array
+        @return:        The partial derivatives of the back-calculated values.  The dimensions are {Ni, Ei, Si, Mi, Oi, Di}.
+        @rtype:         numpy rank-6 float array
+        """
+
+        # Unpack the parameter values.
+        pA = params[self.end_index[1]]
+        kex = params[self.end_index[1]+1]
+
+        # The partial derivatives of the R2eff values.
+        dback_calc = zeros([5] + self.numpy_array_shape, float64)
+        dr2eff_B14(r20a=self.r20a_struct, r20b=self.r20b_struct, pA=pA, dw=self.dw_struct, kex=kex, ncyc=self.power, inv_tcpmg=self.inv_relax_times, tcp=self.tau_cpmg, dback_calc=dback_calc)
+
+        # Assemble and return the Jacobian.
+        jacobian = zeros([len(params)] + self.numpy_array_shape, float64)
+        self.jacobian_r2(jacobian, dback_calc[0] + dback_calc[1], 0)
+        self.jacobian_spin(jacobian, dback_calc[2], self.end_index[0], self.frqs)
+        jacobian[self.end_index[1]] = dback_calc[3]
+        jacobian[self.end_index[1]+1] = dback_calc[4]
+        return jacobian
+
+
+    def jacobian_B14_full(self, params):
+        """The Jacobian of the back-calculated R2eff values for the full Baldwin (2014) model.
+
+        The R2 and dw structures set up by the preceding target function call are used.
+
+
+        @param params:  The vector of parameter values, unscaled.
+        @type params:   numpy rank-1 float array
+        @return:        The partial derivatives of the back-calculated values.  The dimensions are {Ni, Ei, Si, Mi, Oi, Di}.
+        @rtype:         numpy rank-6 float array
+        """
+
+        # Unpack the parameter values.
+        pA = params[self.end_index[2]]
+        kex = params[self.end_index[2]+1]
+
+        # The partial derivatives of the R2eff values.
+        dback_calc = zeros([5] + self.numpy_array_shape, float64)
+        dr2eff_B14(r20a=self.r20a_struct, r20b=self.r20b_struct, pA=pA, dw=self.dw_struct, kex=kex, ncyc=self.power, inv_tcpmg=self.inv_relax_times, tcp=self.tau_cpmg, dback_calc=dback_calc)
+
+        # Assemble and return the Jacobian.
+        jacobian = zeros([len(params)] + self.numpy_array_shape, float64)
+        self.jacobian_r2(jacobian, dback_calc[0], 0, stride=2)
+        self.jacobian_r2(jacobian, dback_calc[1], self.NM, stride=2)
+        self.jacobian_spin(jacobian, dback_calc[2], self.end_index[1], self.frqs)
+        jacobian[self.end_index[2]] = dback_calc[3]
+        jacobian[self.end_index[2]+1] = dback_calc[4]
+        return jacobian
+
+
+    def jacobian_CR72(self, params):
+        """The Jacobian of the back-calculated R2eff values for the reduced Carver and Richards (1972) model.
+
+        The R2 and dw structures set up by the preceding target function call are used.
+
+
+        @param params:  The vector of parameter values, unscaled.
+        @type params:   numpy rank-1 float array
+        @return:        The partial derivatives of the back-calculated values.  The dimensions are {Ni, Ei, Si, Mi, Oi, Di}.
+        @rtype:         numpy rank-6 float array
+        """
+
+        # Unpack the parameter values.
+        pA = params[self.end_index[1]]
+        kex = params[self.end_index[1]+1]
+
+        # The partial derivatives of the R2eff values.
+        dback_calc = zeros([5] + self.numpy_array_shape, float64)
+        dr2eff_CR72(r20a=self.r20a_struct, r20b=self.r20b_struct, pA=pA, dw=self.dw_struct, kex=kex, cpmg_frqs=self.cpmg_frqs, dback_calc=dback_calc)
+
+        # Assemble and return the Jacobian.
+        jacobian = zeros([len(params)] + self.numpy_array_shape, float64)
+        self.jacobian_r2(jacobian, dback_calc[0] + dback_calc[1], 0)
+        self.jacobian_spin(jacobian, dback_calc[2], self.end_index[0], self.frqs)
+        jacobian[self.end_index[1]] = dback_calc[3]
+        jacobian[self.end_index[1]+1] = dback_calc[4]
+        return jacobian
+
+
+    def jacobian_CR72_full(self, params):
+        """The Jacobian of the back-calculated R2eff values for the full Carver and Richards (1972) model.
+
+        The R2 and dw structures set up by the preceding target function call are used.
+
+
+        @param params:  The vector of parameter values, unscaled.
+        @type params:   numpy rank-1 float array
+        @return:        The partial derivatives of the back-calculated values.  The dimensions are {Ni, Ei, Si, Mi, Oi, Di}.
+        @rtype:         numpy rank-6 float array
+        """
+
+        # Unpack the parameter values.
+        pA = params[self.end_index[2]]
+        kex = params[self.end_index[2]+1]
+
+        # The partial derivatives of the R2eff values.
+        dback_calc = zeros([5] + self.numpy_array_shape, float64)
+        dr2eff_CR72(r20a=self.r20a_struct, r20b=self.r20b_struct, pA=pA, dw=self.dw_struct, kex=kex, cpmg_frqs=self.cpmg_frqs, dback_calc=dback_calc)
+
+        # Assemble and return the Jacobian.
+        jacobian = zeros([len(params)] + self.numpy_array_shape, float64)
+        self.jacobian_r2(jacobian, dback_calc[0], 0, stride=2)
+        self.jacobian_r2(jacobian, dback_calc[1], self.NM, stride=2)
+        self.jacobian_spin(jacobian, dback_calc[2], self.end_index[1], self.frqs)
+        jacobian[self.end_index[2]] = dback_calc[3]
+        jacobian[self.end_index[2]+1] = dback_calc[4]
+        return jacobian
+
+
+    def jacobian_DPL94(self, params):
+        """The Jacobian of the back-calculated R1rho values for the Davis, Perlman and London (1994) model, with or without the fitting of R1.
+
+        The R1, R1rho' and phi_ex structures set up by the preceding target function call are used.
+
+
+        @param params:  The vector of parameter values, unscaled.
+        @type params:   numpy rank-1 float array
+        @return:        The partial derivatives of the back-calculated values.  The dimensions are {Ni, Ei, Si, Mi, Oi, Di}.
+        @rtype:         numpy rank-6 float array
+        """
+
+        # The R1 values and the start of the R1rho' parameters.
+        R1 = self.r1
+        start = 0
+        if self.r1_fit:
+            R1 = self.r1_struct
+            start = self.end_index[0]
+
+        # The partial derivatives of the R1rho values.
+        dback_calc = zeros([4] + self.numpy_array_shape, float64)
+        dr1rho_DPL94(r1rho_prime=self.r1rho_prime_struct, phi_ex=self.phi_ex_struct, kex=params[-1], theta=self.tilt_angles, R1=R1, spin_lock_fields2=self.spin_lock_omega1_squared, dback_calc=dback_calc)
+
+        # Assemble and return the Jacobian.
+        jacobian = zeros([len(params)] + self.numpy_array_shape, float64)
+        if self.r1_fit:
+            self.jacobian_r2(jacobian, dback_calc[0], 0)
+        self.jacobian_r2(jacobian, dback_calc[1], start)
+        self.jacobian_spin(jacobian, dback_calc[2], start + self.NE*self.NS*self.NM, self.frqs_squared)
+        jacobian[-1] = dback_calc[3]
+        return jacobian
+
+
+    def jacobian_IT99(self, params):
+        """The Jacobian of the back-calculated R2eff values for the Ishima and Torchia (1999) model.
+
+        The R2 and dw structures set up by the preceding target function call are used.
+
+
+        @param params:  The vector of parameter values, unscaled.
+        @type params:   numpy rank-1 float array
+        @return:        The partial derivatives of the back-calculated values.  The dimensions are {Ni, Ei, Si, Mi, Oi, Di}.
+        @rtype:         numpy rank-6 float array
+        """
+
+        # Unpack the parameter values.
+        pA = params[self.end_index[1]]
+        tex = params[self.end_index[1]+1]
+
+        # The partial derivatives of the R2eff values.
+        dback_calc = zeros([4] + self.numpy_array_shape, float64)
+        dr2eff_IT99(r20=self.r20_struct, pA=pA, dw=self.dw_struct, tex=tex, cpmg_frqs=self.cpmg_frqs, dback_calc=dback_calc)
+
+        # Assemble and return the Jacobian.
+        jacobian = zeros([len(params)] + self.numpy_array_shape, float64)
+        self.jacobian_r2(jacobian, dback_calc[0], 0)
+        self.jacobian_spin(jacobian, dback_calc[1], self.end_index[0], self.frqs)
+        jacobian[self.end_index[1]] = dback_calc[2]
+        jacobian[self.end_index[1]+1] = dback_calc[3]
+        return jacobian
+
+
+    def jacobian_LM63(self, params):
+        """The Jacobian of the back-calculated R2eff values for the Luz and Meiboom (1963) 2-site model.
+
+        The R2 and phi_ex structures set up by the preceding target function call are used.
+
+
+        @param params:  The vector of parameter values, unscaled.
+        @type params:   numpy rank-1 float array
+        @return:        The partial derivatives of the back-calculated values.  The dimensions are {Ni, Ei, Si, Mi, Oi, Di}.
+        @rtype:         numpy rank-6 float array
+        """
+
+        # The partial derivatives of the R2eff values.
+        dback_calc = zeros([3] + self.numpy_array_shape, float64)
+        dr2eff_LM63(r20=self.r20_struct, phi_ex=self.phi_ex_struct, kex=params[self.end_index[1]], cpmg_frqs=self.cpmg_frqs, dback_calc=dback_calc)
+
+        # Assemble and return the Jacobian.
+        jacobian = zeros([len(params)] + self.numpy_array_shape, float64)
+        self.jacobian_r2(jacobian, dback_calc[0], 0)
+        self.jacobian_spin(jacobian, dback_calc[1], self.end_index[0], self.frqs_squared)
+        jacobian[self.end_index[1]] = dback_calc[2]
+        return jacobian
+
+
+    def jacobian_MP05(self, params):
+        """The Jacobian of the back-calculated R1rho values for the Miloushev and Palmer (2005) model, with or without the fitting of R1.
+
+        @param params:  The vector of parameter values, unscaled.
+        @type params:   numpy rank-1 float array
+        @return:        The partial derivatives of the back-calculated values.  The dimensions are {Ni, Ei, Si, Mi, Oi, Di}.
+        @rtype:         numpy rank-6 float array
+        """
+
+        return self.jacobian_r1rho(params, dr1rho_MP05)
+
+
+    def jacobian_r1rho(self, params, dr1rho):
+        """The Jacobian of the back-calculated R1rho values for the TP02, TAP03 and MP05 off-resonance models.
+
+        The R1, R1rho' and dw structures set up by the preceding target function call are used.
+
+
+        @param params:  The vector of parameter values, unscaled.
+        @type params:   numpy rank-1 float array
+        @param dr1rho:  The lib.dispersion function for the partial derivatives of the R1rho values with respect to R1, R1rho', dw, pA and kex.
+        @type dr1rho:   function
+        @return:        The partial derivatives of the back-calculated values.  The dimensions are {Ni, Ei, Si, Mi, Oi, Di}.
+        @rtype:         numpy rank-6 float array
+        """
+
+        # The R1 values and the start of the R1rho' parameters.
+        R1 = self.r1
+        start = 0
+        if self.r1_fit:
+            R1 = self.r1_struct
+            start = self.end_index[0]
+
+        # The partial derivatives of the R1rho values.
+        dback_calc = zeros([5] + self.numpy_array_shape, float64)
+        dr1rho(r1rho_prime=self.r1rho_prime_struct, omega=self.chemical_shifts, offset=self.offset, pA=params[-2], dw=self.dw_struct, kex=params[-1], R1=R1, spin_lock_fields=self.spin_lock_omega1, spin_lock_fields2=self.spin_lock_omega1_squared, dback_calc=dback_calc)
+
+        # Assemble and return the Jacobian.
+        jacobian = zeros([len(params)] + self.numpy_array_shape, float64)
+        if self.r1_fit:
+            self.jacobian_r2(jacobian, dback_calc[0], 0)
+        self.jacobian_r2(jacobian, dback_calc[1], start)
+        self.jacobian_spin(jacobian, dback_calc[2], start + self.NE*self.NS*self.NM, self.frqs)
+        jacobian[-2] = dback_calc[3]
+        jacobian[-1] = dback_calc[4]
+        return jacobian
+
+
+    def jacobian_r2(self, jacobian, dback_calc, start, stride=1):
+        """Add the partial derivatives for a block of experiment, spin and frequency dependent R2 (or R1) parameters to the Jacobian.
+
+        @param jacobian:    The Jacobian to fill.  The dimensions are {Ni, Ei, Si, Mi, Oi, Di}.
+        @type jacobian:     numpy rank-6 float array
+        @param dback_calc:  The partial derivatives of the back-calculated values with respect to the R2 parameter of each point.  The dimensions are {Ei, Si, Mi, Oi, Di}.
+        @type dback_calc:   numpy rank-5 float array
+        @param start:       The index of the first parameter of the block.
+        @type start:        int
+        @keyword stride:    The number of interleaved R2 blocks per spin, which is 2 for the R20A and R20B parameters of the full models.
+        @type stride:       int
+        """
+
+        # The indices.
+        ei, si, mi = self.r2_indices
+        param_index = start + (ei*self.NS + si) * stride * self.NM + mi
+
+        # Fill the Jacobian.
+        jacobian[param_index, ei, si, mi] = dback_calc[ei, si, mi]
+
+
+    def jacobian_spin(self, jacobian, dback_calc, start, frqs):
+        """Add the partial derivatives for a block of spin specific parameters (dw or phi_ex) to the Jacobian.
+
+        @param jacobian:    The Jacobian to fill.  The dimensions are {Ni, Ei, Si, Mi, Oi, Di}.
+        @type jacobian:     numpy rank-6 float array
+        @param dback_calc:  The partial derivatives of the back-calculated values with respect to the parameter in rad/s or (rad/s)^2.  The dimensions are {Ei, Si, Mi, Oi, Di}.
+        @type dback_calc:   numpy rank-5 float array
+        @param start:       The index of the first parameter of the block.
+        @type start:        int
+        @param frqs:        The frequency structure for the conversion from ppm, either self.frqs or self.frqs_squared.
+        @type frqs:         numpy rank-5 float array
+        """
+
+        # The spin indices.
+        si = arange(self.NS)
+
+        # Fill the Jacobian, converting from ppm.
+        jacobian[start + si, :, si] = (dback_calc * frqs).swapaxes(0, 1)
+
+
+    def jacobian_TAP03(self, params):
+        """The Jacobian of the back-calculated R1rho values for the Trott, Abergel and Palmer (2003) model, with or without the fitting of R1.
+
+        @param params:  The vector of parameter values, unscaled.
+        @type params:   numpy rank-1 float array
+        @return:        The partial derivatives of the back-calculated values.  The dimensions are {Ni, Ei, Si, Mi, Oi, Di}.
+        @rtype:         numpy rank-6 float array
+        """
+
+        return self.jacobian_r1rho(params, dr1rho_TAP03)
+
+
+    def jacobian_TP02(self, params):
+        """The Jacobian of the back-calculated R1rho values for the Trott and Palmer (2002) model, with or without the fitting of R1.
+
+        @param params:  The vector of parameter values, unscaled.
+        @type params:   numpy rank-1 float array
+        @return:        The partial derivatives of the back-calculated values.  The dimensions are {Ni, Ei, Si, Mi, Oi, Di}.
+        @rtype:         numpy rank-6 float array
+        """
+
+        return self.jacobian_r1rho(params, dr1rho_TP02)
+
+
+    def jacobian_TSMFK01(self, params):
+        """The Jacobian of the back-calculated R2eff values for the Tollinger et al. (2001) model.
+
+        The R2 and dw structures set up by the preceding target function call are used.
+
+
+        @param params:  The vector of parameter values, unscaled.
+        @type params:   numpy rank-1 float array
+        @return:        The partial derivatives of the back-calculated values.  The dimensions are {Ni, Ei, Si, Mi, Oi, Di}.
+        @rtype:         numpy rank-6 float array
+        """
+
+        # The partial derivatives of the R2eff values.
+        dback_calc = zeros([3] + self.numpy_array_shape, float64)
+        dr2eff_TSMFK01(r20a=self.r20a_struct, dw=self.dw_struct, k_AB=params[self.end_index[1]], tcp=self.tau_cpmg, dback_calc=dback_calc)
+
+        # Assemble and return the Jacobian.
+        jacobian = zeros([len(params)] + self.numpy_array_shape, float64)
+        self.jacobian_r2(jacobian, dback_calc[0], 0)
+        self.jacobian_spin(jacobian, dback_calc[1], self.end_index[0], self.frqs)
+        jacobian[self.end_index[1]] = dback_calc[2]
+        return jacobian
+
+
+    def lm_dri(self, params):
+        """The Jacobian of the back-calculated values for the Levenberg-Marquardt algorithm of the analytic models.
+
+        The data points are flattened, excluding the missing and padding points, in the same order as self.lm_errors.
+
+
+        @param params:  The vector of parameter values.
+        @type params:   numpy rank-1 float array
+        @return:        The partial derivatives of the back-calculated values.  The dimensions are {Ni, Pi}, where Pi is the number of data points.
+        @rtype:         numpy rank-2 float array
+        """
+
+        # The back-calculated values.
+        self.func(params)
+
+        # Scaling.
+        if self.scaling_flag:
+            params = dot(params, self.scaling_matrix)
+
+        # The Jacobian of the data points.
+        jacobian = self.jacobian(params)[:, self.valid]
+
+        # Scaling.
+        if self.scaling_flag:
+            jacobian = dot(self.scaling_matrix, jacobian)
+
+        # Return the Jacobian.
+        return jacobian
@@ -21,7 +21,9 @@
 
 /* This include must come first. */
 #include <Python.h>
+#include <math.h>
 #include <stdio.h>
+#include <string.h>
 
 /* Include all of the variable definitions. */
 #include "relax_fit.h"
@@ -787,6 +789,374 @@ jacobian_chi2_sat(PyObject *self, PyObject *args) {
 }
 
 
+static void batch_back_calc(int model, double *curve_params, double *curve_times, double *curve_back_calc, int curve_num_times) {
+    /* Back calculate the peak intensities of a single curve of the batch, without touching the global state. */
+
+    /* The two parameter exponential. */
+    if (model == 0)
+        exponential(curve_params[index_I0], curve_params[index_R], curve_times, curve_back_calc, curve_num_times);
+
+    /* The inversion recovery experiment. */
+    else if (model == 1)
+        exponential_inv(curve_params[index_I0], curve_params[index_inv_Iinf], curve_params[index_R], curve_times, curve_back_calc, curve_num_times);
+
+    /* The saturation recovery experiment. */
+    else
+        exponential_sat(curve_params[index_Iinf], curve_params[index_R], curve_times, curve_back_calc, curve_num_times);
+}
+
+
+static void batch_back_calc_grad(int model, double *curve_params, double *curve_times, double curve_grad[MAX_PARAMS][MAX_DATA], int curve_num_times) {
+    /* Calculate the partial derivatives of the back calculated peak intensities of a single curve of the batch, without touching the global state. */
+
+    /* The two parameter exponential. */
+    if (model == 0) {
+        exponential_dR(curve_params[index_I0], curve_params[index_R], index_R, curve_times, curve_grad, curve_num_times);
+        exponential_dI0(curve_params[index_I0], curve_params[index_R], index_I0, curve_times, curve_grad, curve_num_times);
+    }
+
+    /* The inversion recovery experiment. */
+    else if (model == 1) {
+        exponential_inv_dR(curve_params[index_I0], curve_params[index_inv_Iinf], curve_params[index_R], index_R, curve_times, curve_grad, curve_num_times);
+        exponential_inv_dI0(curve_params[index_I0], curve_params[index_inv_Iinf], curve_params[index_R], index_I0, curve_times, curve_grad, curve_num_times);
+        exponential_inv_dIinf(curve_params[index_I0], curve_params[index_inv_Iinf], curve_params[index_R], index_inv_Iinf, curve_times, curve_grad, curve_num_times);
+    }
+
+    /* The saturation recovery experiment. */
+    else {
+        exponential_sat_dR(curve_params[index_Iinf], curve_params[index_R], index_R, curve_times, curve_grad, curve_num_times);
+        exponential_sat_dIinf(curve_params[index_Iinf], curve_params[index_R], index_Iinf, curve_times, curve_grad, curve_num_times);
+    }
+}
+
+
+static int batch_solve(int n, double a[MAX_PARAMS][MAX_PARAMS], double b[MAX_PARAMS], double x[MAX_PARAMS]) {
+    /* Solve the small linear system a.x = b by Gaussian elimination with partial pivoting.  The a and b arrays are overwritten, and zero is returned for singular matrices. */
+
+    /* Declarations. */
+    int i, j, k, pivot;
+    double fact, temp;
+
+    /* The forward elimination. */
+    for (k = 0; k < n; k++) {
+        /* Find the pivot. */
+        pivot = k;
+        for (i = k+1; i < n; i++) {
+            if (fabs(a[i][k]) > fabs(a[pivot][k]))
+                pivot = i;
+        }
+
+        /* Singular matrix. */
+        if (a[pivot][k] == 0.0 || a[pivot][k] != a[pivot][k])
+            return 0;
+
+        /* Swap the rows. */
+        if (pivot != k) {
+            for (j = 0; j < n; j++) {
+                temp = a[k][j];
+                a[k][j] = a[pivot][j];
+                a[pivot][j] = temp;
+            }
+            temp = b[k];
+            b[k] = b[pivot];
+            b[pivot] = temp;
+        }
+
+        /* Eliminate. */
+        for (i = k+1; i < n; i++) {
+            fact = a[i][k] / a[k][k];
+            for (j = k; j < n; j++)
+                a[i][j] = a[i][j] - fact * a[k][j];
+            b[i] = b[i] - fact * b[k];
+        }
+    }
+
+    /* The back substitution. */
+    for (i = n-1; i >= 0; i--) {
+        x[i] = b[i];
+        for (j = i+1; j < n; j++)
+            x[i] = x[i] - a[i][j] * x[j];
+        x[i] = x[i] / a[i][i];
+    }
+
+    /* Success. */
+    return 1;
+}
+
+
+static int batch_fit_curve(int model, int curve_num_params, int curve_num_times, double *curve_values, double *curve_variance, double *curve_times, double *curve_params, double func_tol, int max_iterations, double *curve_chi2, double *curve_back_calc, double *trial_back_calc, double curve_grad[MAX_PARAMS][MAX_DATA]) {
+    /* Fit a single exponential curve of the batch using the Levenberg-Marquardt algorithm.
+     *
+     * All storage is supplied by the caller so that no global state is touched, allowing the batch to be fitted with the GIL released.  The optimised parameters are stored in curve_params and the chi-squared value in curve_chi2, and the number of iterations is returned.
+     */
+
+    /* Declarations. */
+    int i, j, k, iter, accepted;
+    double alpha[MAX_PARAMS][MAX_PARAMS], a[MAX_PARAMS][MAX_PARAMS];
+    double beta[MAX_PARAMS], b[MAX_PARAMS], delta[MAX_PARAMS], trial[MAX_PARAMS];
+    double lambda = 0.001;
+    double trial_chi2, resid;
+
+    /* The initial chi-squared value. */
+    batch_back_calc(model, curve_params, curve_times, curve_back_calc, curve_num_times);
+    *curve_chi2 = chi2(curve_values, curve_variance, curve_back_calc, curve_num_times);
+
+    /* The iterations. */
+    for (iter = 0; iter < max_iterations; iter++) {
+        /* The partial derivatives at the current position. */
+        batch_back_calc_grad(model, curve_params, curve_times, curve_grad, curve_num_times);
+
+        /* The curvature matrix and the chi-squared gradient (without the factor of -2). */
+        for (j = 0; j < curve_num_params; j++) {
+            beta[j] = 0.0;
+            for (k = 0; k < curve_num_params; k++)
+                alpha[j][k] = 0.0;
+        }
+        for (i = 0; i < curve_num_times; i++) {
+            resid = (curve_values[i] - curve_back_calc[i]) / curve_variance[i];
+            for (j = 0; j < curve_num_params; j++) {
+                beta[j] = beta[j] + resid * curve_grad[j][i];
+                for (k = 0; k <= j; k++)
+                    alpha[j][k] = alpha[j][k] + curve_grad[j][i] * curve_grad[k][i] / curve_variance[i];
+            }
+        }
+        for (j = 0; j < curve_num_params; j++) {
+            for (k = j+1; k < curve_num_params; k++)
+                alpha[j][k] = alpha[k][j];
+        }
+
+        /* Increase the Marquardt parameter until a step decreasing the chi-squared value is found. */
+        accepted = 0;
+        trial_chi2 = *curve_chi2;
+        while (lambda < 1e16) {
+            /* The augmented curvature matrix. */
+            for (j = 0; j < curve_num_params; j++) {
+                for (k = 0; k < curve_num_params; k++)
+                    a[j][k] = alpha[j][k];
+                if (alpha[j][j] > 0.0)
+                    a[j][j] = alpha[j][j] * (1.0 + lambda);
+                else
+                    a[j][j] = lambda;
+                b[j] = beta[j];
+            }
+
+            /* The parameter step. */
+            if (!batch_solve(curve_num_params, a, b, delta)) {
+                lambda = lambda * 10.0;
+                continue;
+            }
+
+            /* The trial position and chi-squared value. */
+            for (j = 0; j < curve_num_params; j++)
+                trial[j] = curve_params[j] + delta[j];
+            batch_back_calc(model, trial, curve_times, trial_back_calc, curve_num_times);
+            trial_chi2 = chi2(curve_values, curve_variance, trial_back_calc, curve_num_times);
+
+            /* Accept the step. */
+            if (trial_chi2 <= *curve_chi2) {
+                accepted = 1;
+                lambda = lambda / 10.0;
+                break;
+            }
+
+            /* Reject the step. */
+            lambda = lambda * 10.0;
+        }
+
+        /* No downhill step could be found, so the minimum has been reached. */
+        if (!accepted)
+            break;
+
+        /* Update the position. */
+        for (j = 0; j < curve_num_params; j++)
+            curve_params[j] = trial[j];
+        for (i = 0; i < curve_num_times; i++)
+            curve_back_calc[i] = trial_back_calc[i];
+
+        /* The function tolerance. */
+        if (*curve_chi2 - trial_chi2 <= func_tol) {
+            *curve_chi2 = trial_chi2;
+            iter++;
+            break;
+        }
+        *curve_chi2 = trial_chi2;
+    }
+
+    /* Return the number of iterations. */
+    return iter;
+}
+
+
+static PyObject *
+fit_batch(PyObject *self, PyObject *args, PyObject *keywords) {
+    /* Fit a batch of exponential curves in one call, using the Levenberg-Marquardt algorithm.
+     *
+     * The curves are supplied as flat sequences of the concatenated values, errors and relaxation times of all curves, together with the number of time points of each curve and the flat sequence of the initial parameters.  The data is copied into C arrays and the curves are fitted with the GIL released, with all storage local to the call, so the function is thread-safe and does not disturb the curve set up by setup().
+     *
+     * A tuple of the flat list of optimised parameters, the list of chi-squared values and the list of iteration counts is returned.
+     */
+
+    /* Python object declarations. */
+    PyObject *num_times_arg, *values_arg, *sd_arg, *relax_times_arg, *params_arg;
+    PyObject *num_times_seq = NULL, *values_seq = NULL, *sd_seq = NULL, *relax_times_seq = NULL, *params_seq = NULL;
+    PyObject *params_list, *chi2_list, *iter_list;
+
+    /* Normal declarations. */
+    char *model_name;
+    int model, batch_num_params, num_curves, total_times, max_times, max_iterations = 10000000;
+    int i, c, offset;
+    double func_tol = 1e-25;
+    int *curve_num_times = NULL, *curve_iter = NULL;
+    double *batch_values = NULL, *batch_variance = NULL, *batch_times = NULL, *batch_params = NULL, *batch_chi2 = NULL;
+    double *curve_back_calc = NULL, *trial_back_calc = NULL;
+    double (*curve_grad)[MAX_DATA] = NULL;
+
+    /* The keyword list. */
+    static char *keyword_list[] = {"model", "num_params", "num_times", "values", "sd", "relax_times", "params", "func_tol", "max_iterations", NULL};
+
+    /* Parse the function arguments. */
+    if (!PyArg_ParseTupleAndKeywords(args, keywords, "siOOOOO|di", keyword_list, &model_name, &batch_num_params, &num_times_arg, &values_arg, &sd_arg, &relax_times_arg, &params_arg, &func_tol, &max_iterations))
+        return NULL;
+
+    /* The model. */
+    if (strcmp(model_name, "exp") == 0 && batch_num_params == 2)
+        model = 0;
+    else if (strcmp(model_name, "inv") == 0 && batch_num_params == 3)
+        model = 1;
+    else if (strcmp(model_name, "sat") == 0 && batch_num_params == 2)
+        model = 2;
+    else {
+        PyErr_SetString(PyExc_ValueError, "The model must be 'exp' or 'sat' with 2 parameters, or 'inv' with 3 parameters.");
+        return NULL;
+    }
+
+    /* Fast sequence access to the arguments. */
+    num_times_seq = PySequence_Fast(num_times_arg, "The num_times argument must be a sequence.");
+    values_seq = PySequence_Fast(values_arg, "The values argument must be a sequence.");
+    sd_seq = PySequence_Fast(sd_arg, "The sd argument must be a sequence.");
+    relax_times_seq = PySequence_Fast(relax_times_arg, "The relax_times argument must be a sequence.");
+    params_seq = PySequence_Fast(params_arg, "The params argument must be a sequence.");
+    if (!num_times_seq || !values_seq || !sd_seq || !relax_times_seq || !params_seq)
+        goto error;
+
+    /* The number of time points of each curve. */
+    num_curves = (int) PySequence_Fast_GET_SIZE(num_times_seq);
+    curve_num_times = (int *) PyMem_Malloc((num_curves+1) * sizeof(int));
+    if (!curve_num_times) {
+        PyErr_NoMemory();
+        goto error;
+    }
+    total_times = 0;
+    max_times = 1;
+    for (c = 0; c < num_curves; c++) {
+        curve_num_times[c] = (int) PyLong_AsLong(PySequence_Fast_GET_ITEM(num_times_seq, c));
+        if (curve_num_times[c] < 0 || curve_num_times[c] > MAX_DATA) {
+            if (!PyErr_Occurred())
+                PyErr_SetString(PyExc_ValueError, "The number of time points of each curve must be between 0 and MAX_DATA.");
+            goto error;
+        }
+        total_times = total_times + curve_num_times[c];
+        if (curve_num_times[c] > max_times)
+            max_times = curve_num_times[c];
+    }
+
+    /* Check the data sizes. */
+    if (PySequence_Fast_GET_SIZE(values_seq) != total_times || PySequence_Fast_GET_SIZE(sd_seq) != total_times || PySequence_Fast_GET_SIZE(relax_times_seq) != total_times) {
+        PyErr_SetString(PyExc_ValueError, "The values, sd and relax_times sequences must have the total number of time points of all curves.");
+        goto error;
+    }
+    if (PySequence_Fast_GET_SIZE(params_seq) != num_curves * batch_num_params) {
+        PyErr_SetString(PyExc_ValueError, "The params sequence must have the number of parameters for each curve.");
+        goto error;
+    }
+
+    /* Allocate the C arrays. */
+    batch_values = (double *) PyMem_Malloc((total_times+1) * sizeof(double));
+    batch_variance = (double *) PyMem_Malloc((total_times+1) * sizeof(double));
+    batch_times = (double *) PyMem_Malloc((total_times+1) * sizeof(double));
+    batch_params = (double *) PyMem_Malloc((num_curves * batch_num_params + 1) * sizeof(double));
+    batch_chi2 = (double *) PyMem_Malloc((num_curves+1) * sizeof(double));
+    curve_iter = (int *) PyMem_Malloc((num_curves+1) * sizeof(int));
+    curve_back_calc = (double *) PyMem_Malloc(max_times * sizeof(double));
+    trial_back_calc = (double *) PyMem_Malloc(max_times * sizeof(double));
+    curve_grad = (double (*)[MAX_DATA]) PyMem_Malloc(MAX_PARAMS * sizeof(*curve_grad));
+    if (!batch_values || !batch_variance || !batch_times || !batch_params || !batch_chi2 || !curve_iter || !curve_back_calc || !trial_back_calc || !curve_grad) {
+        PyErr_NoMemory();
+        goto error;
+    }
+
+    /* Copy the data into the C arrays, converting the errors to variances. */
+    for (i = 0; i < total_times; i++) {
+        batch_values[i] = PyFloat_AsDouble(PySequence_Fast_GET_ITEM(values_seq, i));
+        batch_variance[i] = square(PyFloat_AsDouble(PySequence_Fast_GET_ITEM(sd_seq, i)));
+        batch_times[i] = PyFloat_AsDouble(PySequence_Fast_GET_ITEM(relax_times_seq, i));
+    }
+    for (i = 0; i < num_curves * batch_num_params; i++)
+        batch_params[i] = PyFloat_AsDouble(PySequence_Fast_GET_ITEM(params_seq, i));
+    if (PyErr_Occurred())
+        goto error;
+
+    /* Fit all curves, releasing the GIL. */
+    Py_BEGIN_ALLOW_THREADS
+    offset = 0;
+    for (c = 0; c < num_curves; c++) {
+        curve_iter[c] = batch_fit_curve(model, batch_num_params, curve_num_times[c], batch_values+offset, batch_variance+offset, batch_times+offset, batch_params + c*batch_num_params, func_tol, max_iterations, batch_chi2+c, curve_back_calc, trial_back_calc, curve_grad);
+        offset = offset + curve_num_times[c];
+    }
+    Py_END_ALLOW_THREADS
+
+    /* Convert the results to Python lists. */
+    params_list = PyList_New(num_curves * batch_num_params);
+    chi2_list = PyList_New(num_curves);
+    iter_list = PyList_New(num_curves);
+    for (i = 0; i < num_curves * batch_num_params; i++)
+        PyList_SET_ITEM(params_list, i, PyFloat_FromDouble(batch_params[i]));
+    for (c = 0; c < num_curves; c++) {
+        PyList_SET_ITEM(chi2_list, c, PyFloat_FromDouble(batch_chi2[c]));
+        PyList_SET_ITEM(iter_list, c, PyLong_FromLong(curve_iter[c]));
+    }
+
+    /* Free the memory. */
+    Py_DECREF(num_times_seq);
+    Py_DECREF(values_seq);
+    Py_DECREF(sd_seq);
+    Py_DECREF(relax_times_seq);
+    Py_DECREF(params_seq);
+    PyMem_Free(curve_num_times);
+    PyMem_Free(curve_iter);
+    PyMem_Free(batch_values);
+    PyMem_Free(batch_variance);
+    PyMem_Free(batch_times);
+    PyMem_Free(batch_params);
+    PyMem_Free(batch_chi2);
+    PyMem_Free(curve_back_calc);
+    PyMem_Free(trial_back_calc);
+    PyMem_Free(curve_grad);
+
+    /* Return the results. */
+    return Py_BuildValue("(NNN)", params_list, chi2_list, iter_list);
+
+error:
+    /* Free the memory and return the error. */
+    Py_XDECREF(num_times_seq);
+    Py_XDECREF(values_seq);
+    Py_XDECREF(sd_seq);
+    Py_XDECREF(relax_times_seq);
+    Py_XDECREF(params_seq);
+    PyMem_Free(curve_num_times);
+    PyMem_Free(curve_iter);
+    PyMem_Free(batch_values);
+    PyMem_Free(batch_variance);
+    PyMem_Free(batch_times);
+    PyMem_Free(batch_params);
+    PyMem_Free(batch_chi2);
+    PyMem_Free(curve_back_calc);
+    PyMem_Free(trial_back_calc);
+    PyMem_Free(curve_grad);
+    return NULL;
+}
+
+
 /* The method table for the functions called by Python. */
 static PyMethodDef relax_fit_methods[] = {
     {
@@ -874,6 +1244,11 @@ static PyMethodDef relax_fit_methods[] = {
         jacobian_chi2_sat,
         METH_VARARGS,
         "Return the Jacobian matrix of the chi-squared function for the saturation recovery experiment as a Python list."
+    }, {
+        "fit_batch",
+        (PyCFunction)fit_batch,
+        METH_VARARGS | METH_KEYWORDS,
+        "Fit a batch of exponential curves in one call using the Levenberg-Marquardt algorithm, returning the optimised parameters, chi-squared values and iteration counts."
     },
         {NULL, NULL, 0, NULL}        /* Sentinel. */
 };
@@ -26,14 +26,14 @@
 """The R1 and R2 exponential relaxation curve fitting optimisation functions."""
 
 # Python module imports.
-from numpy import array, float64, ndarray, nan_to_num
+from numpy import array, float64, int32, ndarray, nan_to_num
 
 # relax module imports.
 from dep_check import C_module_exp_fn
 
 # C modules.
 if C_module_exp_fn:
-    from target_functions.relax_fit import back_calc_I, d2func_exp, d2func_inv, d2func_sat, dfunc_exp, dfunc_inv, dfunc_sat, func_exp, func_inv, func_sat, jacobian_chi2_exp, jacobian_chi2_inv, jacobian_chi2_sat, jacobian_exp, jacobian_inv, jacobian_sat, setup 
+    from target_functions.relax_fit import back_calc_I, d2func_exp, d2func_inv, d2func_sat, dfunc_exp, dfunc_inv, dfunc_sat, fit_batch, func_exp, func_inv, func_sat, jacobian_chi2_exp, jacobian_chi2_inv, jacobian_chi2_sat, jacobian_exp, jacobian_inv, jacobian_sat, setup 
 
 
 class Relax_fit_opt:
@@ -277,3 +277,53 @@ class Relax_fit_opt:
 
         # Return the chi2 Hessian as a numpy array.
         return array(d2chi2, float64)
+
+
+
+def fit_curves(model=None, values=None, errors=None, relax_times=None, params=None, func_tol=1e-25, max_iterations=10000000):
+    """Fit a batch of exponential curves in a single call to the C module.
+
+    The curves are optimised using the Levenberg-Marquardt algorithm of the C module.  This uses no global state, and the Python global interpreter lock is released while fitting, so the function can be called from multiple threads and does not disturb the curve set up by the Relax_fit_opt class.
+
+
+    @keyword model:             The exponential curve type.  This can be 'exp' for the standard two parameter exponential curve, 'inv' for the inversion recovery experiment, and 'sat' for the saturation recovery experiment.
+    @type model:                str
+    @keyword values:            The peak intensities of each curve.
+    @type values:               list of list of float
+    @keyword errors:            The peak intensity errors of each curve.
+    @type errors:               list of list of float
+    @keyword relax_times:       The relaxation times of each curve.
+    @type relax_times:          list of list of float
+    @keyword params:            The initial parameter vector of each curve.
+    @type params:               list of list of float
+    @keyword func_tol:          The function tolerance which, when reached, terminates the optimisation of a curve.
+    @type func_tol:             float
+    @keyword max_iterations:    The maximum number of iterations per curve.
+    @type max_iterations:       int
+    @return:                    The optimised parameters, with one row per curve, the chi-squared values and the iteration counts.
+    @rtype:                     numpy rank-2 float64 array, numpy rank-1 float64 array, numpy rank-1 int32 array
+    """
+
+    # The number of parameters.
+    num_params = 2
+    if model == 'inv':
+        num_params = 3
+
+    # Flatten the curves.
+    num_times = []
+    flat_values = []
+    flat_errors = []
+    flat_times = []
+    flat_params = []
+    for i in range(len(values)):
+        num_times.append(len(values[i]))
+        flat_values += [float(x) for x in values[i]]
+        flat_errors += [float(x) for x in errors[i]]
+        flat_times += [float(x) for x in relax_times[i]]
+        flat_params += [float(x) for x in params[i]]
+
+    # Call the C code.
+    params_fit, chi2, iter_count = fit_batch(model=model, num_params=num_params, num_times=num_times, values=flat_values, sd=flat_errors, relax_times=flat_times, params=flat_params, func_tol=func_tol, max_iterations=max_iterations)
+
+    # Return the results as numpy arrays.
+    return array(params_fit, float64).reshape((len(values), num_params)), array(chi2, float64), array(iter_count, int32)
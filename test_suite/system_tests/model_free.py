@@ -34,10 +34,11 @@ from data_store import Relax_data_store; ds = Relax_data_store()
 import dep_check
 from pipe_control import pipes
 from pipe_control.interatomic import interatomic_loop
-from pipe_control.mol_res_spin import spin_loop
+from pipe_control.mol_res_spin import return_spin, spin_loop
 from lib.errors import RelaxError, RelaxMultiSpinIDError
 from lib.physical_constants import N15_CSA
 from lib.io import DummyFileObject, open_read_file
+from specific_analyses.api import return_api
 from status import Status; status = Status()
 from test_suite.system_tests.base_classes import SystemTestCase
 
@@ -799,6 +800,61 @@ class Mf(SystemTestCase):
                 self.assert_(path.isfile(file_path))
 
 
+    def test_dauvergne_protocol_concurrent(self):
+        """Compare the concurrent and sequential model-free model optimisation of the auto_analyses.dauvergne_protocol."""
+
+        # The data directory.
+        dir = status.install_path + sep+'test_suite'+sep+'shared_data'+sep+'model_free'+sep+'sphere'
+
+        # Create a temporary directory for dumping files.
+        ds.tmpdir = mkdtemp()
+
+        # Loop over the sequential and concurrent optimisations.
+        for concurrent in [False, True]:
+            # Set up a data pipe and bundle.
+            bundle = 'concurrent %s' % concurrent
+            self.interpreter.pipe.create(bundle, 'mf', bundle=bundle)
+
+            # Load the spins and relaxation data.
+            self.interpreter.structure.read_pdb(file='sphere.pdb', dir=dir)
+            self.interpreter.structure.load_spins(spin_id='@N', ave_pos=True)
+            self.interpreter.structure.load_spins(spin_id='@H', ave_pos=True)
+            for frq in ['500', '900']:
+                self.interpreter.relax_data.read(ri_id='R1_%s'%frq, ri_type='R1', frq=float(frq)*1e6, file='r1.%s.out'%frq, dir=dir, mol_name_col=1, res_num_col=2, res_name_col=3, spin_num_col=4, spin_name_col=5, data_col=6, error_col=7)
+                self.interpreter.relax_data.read(ri_id='R2_%s'%frq, ri_type='R2', frq=float(frq)*1e6, file='r2.%s.out'%frq, dir=dir, mol_name_col=1, res_num_col=2, res_name_col=3, spin_num_col=4, spin_name_col=5, data_col=6, error_col=7)
+                self.interpreter.relax_data.read(ri_id='NOE_%s'%frq, ri_type='NOE', frq=float(frq)*1e6, file='noe.%s.out'%frq, dir=dir, mol_name_col=1, res_num_col=2, res_name_col=3, spin_num_col=4, spin_name_col=5, data_col=6, error_col=7)
+
+            # Set up the interactions.
+            self.interpreter.spin.isotope(isotope='15N', spin_id='@N')
+            self.interpreter.spin.isotope(isotope='1H', spin_id='@H')
+            self.interpreter.interatom.define(spin_id1='@N', spin_id2='@H', direct_bond=True)
+            self.interpreter.interatom.set_dist(spin_id1='@N', spin_id2='@H', ave_dist=1.02e-10)
+            self.interpreter.interatom.unit_vectors()
+            self.interpreter.value.set(val=-172e-6, param='csa', spin_id='@N')
+
+            # The local tm model-free optimisation.
+            dAuvergne_protocol(pipe_name=bundle, pipe_bundle=bundle, results_dir=ds.tmpdir+sep+bundle.replace(' ', '_'), diff_model='local_tm', mf_models=['m1', 'm2'], local_tm_models=['tm0', 'tm1'], grid_inc=3, min_algor='newton', mc_sim_num=2, max_iter=1, conv_loop=True, concurrent=concurrent)
+
+        # Compare the results of all model and model selection data pipes.
+        for pipe_prefix in ['tm0', 'tm1', 'aic']:
+            # The spin containers of the two optimisations.
+            spins_seq = list(spin_loop(pipe='%s - concurrent False' % pipe_prefix))
+            spins_con = list(spin_loop(pipe='%s - concurrent True' % pipe_prefix))
+            self.assertEqual(len(spins_seq), len(spins_con))
+
+            # Check the spin data.
+            for i in range(len(spins_seq)):
+                self.assertEqual(spins_con[i].select, spins_seq[i].select)
+                if not spins_seq[i].select:
+                    continue
+                self.assertEqual(spins_con[i].model, spins_seq[i].model)
+                for param in ['local_tm', 's2', 'te', 'chi2']:
+                    if getattr(spins_seq[i], param) == None:
+                        self.assertEqual(getattr(spins_con[i], param), None)
+                    else:
+                        self.assertAlmostEqual(getattr(spins_con[i], param) / getattr(spins_seq[i], param), 1.0)
+
+
     def test_dauvergne_protocol_sphere(self):
         """Catch a failure when loading relaxation data."""
 
@@ -1248,6 +1304,61 @@ class Mf(SystemTestCase):
         self.interpreter.dx.map(params=['local_tm', 's2', 'te'], spin_id=':2@N', inc=2, lower=[5e-9, 0.0, 0.0], file_prefix='devnull')
 
 
+    def test_opendx_tm_s2_te_map_func(self):
+        """Check the vectorised model-free mapping function used by the OpenDX user function dx.map()."""
+
+        # Path of the files.
+        path = status.install_path + sep+'test_suite'+sep+'shared_data'+sep+'model_free'+sep+'S2_0.970_te_2048_Rex_0.149'
+
+        # Read the sequence and relaxation data.
+        self.interpreter.sequence.read(file='noe.500.out', dir=path, res_num_col=1, res_name_col=2)
+        self.interpreter.relax_data.read('R1_600',  'R1',  600.0*1e6, 'r1.600.out', dir=path, res_num_col=1, res_name_col=2, data_col=3, error_col=4)
+        self.interpreter.relax_data.read('R2_600',  'R2',  600.0*1e6, 'r2.600.out', dir=path, res_num_col=1, res_name_col=2, data_col=3, error_col=4)
+        self.interpreter.relax_data.read('NOE_600', 'NOE', 600.0*1e6, 'noe.600.out', dir=path, res_num_col=1, res_name_col=2, data_col=3, error_col=4)
+        self.interpreter.relax_data.read('R1_500',  'R1',  500.0*1e6, 'r1.500.out', dir=path, res_num_col=1, res_name_col=2, data_col=3, error_col=4)
+        self.interpreter.relax_data.read('R2_500',  'R2',  500.0*1e6, 'r2.500.out', dir=path, res_num_col=1, res_name_col=2, data_col=3, error_col=4)
+        self.interpreter.relax_data.read('NOE_500', 'NOE', 500.0*1e6, 'noe.500.out', dir=path, res_num_col=1, res_name_col=2, data_col=3, error_col=4)
+
+        # Set up the spins and the dipole-dipole relaxation interaction.
+        self.interpreter.spin.name('N')
+        self.interpreter.spin.element('N')
+        self.interpreter.sequence.attach_protons()
+        self.interpreter.interatom.define(spin_id1='@N', spin_id2='@H', direct_bond=True)
+        self.interpreter.interatom.set_dist(spin_id1='@N', spin_id2='@H', ave_dist=1.02 * 1e-10)
+        self.interpreter.value.set(N15_CSA, 'csa')
+        self.interpreter.spin.isotope('15N', spin_id='@N')
+        self.interpreter.spin.isotope('1H', spin_id='@H')
+
+        # Select the model and set the starting values.
+        self.interpreter.model_free.select_model(model='tm2')
+        self.interpreter.value.set([1e-8, 0.97, 2048e-12], ['local_tm', 's2', 'te'], spin_id=':2@N')
+
+        # The mapping function.
+        func = return_api().map_func(params=['local_tm', 's2', 'te'], spin_id=':2@N')
+        self.assertNotEqual(func, None)
+
+        # A few points of the space.
+        points = numpy.array([[5e-9, 0.5, 1e-9], [1e-8, 0.97, 2048e-12], [7.5e-9, 1.0, 0.0]], numpy.float64)
+        chi2 = func(points)
+
+        # Compare to the point by point calculation.
+        spin = return_spin(spin_id=':2@N')
+        for i in range(len(points)):
+            self.interpreter.value.set(list(points[i]), ['local_tm', 's2', 'te'], spin_id=':2@N')
+            self.interpreter.minimise.calculate()
+
+            self.assertAlmostEqual(chi2[i] / spin.chi2, 1.0, 10)
+
+        # The mapping function does not modify the spin.
+        self.assertAlmostEqual(spin.s2, 1.0)
+
+        # Unknown parameters.
+        self.assertRaises(RelaxError, return_api().map_func, params=['s2', 'rex'], spin_id=':2@N')
+
+        # Map the space through the mapping function.
+        self.interpreter.dx.map(params=['local_tm', 's2', 'te'], spin_id=':2@N', inc=2, lower=[5e-9, 0.0, 0.0], file_prefix='devnull')
+
+
     def test_opt_constr_bfgs_back_S2_0_970_te_2048_Rex_0_149(self):
         """Constrained BFGS opt, backtracking line search {S2=0.970, te=2048, Rex=0.149}
 
@@ -608,6 +608,37 @@ class N_state_model(SystemTestCase):
         self.script_exec(status.install_path + sep+'test_suite'+sep+'system_tests'+sep+'scripts'+sep+'n_state_model'+sep+'lactose_n_state.py')
 
 
+    def test_mc_sim_create_data_multi_align(self):
+        """Test the creation of the Monte Carlo simulation data for multiple alignments."""
+
+        # Reset and load the state.
+        path = status.install_path + sep+'test_suite'+sep+'shared_data'+sep+'saved_states'+sep+'n_state_model_mc_fail.bz2'
+        self.interpreter.reset()
+        self.interpreter.state.load(path)
+
+        # Create the Monte Carlo data without noise, so that the simulated data is the real data.
+        self.interpreter.monte_carlo.setup(number=3)
+        self.interpreter.monte_carlo.create_data(method='direct', distribution='fixed', fixed_error=0.0)
+
+        # Check the PCS simulation data of all alignments.
+        for spin in spin_loop(skip_desel=True):
+            if not hasattr(spin, 'pcs'):
+                continue
+            for align_id in spin.pcs:
+                self.assertEqual(len(spin.pcs_sim[align_id]), 3)
+                for sim_index in range(3):
+                    self.assertAlmostEqual(spin.pcs_sim[align_id][sim_index], spin.pcs[align_id])
+
+        # Check the RDC simulation data of all alignments.
+        for interatom in interatomic_loop(skip_desel=True):
+            if not hasattr(interatom, 'rdc'):
+                continue
+            for align_id in interatom.rdc:
+                self.assertEqual(len(interatom.rdc_sim[align_id]), 3)
+                for sim_index in range(3):
+                    self.assertAlmostEqual(interatom.rdc_sim[align_id][sim_index], interatom.rdc[align_id])
+
+
     def test_mc_sim_failure(self):
         """Test the setup of the Monte Carlo simulations
         
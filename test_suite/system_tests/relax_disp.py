@@ -42,6 +42,7 @@ from lib.io import extract_data, get_file_path
 from lib.spectrum.nmrpipe import show_apod_extract, show_apod_rmsd, show_apod_rmsd_dir_to_files, show_apod_rmsd_to_file
 from pipe_control.mol_res_spin import generate_spin_string, return_spin, spin_loop
 from pipe_control.minimise import assemble_scaling_matrix
+from specific_analyses.api import return_api
 from specific_analyses.relax_disp.checks import check_missing_r1
 from specific_analyses.relax_disp.estimate_r2eff import estimate_r2eff
 from specific_analyses.relax_disp.data import average_intensity, check_intensity_errors, generate_r20_key, get_curve_type, has_exponential_exp_type, loop_exp_frq, loop_exp_frq_offset_point, loop_spectrum_ids, loop_time, return_grace_file_name_ini, return_param_key_from_data, spin_ids_to_containers
@@ -86,6 +87,7 @@ class Relax_disp(SystemTestCase):
                 "test_estimate_r2eff_err_methods",
                 "test_finite_value",
                 "test_exp_fit",
+                "test_exp_fit_mc_batch",
                 "test_m61_exp_data_to_m61",
                 "test_r1rho_kjaergaard_auto",
                 "test_r1rho_kjaergaard_auto_check_graphs",
@@ -3922,6 +3924,54 @@ class Relax_disp(SystemTestCase):
         self.assertEqual(cdp.clustering['cluster'], [':1@N', ':3@N'])
 
 
+    def test_exp_fit_mc_batch(self):
+        """Test the batched Levenberg-Marquardt optimisation of the Monte Carlo simulations of the 'R2eff' model exponential curves."""
+
+        # Create the data pipe and spins.
+        self.interpreter.pipe.create(pipe_name='mc batch', pipe_type='relax_disp')
+        self.interpreter.spin.create(res_name='Asp', res_num=1, spin_name='N')
+        self.interpreter.spin.create(res_name='Gly', res_num=2, spin_name='N')
+        self.interpreter.spin.create(res_name='Lys', res_num=3, spin_name='N')
+        self.interpreter.spin.isotope(isotope='15N')
+
+        # Load the peak intensities of the 'exp_fit' data and set the metadata.
+        data_path = status.install_path + sep+'test_suite'+sep+'shared_data'+sep+'dispersion'+sep+'exp_fit_data'
+        for nu in [1, 2]:
+            for time in [0.01, 0.02, 0.04, 0.06, 0.08, 0.10, 0.12]:
+                id = "nu_%ikHz_relaxT_%.2f" % (nu, time)
+                self.interpreter.spectrum.read_intensities(file=id+'.list', dir=data_path, spectrum_id=id, int_method='height')
+                self.interpreter.spectrum.baseplane_rmsd(spectrum_id=id, error=1000)
+                self.interpreter.relax_disp.exp_type(spectrum_id=id, exp_type='R1rho')
+                self.interpreter.relax_disp.spin_lock_field(spectrum_id=id, field=nu*1000.0)
+                self.interpreter.relax_disp.relax_time(spectrum_id=id, time=time)
+                self.interpreter.spectrometer.frequency(id=id, frq=1.2, units='GHz')
+        self.interpreter.spectrum.error_analysis(subset=cdp.spectrum_ids)
+
+        # Optimise the exponential curves.
+        self.interpreter.relax_disp.select_model(MODEL_R2EFF)
+        self.interpreter.minimise.execute(min_algor='LM', constraints=False)
+
+        # The Monte Carlo simulations.
+        self.interpreter.monte_carlo.setup(number=50)
+        self.interpreter.monte_carlo.create_data()
+        self.interpreter.monte_carlo.initial_values()
+        self.interpreter.minimise.execute(min_algor='LM', constraints=False)
+        self.interpreter.monte_carlo.error_analysis()
+
+        # Checks for each spin.
+        for spin in spin_loop():
+            for key in spin.r2eff:
+                # The simulation errors.
+                self.assert_(0.0 < spin.r2eff_err[key] < 5.0)
+                self.assert_(0.0 < spin.i0_err[key] / spin.i0[key] < 0.1)
+
+            # The per-simulation minimisation statistics.
+            for i in range(50):
+                self.assert_(spin.chi2_sim[i] != None)
+                self.assert_(spin.iter_sim[i] > 0)
+                self.assertEqual(spin.warning_sim[i], None)
+
+
     def test_finite_value(self):
         """Test return from C code, when parameters are wrong.  This can happen, if minfx takes a wrong step."""
 
@@ -6410,6 +6460,46 @@ class Relax_disp(SystemTestCase):
         self.assertAlmostEqual(cdp.mol[0].res[0].spin[0].chi2, 0.030959849811015544, 3)
 
 
+    def test_opendx_map_refine(self):
+        """Test the vectorised dx.map user function for the CR72 model, with adaptive refinement around the minimum."""
+
+        # Define path to data.
+        prev_data_path = status.install_path + sep+'test_suite'+sep+'shared_data'+sep+'dispersion'+sep+'HWebb_KTeilum_Proteins_Struct_Funct_Bioinf_2011'
+
+        # Read the data.
+        self.interpreter.pipe.create(pipe_name='map', pipe_type='relax_disp')
+        self.interpreter.results.read(prev_data_path + sep + 'FT_-_CR72_-_min_-_128_-_free_spins')
+
+        # The spin.
+        spin_id = ':52@N'
+        spin = return_spin(spin_id=spin_id)
+        point = [spin.dw, spin.pA, spin.kex]
+
+        # The vectorised mapping function at the optimised parameter values.
+        func = return_api().map_func(params=['dw', 'pA', 'kex'], spin_id=spin_id)
+        chi2 = func(array([point, point]))
+        self.assertAlmostEqual(chi2[0], spin.chi2, 6)
+        self.assertAlmostEqual(chi2[1], spin.chi2, 6)
+
+        # Map the space with one refinement level.
+        self.interpreter.dx.map(params=['dw', 'pA', 'kex'], spin_id=spin_id, inc=4, file_prefix='map', dir=ds.tmpdir, point=point, point_file='point', create_par_file=True, refine=1)
+
+        # Test the files exists.
+        for file_name in ['map', 'map.general', 'map.net', 'map.par', 'map_refine1', 'map_refine1.general', 'map_refine1.net', 'map_refine1.par', 'point_refine1.par']:
+            self.assert_(access(ds.tmpdir+sep+file_name, F_OK))
+
+        # The parameter values are unchanged.
+        self.assertEqual([spin.dw, spin.pA, spin.kex], point)
+
+        # The refined map has 5 increments in each dimension, and a lower minimum.
+        chi2 = []
+        for file_name in ['map', 'map_refine1']:
+            lines = open(ds.tmpdir+sep+file_name).readlines()
+            self.assertEqual(len(lines), 5**3)
+            chi2.append(min([float(line) for line in lines]))
+        self.assert_(chi2[1] <= chi2[0])
+
+
     def test_paul_schanda_nov_2015(self):
         """This test truncated private data which was provided by Paul Schanda.  This systemtest uncovers some unfortunate problems when
         running an analysis and reading points by the R2eff method.
@@ -20,4 +20,6 @@
 ###############################################################################
 
 
-__all__ = ['test___init__']
+__all__ = ['test___init__',
+           'test_relax_disp'
+]
@@ -0,0 +1,319 @@
+###############################################################################
+#                                                                             #
+# Copyright (C) 2026 Troels E. Linnet                                         #
+#                                                                             #
+# This file is part of the program relax (http://www.nmr-relax.com).          #
+#                                                                             #
+# This program is free software: you can redistribute it and/or modify        #
+# it under the terms of the GNU General Public License as published by        #
+# the Free Software Foundation, either version 3 of the License, or           #
+# (at your option) any later version.                                         #
+#                                                                             #
+# This program is distributed in the hope that it will be useful,             #
+# but WITHOUT ANY WARRANTY; without even the implied warranty of              #
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the               #
+# GNU General Public License for more details.                                #
+#                                                                             #
+# You should have received a copy of the GNU General Public License           #
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.       #
+#                                                                             #
+###############################################################################
+
+# Python module imports.
+from unittest import TestCase
+
+# relax module imports.
+from auto_analyses.relax_disp import Relax_disp
+from lib.dispersion.variables import MODEL_CR72, MODEL_CR72_FULL, MODEL_LM63, MODEL_LM63_3SITE, MODEL_NOREX, MODEL_NS_CPMG_2SITE_3D, MODEL_NS_CPMG_2SITE_3D_FULL, MODEL_NS_CPMG_2SITE_EXPANDED, MODEL_NS_CPMG_2SITE_STAR, MODEL_NS_CPMG_2SITE_STAR_FULL, MODEL_R2EFF
+from lib.errors import RelaxError
+from multi import Processor_box
+from multi.slave_commands import Slave_command
+from multi.uni_processor import Uni_processor
+
+
+class Fake_command(Slave_command):
+    """A slave command recording its execution."""
+
+    def __init__(self, name=None, executed=None):
+        """Set up the slave command.
+
+        @keyword name:      The name to record.
+        @type name:         str
+        @keyword executed:  The list of executed command names.
+        @type executed:     list of str
+        """
+
+        # Execute the base class __init__() method.
+        super(Fake_command, self).__init__()
+
+        # Store the arguments.
+        self.name = name
+        self.executed = executed
+
+
+    def run(self, processor, completed):
+        """Record the execution.
+
+        @param processor:   The processor object.
+        @type processor:    Processor instance
+        @param completed:   The flag stating if this is the last command of the queue.
+        @type completed:    bool
+        """
+
+        # Record.
+        self.executed.append(self.name)
+
+
+
+class Fake_user_function:
+    """A user function recording its calls, and queuing a slave command for the optimisation user functions."""
+
+    def __init__(self, name=None, interpreter=None):
+        """Set up the user function.
+
+        @keyword name:          The full user function name.
+        @type name:             str
+        @keyword interpreter:   The fake interpreter object.
+        @type interpreter:      Fake_interpreter instance
+        """
+
+        # Store the arguments.
+        self.name = name
+        self.interpreter = interpreter
+
+
+    def __getattr__(self, name):
+        """Return the user function of the user function class."""
+
+        return Fake_user_function(name="%s.%s" % (self.name, name), interpreter=self.interpreter)
+
+
+    def __call__(self, *args, **kargs):
+        """Record the call, and mimic the optimisation user functions."""
+
+        # Alias.
+        interpreter = self.interpreter
+
+        # The current data pipe.
+        if self.name == 'pipe.switch':
+            interpreter.pipe_name = args[0]
+            return
+
+        # Record the call.
+        name = "%s %s" % (self.name, interpreter.pipe_name)
+        interpreter.calls.append(name)
+
+        # A failure.
+        if name == interpreter.fail:
+            raise RelaxError("The '%s' user function failed." % name)
+
+        # Queue a slave command and run the queue, as the optimisation user functions do.
+        if self.name in ['minimise.grid_search', 'minimise.execute']:
+            processor = Processor_box().processor
+            processor.add_to_queue(Fake_command(name=name, executed=interpreter.executed))
+            processor.run_queue()
+
+
+
+class Fake_interpreter:
+    """An interpreter object recording the user function calls."""
+
+    def __init__(self, fail=None):
+        """Set up the interpreter.
+
+        @keyword fail:  The user function call, as the user function name and data pipe name, which should raise a RelaxError.
+        @type fail:     str or None
+        """
+
+        # Initialise.
+        self.fail = fail
+        self.pipe_name = None
+        self.calls = []
+        self.executed = []
+
+
+    def __getattr__(self, name):
+        """Return the user function class."""
+
+        return Fake_user_function(name=name, interpreter=self)
+
+
+
+class Relax_disp_test(Relax_disp):
+    """The relaxation dispersion auto-analysis, set up without execution."""
+
+    def __init__(self, models=None, fail=None):
+        """Set up the analysis variables.
+
+        @keyword models:    The models to analyse.
+        @type models:       list of str
+        @keyword fail:      The user function call which should fail (see Fake_interpreter).
+        @type fail:         str or None
+        """
+
+        # The analysis variables.
+        self.pipe_bundle = 'test'
+        self.results_dir = 'test'
+        self.models = models
+        self.grid_inc = 3
+        self.set_grid_r20 = False
+        self.pre_run_dir = None
+        self.insignificance = 0.0
+        self.eliminate = False
+        self.mc_sim_all_models = False
+        self.mc_sim_num = 3
+        self.exp_mc_sim_num = None
+
+        # The fake interpreter.
+        self.interpreter = Fake_interpreter(fail=fail)
+
+        # The written results.
+        self.results = []
+
+
+    def nesting(self, model=None):
+        """No model nesting."""
+
+        return False
+
+
+    def setup_model(self, model=None):
+        """Set up nothing, always optimising the model."""
+
+        return True
+
+
+    def write_results(self, path=None, model=None):
+        """Record the model."""
+
+        self.results.append(model)
+
+
+
+class Test_relax_disp(TestCase):
+    """Unit tests for the auto_analyses.relax_disp relax module."""
+
+    def setUp(self):
+        """Set up the uni-processor."""
+
+        # Store the current processor.
+        processor_box = Processor_box()
+        self.processor_orig = getattr(processor_box, 'processor', None)
+
+        # The uni-processor.
+        processor_box.processor = Uni_processor(processor_size=1, callback=None)
+
+
+    def tearDown(self):
+        """Restore the original processor."""
+
+        Processor_box().processor = self.processor_orig
+
+
+    def test_model_dependencies(self):
+        """Test the model dependencies of the Relax_disp.model_dependencies() method."""
+
+        # Set up the analysis.
+        analysis = Relax_disp_test(models=[MODEL_R2EFF, MODEL_NOREX, MODEL_CR72, MODEL_CR72_FULL, MODEL_NS_CPMG_2SITE_EXPANDED, MODEL_NS_CPMG_2SITE_3D])
+
+        # Checks.
+        self.assertEqual(analysis.model_dependencies(MODEL_R2EFF), [])
+        self.assertEqual(analysis.model_dependencies(MODEL_NOREX), [MODEL_R2EFF])
+        self.assertEqual(analysis.model_dependencies(MODEL_CR72), [MODEL_R2EFF])
+        self.assertEqual(analysis.model_dependencies(MODEL_CR72_FULL), [MODEL_R2EFF, MODEL_CR72])
+        self.assertEqual(analysis.model_dependencies(MODEL_NS_CPMG_2SITE_EXPANDED), [MODEL_R2EFF, MODEL_CR72])
+        self.assertEqual(analysis.model_dependencies(MODEL_NS_CPMG_2SITE_3D), [MODEL_R2EFF, MODEL_NS_CPMG_2SITE_EXPANDED])
+
+        # Without the R2eff model.
+        analysis = Relax_disp_test(models=[MODEL_CR72, MODEL_CR72_FULL])
+        self.assertEqual(analysis.model_dependencies(MODEL_CR72), [])
+        self.assertEqual(analysis.model_dependencies(MODEL_CR72_FULL), [MODEL_CR72])
+
+
+    def test_model_waves(self):
+        """Test the wave ordering of nested models by the Relax_disp.model_waves() method."""
+
+        # The CR72 to CR72 full nesting.
+        analysis = Relax_disp_test(models=[MODEL_R2EFF, MODEL_NOREX, MODEL_CR72, MODEL_CR72_FULL])
+        self.assertEqual(analysis.model_waves(), [[MODEL_R2EFF], [MODEL_NOREX, MODEL_CR72], [MODEL_CR72_FULL]])
+
+        # The nesting of the NS CPMG 2-site models.
+        analysis = Relax_disp_test(models=[MODEL_R2EFF, MODEL_NOREX, MODEL_NS_CPMG_2SITE_EXPANDED, MODEL_NS_CPMG_2SITE_3D, MODEL_NS_CPMG_2SITE_STAR, MODEL_NS_CPMG_2SITE_3D_FULL, MODEL_NS_CPMG_2SITE_STAR_FULL])
+        self.assertEqual(analysis.model_waves(), [[MODEL_R2EFF], [MODEL_NOREX, MODEL_NS_CPMG_2SITE_EXPANDED], [MODEL_NS_CPMG_2SITE_3D, MODEL_NS_CPMG_2SITE_STAR, MODEL_NS_CPMG_2SITE_3D_FULL], [MODEL_NS_CPMG_2SITE_STAR_FULL]])
+
+        # The 2-site to 3-site nesting, mixed with chains of analytic to numeric models.
+        analysis = Relax_disp_test(models=[MODEL_R2EFF, MODEL_NOREX, MODEL_LM63, MODEL_LM63_3SITE, MODEL_CR72, MODEL_CR72_FULL, MODEL_NS_CPMG_2SITE_EXPANDED, MODEL_NS_CPMG_2SITE_3D])
+        self.assertEqual(analysis.model_waves(), [[MODEL_R2EFF], [MODEL_NOREX, MODEL_LM63, MODEL_CR72], [MODEL_LM63_3SITE, MODEL_CR72_FULL, MODEL_NS_CPMG_2SITE_EXPANDED], [MODEL_NS_CPMG_2SITE_3D]])
+
+        # The more complex model listed first cannot use the nested model, so both are independent.
+        analysis = Relax_disp_test(models=[MODEL_CR72_FULL, MODEL_CR72])
+        self.assertEqual(analysis.model_waves(), [[MODEL_CR72_FULL, MODEL_CR72]])
+
+
+    def test_optimise_models(self):
+        """Test the lockstep optimisation of independent models by the Relax_disp.optimise_models() method."""
+
+        # Set up and optimise.
+        analysis = Relax_disp_test(models=[MODEL_NOREX, MODEL_LM63, MODEL_CR72])
+        analysis.optimise_models(models=[MODEL_LM63, MODEL_CR72])
+
+        # The grid searches of both models are executed together, followed by the minimisations.
+        self.assertEqual(analysis.interpreter.executed, [
+            "minimise.grid_search LM63 - test",
+            "minimise.grid_search CR72 - test",
+            "minimise.execute LM63 - test",
+            "minimise.execute CR72 - test"
+        ])
+
+        # The results and processor queue.
+        self.assertEqual(analysis.results, [MODEL_LM63, MODEL_CR72])
+        processor = Processor_box().processor
+        self.assertFalse(processor.queue_held)
+        self.assertFalse(processor.is_queued())
+
+
+    def test_optimise_models_failure(self):
+        """Test that a failure in the Relax_disp.optimise_models() method is raised without executing the held queue."""
+
+        # Set up and optimise.
+        analysis = Relax_disp_test(models=[MODEL_NOREX, MODEL_LM63, MODEL_CR72], fail="minimise.execute CR72 - test")
+        self.assertRaises(RelaxError, analysis.optimise_models, models=[MODEL_LM63, MODEL_CR72])
+
+        # Only the grid searches have been executed.
+        self.assertEqual(analysis.interpreter.executed, [
+            "minimise.grid_search LM63 - test",
+            "minimise.grid_search CR72 - test"
+        ])
+        self.assertEqual(analysis.results, [])
+
+        # The queued minimisation has been discarded.
+        processor = Processor_box().processor
+        self.assertFalse(processor.queue_held)
+        self.assertFalse(processor.is_queued())
+        self.assertEqual(processor.memo_map, {})
+
+
+    def test_optimise_stages(self):
+        """Test the stages yielded by the Relax_disp.optimise_stages() generator."""
+
+        # Set up the analysis, with Monte Carlo simulations.
+        analysis = Relax_disp_test(models=[MODEL_CR72])
+        analysis.interpreter.pipe_name = 'CR72 - test'
+        calls = analysis.interpreter.calls
+
+        # The grid search stage.
+        stages = analysis.optimise_stages(model=MODEL_CR72, model_path='CR72')
+        next(stages)
+        self.assertEqual(calls[-1], "minimise.grid_search CR72 - test")
+
+        # The minimisation stage.
+        next(stages)
+        self.assertEqual(calls[-1], "minimise.execute CR72 - test")
+
+        # The Monte Carlo simulation stage.
+        next(stages)
+        self.assertEqual(calls[-4:], ["monte_carlo.setup CR72 - test", "monte_carlo.create_data CR72 - test", "monte_carlo.initial_values CR72 - test", "minimise.execute CR72 - test"])
+
+        # The end.
+        self.assertRaises(StopIteration, next, stages)
+        self.assertEqual(calls[-1], "monte_carlo.error_analysis CR72 - test")
@@ -158,6 +158,44 @@ class Test_align_tensor(TestCase):
         self.assertAlmostEqual(self.align_data.Am2.imag, 4.1038e-04)
 
 
+    def test_lazy_sim(self):
+        """Test that only the changed Monte Carlo simulation elements of the alignment tensor objects are recalculated when read."""
+
+        # Set the number of MC sims.
+        self.align_data.set_sim_num(3)
+
+        # Set the values.
+        values = []
+        for i in range(3):
+            values.append([(i+1) * 1e-4, -2e-4, 3e-4, 1e-4, -5e-5])
+            for j in range(5):
+                self.align_data.set(param=['Axx', 'Ayy', 'Axy', 'Axz', 'Ayz'][j], value=values[i][j], category='sim', sim_index=i)
+
+        # The dependent objects are only calculated when read.
+        self.assert_('A_sim' not in self.align_data.__dict__)
+        A_sim = [self.align_data.A_sim[i] for i in range(3)]
+        Aa_sim = [self.align_data.Aa_sim[i] for i in range(3)]
+        self.assert_('A_sim' in self.align_data.__dict__)
+
+        # Change the second simulation.
+        values[1][0] = 5e-4
+        self.align_data.set(param='Axx', value=values[1][0], category='sim', sim_index=1)
+        self.assert_('A_sim' not in self.align_data.__dict__)
+
+        # The unchanged simulation elements are reused.
+        self.assert_(self.align_data.A_sim[0] is A_sim[0])
+        self.assert_(self.align_data.A_sim[2] is A_sim[2])
+        self.assertEqual(self.align_data.Aa_sim[0], Aa_sim[0])
+
+        # The changed simulation elements.
+        for i in range(3):
+            Azz, Axxyy, tensor = self.calc_objects(*values[i])
+            self.assertEqual(self.align_data.Azz_sim[i], Azz)
+            self.assertEqual(self.align_data.Axxyy_sim[i], Axxyy)
+            self.assertEqual(self.align_data.A_sim[i].tolist(), tensor.tolist())
+        self.assertNotEqual(self.align_data.Aa_sim[1], Aa_sim[1])
+
+
     def test_set_Szz(self):
         """Test that the Szz parameter cannot be set."""
 
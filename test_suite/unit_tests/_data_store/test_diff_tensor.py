@@ -134,6 +134,46 @@ class Test_diff_tensor(TestCase):
         print(self.diff_data)
 
 
+    def test_lazy_spheroid_sim(self):
+        """Test that only the changed Monte Carlo simulation elements of the spheroidal diffusion tensor objects are recalculated when read."""
+
+        # Set the diffusion type.
+        self.diff_data.set(param='type', value='spheroid')
+        self.diff_data.set(param='spheroid_type', value='prolate')
+
+        # Set the number of MC sims.
+        self.diff_data.set_sim_num(3)
+
+        # Set the values.
+        values = []
+        for i in range(3):
+            values.append([(8 + i) * 1e-9, 1e7, (i + 1) * 0.3, 0.5])
+            for j in range(4):
+                self.diff_data.set(param=['tm', 'Da', 'theta', 'phi'][j], value=values[i][j], category='sim', sim_index=i)
+
+        # The dependent objects are only calculated when read.
+        self.assert_('tensor_sim' not in self.diff_data.__dict__)
+        tensor_sim = [self.diff_data.tensor_sim[i] for i in range(3)]
+        self.assert_('tensor_sim' in self.diff_data.__dict__)
+
+        # Change the second simulation.
+        values[1][0] = 12e-9
+        self.diff_data.set(param='tm', value=values[1][0], category='sim', sim_index=1)
+        self.assert_('tensor_sim' not in self.diff_data.__dict__)
+
+        # The unchanged simulation elements are reused.
+        self.assert_(self.diff_data.tensor_sim[0] is tensor_sim[0])
+        self.assert_(self.diff_data.tensor_sim[2] is tensor_sim[2])
+
+        # Check all the simulation elements.
+        for i in range(3):
+            Diso, Dpar, Dper, Dratio, Dpar_unit, tensor_diag, rotation, tensor = self.calc_spheroid_objects(*values[i])
+            self.assertEqual(self.diff_data.Diso_sim[i], Diso)
+            self.assertEqual(self.diff_data.Dratio_sim[i], Dratio)
+            self.assertEqual(self.diff_data.rotation_sim[i].tolist(), rotation.tolist())
+            self.assertEqual(self.diff_data.tensor_sim[i].tolist(), tensor.tolist())
+
+
     def test_set_Diso(self):
         """Test that the Diso parameter cannot be set."""
 
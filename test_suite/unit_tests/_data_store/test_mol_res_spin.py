@@ -73,6 +73,31 @@ class Test_mol_res_spin(TestCase):
         self.assert_(not hasattr(self.mol[0].res[1].spin[0], 'x'))
 
 
+    def test_index_res_num(self):
+        """Unit test for the 'index_num()' method of the ResidueList class."""
+
+        # Add some residues.
+        self.mol[0].res[0].num = 3
+        self.mol[0].res.add_item(res_name='LEU', res_num=-5)
+        self.mol[0].res.add_item(res_name='GLY', res_num=10)
+
+        # Test the indices.
+        self.assertEqual(self.mol[0].res.index_num(3), 0)
+        self.assertEqual(self.mol[0].res.index_num(-5), 1)
+        self.assertEqual(self.mol[0].res.index_num(10), 2)
+        self.assertEqual(self.mol[0].res.index_num(11), None)
+
+        # Remove a residue and renumber another.
+        self.mol[0].res.pop(1)
+        self.mol[0].res[1].num = 11
+
+        # Test the updated indices.
+        self.assertEqual(self.mol[0].res.index_num(3), 0)
+        self.assertEqual(self.mol[0].res.index_num(-5), None)
+        self.assertEqual(self.mol[0].res.index_num(10), None)
+        self.assertEqual(self.mol[0].res.index_num(11), 1)
+
+
     def test_add_spin(self):
         """Unit test for the 'add_item()' method of the SpinList class."""
 
@@ -0,0 +1,65 @@
+###############################################################################
+#                                                                             #
+# Copyright (C) 2026 Troels E. Linnet                                         #
+#                                                                             #
+# This file is part of the program relax (http://www.nmr-relax.com).          #
+#                                                                             #
+# This program is free software: you can redistribute it and/or modify        #
+# it under the terms of the GNU General Public License as published by        #
+# the Free Software Foundation, either version 3 of the License, or           #
+# (at your option) any later version.                                         #
+#                                                                             #
+# This program is distributed in the hope that it will be useful,             #
+# but WITHOUT ANY WARRANTY; without even the implied warranty of              #
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the               #
+# GNU General Public License for more details.                                #
+#                                                                             #
+# You should have received a copy of the GNU General Public License           #
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.       #
+#                                                                             #
+###############################################################################
+
+# Python module imports.
+from numpy import array, float64
+from numpy.linalg import norm
+from unittest import TestCase
+
+# relax module imports.
+from lib.alignment.pcs import pcs_tensor, pcs_tensor_batch
+from lib.physical_constants import pcs_constant
+
+
+class Test_pcs(TestCase):
+    """Unit tests for the lib.alignment.pcs relax module."""
+
+    def test_pcs_tensor_batch(self):
+        """Compare pcs_tensor_batch() to pcs_tensor() for a stack of vectors and alignment tensors."""
+
+        # The temperatures, field strengths, and alignment tensors.
+        T = [303.0, 298.0]
+        Bo = [18.8, 14.1]
+        A = array([
+            [[ 1.2e-32, -3.0e-33,  5.0e-33], [-3.0e-33, -2.0e-33, 1.0e-33], [ 5.0e-33, 1.0e-33, -1.0e-32]],
+            [[-4.0e-33,  2.0e-33,  1.0e-33], [ 2.0e-33,  7.0e-33, 3.0e-33], [ 1.0e-33, 3.0e-33, -3.0e-33]]
+        ], float64)
+
+        # The vectors (in meters), for 2 spins and 3 simulations.
+        vect = array([
+            [[10.0, 2.0, -3.0], [9.5, 2.5, -2.8], [10.2, 1.8, -3.3]],
+            [[-4.0, 12.0, 6.0], [-4.2, 11.5, 6.3], [-3.9, 12.4, 5.8]]
+        ], float64) * 1e-10
+
+        # The PCS constants without the distance dependence.
+        c = array([pcs_constant(T[i], Bo[i], 1.0) for i in range(2)], float64)
+
+        # The batched PCS values.
+        pcs = pcs_tensor_batch(c, vect, A)
+        self.assertEqual(pcs.shape, (2, 2, 3))
+
+        # Compare to the individual PCS values.
+        for i in range(2):
+            for j in range(2):
+                for k in range(3):
+                    r = norm(vect[j, k])
+                    dj = pcs_constant(T[i], Bo[i], r)
+                    self.assertAlmostEqual(pcs[i, j, k] / pcs_tensor(dj, vect[j, k] / r, A[i]), 1.0, 12)
@@ -190,3 +190,33 @@ class Test_cr72(TestCase):
 
         # Calculate and check the R2eff values.
         self.calc_r2eff()
+
+
+    def test_cr72_batch(self):
+        """Test the r2eff_cr72() function for multiple parameter points, including the no exchange cases of pA = 1.0 and kex = 0.0."""
+
+        # The parameter points {pA, kex}.
+        points = [[0.95, 1000.0], [1.0, 1000.0], [0.95, 0.0], [0.9, 5000.0]]
+        num = len(points)
+
+        # Parameter conversions.
+        k_AB, k_BA, pB, dw_frq = self.param_conversion(pA=self.pA, kex=self.kex, dw=self.dw, sfrq=self.sfrq)
+
+        # The data structures with the additional first dimension of the points.
+        a = ones([num, self.num_points])
+        r20a = self.r20a*a
+        r20b = self.r20b*a
+        dw = dw_frq*a
+        pA = array([point[0] for point in points], float64).reshape(num, 1)
+        kex = array([point[1] for point in points], float64).reshape(num, 1)
+        back_calc = zeros([num, self.num_points], float64)
+
+        # Calculate the R2eff values for all points at once.
+        r2eff_CR72(r20a=r20a, r20a_orig=r20a, r20b=r20b, r20b_orig=r20b, pA=pA, dw=dw, dw_orig=dw, kex=kex, cpmg_frqs=self.cpmg_frqs, back_calc=back_calc)
+
+        # Compare to the point by point calculation.
+        for i in range(num):
+            self.R2eff = zeros(self.num_points, float64)
+            r2eff_CR72(r20a=r20a[i], r20a_orig=r20a[i], r20b=r20b[i], r20b_orig=r20b[i], pA=points[i][0], dw=dw[i], dw_orig=dw[i], kex=points[i][1], cpmg_frqs=self.cpmg_frqs, back_calc=self.R2eff)
+            for j in range(self.num_points):
+                self.assertAlmostEqual(back_calc[i, j], self.R2eff[j])
@@ -21,7 +21,8 @@
 
 # Python module imports.
 from os import sep
-from numpy import complex64, load, sum
+from numpy import complex64, iscomplexobj, load, ndindex, sum
+from numpy.random import RandomState
 from unittest import TestCase
 
 # relax module imports.
@@ -242,3 +243,53 @@ class Test_matrix_exponential(TestCase):
                         self.assertAlmostEqual(diff_A_pos_imag_sum, 0.0)
                         self.assertAlmostEqual(diff_A_neg_real_sum, 0.0)
                         self.assertAlmostEqual(diff_A_neg_imag_sum, 0.0)
+
+
+    def check_against_eig(self, A):
+        """Compare the matrix_exponential() function to the eigenvalue decomposition approach, matrix by matrix.
+
+        @param A:   The matrices to exponentiate.
+        @type A:    numpy array of rank [NE][NS][NM][NO][ND][X][X]
+        """
+
+        # The higher dimensional matrix exponential.
+        eA = matrix_exponential(A)
+
+        # Check the shape and the real arithmetic.
+        self.assertEqual(eA.shape, A.shape)
+        self.assertEqual(iscomplexobj(eA), iscomplexobj(A))
+
+        # Compare each matrix.
+        for index in ndindex(A.shape[:-2]):
+            eA_i = np_matrix_exponential(A[index])
+            self.assertAlmostEqual(abs(eA[index] - eA_i).max() / abs(eA_i).max(), 0.0, 10)
+
+
+    def test_matrix_exponential_2x2_closed_form(self):
+        """Test the closed form matrix_exponential() for 2x2 real and complex matrices, including negative discriminants and the zero matrices of the padding."""
+
+        # Random real matrices, with a mixture of real and complex conjugate eigenvalues.
+        A = RandomState(10).normal(size=(1, 2, 2, 1, 6, 2, 2))
+        A[0, 0, 0, 0, 0] = 0.0
+        self.check_against_eig(A)
+
+        # Complex matrices, as for the MMQ models.
+        B = A + 1.j * RandomState(11).normal(size=A.shape)
+        self.check_against_eig(B)
+
+
+    def test_matrix_exponential_pade(self):
+        """Test the scaling and squaring Pade matrix_exponential() for 3x3, 6x6 and 7x7 real and complex matrices over a range of norms."""
+
+        # Loop over the matrix sizes and norms.
+        random = RandomState(20)
+        for size in [3, 6, 7]:
+            for scale in [1e-3, 0.1, 1.0, 20.0]:
+                # Real matrices.
+                A = scale * random.normal(size=(1, 1, 2, 1, 3, size, size))
+                self.check_against_eig(A)
+
+                # Complex matrices.
+                B = A + 1.j * scale * random.normal(size=A.shape)
+                self.check_against_eig(B)
+
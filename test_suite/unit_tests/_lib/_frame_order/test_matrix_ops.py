@@ -21,11 +21,13 @@
 
 # Python module imports.
 from math import pi
-from numpy import array, float64, zeros
+from numpy import add, array, dot, eye, float64, transpose, zeros
 from unittest import TestCase
 
 # relax module imports.
 import dep_check
+from lib.compat import norm
+import lib.frame_order.matrix_ops
 from lib.frame_order.format import print_frame_order_2nd_degree
 from lib.frame_order.free_rotor import compile_2nd_matrix_free_rotor
 from lib.frame_order.iso_cone import compile_2nd_matrix_iso_cone
@@ -35,13 +37,137 @@ from lib.frame_order.pseudo_ellipse import compile_2nd_matrix_pseudo_ellipse
 from lib.frame_order.pseudo_ellipse_free_rotor import compile_2nd_matrix_pseudo_ellipse_free_rotor
 from lib.frame_order.pseudo_ellipse_torsionless import compile_2nd_matrix_pseudo_ellipse_torsionless
 from lib.frame_order.rotor import compile_2nd_matrix_rotor
-from lib.frame_order.matrix_ops import reduce_alignment_tensor
+from lib.frame_order.matrix_ops import pcs_numeric_qr_int, reduce_alignment_tensor
 from lib.geometry.coord_transform import cartesian_to_spherical, spherical_to_cartesian
 from lib.geometry.rotations import euler_to_R_zyz, two_vect_to_R
 from lib.linear_algebra.kronecker_product import kron_prod, transpose_23
 from status import Status; status = Status()
 
 
+def pcs_pivot_motion_full_qr_int(full_in_ref_frame=None, r_pivot_atom=None, r_pivot_atom_rev=None, r_ln_pivot=None, A=None, Ri=None, pcs_theta=None, pcs_theta_err=None, missing_pcs=None):
+    """The state by state reference for the quasi-random PCS numerical integration, adding the PCS values of a single state.
+
+    @keyword full_in_ref_frame: An array of flags specifying if the tensor in the reference frame is the full or reduced tensor.
+    @type full_in_ref_frame:    numpy rank-1 array
+    @keyword r_pivot_atom:      The pivot point to atom vector.
+    @type r_pivot_atom:         numpy rank-2, 3D array
+    @keyword r_pivot_atom_rev:  The reversed pivot point to atom vector.
+    @type r_pivot_atom_rev:     numpy rank-2, 3D array
+    @keyword r_ln_pivot:        The lanthanide position to pivot point vector.
+    @type r_ln_pivot:           numpy rank-2, 3D array
+    @keyword A:                 The full alignment tensor of the non-moving domain.
+    @type A:                    numpy rank-2, 3D array
+    @keyword Ri:                The frame-shifted, pre-calculated rotation matrix for state i.
+    @type Ri:                   numpy rank-2, 3D array
+    @keyword pcs_theta:         The storage structure for the back-calculated PCS values.
+    @type pcs_theta:            numpy rank-2 array
+    @keyword pcs_theta_err:     The storage structure for the back-calculated PCS errors.
+    @type pcs_theta_err:        numpy rank-2 array
+    @keyword missing_pcs:       A structure used to indicate which PCS values are missing.
+    @type missing_pcs:          numpy rank-2 array
+    """
+
+    # Pre-calculate all the new vectors.
+    rot_vect = dot(r_pivot_atom, Ri) + r_ln_pivot
+
+    # The vector length (to the 5th power).
+    length = 1.0 / norm(rot_vect, axis=1)**5
+
+    # The reverse vectors and lengths.
+    if min(full_in_ref_frame) == 0:
+        rot_vect_rev = dot(r_pivot_atom_rev, Ri) + r_ln_pivot
+        length_rev = 1.0 / norm(rot_vect_rev, axis=1)**5
+
+    # Loop over the atoms.
+    for j in range(len(r_pivot_atom[:, 0])):
+        # Loop over the alignments.
+        for i in range(len(pcs_theta)):
+            # Skip missing data.
+            if missing_pcs[i, j]:
+                continue
+
+            # The projection.
+            if full_in_ref_frame[i]:
+                proj = dot(rot_vect[j], dot(A[i], rot_vect[j]))
+                length_i = length[j]
+            else:
+                proj = dot(rot_vect_rev[j], dot(A[i], rot_vect_rev[j]))
+                length_i = length_rev[j]
+
+            # The PCS.
+            pcs_theta[i, j] += proj * length_i
+
+
+def pcs_pivot_motion_double_rotor_qr_int(full_in_ref_frame=None, r_pivot_atom=None, r_pivot_atom_rev=None, r_ln_pivot=None, r_inter_pivot=None, A=None, Ri=None, Ri2=None, pcs_theta=None, pcs_theta_err=None, missing_pcs=None):
+    """The state by state reference for the quasi-random PCS numerical integration of the double rotor model, adding the PCS values of a single state.
+
+    @keyword full_in_ref_frame: An array of flags specifying if the tensor in the reference frame is the full or reduced tensor.
+    @type full_in_ref_frame:    numpy rank-1 array
+    @keyword r_pivot_atom:      The pivot point to atom vector.
+    @type r_pivot_atom:         numpy rank-2, 3D array
+    @keyword r_pivot_atom_rev:  The reversed pivot point to atom vector.
+    @type r_pivot_atom_rev:     numpy rank-2, 3D array
+    @keyword r_ln_pivot:        The lanthanide position to pivot point vector.
+    @type r_ln_pivot:           numpy rank-2, 3D array
+    @keyword r_inter_pivot:     The vector between the two pivots.
+    @type r_inter_pivot:        numpy rank-1, 3D array
+    @keyword A:                 The full alignment tensor of the non-moving domain.
+    @type A:                    numpy rank-2, 3D array
+    @keyword Ri:                The frame-shifted, pre-calculated rotation matrix for state i for the 1st mode of motion.
+    @type Ri:                   numpy rank-2, 3D array
+    @keyword Ri2:               The frame-shifted, pre-calculated rotation matrix for state i for the 2nd mode of motion.
+    @type Ri2:                  numpy rank-2, 3D array
+    @keyword pcs_theta:         The storage structure for the back-calculated PCS values.
+    @type pcs_theta:            numpy rank-2 array
+    @keyword pcs_theta_err:     The storage structure for the back-calculated PCS errors.
+    @type pcs_theta_err:        numpy rank-2 array
+    @keyword missing_pcs:       A structure used to indicate which PCS values are missing.
+    @type missing_pcs:          numpy rank-2 array
+    """
+
+    # Rotate the first pivot to atomic position vectors.
+    rot_vect = dot(r_pivot_atom, Ri)
+
+    # Add the inter-pivot vector to obtain the 2nd pivot to atomic position vectors.
+    add(r_inter_pivot, rot_vect, rot_vect)
+
+    # Rotate the 2nd pivot to atomic position vectors.
+    rot_vect = dot(rot_vect, Ri2)
+
+    # Add the lanthanide to pivot vector.
+    add(rot_vect, r_ln_pivot, rot_vect)
+
+    # The vector length (to the 5th power).
+    length = 1.0 / norm(rot_vect, axis=1)**5
+
+    # The reverse vectors and lengths.
+    if min(full_in_ref_frame) == 0:
+        rot_vect_rev = dot(r_pivot_atom_rev, Ri)
+        add(r_inter_pivot, rot_vect_rev, rot_vect_rev)
+        rot_vect_rev = dot(rot_vect_rev, Ri2)
+        add(rot_vect_rev, r_ln_pivot, rot_vect_rev)
+        length_rev = 1.0 / norm(rot_vect_rev, axis=1)**5
+
+    # Loop over the atoms.
+    for j in range(len(r_pivot_atom[:, 0])):
+        # Loop over the alignments.
+        for i in range(len(pcs_theta)):
+            # Skip missing data.
+            if missing_pcs[i, j]:
+                continue
+
+            # The projection.
+            if full_in_ref_frame[i]:
+                proj = dot(rot_vect[j], dot(A[i], rot_vect[j]))
+                length_i = length[j]
+            else:
+                proj = dot(rot_vect_rev[j], dot(A[i], rot_vect_rev[j]))
+                length_i = length_rev[j]
+
+            # The PCS.
+            pcs_theta[i, j] += proj * length_i
+
+
 class Test_matrix_ops(TestCase):
     """Unit tests for the lib.frame_order_matrix_ops relax module."""
 
@@ -1070,6 +1196,123 @@ class Test_matrix_ops(TestCase):
                 self.assert_(abs(f2[i, j] - real[i, j]) < 1e-3)
 
 
+    def pcs_qr_int_setup(self):
+        """Set up the data structures for the PCS numerical integration tests.
+
+        @return:    The keyword arguments for pcs_numeric_qr_int(), the frame-shifted rotation matrices for the 1st mode of motion, and the in-frame and frame-shifted rotation matrices for the 2nd mode of motion.
+        @rtype:     dict, numpy rank-3 array, numpy rank-3 array, numpy rank-3 array
+        """
+
+        # The eigenframe.
+        R_eigen = zeros((3, 3), float64)
+        euler_to_R_zyz(0.3, 1.1, -0.4, R_eigen)
+
+        # The in-frame rotation matrices for 20 states, and their frame-shifted versions.
+        Ri_prime = zeros((20, 3, 3), float64)
+        Ri2_prime = zeros((20, 3, 3), float64)
+        Ri = zeros((20, 3, 3), float64)
+        Ri2 = zeros((20, 3, 3), float64)
+        for i in range(20):
+            euler_to_R_zyz(0.1*i, 0.05*i, -0.2*i, Ri_prime[i])
+            euler_to_R_zyz(-0.1*i, 0.3, 0.15*i, Ri2_prime[i])
+            Ri[i] = dot(R_eigen, dot(Ri_prime[i], transpose(R_eigen)))
+            Ri2[i] = dot(R_eigen, dot(Ri2_prime[i], transpose(R_eigen)))
+
+        # The data for 4 atoms and 2 alignments, the 2nd alignment using the reduced tensor.
+        data = {
+            'mask': array([i % 3 != 1 for i in range(20)]),
+            'max_points': 10,
+            'c': array([[1.0, 1.1, 1.2, 1.3], [2.0, 2.1, 2.2, 2.3]], float64),
+            'full_in_ref_frame': array([1, 0]),
+            'r_pivot_atom': array([[10.0, 2.0, -3.0], [-4.0, 12.0, 6.0], [5.0, -8.0, 9.0], [1.0, 3.0, 15.0]], float64),
+            'r_pivot_atom_rev': array([[9.0, -2.0, 4.0], [-5.0, 11.0, -6.0], [6.0, 7.0, 8.0], [-2.0, 4.0, 14.0]], float64),
+            'r_ln_pivot': array([[5.0, -10.0, 20.0]], float64),
+            'A': array([[[ 1.2e-3, -3.0e-4, 5.0e-4], [-3.0e-4, -2.0e-4, 1.0e-4], [ 5.0e-4, 1.0e-4, -1.0e-3]],
+                        [[-4.0e-4,  2.0e-4, 1.0e-4], [ 2.0e-4,  7.0e-4, 3.0e-4], [ 1.0e-4, 3.0e-4, -3.0e-4]]], float64),
+            'R_eigen': R_eigen,
+            'RT_eigen': transpose(R_eigen),
+            'Ri_prime': Ri_prime,
+            'pcs_theta': zeros((2, 4), float64),
+            'pcs_theta_err': zeros((2, 4), float64),
+            'missing_pcs': array([[0, 0, 1, 0], [0, 1, 0, 0]])
+        }
+
+        # Return the data.
+        return data, Ri, Ri2_prime, Ri2
+
+
+    def test_pcs_numeric_qr_int(self):
+        """Compare pcs_numeric_qr_int() to the state by state PCS numerical integration."""
+
+        # Set up.
+        data, Ri, Ri2_prime, Ri2 = self.pcs_qr_int_setup()
+
+        # The state by state PCS sum, for the first 10 states inside the distribution.
+        pcs = zeros((2, 4), float64)
+        states = [i for i in range(20) if data['mask'][i]][:10]
+        for i in states:
+            pcs_pivot_motion_full_qr_int(full_in_ref_frame=data['full_in_ref_frame'], r_pivot_atom=data['r_pivot_atom'], r_pivot_atom_rev=data['r_pivot_atom_rev'], r_ln_pivot=data['r_ln_pivot'], A=data['A'], Ri=Ri[i], pcs_theta=pcs, pcs_theta_err=data['pcs_theta_err'], missing_pcs=data['missing_pcs'])
+        pcs = data['c'] * pcs / 10.0
+
+        # Compare to the batched calculation, in one block and in blocks of 3 states.
+        block_size = lib.frame_order.matrix_ops.QR_INT_BLOCK_SIZE
+        try:
+            for size in [block_size, 12]:
+                lib.frame_order.matrix_ops.QR_INT_BLOCK_SIZE = size
+                pcs_numeric_qr_int(**data)
+                for i in range(2):
+                    for j in range(4):
+                        if data['missing_pcs'][i, j]:
+                            self.assertEqual(data['pcs_theta'][i, j], 0.0)
+                        else:
+                            self.assertAlmostEqual(data['pcs_theta'][i, j] / pcs[i, j], 1.0, 12)
+        finally:
+            lib.frame_order.matrix_ops.QR_INT_BLOCK_SIZE = block_size
+
+
+    def test_pcs_numeric_qr_int_double_rotor(self):
+        """Compare pcs_numeric_qr_int() to the state by state PCS numerical integration for the double rotor model."""
+
+        # Set up.
+        data, Ri, Ri2_prime, Ri2 = self.pcs_qr_int_setup()
+        data['r_inter_pivot'] = array([[3.0, 1.0, -2.0]], float64)
+        data['Ri2_prime'] = Ri2_prime
+
+        # The state by state PCS sum, for the first 10 states inside the distribution.
+        pcs = zeros((2, 4), float64)
+        states = [i for i in range(20) if data['mask'][i]][:10]
+        for i in states:
+            pcs_pivot_motion_double_rotor_qr_int(full_in_ref_frame=data['full_in_ref_frame'], r_pivot_atom=data['r_pivot_atom'], r_pivot_atom_rev=data['r_pivot_atom_rev'], r_ln_pivot=data['r_ln_pivot'], r_inter_pivot=data['r_inter_pivot'], A=data['A'], Ri=Ri[i], Ri2=Ri2[i], pcs_theta=pcs, pcs_theta_err=data['pcs_theta_err'], missing_pcs=data['missing_pcs'])
+        pcs = data['c'] * pcs / 10.0
+
+        # Compare to the batched calculation.
+        pcs_numeric_qr_int(**data)
+        for i in range(2):
+            for j in range(4):
+                if not data['missing_pcs'][i, j]:
+                    self.assertAlmostEqual(data['pcs_theta'][i, j] / pcs[i, j], 1.0, 12)
+
+
+    def test_pcs_numeric_qr_int_rigid(self):
+        """Check that pcs_numeric_qr_int() defaults to the rigid state when no points lie in the distribution."""
+
+        # Set up, with no points in the distribution.
+        data, Ri, Ri2_prime, Ri2 = self.pcs_qr_int_setup()
+        data['mask'][:] = False
+
+        # The rigid state PCSs.
+        pcs = zeros((2, 4), float64)
+        pcs_pivot_motion_full_qr_int(full_in_ref_frame=data['full_in_ref_frame'], r_pivot_atom=data['r_pivot_atom'], r_pivot_atom_rev=data['r_pivot_atom_rev'], r_ln_pivot=data['r_ln_pivot'], A=data['A'], Ri=eye(3), pcs_theta=pcs, pcs_theta_err=data['pcs_theta_err'], missing_pcs=data['missing_pcs'])
+        pcs = data['c'] * pcs
+
+        # Compare.
+        pcs_numeric_qr_int(**data)
+        for i in range(2):
+            for j in range(4):
+                if not data['missing_pcs'][i, j]:
+                    self.assertAlmostEqual(data['pcs_theta'][i, j] / pcs[i, j], 1.0, 12)
+
+
     def test_reduce_alignment_tensor_order(self):
         """Test the alignment tensor reduction for the order identity matrix."""
 
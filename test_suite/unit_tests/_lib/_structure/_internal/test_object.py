@@ -82,3 +82,66 @@ class Test_object(UnitTestCase):
                 self.assertEqual(mol.z[j], data[i][j][3][2])
                 self.assertEqual(mol.element[j], data[i][j][4])
                 self.assertEqual(mol.bonded[j], data[i][j][5])
+
+
+    def test_coord_array(self):
+        """Test the coordinate views and bulk coordinate access of the internal structural object."""
+
+        # Initialise a structural object with two models of three atoms.
+        struct = object.Internal()
+        struct.add_model(model=1)
+        struct.add_model(model=2)
+        for i in range(3):
+            struct.add_atom(atom_name='C%i' % i, res_name='UNK', res_num=i+1, mol_name='X', pos=[[float(i), 10.0, None], [float(i), 20.0, None]], element='C')
+
+        # The list-like coordinate views.
+        mol = struct.structural_data[0].mol[0]
+        self.assertEqual(mol.x, [0.0, 1.0, 2.0])
+        self.assertEqual(mol.y, [10.0, 10.0, 10.0])
+        self.assertEqual(mol.z, [None, None, None])
+        self.assertEqual(len(mol.x), 3)
+
+        # Modifications through the views and the array should be visible in both.
+        mol.x[1] = 5.0
+        self.assertEqual(mol.coord_array()[1, 0], 5.0)
+        mol.coord_array()[2, 1] = -1.0
+        self.assertEqual(mol.y[2], -1.0)
+
+        # Contiguous selections are views.
+        view = mol.coord_array([1, 2])
+        view[0, 2] = 3.0
+        self.assertEqual(mol.z[1], 3.0)
+
+        # The bulk positions of all models.
+        coord = struct.coord_array(selection=struct.selection(atom_id='@C0,C2'))
+        self.assertEqual(coord.shape, (2, 2, 3))
+        self.assertEqual(coord[0, :, 0].tolist(), [0.0, 2.0])
+        self.assertEqual(coord[1, :, 1].tolist(), [20.0, 20.0])
+
+
+    def test_atom_loop(self):
+        """Test the per-molecule extraction of the atomic information by the atom_loop() method."""
+
+        # Initialise a structural object with two models of two molecules.
+        struct = object.Internal()
+        struct.add_model(model=1)
+        struct.add_model(model=2)
+        for mol_name in ['X', 'Y']:
+            for i in range(3):
+                struct.add_atom(atom_name='C%i' % i, res_name='UNK', res_num=i+1, mol_name=mol_name, pos=[[float(i), 10.0, 1.0], [float(i), 20.0, 3.0]], element='C')
+
+        # The selected atom information, with all model positions.
+        atoms = list(struct.atom_loop(selection=struct.selection(atom_id='@C0,C2'), mol_name_flag=True, res_num_flag=True, atom_name_flag=True, pos_flag=True, mol_index_flag=True, index_flag=True))
+        self.assertEqual(len(atoms), 4)
+        self.assertEqual([atom[:3] for atom in atoms], [('X', 1, 'C0'), ('X', 3, 'C2'), ('Y', 1, 'C0'), ('Y', 3, 'C2')])
+        self.assertEqual([atom[4:] for atom in atoms], [(0, 0), (0, 2), (1, 0), (1, 2)])
+        self.assertEqual(atoms[1][3].tolist(), [[2.0, 10.0, 1.0], [2.0, 20.0, 3.0]])
+
+        # The averaged positions.
+        pos = list(struct.atom_loop(selection=struct.selection(atom_id='#Y@C1'), pos_flag=True, ave=True))
+        self.assertEqual(len(pos), 1)
+        self.assertEqual(pos[0].tolist(), [1.0, 15.0, 2.0])
+
+        # A single model.
+        pos = list(struct.atom_loop(selection=struct.selection(atom_id='#X@C1'), pos_flag=True, model_num=2))
+        self.assertEqual(pos[0].tolist(), [[1.0, 20.0, 3.0]])
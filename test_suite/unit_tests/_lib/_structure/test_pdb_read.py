@@ -51,6 +51,30 @@ class Test_pdb_read(UnitTestCase):
         self.assertEqual(record[14], None)
 
 
+    def test_atom_block(self):
+        """Test the lib.structure.pdb_read.atom_block() function against the atom() and hetatm() functions."""
+
+        # The PDB records.
+        records = [
+            'ATOM    158  CG  GLU    11       9.590  -1.041 -11.596  1.00  0.00           C  ',
+            'ATOM    159 HE21AGLN A  12A    -10.000   2.123   0.101  0.50 12.34           H  ',
+            'HETATM  160  O   HOH   201       1.000   2.000   3.000                            ',
+            'ATOM    161  N   ALA    13       1.0     2.0     3.0'
+        ]
+
+        # Parse the block.
+        block = pdb_read.atom_block(records)
+
+        # Test the elements.
+        for i in range(len(records)):
+            if records[i][:4] == 'ATOM':
+                record = pdb_read.atom("%-80s" % records[i])
+            else:
+                record = pdb_read.hetatm("%-80s" % records[i])
+            for j in range(15):
+                self.assertEqual(block[j][i], record[j])
+
+
     def test_helix(self):
         """Test the lib.structure.pdb_read.helix() function."""
 
@@ -0,0 +1,110 @@
+###############################################################################
+#                                                                             #
+# Copyright (C) 2026 Troels E. Linnet                                         #
+#                                                                             #
+# This file is part of the program relax (http://www.nmr-relax.com).          #
+#                                                                             #
+# This program is free software: you can redistribute it and/or modify        #
+# it under the terms of the GNU General Public License as published by        #
+# the Free Software Foundation, either version 3 of the License, or           #
+# (at your option) any later version.                                         #
+#                                                                             #
+# This program is distributed in the hope that it will be useful,             #
+# but WITHOUT ANY WARRANTY; without even the implied warranty of              #
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the               #
+# GNU General Public License for more details.                                #
+#                                                                             #
+# You should have received a copy of the GNU General Public License           #
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.       #
+#                                                                             #
+###############################################################################
+
+# Python module imports.
+from itertools import product
+from numpy import array, dot, float64, linspace, sum
+from unittest import TestCase
+
+# relax module imports.
+from lib.optimisation import grid_batch, grid_points, grid_refine
+
+
+def quadratic(points):
+    """A simple quadratic function with the minimum at [1, -2], evaluating multiple points at once."""
+
+    return sum((points - array([1.0, -2.0]))**2, axis=1)
+
+
+
+class Test_optimisation(TestCase):
+    """Unit tests for the lib.optimisation relax module."""
+
+    def test_grid_batch(self):
+        """Test the grid_batch() function for a simple quadratic function."""
+
+        # The grid search.
+        x, f, count, warning = grid_batch(func_batch=quadratic, num_incs=[5, 9], lower=[-1.0, -4.0], upper=[3.0, 4.0], block_size=7)
+
+        # Checks.
+        self.assertEqual(count, 45)
+        self.assertAlmostEqual(f, 0.0)
+        self.assertAlmostEqual(x[0], 1.0)
+        self.assertAlmostEqual(x[1], -2.0)
+        self.assertEqual(warning, None)
+
+
+    def test_grid_batch_constraints(self):
+        """Test the grid_batch() function with the linear constraint x0 >= 2."""
+
+        # The constraint.
+        A = array([[1.0, 0.0]], float64)
+        b = array([2.0], float64)
+
+        # The grid search.
+        x, f, count, warning = grid_batch(func_batch=quadratic, num_incs=[5, 9], lower=[-1.0, -4.0], upper=[3.0, 4.0], A=A, b=b, block_size=10)
+
+        # Checks.
+        self.assertEqual(count, 18)
+        self.assertAlmostEqual(f, 1.0)
+        self.assertAlmostEqual(x[0], 2.0)
+        self.assertAlmostEqual(x[1], -2.0)
+
+
+    def test_grid_points(self):
+        """Test that grid_points() generates exactly the feasible points of the full grid, in the same order."""
+
+        # The constraints x0 + x1 + x2 <= 1, x0 >= x1, and x2 >= -0.5.
+        A = array([[-1.0, -1.0, -1.0], [1.0, -1.0, 0.0], [0.0, 0.0, 1.0]], float64)
+        b = array([-1.0, 0.0, -0.5], float64)
+        num_incs = [4, 5, 6]
+        lower = [-1.0, -1.0, -1.0]
+        upper = [1.0, 1.0, 1.0]
+
+        # The feasible points of the full grid, with the first dimension varying the fastest.
+        incs = [linspace(lower[i], upper[i], num_incs[i]) for i in range(3)]
+        real = []
+        for x2, x1, x0 in product(incs[2], incs[1], incs[0]):
+            point = array([x0, x1, x2], float64)
+            if (dot(A, point) - b >= 0.0).all():
+                real.append(point)
+
+        # Check different block sizes.
+        for block_size in [1, 3, 20, 10000]:
+            points = []
+            for block in grid_points(num_incs=num_incs, lower=lower, upper=upper, A=A, b=b, block_size=block_size):
+                points += list(block)
+            self.assertEqual(len(points), len(real))
+            for i in range(len(real)):
+                self.assertEqual(list(points[i]), list(real[i]))
+
+
+    def test_grid_refine(self):
+        """Test the grid_refine() function, where the coarse grid misses the minimum."""
+
+        # The grid search.
+        x, f, count, warning = grid_refine(func_batch=quadratic, num_incs=[4, 4], lower=[-3.0, -5.0], upper=[3.0, 5.0], levels=6, best=2)
+
+        # Checks.
+        self.assertAlmostEqual(x[0], 1.0, 1)
+        self.assertAlmostEqual(x[1], -2.0, 1)
+        self.assertTrue(f < 0.01)
+        self.assertEqual(warning, None)
@@ -127,6 +127,30 @@ class Test_selection(UnitTestCase):
         self.assertEqual(obj._union[0]._intersect[1].spins, [])
 
 
+    def test_Selection_cache(self):
+        """Test that the Selection objects created from the cache are identical to the original."""
+
+        # The Selection objects.
+        obj1 = Selection("#Ap4Aase:4 & :Pro@Ca")
+        obj2 = Selection("#Ap4Aase:4 & :Pro@Ca")
+
+        # Two different objects.
+        self.assertNotEqual(id(obj1), id(obj2))
+
+        # Test the highest level object.
+        self.assertEqual(obj2._union, None)
+        self.assertEqual(obj2._intersect, obj1._intersect)
+        self.assertEqual(obj2.molecules, [])
+        self.assertEqual(obj2.residues, [])
+        self.assertEqual(obj2.spins, [])
+
+        # Test the intersections.
+        self.assertEqual(obj2._intersect[0].molecules, ['Ap4Aase'])
+        self.assertEqual(obj2._intersect[0].residues, [4])
+        self.assertEqual(obj2._intersect[1].residues, ['Pro'])
+        self.assertEqual(obj2._intersect[1].spins, ['Ca'])
+
+
     def test_Selection_contains_mol1(self):
         """The Selection object "#Ap4Aase:Glu | #RNA@C8" contains the molecule 'RNA'."""
 
@@ -434,6 +458,19 @@ class Test_selection(UnitTestCase):
         self.assert_(not obj.contains_spin_id(':71@C'))
 
 
+    def test_Selection_residue_numbers(self):
+        """Test the Selection.residue_numbers() method."""
+
+        # Simple residue number selections.
+        self.assertEqual(Selection(":1-3").residue_numbers(), [1, 2, 3])
+        self.assertEqual(Selection("#Ap4Aase:4,6@N").residue_numbers(), [4, 6])
+
+        # Selections which are not simple residue number selections.
+        self.assertEqual(Selection(":Pro").residue_numbers(), None)
+        self.assertEqual(Selection("@N").residue_numbers(), None)
+        self.assertEqual(Selection(":4 & @N").residue_numbers(), None)
+
+
     def test_parse_token_single_element_num(self):
         """Test the lib.selection.parse_token() function on the string '1'."""
 
@@ -20,7 +20,8 @@
 ###############################################################################
 
 # relax module imports.
-from lib.statistics import geometric_mean, geometric_std
+from numpy import array, nan
+from lib.statistics import confidence_interval_array, geometric_mean, geometric_std, std, std_array
 from test_suite.unit_tests.base_classes import UnitTestCase
 
 
@@ -41,3 +42,46 @@ class Test_statistics(UnitTestCase):
         # Calculate the geometric std and check it.
         std = geometric_std(values=[2, 8])
         self.assertEqual(std, 2.0)
+
+
+    def test_std_array(self):
+        """Check that the std_array() function matches the std() function for each row, skipping deselected values."""
+
+        # The data.
+        values = [[1.0, 2.0, 4.0, 8.0, 16.0], [-1.0, 0.5, 3.0, 3.0, 100.0], [2.0, 2.0, 2.0, 2.0, 2.0]]
+        select = [True, True, False, True, True]
+
+        # Calculate the SDs and check them.
+        sd = std_array(values=array(values), select=array(select))
+        for i in range(len(values)):
+            self.assertAlmostEqual(sd[i], std(values=values[i], skip=select))
+
+
+    def test_std_array_nan(self):
+        """Check that the std_array() function skips the NaN values of failed simulations, using N-1 of the remaining values."""
+
+        # The data, with one failed simulation per row.
+        values = array([[1.0, 2.0, nan, 8.0, 16.0], [nan, 0.5, 3.0, 3.0, 100.0]])
+        select = array([True, True, True, True, False])
+
+        # Calculate the SDs and check them.
+        sd = std_array(values=values, select=select)
+        self.assertAlmostEqual(sd[0], std(values=[1.0, 2.0, 8.0]))
+        self.assertAlmostEqual(sd[1], std(values=[0.5, 3.0, 3.0]))
+
+
+    def test_std_array_single(self):
+        """Check that the std_array() function returns zero for a single selected value."""
+
+        # Calculate the SD and check it.
+        sd = std_array(values=array([[1.0, 5.0, 3.0]]), select=array([False, True, False]))
+        self.assertEqual(sd[0], 0.0)
+
+
+    def test_confidence_interval_array(self):
+        """Check the 50% confidence interval of the values [1, 2, ..., 9], skipping the value of 100."""
+
+        # Calculate the interval and check it.
+        lower, upper = confidence_interval_array(values=array([[1.0, 2.0, 3.0, 4.0, 100.0, 5.0, 6.0, 7.0, 8.0, 9.0]]), select=array([True, True, True, True, False, True, True, True, True, True]), level=0.5)
+        self.assertAlmostEqual(lower[0], 3.0)
+        self.assertAlmostEqual(upper[0], 7.0)
@@ -0,0 +1,191 @@
+###############################################################################
+#                                                                             #
+# Copyright (C) 2026 Troels E. Linnet                                         #
+#                                                                             #
+# This file is part of the program relax (http://www.nmr-relax.com).          #
+#                                                                             #
+# This program is free software: you can redistribute it and/or modify        #
+# it under the terms of the GNU General Public License as published by        #
+# the Free Software Foundation, either version 3 of the License, or           #
+# (at your option) any later version.                                         #
+#                                                                             #
+# This program is distributed in the hope that it will be useful,             #
+# but WITHOUT ANY WARRANTY; without even the implied warranty of              #
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the               #
+# GNU General Public License for more details.                                #
+#                                                                             #
+# You should have received a copy of the GNU General Public License           #
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.       #
+#                                                                             #
+###############################################################################
+
+# Python module imports.
+import sys
+from unittest import TestCase
+
+# relax module imports.
+from lib.compat import StringIO
+from multi.multi_processor_base import Multi_processor
+from test_suite.unit_tests._multi.test_uni_processor import Test_memo, Test_slave_command
+
+
+class Fake_processor(Multi_processor):
+    """A multi-processor with the slaves executed in turn within the master process."""
+
+    def __init__(self, processor_size):
+        """Set up the fake processor fabric.
+
+        @param processor_size:  The number of slave processors.
+        @type processor_size:   int
+        """
+
+        # The rank of the currently executing processor, and the results waiting to be received by the master.
+        self._rank = 0
+        self._results = []
+
+        # Execute the base class __init__() method.
+        super(Fake_processor, self).__init__(processor_size=processor_size, callback=None)
+
+        # Return the results one at a time, processing them immediately.
+        self.batched_returns = False
+        self.threaded_result_processing = False
+
+
+    def assert_on_master(self):
+        """The fake fabric always runs on the master."""
+
+
+    def master_queue_command(self, command, dest):
+        """Execute the chunk of commands as the slave processor of the given rank.
+
+        @param command: The chunk of slave commands.
+        @type command:  list of Slave_command instances
+        @param dest:    The rank of the slave processor.
+        @type dest:     int
+        """
+
+        # Switch to the slave.
+        self._rank = dest
+
+        # Execute each command, one by one.
+        for i in range(len(command)):
+            command[i].run(self, i == len(command)-1)
+
+        # Switch back to the master.
+        self._rank = 0
+
+
+    def master_receive_result(self):
+        """Return the oldest result from the slaves.
+
+        @return:    The result command.
+        @rtype:     Result_command instance
+        """
+
+        return self._results.pop(0)
+
+
+    def rank(self):
+        """The rank of the currently executing processor.
+
+        @return:    The rank.
+        @rtype:     int
+        """
+
+        return self._rank
+
+
+    def return_result_command(self, result_object):
+        """Store the slave result for the master to receive.
+
+        @param result_object:   The result command.
+        @type result_object:    Result_command instance
+        """
+
+        self._results.append(result_object)
+
+
+
+class Test_processor(TestCase):
+    """Unit tests for the multi.processor relax module."""
+
+    def setUp(self):
+        """Set up the fake processor with two slaves."""
+
+        # The processor.
+        self.processor = Fake_processor(processor_size=2)
+
+
+    def run_queue(self, values=None, results=None):
+        """Queue the slave commands and run the queue, capturing the printout.
+
+        @keyword values:    The values for the slave commands to return.
+        @type values:       list of int
+        @keyword results:   The list for the result commands to append to.
+        @type results:      list
+        @return:            The printout of the queue run.
+        @rtype:             str
+        """
+
+        # Queue the commands.
+        for value in values:
+            self.processor.add_to_queue(Test_slave_command(value=value), Test_memo(results=results))
+
+        # Run the queue, capturing STDOUT.
+        stdout = sys.stdout
+        sys.stdout = StringIO()
+        try:
+            self.processor.run_queue()
+            text = sys.stdout.getvalue()
+        finally:
+            sys.stdout = stdout
+
+        # Return the printout.
+        return text
+
+
+    def test_run_queue_utilisation(self):
+        """Test the utilisation printout at the end of Processor.run_queue() for the 'static' dispatch mode."""
+
+        # Run the queue.
+        results = []
+        text = self.run_queue(values=[1, 2, 3, 4], results=results)
+
+        # All commands have been executed.
+        self.assertEqual(sorted(results), [1, 2, 3, 4])
+        self.assertFalse(self.processor.is_queued())
+
+        # One chunk per slave.
+        self.assertEqual(sorted(self.processor.utilisation.keys()), [1, 2])
+        self.assertEqual(self.processor.utilisation[1][1], 1)
+        self.assertEqual(self.processor.utilisation[2][1], 1)
+
+        # The printout.
+        lines = text.strip().split('\n')
+        self.assertEqual(len(lines), 4)
+        self.assertTrue(lines[0].startswith("Slave processor utilisation (static dispatch, "))
+        self.assertEqual(lines[1].split(), ["Rank", "Commands", "Busy", "time", "(s)", "Utilisation"])
+        for i in range(2):
+            row = lines[i+2].split()
+            self.assertEqual(row[:2], [str(i+1), '1'])
+            self.assertTrue(row[3].endswith('%'))
+
+
+    def test_run_queue_utilisation_dynamic(self):
+        """Test the utilisation printout at the end of Processor.run_queue() for the 'dynamic' dispatch mode."""
+
+        # Run the queue, one command at a time.
+        self.processor.dispatch_mode = 'dynamic'
+        results = []
+        text = self.run_queue(values=[1, 2, 3, 4, 5], results=results)
+
+        # All commands have been executed.
+        self.assertEqual(sorted(results), [1, 2, 3, 4, 5])
+
+        # The command counts of all slaves.
+        self.assertEqual(self.processor.utilisation[1][1] + self.processor.utilisation[2][1], 5)
+
+        # The printout.
+        self.assertIn("Slave processor utilisation (dynamic dispatch, ", text)
+        counts = [int(line.split()[1]) for line in text.strip().split('\n')[2:]]
+        self.assertEqual(sum(counts), 5)
@@ -0,0 +1,185 @@
+###############################################################################
+#                                                                             #
+# Copyright (C) 2026 Troels E. Linnet                                         #
+#                                                                             #
+# This file is part of the program relax (http://www.nmr-relax.com).          #
+#                                                                             #
+# This program is free software: you can redistribute it and/or modify        #
+# it under the terms of the GNU General Public License as published by        #
+# the Free Software Foundation, either version 3 of the License, or           #
+# (at your option) any later version.                                         #
+#                                                                             #
+# This program is distributed in the hope that it will be useful,             #
+# but WITHOUT ANY WARRANTY; without even the implied warranty of              #
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the               #
+# GNU General Public License for more details.                                #
+#                                                                             #
+# You should have received a copy of the GNU General Public License           #
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.       #
+#                                                                             #
+###############################################################################
+
+# Python module imports.
+from unittest import TestCase
+
+# relax module imports.
+from multi.memo import Memo
+from multi.result_commands import Result_command
+from multi.slave_commands import Slave_command
+from multi.uni_processor import Uni_processor
+
+
+class Test_memo(Memo):
+    """The memo object holding the list of results."""
+
+    def __init__(self, results=None):
+        """Store the results list.
+
+        @keyword results:   The list to append the slave results to.
+        @type results:      list
+        """
+
+        # Store the argument.
+        self.results = results
+
+
+
+class Test_result_command(Result_command):
+    """The result command storing the slave result in the memo."""
+
+    def __init__(self, processor, memo_id=None, value=None, completed=True):
+        """Store the slave result.
+
+        @param processor:   The slave processor object.
+        @type processor:    Processor instance
+        @keyword memo_id:   The ID of the corresponding memo object.
+        @type memo_id:      int
+        @keyword value:     The slave result.
+        @type value:        int
+        @keyword completed: A flag saying if the calculation on the slave processor completed correctly.
+        @type completed:    bool
+        """
+
+        # Execute the base class __init__() method.
+        super(Test_result_command, self).__init__(processor=processor, completed=completed)
+
+        # Store the arguments.
+        self.memo_id = memo_id
+        self.value = value
+
+
+    def run(self, processor, memo):
+        """Append the slave result to the list in the memo.
+
+        @param processor:   The processor object.
+        @type processor:    Processor instance
+        @param memo:        The slave's corresponding memo object.
+        @type memo:         Memo instance
+        """
+
+        # Store the result.
+        memo.results.append(self.value)
+
+
+
+class Test_slave_command(Slave_command):
+    """The slave command returning a single value."""
+
+    def __init__(self, value=None):
+        """Set up the slave command.
+
+        @keyword value: The value to return to the master.
+        @type value:    int
+        """
+
+        # Execute the base class __init__() method.
+        super(Test_slave_command, self).__init__()
+
+        # Store the argument.
+        self.value = value
+
+
+    def run(self, processor, completed):
+        """Return the value to the master.
+
+        @param processor:   The processor object.
+        @type processor:    Processor instance
+        @param completed:   The flag stating if this is the last command of the queue.
+        @type completed:    bool
+        """
+
+        # Return the result.
+        processor.return_object(Test_result_command(processor=processor, memo_id=self.memo_id, value=self.value, completed=completed))
+
+
+
+class Test_uni_processor(TestCase):
+    """Unit tests for the multi.uni_processor relax module."""
+
+    def setUp(self):
+        """Set up the uni-processor."""
+
+        # The processor.
+        self.processor = Uni_processor(processor_size=1, callback=None)
+
+
+    def queue(self, values=None, results=None):
+        """Add slave commands to the processor queue.
+
+        @keyword values:    The values for the slave commands to return.
+        @type values:       list of int
+        @keyword results:   The list for the result commands to append to.
+        @type results:      list
+        """
+
+        # Loop over the values.
+        for value in values:
+            self.processor.add_to_queue(Test_slave_command(value=value), Test_memo(results=results))
+
+
+    def test_run_queue(self):
+        """Test the execution of the queue by Uni_processor.run_queue()."""
+
+        # Queue and run the commands.
+        results = []
+        self.queue(values=[1, 2, 3], results=results)
+        self.processor.run_queue()
+
+        # Checks.
+        self.assertEqual(results, [1, 2, 3])
+        self.assertFalse(self.processor.is_queued())
+        self.assertEqual(self.processor.memo_map, {})
+
+
+    def test_run_queue_held(self):
+        """Test Uni_processor.run_queue() with the queue held and released."""
+
+        # Hold the queue.
+        results = []
+        self.processor.hold_queue()
+
+        # Queue and run the commands from multiple sources.
+        self.queue(values=[1, 2], results=results)
+        self.processor.run_queue()
+        self.queue(values=[3], results=results)
+        self.processor.run_queue()
+
+        # Nothing has been executed.
+        self.assertEqual(results, [])
+        self.assertTrue(self.processor.is_queued())
+        self.assertEqual(len(self.processor.command_queue), 3)
+        self.assertEqual(len(self.processor.memo_map), 3)
+
+        # Release the queue.
+        self.processor.release_queue()
+
+        # All commands have been executed together.
+        self.assertEqual(results, [1, 2, 3])
+        self.assertFalse(self.processor.queue_held)
+        self.assertFalse(self.processor.is_queued())
+        self.assertEqual(self.processor.memo_map, {})
+
+        # The queue is no longer held.
+        self.queue(values=[4], results=results)
+        self.processor.run_queue()
+        self.assertEqual(results, [1, 2, 3, 4])
@@ -0,0 +1,95 @@
+###############################################################################
+#                                                                             #
+# Copyright (C) 2026 Troels E. Linnet                                         #
+#                                                                             #
+# This file is part of the program relax (http://www.nmr-relax.com).          #
+#                                                                             #
+# This program is free software: you can redistribute it and/or modify        #
+# it under the terms of the GNU General Public License as published by        #
+# the Free Software Foundation, either version 3 of the License, or           #
+# (at your option) any later version.                                         #
+#                                                                             #
+# This program is distributed in the hope that it will be useful,             #
+# but WITHOUT ANY WARRANTY; without even the implied warranty of              #
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the               #
+# GNU General Public License for more details.                                #
+#                                                                             #
+# You should have received a copy of the GNU General Public License           #
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.       #
+#                                                                             #
+###############################################################################
+
+# relax module imports.
+from data_store import Relax_data_store; ds = Relax_data_store()
+from lib.statistics import std
+from pipe_control.error_analysis import monte_carlo_error_analysis
+from pipe_control.mol_res_spin import create_spin, return_spin
+from test_suite.unit_tests.base_classes import UnitTestCase
+
+
+class Test_error_analysis(UnitTestCase):
+    """Unit tests for the functions of the 'pipe_control.error_analysis' module."""
+
+    def setUp(self):
+        """Set up a relaxation curve-fitting data pipe with two spins and 5 simulations."""
+
+        # Add a data pipe.
+        ds.add(pipe_name='orig', pipe_type='relax_fit')
+
+        # The simulation state.
+        cdp.sim_state = True
+        cdp.sim_number = 5
+
+        # Two spins with the exponential model.
+        for i in range(2):
+            create_spin(spin_num=1, spin_name='N', res_num=i+1, res_name='Gly')
+            spin = return_spin(spin_id=':%i@N' % (i+1))
+            spin.model = 'exp'
+            spin.params = ['rx', 'i0']
+            spin.select_sim = [True, True, True, True, True]
+
+
+    def test_monte_carlo_error_analysis(self):
+        """Check the errors of pipe_control.error_analysis.monte_carlo_error_analysis() with deselected simulations."""
+
+        # The simulation values, with the last simulation of the first spin deselected.
+        spin1 = return_spin(spin_id=':1@N')
+        spin1.rx_sim = [1.0, 2.0, 3.0, 5.0, 100.0]
+        spin1.i0_sim = [10.0, 20.0, 30.0, 50.0, 1000.0]
+        spin1.select_sim[4] = False
+        spin2 = return_spin(spin_id=':2@N')
+        spin2.rx_sim = [1.0, 1.5, 2.5, 2.0, 3.0]
+        spin2.i0_sim = [100.0, 110.0, 90.0, 105.0, 95.0]
+
+        # The error analysis.
+        monte_carlo_error_analysis()
+
+        # Checks.
+        self.assertAlmostEqual(spin1.rx_err, std(values=[1.0, 2.0, 3.0, 5.0]))
+        self.assertAlmostEqual(spin1.i0_err, std(values=[10.0, 20.0, 30.0, 50.0]))
+        self.assertAlmostEqual(spin2.rx_err, std(values=spin2.rx_sim))
+        self.assertAlmostEqual(spin2.i0_err, std(values=spin2.i0_sim))
+        self.assertFalse(cdp.sim_state)
+
+
+    def test_monte_carlo_error_analysis_failed_sim(self):
+        """Check that failed simulations, with the parameter values of None, are skipped by pipe_control.error_analysis.monte_carlo_error_analysis()."""
+
+        # The simulation values, with the third simulation of the first spin having failed.
+        spin1 = return_spin(spin_id=':1@N')
+        spin1.rx_sim = [1.0, 2.0, None, 4.0, 8.0]
+        spin1.i0_sim = [10.0, 20.0, None, 40.0, 80.0]
+        spin2 = return_spin(spin_id=':2@N')
+        spin2.rx_sim = [1.0, 1.5, 2.5, 2.0, 3.0]
+        spin2.i0_sim = [100.0, 110.0, 90.0, 105.0, 95.0]
+
+        # The error analysis, including the statistics printout.
+        monte_carlo_error_analysis(conf_level=0.9, covariance=True)
+
+        # The N-1 normalisation uses the 4 remaining simulations.
+        self.assertAlmostEqual(spin1.rx_err, std(values=[1.0, 2.0, 4.0, 8.0]))
+        self.assertAlmostEqual(spin1.i0_err, std(values=[10.0, 20.0, 40.0, 80.0]))
+
+        # The second spin is unaffected.
+        self.assertAlmostEqual(spin2.rx_err, std(values=spin2.rx_sim))
+        self.assertAlmostEqual(spin2.i0_err, std(values=spin2.i0_sim))
@@ -20,9 +20,15 @@
 ###############################################################################
 
 # Python module imports.
+from numpy import array, float64
+from tempfile import mktemp
 from unittest import TestCase
 
 # relax module imports.
+from data_store import Relax_data_store; ds = Relax_data_store()
+from lib.io import delete
+from pipe_control import pipes
+from pipe_control.reset import reset
 import pipe_control.state
 from test_suite.unit_tests.state_testing_base import State_base_class
 
@@ -33,3 +39,85 @@ class Test_state(State_base_class, TestCase):
 
     # Place the pipe_control.state module into the class namespace.
     state = pipe_control.state
+
+
+    def test_save_load_binary(self):
+        """The saving and loading of the relax data store in the binary format.
+
+        This tests the normal operation of the pipe_control.state.save_state() and pipe_control.state.load_state() functions with the binary format.
+        """
+
+        # Create a temporary file name.
+        ds.tmpfile = mktemp()
+        file_name = ds.tmpfile
+
+        # Add a data pipe with some data to the data store.
+        ds.add(pipe_name='orig', pipe_type='mf')
+        dp = pipes.get_pipe('orig')
+        dp.x = 1
+        dp.floats = [0.1*i for i in range(20)]
+        dp.matrix = array([[1.0/(i+j+1) for j in range(4)] for i in range(3)], float64)
+        ds.y = 'Hello'
+
+        # Save the state.
+        self.state.save_state(state=file_name, format='binary', force=True)
+
+        # Reset and load the state.
+        reset()
+        self.state.load_state(state=file_name)
+
+        # Test the contents of the restored singleton.
+        dp = pipes.get_pipe('orig')
+        self.assertEqual(list(ds.keys()), ['orig'])
+        self.assertEqual(dp.x, 1)
+        self.assertEqual(ds.y, 'Hello')
+        self.assertEqual(dp.floats, [0.1*i for i in range(20)])
+        self.assert_(isinstance(dp.floats, list))
+        self.assertEqual(dp.matrix.dtype, float64)
+        self.assertEqual(dp.matrix.shape, (3, 4))
+        for i in range(3):
+            for j in range(4):
+                self.assertEqual(dp.matrix[i, j], 1.0/(i+j+1))
+
+        # Clean up.
+        delete(file_name, fail=False)
+
+
+    def test_save_load_binary_same_path(self):
+        """Loading a binary state and saving it back to the same file, in both formats.
+
+        The arrays of the loaded binary file are memory-mapped from the file, so the file must not be truncated when it is overwritten.
+        """
+
+        # Create a temporary file name.
+        ds.tmpfile = mktemp()
+        file_name = ds.tmpfile
+
+        # Add a data pipe with a large array to the data store.
+        ds.add(pipe_name='orig', pipe_type='mf')
+        dp = pipes.get_pipe('orig')
+        dp.matrix = array([[i*100.0 + j for j in range(100)] for i in range(200)], float64)
+
+        # Save the state.
+        self.state.save_state(state=file_name, format='binary', force=True)
+
+        # Loop over the formats.
+        for format in ['binary', 'xml']:
+            # Load the state and save it back to the same file.
+            reset()
+            self.state.load_state(state=file_name)
+            self.state.save_state(state=file_name, format=format, compress_type=0, force=True)
+
+            # Reload and check the array.
+            reset()
+            self.state.load_state(state=file_name)
+            dp = pipes.get_pipe('orig')
+            self.assertEqual(dp.matrix.shape, (200, 100))
+            self.assertEqual(dp.matrix[0, 0], 0.0)
+            self.assertEqual(dp.matrix[199, 99], 19999.0)
+
+            # Restore the binary file for the next format.
+            self.state.save_state(state=file_name, format='binary', force=True)
+
+        # Clean up.
+        delete(file_name, fail=False)
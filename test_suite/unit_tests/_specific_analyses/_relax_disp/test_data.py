@@ -28,7 +28,7 @@ from data_store import Relax_data_store; ds = Relax_data_store()
 from math import atan, pi
 from pipe_control import state
 from pipe_control.mol_res_spin import get_spin_ids, return_spin
-from specific_analyses.relax_disp.data import calc_rotating_frame_params, count_relax_times, find_intensity_keys, get_curve_type, has_exponential_exp_type, loop_exp_frq, loop_exp_frq_offset, loop_exp_frq_offset_point, loop_exp_frq_offset_point_time, loop_time, return_offset_data, return_spin_lock_nu1
+from specific_analyses.relax_disp.data import calc_rotating_frame_params, count_relax_times, find_intensity_keys, get_curve_type, has_exponential_exp_type, loop_exp_frq, loop_exp_frq_offset, loop_exp_frq_offset_point, loop_exp_frq_offset_point_time, loop_time, relax_time, return_offset_data, return_packed_layout, return_param_key_from_data, return_r2eff_arrays, return_spin_lock_nu1
 from status import Status; status = Status()
 from test_suite.unit_tests.base_classes import UnitTestCase
 
@@ -679,6 +679,37 @@ class Test_data(UnitTestCase):
                 count += 1
 
 
+    def test_return_packed_layout(self):
+        """Unit test of the return_packed_layout() function and its cache.
+
+        This uses the data of the saved state attached to U{bug #21665<https://web.archive.org/web/https://gna.org/bugs/?21665>}.
+        """
+
+        # Load the state.
+        statefile = status.install_path + sep+'test_suite'+sep+'shared_data'+sep+'dispersion'+sep+'bug_21665.bz2'
+        state.load_state(statefile, force=True)
+
+        # The layout.
+        layout = return_packed_layout()
+
+        # Check the data keys and relaxation times against the loops.
+        count = 0
+        for exp_type, frq, offset, point, ei, mi, oi, di in loop_exp_frq_offset_point(return_indices=True):
+            self.assertEqual(layout.keys[ei][mi][oi][di], return_param_key_from_data(exp_type=exp_type, frq=frq, offset=offset, point=point))
+            self.assertEqual(list(layout.relax_times[ei][mi][oi][di]), list(loop_time(exp_type=exp_type, frq=frq, offset=offset, point=point)))
+            count += 1
+        self.assertEqual(count, 34)
+        self.assertEqual(layout.exp_types, ['SQ CPMG'])
+
+        # The layout is cached.
+        self.assertTrue(return_packed_layout() is layout)
+
+        # Changing the metadata invalidates the cache.
+        relax_time(time=0.05, spectrum_id=cdp.spectrum_ids[0])
+        layout2 = return_packed_layout()
+        self.assertFalse(layout2 is layout)
+
+
     def test_return_offset_data(self):
         """Unit test of the return_offset_data() function for R1rho setup.
 
@@ -746,3 +777,119 @@ class Test_data(UnitTestCase):
 
 
 
+
+
+    def test_return_r2eff_arrays_all_missing(self):
+        """Unit test of the return_r2eff_arrays() function for a spin with all R2eff values missing and no errors.
+
+        This uses the data of the saved state attached to U{bug #21665<https://web.archive.org/web/https://gna.org/bugs/?21665>}.
+        """
+
+        # Load the state.
+        statefile = status.install_path + sep+'test_suite'+sep+'shared_data'+sep+'dispersion'+sep+'bug_21665.bz2'
+        state.load_state(statefile, force=True)
+
+        # The first two selected spins.
+        spin_ids = []
+        spins = []
+        for spin_id in get_spin_ids():
+            spin = return_spin(spin_id=spin_id)
+            if spin.select:
+                spin_ids.append(spin_id)
+                spins.append(spin)
+        spin_ids = spin_ids[:2]
+        spins = spins[:2]
+
+        # R2eff values and errors for the second spin, and an empty R2eff dictionary without errors for the first.
+        spins[0].r2eff = {}
+        if hasattr(spins[0], 'r2eff_err'):
+            del spins[0].r2eff_err
+        spins[1].r2eff = {}
+        spins[1].r2eff_err = {}
+        for exp_type, frq, offset, point, ei, mi, oi, di in loop_exp_frq_offset_point(return_indices=True):
+            key = return_param_key_from_data(exp_type=exp_type, frq=frq, offset=offset, point=point)
+            spins[1].r2eff[key] = 10.0 + di
+            spins[1].r2eff_err[key] = 0.5
+
+        # The data.
+        values, errors, missing, frqs, frqs_H, exp_types, relax_times = return_r2eff_arrays(spins=spins, spin_ids=spin_ids, fields=cdp.spectrometer_frq_list, field_count=cdp.spectrometer_frq_count)
+
+        # Check the data of both spins.
+        for exp_type, frq, offset, point, ei, mi, oi, di in loop_exp_frq_offset_point(return_indices=True):
+            # The first spin is missing all data.
+            self.assertEqual(missing[ei][0][mi][oi][di], 1)
+            self.assertEqual(values[ei][0][mi][oi][di], 0.0)
+            self.assertEqual(errors[ei][0][mi][oi][di], 1.0)
+
+            # The second spin has all data.
+            self.assertEqual(missing[ei][1][mi][oi][di], 0)
+            self.assertEqual(values[ei][1][mi][oi][di], 10.0 + di)
+            self.assertEqual(errors[ei][1][mi][oi][di], 0.5)
+
+
+    def test_return_r2eff_arrays_cache(self):
+        """Unit test of the caching of the packed data by the return_r2eff_arrays() function.
+
+        This uses the data of the saved state attached to U{bug #21665<https://web.archive.org/web/https://gna.org/bugs/?21665>}.
+        """
+
+        # Load the state.
+        statefile = status.install_path + sep+'test_suite'+sep+'shared_data'+sep+'dispersion'+sep+'bug_21665.bz2'
+        state.load_state(statefile, force=True)
+
+        # The first selected spin.
+        for spin_id in get_spin_ids():
+            spin = return_spin(spin_id=spin_id)
+            if spin.select:
+                break
+
+        # R2eff values and errors, and two simulations.
+        spin.r2eff = {}
+        spin.r2eff_err = {}
+        for exp_type, frq, offset, point, ei, mi, oi, di in loop_exp_frq_offset_point(return_indices=True):
+            key = return_param_key_from_data(exp_type=exp_type, frq=frq, offset=offset, point=point)
+            spin.r2eff[key] = 10.0 + di
+            spin.r2eff_err[key] = 0.5
+        spin.r2eff_sim = []
+        for i in range(2):
+            spin.r2eff_sim.append({})
+            for key in spin.r2eff:
+                spin.r2eff_sim[i][key] = spin.r2eff[key] + i + 1.0
+
+        # The data.
+        args = {'spins': [spin], 'spin_ids': [spin_id], 'fields': cdp.spectrometer_frq_list, 'field_count': cdp.spectrometer_frq_count}
+        values, errors, missing, frqs, frqs_H, exp_types, relax_times = return_r2eff_arrays(**args)
+        values_sim, errors_sim, missing_sim, frqs, frqs_H, exp_types, relax_times = return_r2eff_arrays(sim_index=1, **args)
+
+        # The measured and simulation values are taken from the same packed data.
+        self.assertTrue(errors_sim is errors)
+        self.assertTrue(missing_sim is missing)
+        layout = return_packed_layout()
+        packed = layout.data[(spin_id,)]
+        for exp_type, frq, offset, point, ei, mi, oi, di in loop_exp_frq_offset_point(return_indices=True):
+            key = return_param_key_from_data(exp_type=exp_type, frq=frq, offset=offset, point=point)
+            self.assertEqual(packed.values[ei][0][mi][oi].shape[0], 3)
+            if key in spin.r2eff:
+                self.assertEqual(values[ei][0][mi][oi][di], spin.r2eff[key])
+                self.assertEqual(values_sim[ei][0][mi][oi][di], spin.r2eff[key] + 2.0)
+
+        # Changing the simulation data repacks the data.
+        key = list(spin.r2eff.keys())[0]
+        spin.r2eff_sim[0][key] = 100.0
+        return_r2eff_arrays(sim_index=1, **args)
+        self.assertTrue(layout.data[(spin_id,)] is packed)
+        return_r2eff_arrays(sim_index=0, **args)
+        self.assertFalse(layout.data[(spin_id,)] is packed)
+        packed = layout.data[(spin_id,)]
+
+        # Changing the data repacks the data.
+        spin.r2eff[key] = 50.0
+        values, errors, missing, frqs, frqs_H, exp_types, relax_times = return_r2eff_arrays(**args)
+        self.assertFalse(layout.data[(spin_id,)] is packed)
+        for exp_type, frq, offset, point, ei, mi, oi, di in loop_exp_frq_offset_point(return_indices=True):
+            if return_param_key_from_data(exp_type=exp_type, frq=frq, offset=offset, point=point) == key:
+                self.assertEqual(values[ei][0][mi][oi][di], 50.0)
+
+        # Changing the metadata discards the packed data.
+        relax_time(time=0.05, spectrum_id=cdp.spectrum_ids[0])
+        self.assertEqual(return_packed_layout().data, {})
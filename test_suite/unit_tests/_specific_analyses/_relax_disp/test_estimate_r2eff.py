@@ -0,0 +1,111 @@
+###############################################################################
+#                                                                             #
+# Copyright (C) 2026 Troels E. Linnet                                         #
+#                                                                             #
+# This file is part of the program relax (http://www.nmr-relax.com).          #
+#                                                                             #
+# This program is free software: you can redistribute it and/or modify        #
+# it under the terms of the GNU General Public License as published by        #
+# the Free Software Foundation, either version 3 of the License, or           #
+# (at your option) any later version.                                         #
+#                                                                             #
+# This program is distributed in the hope that it will be useful,             #
+# but WITHOUT ANY WARRANTY; without even the implied warranty of              #
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the               #
+# GNU General Public License for more details.                                #
+#                                                                             #
+# You should have received a copy of the GNU General Public License           #
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.       #
+#                                                                             #
+###############################################################################
+
+# Python module imports.
+from numpy import array, diag, exp, float64, ones, sqrt, zeros
+from unittest import TestCase
+
+# relax module imports.
+from lib.statistics import multifit_covar
+from specific_analyses.relax_disp.estimate_r2eff import Exp, covariance_batch, estimate_x0_exp_batch, minimise_batch
+
+
+class Test_estimate_r2eff(TestCase):
+    """Unit tests for the stacked exponential curve functions of the specific_analyses.relax_disp.estimate_r2eff module."""
+
+    def setUp(self):
+        """Set up a number of exponential curves of different lengths, with small deterministic perturbations."""
+
+        # The curve parameters [r2eff, i0] and lengths.
+        self.real = array([[15.0, 20000.0], [12.0, 50000.0], [5.0, 1000.0], [30.0, 90000.0]], float64)
+        self.lengths = [7, 5, 6, 4]
+
+        # The padded arrays.
+        times = [0.01, 0.02, 0.04, 0.06, 0.08, 0.10, 0.12]
+        perturb = [1.01, 0.99, 1.005, 0.995, 1.02, 0.98, 1.0]
+        self.times = zeros((4, 7), float64)
+        self.values = zeros((4, 7), float64)
+        self.errors = ones((4, 7), float64)
+        self.mask = zeros((4, 7), bool)
+        for i in range(4):
+            for j in range(self.lengths[i]):
+                self.times[i, j] = times[j]
+                self.values[i, j] = self.real[i, 1] * exp(-self.real[i, 0] * times[j]) * perturb[j]
+                self.errors[i, j] = 0.02 * self.real[i, 1]
+                self.mask[i, j] = True
+
+
+    def test_covariance_batch(self):
+        """Compare covariance_batch() to lib.statistics.multifit_covar() for each curve."""
+
+        # The stacked covariance matrices.
+        covar = covariance_batch(params=self.real, times=self.times, errors=self.errors, mask=self.mask)
+
+        # Check each curve.
+        E = Exp(verbosity=0)
+        for i in range(4):
+            # The single curve covariance.
+            n = self.lengths[i]
+            J = E.func_exp_grad(params=self.real[i], times=self.times[i, :n])
+            covar_i = multifit_covar(J=J, weights=1. / self.errors[i, :n]**2)
+
+            # The errors.
+            for k in range(2):
+                self.assertAlmostEqual(sqrt(covar[i, k, k]) / sqrt(diag(covar_i)[k]), 1.0, 10)
+
+
+    def test_estimate_x0_exp_batch(self):
+        """Compare estimate_x0_exp_batch() to Exp.estimate_x0_exp() for each curve."""
+
+        # The stacked estimates.
+        x0 = estimate_x0_exp_batch(times=self.times, values=self.values, mask=self.mask)
+
+        # Check each curve.
+        E = Exp(verbosity=0)
+        for i in range(4):
+            n = self.lengths[i]
+            x0_i = E.estimate_x0_exp(times=self.times[i, :n], values=self.values[i, :n])
+            self.assertAlmostEqual(x0[i, 0] / x0_i[0], 1.0, 10)
+            self.assertAlmostEqual(x0[i, 1] / x0_i[1], 1.0, 10)
+
+
+    def test_minimise_batch(self):
+        """Check that minimise_batch() finds the minimum of each curve."""
+
+        # Fit all curves.
+        params, chi2, iter_count = minimise_batch(times=self.times, values=self.values, errors=self.errors, mask=self.mask)
+
+        # Check each curve.
+        E = Exp(verbosity=0)
+        for i in range(4):
+            # The chi-squared value.
+            n = self.lengths[i]
+            chi2_i = E.func_exp_chi2(params=params[i], times=self.times[i, :n], values=self.values[i, :n], errors=self.errors[i, :n])
+            self.assertAlmostEqual(chi2[i], chi2_i, 10)
+
+            # The gradient is zero at the minimum.
+            grad = E.func_exp_chi2_grad(params=params[i], times=self.times[i, :n], values=self.values[i, :n], errors=self.errors[i, :n])
+            self.assertAlmostEqual(grad[0] * params[i, 0] / chi2[i], 0.0, 5)
+            self.assertAlmostEqual(grad[1] * params[i, 1] / chi2[i], 0.0, 5)
+
+            # The parameters are close to the real values.
+            self.assertAlmostEqual(params[i, 0] / self.real[i, 0], 1.0, 1)
+            self.assertAlmostEqual(params[i, 1] / self.real[i, 1], 1.0, 1)
@@ -0,0 +1,190 @@
+###############################################################################
+#                                                                             #
+# Copyright (C) 2026 Troels E. Linnet                                         #
+#                                                                             #
+# This file is part of the program relax (http://www.nmr-relax.com).          #
+#                                                                             #
+# This program is free software: you can redistribute it and/or modify        #
+# it under the terms of the GNU General Public License as published by        #
+# the Free Software Foundation, either version 3 of the License, or           #
+# (at your option) any later version.                                         #
+#                                                                             #
+# This program is distributed in the hope that it will be useful,             #
+# but WITHOUT ANY WARRANTY; without even the implied warranty of              #
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the               #
+# GNU General Public License for more details.                                #
+#                                                                             #
+# You should have received a copy of the GNU General Public License           #
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.       #
+#                                                                             #
+###############################################################################
+
+# Python module imports.
+from math import acos, cos, pi, sin
+from numpy import array, float32, float64, load, ones, savez, zeros
+from os import listdir, sep
+from shutil import rmtree
+from tempfile import mkdtemp
+from unittest import TestCase
+
+# relax module imports.
+from extern.sobol.sobol_lib import i4_sobol_generate, i4_sobol_generate_vect
+from lib.frame_order.variables import MODEL_DOUBLE_ROTOR, MODEL_ISO_CONE, MODEL_ISO_CONE_TORSIONLESS, MODEL_ROTOR
+from lib.geometry.rotations import axis_angle_to_R, tilt_torsion_to_R
+from target_functions import frame_order
+from target_functions.frame_order import Frame_order, Sobol_data
+
+
+class Test_frame_order(TestCase):
+    """Unit tests for the target_functions.frame_order relax module."""
+
+    def setUp(self):
+        """Reset the Sobol' data and create a temporary cache directory."""
+
+        # Reset the module level Sobol' data storage.
+        frame_order.sobol_data = Sobol_data()
+
+        # The cache directory.
+        self.tmpdir = mkdtemp()
+
+
+    def tearDown(self):
+        """Reset the Sobol' data and remove the temporary cache directory."""
+
+        # Reset the module level Sobol' data storage.
+        frame_order.sobol_data = Sobol_data()
+
+        # Remove the cache directory.
+        rmtree(self.tmpdir)
+
+
+    def setup_target(self, model=None, num_params=None, cache_dir=None):
+        """Set up the frame order target function class, creating the Sobol' data.
+
+        @keyword model:         The frame order model.
+        @type model:            str
+        @keyword num_params:    The number of motional parameters of the model.
+        @type num_params:       int
+        @keyword cache_dir:     The Sobol' data cache directory.
+        @type cache_dir:        str or None
+        @return:                The target function class instance.
+        @rtype:                 Frame_order instance
+        """
+
+        # Synthetic PCS data for 2 alignments and 3 spins.
+        pcs = array([[1.0, -0.5, 0.2], [0.3, 0.7, -1.0]], float64)
+        pos = array([[30.0, 1.0, 2.0], [25.0, -3.0, 0.0], [35.0, 2.0, -4.0]], float64)
+
+        # The parameters.
+        init_params = array([0.5, -0.2, 0.1, 0.2, 0.4, -0.3] + [0.5]*num_params, float64)
+
+        # Initialise and return the target function class.
+        return Frame_order(model=model, init_params=init_params, full_tensors=array([1e-4, -2e-4, 3e-4, 1e-4, -1e-4]*2, float64), full_in_ref_frame=array([1, 0]), pcs=pcs, pcs_errors=ones((2, 3), float64)*0.1, pcs_weights=ones((2, 3), float64), atomic_pos=pos, temp=array([298.0, 298.0]), frq=array([600e6, 800e6]), paramag_centre=array([1.0, 2.0, 3.0]), pivot=array([5.0, 5.0, 5.0]), com=array([20.0, 1.0, 2.0]), sobol_max_points=2, sobol_oversample=1, sobol_cache_dir=cache_dir)
+
+
+    def test_create_sobol_data(self):
+        """Check the angles and rotation matrices of create_sobol_data() against the scalar Sobol' generator."""
+
+        # The models, their number of motional parameters, and Sobol' dimensions.
+        models = [
+            [MODEL_ISO_CONE, 4, ['theta', 'phi', 'sigma']],
+            [MODEL_ISO_CONE_TORSIONLESS, 3, ['theta', 'phi']],
+            [MODEL_ROTOR, 2, ['sigma']],
+            [MODEL_DOUBLE_ROTOR, 5, ['sigma', 'sigma2']]
+        ]
+
+        # Loop over the models.
+        for model, num_params, dims in models:
+            # Set up the target function.
+            self.setup_target(model=model, num_params=num_params)
+            data = frame_order.sobol_data
+            m = len(dims)
+            total_num = 2 * 10**m
+            self.assertEqual(data.model, model)
+            self.assertEqual(data.total_num, total_num)
+
+            # The scalar Sobol' points.
+            points = i4_sobol_generate(m, total_num, 1000)
+
+            # Check each point.
+            for i in range(total_num):
+                # The angles.
+                angles = {}
+                for j in range(m):
+                    if dims[j] == 'theta':
+                        angles[dims[j]] = acos(2.0*points[j, i] - 1.0)
+                    elif dims[j] == 'phi':
+                        angles[dims[j]] = 2.0 * pi * points[j, i]
+                    else:
+                        angles[dims[j]] = 2.0 * pi * (points[j, i] - 0.5)
+                    self.assertAlmostEqual(data.sobol_angles[j, i], angles[dims[j]], 5)
+
+                # The rotation matrices.
+                R = zeros((3, 3), float64)
+                R2 = zeros((3, 3), float64)
+                if model == MODEL_ISO_CONE:
+                    tilt_torsion_to_R(angles['phi'], angles['theta'], angles['sigma'], R)
+                elif model == MODEL_ISO_CONE_TORSIONLESS:
+                    axis_angle_to_R(array([-sin(angles['phi']), cos(angles['phi']), 0.0]), angles['theta'], R)
+                elif model == MODEL_ROTOR:
+                    axis_angle_to_R(array([0.0, 0.0, 1.0]), angles['sigma'], R)
+                else:
+                    axis_angle_to_R(array([0.0, 1.0, 0.0]), angles['sigma'], R)
+                    axis_angle_to_R(array([1.0, 0.0, 0.0]), angles['sigma2'], R2)
+                for a in range(3):
+                    for b in range(3):
+                        self.assertAlmostEqual(data.Ri_prime[i, a, b], R[a, b], 5)
+                        self.assertAlmostEqual(data.Ri2_prime[i, a, b], R2[a, b], 5)
+
+
+    def test_i4_sobol_generate_vect(self):
+        """Check that the vectorised Sobol' generator matches the scalar generator."""
+
+        # Loop over the dimensions, numbers of points, and skips.
+        for m, n, skip in [[1, 50, 1000], [2, 200, 1000], [3, 2000, 1000], [4, 100, 0], [5, 100, 1]]:
+            # The two sequences.
+            points = i4_sobol_generate(m, n, skip)
+            points_vect = i4_sobol_generate_vect(m, n, skip)
+
+            # Checks.
+            self.assertEqual(points_vect.shape, (m, n))
+            self.assertEqual(points_vect.tolist(), points.tolist())
+
+
+    def test_sobol_cache(self):
+        """Check the saving to and loading from the Sobol' data cache."""
+
+        # Create and save the data.
+        self.setup_target(model=MODEL_ISO_CONE, num_params=4, cache_dir=self.tmpdir)
+        file_name = self.tmpdir + sep + 'sobol_iso_cone_2000_3D.npz'
+        self.assertEqual(listdir(self.tmpdir), ['sobol_iso_cone_2000_3D.npz'])
+        data = frame_order.sobol_data
+
+        # Reload into a fresh storage object.
+        new = Sobol_data()
+        self.assertTrue(new.load(file_name=file_name, model=MODEL_ISO_CONE, total_num=2000, dims=3))
+        self.assertEqual(new.model, MODEL_ISO_CONE)
+        self.assertEqual(new.total_num, 2000)
+        self.assertEqual(new.sobol_angles.dtype, float32)
+        self.assertEqual(new.sobol_angles.tolist(), data.sobol_angles.tolist())
+        self.assertEqual(new.Ri_prime.tolist(), data.Ri_prime.tolist())
+        self.assertEqual(new.Ri2_prime.tolist(), data.Ri2_prime.tolist())
+
+        # Mismatched cache files.
+        new = Sobol_data()
+        self.assertFalse(new.load(file_name=file_name, model=MODEL_ISO_CONE, total_num=200, dims=3))
+        self.assertFalse(new.load(file_name=file_name, model=MODEL_ISO_CONE, total_num=2000, dims=2))
+        self.assertFalse(new.load(file_name=self.tmpdir + sep + 'missing.npz', model=MODEL_ISO_CONE, total_num=2000, dims=3))
+        self.assertEqual(new.total_num, None)
+
+        # Tag the cached data, to distinguish loading from regeneration.
+        with load(file_name) as cache:
+            angles = cache['sobol_angles']
+            Ri_prime = cache['Ri_prime'] * 2.0
+            Ri2_prime = cache['Ri2_prime']
+        savez(file_name, sobol_angles=angles, Ri_prime=Ri_prime, Ri2_prime=Ri2_prime)
+
+        # The target function should now use the cached data.
+        frame_order.sobol_data = Sobol_data()
+        self.setup_target(model=MODEL_ISO_CONE, num_params=4, cache_dir=self.tmpdir)
+        self.assertEqual(frame_order.sobol_data.Ri_prime.tolist(), Ri_prime.tolist())
@@ -0,0 +1,247 @@
+###############################################################################
+#                                                                             #
+# Copyright (C) 2026 Troels E. Linnet                                         #
+#                                                                             #
+# This file is part of the program relax (http://www.nmr-relax.com).          #
+#                                                                             #
+# This program is free software: you can redistribute it and/or modify        #
+# it under the terms of the GNU General Public License as published by        #
+# the Free Software Foundation, either version 3 of the License, or           #
+# (at your option) any later version.                                         #
+#                                                                             #
+# This program is distributed in the hope that it will be useful,             #
+# but WITHOUT ANY WARRANTY; without even the implied warranty of              #
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the               #
+# GNU General Public License for more details.                                #
+#                                                                             #
+# You should have received a copy of the GNU General Public License           #
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.       #
+#                                                                             #
+###############################################################################
+
+# Python module imports.
+from math import pi
+from numpy import abs, array, float64, max, outer, zeros
+from unittest import TestCase
+
+# relax module imports.
+from lib.physical_constants import h_bar, mu0
+from lib.periodic_table import periodic_table
+from target_functions.mf import Mf
+
+
+class Test_mf(TestCase):
+    """Unit tests for the packed global model-free target functions of the target_functions.mf relax module."""
+
+    def setUp(self):
+        """Set up the spin models and relaxation data for the global model-free target functions."""
+
+        # The Rex scaling.
+        rex = 1.0 / (2.0 * pi * 600e6)**2
+
+        # The model-free equations, parameters, and parameter values of the spins.
+        self.models = [
+            ['mf_orig', ['s2'], [0.8]],
+            ['mf_orig', ['s2', 'te'], [0.7, 50e-12]],
+            ['mf_orig', ['s2', 'te', 'rex'], [0.75, 40e-12, 2.0*rex]],
+            ['mf_orig', ['s2', 'te', 'rex', 'r', 'csa'], [0.75, 40e-12, rex, 1.03e-10, -170e-6]],
+            ['mf_ext', ['s2f', 's2', 'ts'], [0.9, 0.7, 1.2e-9]],
+            ['mf_ext', ['s2f', 'tf', 's2', 'ts', 'rex'], [0.9, 20e-12, 0.7, 1.2e-9, rex]],
+            ['mf_orig', ['s2', 'te'], [0.72, 60e-12]],
+            ['mf_orig', ['s2'], [0.85]]
+        ]
+
+        # The XH unit vectors.
+        self.vectors = [
+            array([0.0, 0.0, 1.0], float64),
+            array([0.6, 0.0, 0.8], float64),
+            array([0.0, 0.6, 0.8], float64),
+            array([0.48, 0.6, 0.64], float64),
+            array([0.8, 0.6, 0.0], float64),
+            array([-0.36, 0.48, 0.8], float64),
+            array([0.64, -0.48, 0.6], float64),
+            array([-0.6, -0.64, 0.48], float64)
+        ]
+
+        # The diffusion tensor parameters.
+        self.diff_params = {
+            'sphere': [10e-9],
+            'spheroid': [10e-9, 2e6, 1.0, 2.0],
+            'ellipsoid': [10e-9, 2e6, 0.3, 0.5, 1.0, 2.0]
+        }
+
+
+    def calc_mf(self, diff_type, model_type, spin=None):
+        """Initialise the model-free target function class.
+
+        Every third spin has a single field strength with R2 and NOE data only, so that the R1 value for the NOE is back calculated.
+
+
+        @param diff_type:   The diffusion tensor type.
+        @type diff_type:    str
+        @param model_type:  The model type, either 'diff', 'all', or 'mf'.
+        @type model_type:   str
+        @keyword spin:      The index of the single spin for the 'mf' model type.
+        @type spin:         int or None
+        @return:            The target function class instance and the parameter vector.
+        @rtype:             Mf instance, numpy rank-1 array
+        """
+
+        # The spins.
+        spins = list(range(len(self.models)))
+        if model_type == 'mf':
+            spins = [spin]
+
+        # Initialise the data structures.
+        num_spins = len(spins)
+        equations = []
+        param_types = []
+        param_values = []
+        num_params = []
+        relax_data = []
+        errors = []
+        num_frq = []
+        frq = []
+        num_ri = []
+        remap_table = []
+        noe_r1_table = []
+        ri_labels = []
+
+        # Loop over the spins.
+        for i in spins:
+            # The model.
+            equations.append(self.models[i][0])
+            param_types.append(self.models[i][1])
+            param_values = param_values + self.models[i][2]
+            num_params.append(len(self.models[i][1]))
+
+            # R2 and NOE data at one field strength.
+            if i % 3 == 2:
+                num_frq.append(1)
+                frq.append([600e6])
+                num_ri.append(2)
+                remap_table.append([0, 0])
+                noe_r1_table.append([None, None])
+                ri_labels.append(['R2', 'NOE'])
+                relax_data.append(array([10.0, 0.7], float64))
+                errors.append(array([0.3, 0.05], float64))
+
+            # R1, R2 and NOE data at two field strengths.
+            else:
+                num_frq.append(2)
+                frq.append([600e6, 800e6])
+                num_ri.append(6)
+                remap_table.append([0, 0, 0, 1, 1, 1])
+                noe_r1_table.append([None, None, 0, None, None, 3])
+                ri_labels.append(['R1', 'R2', 'NOE', 'R1', 'R2', 'NOE'])
+                relax_data.append(array([1.5, 10.0, 0.7, 1.2, 12.0, 0.8], float64))
+                errors.append(array([0.05, 0.3, 0.05, 0.05, 0.3, 0.05], float64))
+
+        # The parameter vector.
+        diff_params = self.diff_params[diff_type]
+        if model_type == 'mf':
+            params = array(param_values, float64)
+            param_values = None
+        elif model_type == 'all':
+            params = array(diff_params + param_values, float64)
+            param_values = None
+        else:
+            params = array(diff_params, float64)
+            param_values = [array(param_values, float64)] * num_spins
+
+        # The gyromagnetic ratios.
+        gx = [periodic_table.gyromagnetic_ratio('15N')] * num_spins
+        gh = [periodic_table.gyromagnetic_ratio('1H')] * num_spins
+
+        # Initialise the class.
+        mf = Mf(init_params=params, model_type=model_type, diff_type=diff_type, diff_params=diff_params, num_spins=num_spins, equations=equations, param_types=param_types, param_values=param_values, relax_data=relax_data, errors=errors, bond_length=[1.02e-10]*num_spins, csa=[-172e-6]*num_spins, num_frq=num_frq, frq=frq, num_ri=num_ri, remap_table=remap_table, noe_r1_table=noe_r1_table, ri_labels=ri_labels, gx=gx, gh=gh, h_bar=h_bar, mu0=mu0, num_params=num_params, vectors=[self.vectors[i] for i in spins])
+
+        # Return the class instance and parameters.
+        return mf, params
+
+
+    def check_packed(self, diff_type, model_type):
+        """Compare the packed target functions to the single spin target functions and to finite differences.
+
+        @param diff_type:   The diffusion tensor type.
+        @type diff_type:    str
+        @param model_type:  The model type, either 'diff' or 'all'.
+        @type model_type:   str
+        """
+
+        # Initialise.
+        mf, params = self.calc_mf(diff_type, model_type)
+
+        # The sum of the chi-squared values of the single spin target functions.
+        chi2 = 0.0
+        for i in range(len(self.models)):
+            spin_mf, spin_params = self.calc_mf(diff_type, 'mf', spin=i)
+            chi2 += spin_mf.func(spin_params)
+
+        # The packed values.
+        chi2_packed = mf.func_packed(params * 1.0)
+        grad_packed = mf.dfunc_packed(params * 1.0)
+        hess_packed = mf.d2func_packed(params * 1.0)
+
+        # The chi-squared value.
+        self.assertAlmostEqual(chi2_packed / chi2, 1.0, 10)
+
+        # The gradient and Hessian from finite differences of the chi-squared value and gradient.
+        grad = zeros(len(params), float64)
+        hess = zeros((len(params), len(params)), float64)
+        for i in range(len(params)):
+            step = params[i] * 1e-5
+            params_up = params * 1.0
+            params_up[i] = params_up[i] + step
+            params_down = params * 1.0
+            params_down[i] = params_down[i] - step
+            grad[i] = (mf.func_packed(params_up) - mf.func_packed(params_down)) / (2.0 * step)
+            hess[:, i] = (mf.dfunc_packed(params_up) - mf.dfunc_packed(params_down)) / (2.0 * step)
+
+        # Check the gradient, in units of the parameter values.
+        grad_max = max(abs(grad * params))
+        for i in range(len(params)):
+            self.assertAlmostEqual(grad_packed[i] * params[i] / grad_max, grad[i] * params[i] / grad_max, 6)
+
+        # Check the Hessian, in units of the parameter values.
+        norm = outer(params, params)
+        hess_max = max(abs(hess * norm))
+        for i in range(len(params)):
+            for j in range(len(params)):
+                self.assertAlmostEqual(hess_packed[i, j] * norm[i, j] / hess_max, hess[i, j] * norm[i, j] / hess_max, 6)
+
+
+    def test_packed_sphere_diff(self):
+        """Test the packed target functions for the spherical diffusion tensor with fixed model-free parameters."""
+
+        self.check_packed('sphere', 'diff')
+
+
+    def test_packed_sphere_all(self):
+        """Test the packed target functions for the spherical diffusion tensor and all model-free parameters."""
+
+        self.check_packed('sphere', 'all')
+
+
+    def test_packed_spheroid_diff(self):
+        """Test the packed target functions for the spheroidal diffusion tensor with fixed model-free parameters."""
+
+        self.check_packed('spheroid', 'diff')
+
+
+    def test_packed_spheroid_all(self):
+        """Test the packed target functions for the spheroidal diffusion tensor and all model-free parameters."""
+
+        self.check_packed('spheroid', 'all')
+
+
+    def test_packed_ellipsoid_diff(self):
+        """Test the packed target functions for the ellipsoidal diffusion tensor with fixed model-free parameters."""
+
+        self.check_packed('ellipsoid', 'diff')
+
+
+    def test_packed_ellipsoid_all(self):
+        """Test the packed target functions for the ellipsoidal diffusion tensor and all model-free parameters."""
+
+        self.check_packed('ellipsoid', 'all')
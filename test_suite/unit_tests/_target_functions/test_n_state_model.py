@@ -20,8 +20,9 @@
 ###############################################################################
 
 # Python module imports.
+from copy import deepcopy
 from math import pi
-from numpy import array, float64, ones
+from numpy import abs, arange, array, cos, float64, int32, max, nan, ones, sin, sqrt, zeros
 from unittest import TestCase
 
 # relax module imports.
@@ -31,6 +32,100 @@ from target_functions.n_state_model import N_state_opt
 class Test_n_state_model(TestCase):
     """Unit tests for the target_functions.n_state_model relax module."""
 
+    def check_ensemble(self, model=None, pseudo=False, hessian=True):
+        """Compare the ensemble-vectorised target functions to the standard target functions.
+
+        The data consists of 3 alignments, 5 states, 7 interatomic pairs, and 6 spins, with one missing RDC and one missing PCS.
+
+
+        @keyword model:     The N-state model type, either 'population' or 'fixed'.
+        @type model:        str
+        @keyword pseudo:    A flag which if True will make every third interatomic pair a pseudo-atom pair.
+        @type pseudo:       bool
+        @keyword hessian:   A flag which if True will cause the Hessians to be compared.
+        @type hessian:      bool
+        """
+
+        # The dimensions.
+        N, A, J, S = 5, 3, 7, 6
+
+        # Deterministic pseudo-random numbers.
+        def values(shape, scale=1.0, shift=0.0):
+            x = arange(1, zeros(shape).size+1, dtype=float64).reshape(shape)
+            return scale * sin(x * 1.7 + shift) + scale * cos(x * 0.31)
+
+        # The parameters, the alignment tensors followed by the probabilities.
+        params = values(5*A, scale=1e-4)
+        if model == 'population':
+            params = array(list(params) + [0.3, 0.1, 0.25, 0.15], float64)
+
+        # The RDC data.
+        rdcs = values((A, J), scale=5.0)
+        rdcs[0, 2] = nan
+        rdc_vect = []
+        dip_const = []
+        rdc_pseudo_flags = zeros(J, int32)
+        for j in range(J):
+            if pseudo and j % 3 == 0:
+                vect = values((N, 3, 3), shift=j)
+                dip_const.append([-20000.0 - 1000.0*j, -21000.0, -22000.0])
+                rdc_pseudo_flags[j] = 1
+            else:
+                vect = values((N, 3), shift=j)
+                dip_const.append(-20000.0 - 1000.0*j)
+            rdc_vect.append(vect / sqrt((vect**2).sum(-1))[..., None])
+        absolute_rdc = zeros((A, J), int32)
+        absolute_rdc[2, 4] = 1
+
+        # The PCS data.
+        pcs = values((A, S), scale=1e-6)
+        pcs[1, 3] = nan
+        atomic_pos = values((S, N, 3), scale=10.0) + 5.0
+
+        # The keyword arguments.
+        kargs = dict(model=model, N=N, init_params=params, fixed_tensors=[False]*A, pcs=pcs, pcs_errors=0.1*ones((A, S), float64)*1e-6, pcs_weights=ones((A, S), float64), rdcs=rdcs, rdc_errors=ones((A, J), float64), rdc_weights=ones((A, J), float64), rdc_vect=rdc_vect, T_flags=zeros((A, J), int32), rdc_pseudo_flags=rdc_pseudo_flags, pcs_pseudo_flags=zeros(S, int32), temp=array([303.0]*A), frq=array([14.1]*A), dip_const=dip_const, absolute_rdc=absolute_rdc, atomic_pos=atomic_pos, paramag_centre=zeros(3, float64))
+
+        # Two independent instances.
+        standard = N_state_opt(**deepcopy(kargs))
+        ensemble = N_state_opt(**deepcopy(kargs))
+
+        # The chi-squared values.
+        chi2 = standard.func_standard(params)
+        self.assertAlmostEqual(ensemble.func(params) / chi2, 1.0, 12)
+
+        # The gradients.
+        grad = standard.dfunc_standard(params)
+        grad_ens = ensemble.dfunc(params)
+        for i in range(len(params)):
+            self.assertAlmostEqual(grad_ens[i] / max(abs(grad)), grad[i] / max(abs(grad)), 12)
+
+        # The Hessians.
+        if hessian:
+            hess = standard.d2func_standard(params)
+            hess_ens = ensemble.d2func(params)
+            for i in range(len(params)):
+                for j in range(len(params)):
+                    self.assertAlmostEqual(hess_ens[i, j] / max(abs(hess)), hess[i, j] / max(abs(hess)), 12)
+
+
+    def test_ensemble_fixed(self):
+        """Test the ensemble-vectorised target functions for the fixed probability N-state model."""
+
+        self.check_ensemble(model='fixed')
+
+
+    def test_ensemble_fixed_pseudo(self):
+        """Test the ensemble-vectorised target functions for the fixed probability N-state model with pseudo-atoms."""
+
+        self.check_ensemble(model='fixed', pseudo=True)
+
+
+    def test_ensemble_population(self):
+        """Test the ensemble-vectorised target functions for the population N-state model."""
+
+        self.check_ensemble(model='population')
+
+
     def test_func1(self):
         """Unit test 1 of the func() method.
 
@@ -0,0 +1,335 @@
+###############################################################################
+#                                                                             #
+# Copyright (C) 2026 Troels E. Linnet                                         #
+#                                                                             #
+# This file is part of the program relax (http://www.nmr-relax.com).          #
+#                                                                             #
+# This program is free software: you can redistribute it and/or modify        #
+# it under the terms of the GNU General Public License as published by        #
+# the Free Software Foundation, either version 3 of the License, or           #
+# (at your option) any later version.                                         #
+#                                                                             #
+# This program is distributed in the hope that it will be useful,             #
+# but WITHOUT ANY WARRANTY; without even the implied warranty of              #
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the               #
+# GNU General Public License for more details.                                #
+#                                                                             #
+# You should have received a copy of the GNU General Public License           #
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.       #
+#                                                                             #
+###############################################################################
+
+# Python module imports.
+from math import pi
+from numpy import abs, arctan2, array, diag, float64, max, zeros
+from unittest import TestCase
+
+# relax module imports.
+from lib.dispersion.variables import EXP_TYPE_CPMG_SQ, EXP_TYPE_R1RHO, MODEL_B14, MODEL_B14_FULL, MODEL_CR72, MODEL_CR72_FULL, MODEL_DPL94, MODEL_IT99, MODEL_LM63, MODEL_MP05, MODEL_TAP03, MODEL_TP02, MODEL_TSMFK01
+from target_functions.relax_disp import Dispersion
+
+
+class Test_relax_disp(TestCase):
+    """Unit tests for the analytic gradients and Hessians of the target_functions.relax_disp relax module."""
+
+    def setUp(self):
+        """Set up the experimental set up for two spins at two field strengths."""
+
+        # The spectrometer frequencies, for converting ppm to rad/s.
+        self.frqs = [2.0 * pi * 60.8, 2.0 * pi * 81.1]
+
+        # The CPMG frequencies, with different numbers of points per field.
+        self.cpmg_frqs = [[50.0, 100.0, 200.0, 400.0, 800.0], [75.0, 150.0, 300.0, 600.0, 900.0, 1200.0]]
+
+        # The spin-lock field strengths and offsets (rad/s) of the R1rho data.
+        self.spin_lock_nu1 = [[500.0, 1000.0, 1500.0, 2000.0], [600.0, 1200.0, 1800.0, 2400.0, 3000.0]]
+        self.offsets = [2.0 * pi * 100.0, 2.0 * pi * -300.0]
+        self.chemical_shift = 2.0 * pi * 500.0
+
+
+    def calc_disp(self, model, r1_fit=False, scaling=False):
+        """Initialise the dispersion target function class.
+
+        A single data point is flagged as missing, and the measured values are otherwise arbitrary.
+
+
+        @param model:       The dispersion model.
+        @type model:        str
+        @keyword r1_fit:    A flag which if True will cause the R1 values to be optimised.
+        @type r1_fit:       bool
+        @keyword scaling:   A flag which if True will cause a scaling matrix to be used.
+        @type scaling:      bool
+        @return:            The target function class instance.
+        @rtype:             Dispersion instance
+        """
+
+        # The experiment type and dispersion points.
+        if model in [MODEL_DPL94, MODEL_TP02, MODEL_TAP03, MODEL_MP05]:
+            exp_type = EXP_TYPE_R1RHO
+            points = self.spin_lock_nu1
+            offsets = self.offsets
+        else:
+            exp_type = EXP_TYPE_CPMG_SQ
+            points = self.cpmg_frqs
+            offsets = [None]
+
+        # Initialise the data structures.
+        values = [[]]
+        errors = [[]]
+        missing = [[]]
+        frqs = [[]]
+        offset = [[]]
+        chemical_shifts = [[]]
+        tilt_angles = [[]]
+        r1 = []
+        for si in range(2):
+            values[0].append([])
+            errors[0].append([])
+            missing[0].append([])
+            frqs[0].append([])
+            offset[0].append([])
+            chemical_shifts[0].append([])
+            tilt_angles[0].append([])
+            r1.append([])
+            for mi in range(2):
+                values[0][si].append([])
+                errors[0][si].append([])
+                missing[0][si].append([])
+                frqs[0][si].append(self.frqs[mi])
+                offset[0][si].append([])
+                chemical_shifts[0][si].append(self.chemical_shift)
+                tilt_angles[0][si].append([])
+                r1[si].append(1.5 + 0.1*mi)
+                for oi in range(len(offsets)):
+                    num = len(points[mi])
+                    values[0][si][mi].append(array([12.0 + 0.5*si + 0.2*mi + 2.0*(num-di)/num for di in range(num)], float64))
+                    errors[0][si][mi].append(array([0.3 + 0.01*di for di in range(num)], float64))
+                    missing[0][si][mi].append(array([0]*num))
+                    if exp_type == EXP_TYPE_R1RHO:
+                        offset[0][si][mi].append(offsets[oi])
+                        tilt_angles[0][si][mi].append([arctan2(2.0 * pi * nu1, self.chemical_shift - offsets[oi]) for nu1 in points[mi]])
+
+        # A missing data point.
+        missing[0][1][0][0][2] = 1
+
+        # The dispersion points and relaxation times.
+        disp_points = [[[points[mi]] * len(offsets) for mi in range(2)]]
+        relax_times = [[[[[0.04]] * len(points[mi])] * len(offsets) for mi in range(2)]]
+        cpmg_frqs = None
+        spin_lock_nu1 = None
+        if exp_type == EXP_TYPE_R1RHO:
+            spin_lock_nu1 = disp_points
+        else:
+            cpmg_frqs = disp_points
+            chemical_shifts = None
+            tilt_angles = None
+
+        # The scaling matrix.
+        scaling_matrix = None
+        if scaling:
+            scaling_matrix = diag(self.params(model, r1_fit))
+
+        # Initialise and return the class.
+        return Dispersion(model=model, num_params=None, num_spins=2, num_frq=2, exp_types=[exp_type], values=values, errors=errors, missing=missing, frqs=frqs, frqs_H=None, cpmg_frqs=cpmg_frqs, spin_lock_nu1=spin_lock_nu1, chemical_shifts=chemical_shifts, offset=offset, tilt_angles=tilt_angles, r1=r1, relax_times=relax_times, scaling_matrix=scaling_matrix, r1_fit=r1_fit)
+
+
+    def check_gradient(self, model, r1_fit=False):
+        """Compare the analytic chi-squared gradient and Hessian to finite differences.
+
+        @param model:       The dispersion model.
+        @type model:        str
+        @keyword r1_fit:    A flag which if True will cause the R1 values to be optimised.
+        @type r1_fit:       bool
+        """
+
+        # Initialise.
+        disp = self.calc_disp(model, r1_fit=r1_fit)
+        params = self.params(model, r1_fit)
+
+        # The gradient from finite differences.
+        grad = zeros(len(params), float64)
+        for i in range(len(params)):
+            step = params[i] * 1e-6
+            params_up = params * 1.0
+            params_up[i] = params_up[i] + step
+            params_down = params * 1.0
+            params_down[i] = params_down[i] - step
+            grad[i] = (disp.func(params_up) - disp.func(params_down)) / (2.0 * step)
+
+        # Check the gradient, in units of the parameter values.
+        dchi2 = disp.dfunc(params * 1.0)
+        grad_max = max(abs(grad * params))
+        for i in range(len(params)):
+            self.assertAlmostEqual(dchi2[i] * params[i] / grad_max, grad[i] * params[i] / grad_max, 6)
+
+        # For a perfect fit, the Gauss-Newton Hessian is exact.
+        disp.func(params * 1.0)
+        disp.values[:] = disp.back_calc
+        hess = zeros((len(params), len(params)), float64)
+        for i in range(len(params)):
+            step = params[i] * 1e-6
+            params_up = params * 1.0
+            params_up[i] = params_up[i] + step
+            params_down = params * 1.0
+            params_down[i] = params_down[i] - step
+            hess[:, i] = (disp.dfunc(params_up) - disp.dfunc(params_down)) / (2.0 * step)
+
+        # Check the Hessian, in units of the parameter values.
+        d2chi2 = disp.d2func(params * 1.0)
+        hess_max = max(abs(hess * params * params.reshape(-1, 1)))
+        for i in range(len(params)):
+            for j in range(len(params)):
+                self.assertAlmostEqual(d2chi2[i, j] * params[i] * params[j] / hess_max, hess[i, j] * params[i] * params[j] / hess_max, 5)
+
+
+    def params(self, model, r1_fit=False):
+        """Return the parameter vector for the model.
+
+        @param model:       The dispersion model.
+        @type model:        str
+        @keyword r1_fit:    A flag which if True will cause the R1 values to be optimised.
+        @type r1_fit:       bool
+        @return:            The parameter vector.
+        @rtype:             numpy rank-1 float array
+        """
+
+        # The R1, R2 and spin parameters per experiment, spin and field.
+        r1 = [1.4, 1.6, 1.5, 1.7]
+        r2 = [10.0, 11.0, 12.0, 13.0]
+        dw = [1.5, 2.5]
+
+        # The parameters.
+        if model == MODEL_LM63:
+            params = r2 + [0.3, 0.5] + [2000.0]
+        elif model in [MODEL_CR72, MODEL_B14]:
+            params = r2 + dw + [0.9, 1500.0]
+        elif model in [MODEL_CR72_FULL, MODEL_B14_FULL]:
+            params = [10.0, 14.0, 11.0, 15.0, 12.0, 16.0, 13.0, 17.0] + dw + [0.9, 1500.0]
+        elif model == MODEL_IT99:
+            params = r2 + dw + [0.95, 5e-4]
+        elif model == MODEL_TSMFK01:
+            params = r2 + dw + [30.0]
+        elif model == MODEL_DPL94:
+            params = r2 + [0.3, 0.5] + [5000.0]
+        else:
+            params = r2 + dw + [0.8, 5000.0]
+
+        # Fitted R1 values.
+        if r1_fit:
+            params = r1 + params
+
+        # Return the vector.
+        return array(params, float64)
+
+
+    def test_dfunc_B14(self):
+        """Test the B14 model gradient and Hessian."""
+
+        self.check_gradient(MODEL_B14)
+
+
+    def test_dfunc_B14_full(self):
+        """Test the B14 full model gradient and Hessian."""
+
+        self.check_gradient(MODEL_B14_FULL)
+
+
+    def test_dfunc_CR72(self):
+        """Test the CR72 model gradient and Hessian."""
+
+        self.check_gradient(MODEL_CR72)
+
+
+    def test_dfunc_CR72_full(self):
+        """Test the CR72 full model gradient and Hessian."""
+
+        self.check_gradient(MODEL_CR72_FULL)
+
+
+    def test_dfunc_DPL94(self):
+        """Test the DPL94 model gradient and Hessian."""
+
+        self.check_gradient(MODEL_DPL94)
+
+
+    def test_dfunc_DPL94_fit_r1(self):
+        """Test the DPL94 model gradient and Hessian, with fitted R1 values."""
+
+        self.check_gradient(MODEL_DPL94, r1_fit=True)
+
+
+    def test_dfunc_IT99(self):
+        """Test the IT99 model gradient and Hessian."""
+
+        self.check_gradient(MODEL_IT99)
+
+
+    def test_dfunc_LM63(self):
+        """Test the LM63 model gradient and Hessian."""
+
+        self.check_gradient(MODEL_LM63)
+
+
+    def test_dfunc_MP05(self):
+        """Test the MP05 model gradient and Hessian."""
+
+        self.check_gradient(MODEL_MP05)
+
+
+    def test_dfunc_MP05_fit_r1(self):
+        """Test the MP05 model gradient and Hessian, with fitted R1 values."""
+
+        self.check_gradient(MODEL_MP05, r1_fit=True)
+
+
+    def test_dfunc_TAP03(self):
+        """Test the TAP03 model gradient and Hessian."""
+
+        self.check_gradient(MODEL_TAP03)
+
+
+    def test_dfunc_TP02(self):
+        """Test the TP02 model gradient and Hessian."""
+
+        self.check_gradient(MODEL_TP02)
+
+
+    def test_dfunc_TP02_fit_r1(self):
+        """Test the TP02 model gradient and Hessian, with fitted R1 values."""
+
+        self.check_gradient(MODEL_TP02, r1_fit=True)
+
+
+    def test_dfunc_TSMFK01(self):
+        """Test the TSMFK01 model gradient and Hessian."""
+
+        self.check_gradient(MODEL_TSMFK01)
+
+
+    def test_lm_dri_scaling(self):
+        """Test the Levenberg-Marquardt Jacobian and the gradient with parameter scaling for the CR72 model."""
+
+        # Initialise.
+        disp = self.calc_disp(MODEL_CR72)
+        disp_scaled = self.calc_disp(MODEL_CR72, scaling=True)
+        params = self.params(MODEL_CR72)
+        ones = params / params
+
+        # The number of data points, excluding the missing point.
+        jacobian = disp.lm_dri(params)
+        self.assertEqual(jacobian.shape, (len(params), 2*5 + 2*6 - 1))
+        self.assertEqual(len(disp.lm_errors), 2*5 + 2*6 - 1)
+
+        # The gradient from the Levenberg-Marquardt Jacobian.
+        residuals = (disp.values - disp.back_calc)[disp.valid]
+        grad = -2.0 * (jacobian * residuals / disp.lm_errors**2).sum(axis=1)
+        dchi2 = disp.dfunc(params)
+        for i in range(len(params)):
+            self.assertAlmostEqual(grad[i] / max(abs(grad)), dchi2[i] / max(abs(grad)), 10)
+
+        # The scaled gradient and Jacobian.
+        dchi2_scaled = disp_scaled.dfunc(ones)
+        jacobian_scaled = disp_scaled.lm_dri(ones)
+        for i in range(len(params)):
+            self.assertAlmostEqual(dchi2_scaled[i] / max(abs(grad)), dchi2[i] * params[i] / max(abs(grad)), 10)
+            self.assertAlmostEqual(max(abs(jacobian_scaled[i] - jacobian[i] * params[i])), 0.0, 10)
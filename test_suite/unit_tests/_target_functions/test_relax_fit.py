@@ -20,6 +20,7 @@
 ###############################################################################
 
 # Python module imports.
+from math import exp
 from numpy import array, transpose
 from unittest import TestCase
 
@@ -27,7 +28,7 @@ from unittest import TestCase
 from dep_check import C_module_exp_fn
 from status import Status; status = Status()
 if C_module_exp_fn:
-    from target_functions.relax_fit import setup, func_exp, dfunc_exp, d2func_exp, jacobian_exp, jacobian_chi2_exp
+    from target_functions.relax_fit import setup, fit_batch, func_exp, dfunc_exp, d2func_exp, jacobian_exp, jacobian_chi2_exp
 
 
 class Test_relax_fit(TestCase):
@@ -290,3 +291,46 @@ class Test_relax_fit(TestCase):
         for i in range(len(matrix)):
             for j in range(len(matrix[i])):
                 self.assertAlmostEqual(matrix[i, j], real[i, j], 3)
+
+
+    def test_fit_batch(self):
+        """Unit test for the fit_batch() function, for curves of all three exponential models."""
+
+        # The time points.
+        relax_times = [0.0, 0.25, 0.5, 1.0, 2.0, 4.0]
+
+        # Three 2-parameter exponential curves of different lengths, with the parameters [R, I0].
+        real = [[1.0, 1000.0], [5.0, 200.0], [0.5, 3000.0]]
+        num_times = [6, 5, 4]
+        values = []
+        times = []
+        for i in range(len(real)):
+            for j in range(num_times[i]):
+                values.append(real[i][1] * exp(-real[i][0] * relax_times[j]))
+                times.append(relax_times[j])
+
+        # Fit all curves in one call, starting away from the minimum.
+        params, chi2, iter_count = fit_batch(model='exp', num_params=2, num_times=num_times, values=values, sd=[10.0]*len(values), relax_times=times, params=[2.0, 500.0]*len(real))
+
+        # Check the fitted parameters.
+        for i in range(len(real)):
+            print("Curve %i: params %s, chi2 %s, iterations %s." % (i, params[2*i:2*i+2], chi2[i], iter_count[i]))
+            self.assertAlmostEqual(params[2*i] / real[i][0], 1.0, 6)
+            self.assertAlmostEqual(params[2*i+1] / real[i][1], 1.0, 6)
+            self.assertAlmostEqual(chi2[i], 0.0, 6)
+
+        # The inversion recovery curve, with the parameters [R, I0, Iinf].
+        values = [800.0 - 1400.0*exp(-2.5*t) for t in relax_times]
+        params, chi2, iter_count = fit_batch(model='inv', num_params=3, num_times=[6], values=values, sd=[10.0]*6, relax_times=relax_times, params=[1.0, 1.0, 1.0])
+        self.assertAlmostEqual(params[0], 2.5, 6)
+        self.assertAlmostEqual(params[1], -600.0, 4)
+        self.assertAlmostEqual(params[2], 800.0, 4)
+
+        # The saturation recovery curve, with the parameters [R, Iinf].
+        values = [700.0*(1.0 - exp(-1.5*t)) for t in relax_times]
+        params, chi2, iter_count = fit_batch(model='sat', num_params=2, num_times=[6], values=values, sd=[10.0]*6, relax_times=relax_times, params=[1.0, 100.0])
+        self.assertAlmostEqual(params[0], 1.5, 6)
+        self.assertAlmostEqual(params[1], 700.0, 4)
+
+        # The model and parameter number mismatch.
+        self.assertRaises(ValueError, fit_batch, model='inv', num_params=2, num_times=[6], values=values, sd=[10.0]*6, relax_times=relax_times, params=[1.0, 100.0])
@@ -205,6 +205,14 @@ uf.add_keyarg(
     desc_short = "creation of file with parameter and calculated chi2",
     desc = "A flag specifying whether to create a file with parameters and associated chi2 value.  The default of False causes the file not to be created."
 )
+uf.add_keyarg(
+    name = "refine",
+    default = 0,
+    py_type = "int",
+    desc_short = "number of refinement levels",
+    desc = "The number of adaptive refinement levels.  For each level, an additional map with the same number of increments is created in a box of two increments on each side of the lowest chi2 point of the previous map.  The files of each level are prefixed with the file prefix followed by '_refine' and the level number.",
+    wiz_element_type = "spin"
+)
 # Description.
 uf.desc.append(Desc_container())
 uf.desc[-1].add_paragraph("This will map the space corresponding to the spin identifier and create the OpenDX files.  The map type can be changed to one of the following supported map types:")
@@ -227,6 +235,8 @@ uf.desc[-1].add_prompt("relax> dx.map(params=['s2', 's2f', 'ts'], spin_id=':6',
 uf.desc[-1].add_paragraph("To map the model-free space 'm4' for residue 2, spin N6 defined by the parameters {S2, te, Rex}, name the results 'test', and to place the files in the current directory, use one of the following commands:")
 uf.desc[-1].add_prompt("relax> dx.map(['s2', 'te', 'rex'], spin_id=':2@N6', file_prefix='test', dir=None)")
 uf.desc[-1].add_prompt("relax> dx.map(params=['s2', 'te', 'rex'], spin_id=':2@N6', inc=100, file_prefix='test', dir=None)")
+uf.desc[-1].add_paragraph("To zoom into the minimum of this space with two additional maps, each two increments either side of the lowest chi2 point of the previous map, type:")
+uf.desc[-1].add_prompt("relax> dx.map(params=['s2', 'te', 'rex'], spin_id=':2@N6', inc=20, file_prefix='test', dir=None, refine=2)")
 uf.backend = map
 uf.menu_text = "&map"
 uf.gui_icon = "relax.grid_search"
@@ -604,6 +604,14 @@ uf.add_keyarg(
     desc = "The generation of the Sobol' sequence oversamples as N * Ov * 10**M, where N is the maximum number of points, Ov is the oversamling value, and M is the number of dimensions or torsion-tilt angles used in the system.",
     wiz_element_type = "spin"
 )
+uf.add_keyarg(
+    name = "cache_dir",
+    py_type = "str",
+    arg_type = "dir",
+    desc_short = "cache directory",
+    desc = "The optional directory in which the generated Sobol' points and rotation matrices are cached, so that they are not regenerated in repeated runs or by the parallel slave processes.",
+    can_be_none = True
+)
 # Description.
 uf.desc.append(Desc_container())
 uf.desc[-1].add_paragraph("This allows the maximum number of integration points N used during the frame order target function optimisation to be specified.  This is used in the quasi-random Sobol' sequence for the numerical integration of the PCS.  The formula used to find the total number of Sobol' points is:")
@@ -619,6 +627,7 @@ uf.desc[-1].add_list_element("Generate the Sobol' sequence for the total number
 uf.desc[-1].add_list_element("Convert all points to the torsion-tilt angle system.")
 uf.desc[-1].add_list_element("Skip all Sobol' points with angles greater than the current parameter values.")
 uf.desc[-1].add_list_element("Terminate the loop over the Sobol' points once the maximum number of points has been reached.")
+uf.desc[-1].add_paragraph("As the generation of the oversampled Sobol' points can be slow for the models with many torsion-tilt angles, a cache directory can be specified.  The points for each model, total number of points and dimension are then stored in this directory and loaded in subsequent runs.")
 uf.backend = sobol_setup
 uf.menu_text = "&sobol_setup"
 uf.gui_icon = "oxygen.actions.edit-rename"
@@ -382,6 +382,38 @@ uf.wizard_size = (1000, 700)
 uf.wizard_image = WIZARD_IMAGE_PATH + 'minimise.png'
 
 
+# The minimise.grid_refine user function.
+uf = uf_info.add_uf('minimise.grid_refine')
+uf.title = "Activate the coarse-to-fine grid search refinement."
+uf.title_short = "Grid search refinement activation."
+uf.add_keyarg(
+    name = "levels",
+    default = 0,
+    py_type = "int",
+    min = 0,
+    desc_short = "refinement levels",
+    desc = "The number of refinement levels.  A value of 0 deactivates the refinement."
+)
+uf.add_keyarg(
+    name = "best",
+    default = 1,
+    py_type = "int",
+    min = 1,
+    desc_short = "number of candidates",
+    desc = "The number of best grid points to refine around at each level."
+)
+# Description.
+uf.desc.append(Desc_container())
+uf.desc[-1].add_paragraph("The coarse-to-fine grid search is an automatic alternative to the zooming grid search.  After the normal grid search, a new grid with the same number of increments is placed around each of the best grid points, spanning one grid step of the previous level on either side while staying within the original bounds.  The best points of all grids are then carried to the next level.  Refining around more than one point protects against a coarse grid missing the global minimum.")
+uf.desc[-1].add_paragraph("After setting the refinement levels, the grid search user function should be called as normal.  This is currently only supported by the relaxation dispersion analysis.")
+uf.backend = minimise.grid_refine
+uf.menu_text = "grid_&refine"
+uf.gui_icon = "oxygen.actions.zoom-in"
+uf.wizard_height_desc = 400
+uf.wizard_size = (900, 600)
+uf.wizard_image = WIZARD_IMAGE_PATH + 'minimise.png'
+
+
 # The minimise.grid_zoom user function.
 uf = uf_info.add_uf('minimise.grid_zoom')
 uf.title = "Activate the zooming grid search by setting the zoom level."
@@ -121,9 +121,25 @@ uf.wizard_image = WIZARD_IMAGE_PATH + 'monte_carlo.png'
 uf = uf_info.add_uf('monte_carlo.error_analysis')
 uf.title = "Calculate parameter errors from the Monte Carlo simulations."
 uf.title_short = "Error calculation."
+uf.add_keyarg(
+    name = "conf_level",
+    py_type = "float",
+    default = None,
+    desc_short = "confidence level",
+    desc = "The optional confidence level, for example 0.95, for reporting the percentile confidence intervals of the simulation parameter values.",
+    can_be_none = True
+)
+uf.add_keyarg(
+    name = "covariance",
+    default = False,
+    py_type = "bool",
+    desc_short = "covariance flag",
+    desc = "A flag which if True will cause the covariance matrix of the simulation parameter values of each model to be reported."
+)
 # Description.
 uf.desc.append(Desc_container())
 uf.desc[-1].add_paragraph("Parameter errors are calculated as the standard deviation of the distribution of parameter values.  This function should never be used if parameter values are obtained by minimisation and the simulation data are generated using the method 'direct'.  The reason is because only true Monte Carlo simulations can give the true parameter errors.")
+uf.desc[-1].add_paragraph("The mean, standard deviation and percentile confidence interval of the simulation values of each parameter can optionally be reported by setting the confidence level.  The covariance matrix of the simulation values of the parameters of each model can also be reported.")
 uf.desc.append(monte_carlo_desc)
 uf.backend = error_analysis.monte_carlo_error_analysis
 uf.menu_text = "&error_analysis"
@@ -516,6 +516,14 @@ uf.add_keyarg(
     desc_short = "force flag",
     desc = "A flag which if True will cause the file to be overwritten."
 )
+uf.add_keyarg(
+    name = "chunk",
+    py_type = "int",
+    min = 1,
+    desc_short = "number of spins per block",
+    desc = "The number of spins to simulate at once.  This limits the memory usage of the simulations.  If not supplied, the number of spins is chosen so that one million positions are simulated at once.",
+    can_be_none = True
+)
 # Description.
 uf.desc.append(Desc_container())
 uf.desc[-1].add_paragraph("The analysis of the pseudo-contact shift is influenced by two significant sources of noise - that of the NMR experiment and structural noise from the 3D molecular structure used.  The closer the spin to the paramagnetic centre, the greater the influence of structural noise.  This distance dependence is governed by the equation:")
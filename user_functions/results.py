@@ -85,7 +85,7 @@ uf.add_keyarg(
 )
 # Description.
 uf.desc.append(Desc_container())
-uf.desc[-1].add_paragraph("This is able to handle uncompressed, bzip2 compressed files, or gzip compressed files automatically.  The full file name including extension can be supplied, however, if the file cannot be found the file with '.bz2' appended followed by the file name with '.gz' appended will be searched for.")
+uf.desc[-1].add_paragraph("This is able to handle uncompressed, bzip2 compressed files, gzip compressed files, or files in the binary relax format automatically.  The full file name including extension can be supplied, however, if the file cannot be found the file with '.bz2' appended followed by the file name with '.gz' appended will be searched for.")
 uf.backend = results.read
 uf.menu_text = "&read"
 uf.gui_icon = "oxygen.actions.document-open"
@@ -135,6 +135,23 @@ uf.add_keyarg(
     ],
     wiz_read_only = True,
 )
+uf.add_keyarg(
+    name = "format",
+    default = "xml",
+    py_type = "str",
+    desc_short = "file format",
+    desc = "The format of the results file.",
+    wiz_element_type = "combo",
+    wiz_combo_choices = [
+        "XML",
+        "Binary"
+    ],
+    wiz_combo_data = [
+        "xml",
+        "binary"
+    ],
+    wiz_read_only = True,
+)
 uf.add_keyarg(
     name = "force",
     default = False,
@@ -151,6 +168,7 @@ uf.desc[-1].add_item_list_element("0", "No compression (no file extension),")
 uf.desc[-1].add_item_list_element("1", "bzip2 compression ('.bz2' file extension),")
 uf.desc[-1].add_item_list_element("2", "gzip compression ('.gz' file extension).")
 uf.desc[-1].add_paragraph("The complementary read function will automatically handle the compressed files.")
+uf.desc[-1].add_paragraph("The format can be set to either 'xml' or 'binary'.  The binary format contains the same XML document, but with all large numeric arrays and float lists stored natively within a zip archive compatible with the numpy '.npz' format.  This is much faster to write and read, as the arrays are memory-mapped and only loaded when accessed.  The binary format is never compressed, so the compression type is ignored.  The results.read user function automatically detects the binary format.")
 uf.backend = results.write
 uf.menu_text = "&write"
 uf.gui_icon = "oxygen.actions.document-save"
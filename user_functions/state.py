@@ -127,6 +127,17 @@ uf.add_keyarg(
     wiz_combo_choices = ["No compression", "bzip2 compression", "gzip compression"],
     wiz_combo_data = [0, 1, 2]
 )
+uf.add_keyarg(
+    name = "format",
+    default = "xml",
+    py_type = "str",
+    desc_short = "file format",
+    desc = "The format of the state file.",
+    wiz_element_type = "combo",
+    wiz_combo_choices = ["XML", "Binary"],
+    wiz_combo_data = ["xml", "binary"],
+    wiz_read_only = True
+)
 uf.add_keyarg(
     name = "force",
     default = False,
@@ -141,6 +152,7 @@ uf.desc[-1].add_paragraph("The default behaviour of this function is to compress
 uf.desc[-1].add_item_list_element("0", "No compression (no file extension).")
 uf.desc[-1].add_item_list_element("1", "bzip2 compression ('.bz2' file extension).")
 uf.desc[-1].add_item_list_element("2", "gzip compression ('.gz' file extension).")
+uf.desc[-1].add_paragraph("The format can be set to either 'xml' or 'binary'.  The binary format is a zip archive, compatible with the numpy '.npz' format, containing the same XML document but with all large numeric arrays and float lists stored natively rather than as text.  This is much faster to write and to read back in, as these arrays are memory-mapped and only loaded when accessed.  The binary format is never compressed, so the compression type is ignored and no extension is added to the file name.  The state.load user function automatically detects the binary format.")
 # Prompt examples.
 uf.desc.append(Desc_container("Prompt examples"))
 uf.desc[-1].add_paragraph("The following commands will save the current program state, uncompressed, into the file 'save':")
@@ -154,6 +166,8 @@ uf.desc[-1].add_prompt("relax> state.save(state='save.bz2')")
 uf.desc[-1].add_paragraph("If the file 'save' already exists, the following commands will save the current program state by overwriting the file.")
 uf.desc[-1].add_prompt("relax> state.save('save', force=True)")
 uf.desc[-1].add_prompt("relax> state.save(state='save', force=True)")
+uf.desc[-1].add_paragraph("The following command will save the current program state in the binary format into the file 'save.rbin':")
+uf.desc[-1].add_prompt("relax> state.save('save.rbin', format='binary')")
 uf.backend = save_state
 uf.menu_text = "&save"
 uf.gui_icon = "oxygen.actions.document-save"
@@ -1119,6 +1119,13 @@ uf.add_keyarg(
     desc = "The PDB ATOM record 'Alternate location indicator' field value.",
     can_be_none = True
 )
+uf.add_keyarg(
+    name = "atom_id",
+    py_type = "str",
+    desc_short = "atom ID string",
+    desc = "The atom identification string to restrict the loading of the structural data to.",
+    can_be_none = True
+)
 uf.add_keyarg(
     name = "verbosity",
     default = 1,
@@ -1141,6 +1148,7 @@ uf.desc[-1].add_paragraph("Setting the molecule name allows the molecule within
 uf.desc[-1].add_paragraph("Note that relax will complain if it cannot work out what to do.")
 uf.desc[-1].add_paragraph("This is able to handle uncompressed, bzip2 compressed files, or gzip compressed files automatically.  The full file name including extension can be supplied, however, if the file cannot be found, this function will search for the file name with '.bz2' appended followed by the file name with '.gz' appended.")
 uf.desc[-1].add_paragraph("If a PDB file contains alternative atomic locations, then the alternate location indicator must be specified to allow one of the multiple coordinate sets to be selected.")
+uf.desc[-1].add_paragraph("The PDB file is streamed, so that only the records of the models to be loaded are held in memory and the reading stops once all of the desired models have been read.  The atom ID string, which uses the same notation as the spin ID, can be used to only load a subset of the atoms, for example '@N,C,CA,O' for the backbone heavy atoms of a protein.  Note that the molecule part of the atom ID is matched against the new molecule names.  This allows large ensembles of many models to be loaded quickly and with a reduced memory footprint.")
 # Prompt examples.
 uf.desc.append(Desc_container("Prompt examples"))
 uf.desc[-1].add_paragraph("To load all structures from the PDB file 'test.pdb' in the directory '~/pdb', including all models and all molecules, type one of:")
@@ -1152,6 +1160,8 @@ uf.desc[-1].add_prompt("relax> structure.read_pdb(file='test.pdb', read_model=10
 uf.desc[-1].add_paragraph("To load models 1 and 5 from the file 'test.pdb' as two different structures of the same model, type one of:")
 uf.desc[-1].add_prompt("relax> structure.read_pdb('test.pdb', read_model=[1, 5], set_model_num=[1, 1])")
 uf.desc[-1].add_prompt("relax> structure.read_pdb('test.pdb', set_mol_name=['CaM_1', 'CaM_2'], read_model=[1, 5], set_model_num=[1, 1])")
+uf.desc[-1].add_paragraph("To load only the backbone amide nitrogen and hydrogen atoms of all models from the file 'test.pdb', type:")
+uf.desc[-1].add_prompt("relax> structure.read_pdb('test.pdb', atom_id='@N,H')")
 uf.desc[-1].add_paragraph("To load the files 'lactose_MCMM4_S1_1.pdb', 'lactose_MCMM4_S1_2.pdb', 'lactose_MCMM4_S1_3.pdb' and 'lactose_MCMM4_S1_4.pdb' as models, type the following sequence of commands:")
 uf.desc[-1].add_prompt("relax> structure.read_pdb('lactose_MCMM4_S1_1.pdb', set_mol_name='lactose_MCMM4_S1', set_model_num=1)")
 uf.desc[-1].add_prompt("relax> structure.read_pdb('lactose_MCMM4_S1_2.pdb', set_mol_name='lactose_MCMM4_S1', set_model_num=2)")